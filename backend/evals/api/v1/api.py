@@ -1,9 +1,15 @@
 from fastapi import APIRouter
 from backend.evals.api.v1.endpoints import (
+    analytics,
     auth,
-    evaluations
+    datasets,
+    evaluations,
+    feedback,
 )
 
 api_router = APIRouter()
 api_router.include_router(evaluations.router, prefix="/evals", tags=["evals"])
+api_router.include_router(analytics.router, prefix="/analytics", tags=["analytics"])
+api_router.include_router(datasets.router, prefix="/datasets", tags=["datasets"])
+api_router.include_router(feedback.router, prefix="/feedback", tags=["feedback"])
 api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
@@ -0,0 +1,110 @@
+from datetime import datetime
+from typing import List
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi_cache.decorator import cache
+
+from backend.common.deps.service_deps import get_current_api_key
+from backend.common.models.m2m_client_model import APIKey
+from backend.common.schemas.response_schema import IGetResponseBase, create_response
+from backend.common.utils.exceptions import IdNotFoundException
+from backend.evals import crud
+from backend.evals.core.config import settings
+from backend.evals.models import AnalyticsInterval, EvaluationJob
+from backend.evals.schema import ILeaderboardEntry, IMetricTrendPoint, IScoreHistogram, IScoreQuantiles
+
+router = APIRouter()
+
+
+@router.get("/trend")
+@cache(expire=settings.EVAL_ANALYTICS_CACHE_TTL)
+async def get_metric_trend(
+    metric_name: str,
+    task_id: UUID | None = None,
+    team_ids: List[UUID] = Query(default=[]),
+    start: datetime | None = None,
+    end: datetime | None = None,
+    interval: AnalyticsInterval = AnalyticsInterval.DAY,
+    api_key: APIKey = Depends(get_current_api_key),
+) -> IGetResponseBase[List[IMetricTrendPoint]]:
+    """
+    Job scores of a metric over time, aggregated per team and interval.
+    """
+    trend = await crud.evaluation_result.get_trend(
+        metric_name=metric_name,
+        task_id=task_id,
+        team_ids=team_ids,
+        start=start,
+        end=end,
+        interval=interval,
+    )
+    return create_response(data=trend) # type: ignore
+
+
+@router.get("/leaderboard")
+@cache(expire=settings.EVAL_ANALYTICS_CACHE_TTL)
+async def get_leaderboard(
+    task_id: UUID,
+    metric_name: str,
+    higher_is_better: bool = True,
+    limit: int = Query(default=100, ge=1, le=1000),
+    api_key: APIKey = Depends(get_current_api_key),
+) -> IGetResponseBase[List[ILeaderboardEntry]]:
+    """
+    Teams ranked by their latest job score on a metric of a task.
+    """
+    leaderboard = await crud.evaluation_result.get_leaderboard(
+        task_id=task_id, metric_name=metric_name, higher_is_better=higher_is_better, limit=limit
+    )
+    return create_response(data=leaderboard) # type: ignore
+
+
+@router.get("/quantiles")
+@cache(expire=settings.EVAL_ANALYTICS_CACHE_TTL)
+async def get_score_quantiles(
+    metric_name: str,
+    q: List[float] = Query(default=[0.5, 0.9], description="Quantiles, between 0 and 1"),
+    task_id: UUID | None = None,
+    team_ids: List[UUID] = Query(default=[]),
+    job_ids: List[UUID] = Query(default=[]),
+    start: datetime | None = None,
+    end: datetime | None = None,
+    api_key: APIKey = Depends(get_current_api_key),
+) -> IGetResponseBase[List[IScoreQuantiles]]:
+    """
+    Approximate quantiles (e.g. median, p90) of each team's per-sample scores on a metric, merged across the
+    matching jobs and time window from the stored score sketches.
+    """
+    if any(not 0 <= value <= 1 for value in q):
+        raise HTTPException(status_code=400, detail="Quantiles must be between 0 and 1.")
+    quantiles = await crud.evaluation_result.get_quantiles(
+        metric_name=metric_name,
+        quantiles=q,
+        task_id=task_id,
+        team_ids=team_ids,
+        job_ids=job_ids,
+        start=start,
+        end=end,
+    )
+    return create_response(data=quantiles) # type: ignore
+
+
+@router.get("/jobs/{job_id}/distribution")
+@cache(expire=settings.EVAL_ANALYTICS_CACHE_TTL)
+async def get_score_distribution(
+    job_id: UUID,
+    metric_name: str,
+    team_id: UUID | None = None,
+    bins: int = Query(default=20, ge=1, le=200),
+    api_key: APIKey = Depends(get_current_api_key),
+) -> IGetResponseBase[IScoreHistogram]:
+    """
+    Histogram of a job's per-item scores on a metric.
+    """
+    if not await crud.evaluation_job.get(id=job_id):
+        raise IdNotFoundException(EvaluationJob, job_id)
+    histogram = await crud.evaluation_item_result.get_score_histogram(
+        job_id=job_id, metric_name=metric_name, team_id=team_id, bins=bins
+    )
+    return create_response(data=histogram) # type: ignore
@@ -0,0 +1,150 @@
+from typing import Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi_pagination import Params
+
+from backend.common.deps.service_deps import get_current_api_key
+from backend.common.models.m2m_client_model import APIKey
+from backend.common.schemas.response_schema import (
+    IGetResponseBase,
+    IGetResponsePaginated,
+    IPostResponseBase,
+    create_response,
+)
+from backend.common.utils.exceptions import IdNotFoundException
+from backend.evals import crud
+from backend.evals.core.config import settings
+from backend.evals.models import DatasetFormat, GroundTruthDataset
+from backend.evals.schema import (
+    IDatasetSnapshotRead,
+    IGroundTruthDatasetCreate,
+    IGroundTruthDatasetList,
+    IGroundTruthDatasetRead,
+    IGroundTruthItemRead,
+)
+from backend.evals.utils.dataset_ingest import DatasetIngestError, ingest_items
+from backend.evals.utils.dataset_snapshot import SnapshotError, get_snapshot
+
+router = APIRouter()
+
+CONTENT_TYPE_FORMATS = {
+    "application/x-ndjson": DatasetFormat.NDJSON,
+    "application/jsonl": DatasetFormat.NDJSON,
+    "text/csv": DatasetFormat.CSV,
+    "application/vnd.apache.parquet": DatasetFormat.PARQUET,
+}
+
+
+@router.get("")
+async def get_datasets(
+    task_id: UUID | None = None,
+    params: Params = Depends(),
+    api_key: APIKey = Depends(get_current_api_key),
+) -> IGetResponsePaginated[IGroundTruthDatasetList]:
+    datasets = await crud.ground_truth_dataset.get_filtered_datasets(task_id=task_id, params=params)
+    return create_response(data=datasets) # type: ignore
+
+
+@router.post("")
+async def create_dataset(
+    dataset_in: IGroundTruthDatasetCreate,
+    api_key: APIKey = Depends(get_current_api_key),
+) -> IPostResponseBase[IGroundTruthDatasetRead]:
+    """
+    Create an empty dataset; add items with `POST /datasets/{dataset_id}/items/upload`.
+    """
+    dataset = await crud.ground_truth_dataset.create(obj_in=dataset_in)
+    return create_response(data=dataset, message="Dataset created.") # type: ignore
+
+
+@router.get("/{dataset_id}")
+async def get_dataset(
+    dataset_id: UUID,
+    api_key: APIKey = Depends(get_current_api_key),
+) -> IGetResponseBase[IGroundTruthDatasetRead]:
+    """
+    Dataset metadata, item count and the progress of the current or last upload.
+    """
+    dataset = await crud.ground_truth_dataset.get(id=dataset_id)
+    if not dataset:
+        raise IdNotFoundException(GroundTruthDataset, dataset_id)
+    return create_response(data=dataset) # type: ignore
+
+
+@router.get("/{dataset_id}/items")
+async def get_dataset_items(
+    dataset_id: UUID,
+    params: Params = Depends(),
+    api_key: APIKey = Depends(get_current_api_key),
+) -> IGetResponsePaginated[IGroundTruthItemRead]:
+    items = await crud.ground_truth_item.get_by_dataset_paginated(dataset_id=dataset_id, params=params)
+    return create_response(data=items) # type: ignore
+
+
+@router.post("/{dataset_id}/items/upload")
+async def upload_dataset_items(
+    dataset_id: UUID,
+    request: Request,
+    format: Optional[DatasetFormat] = None,
+    label_columns: Optional[str] = None,
+    tenant_id: UUID | None = None,
+    api_key: APIKey = Depends(get_current_api_key),
+) -> IPostResponseBase[IGroundTruthDatasetRead]:
+    """
+    Append items from a streamed NDJSON, CSV or Parquet request body.
+
+    The format is taken from `format` or the Content-Type. Rows of flat formats are split into the ground truth
+    label (`label_columns`, comma separated) and the input data (all other columns). Invalid rows are skipped and
+    reported; poll `GET /datasets/{dataset_id}` for progress while the upload runs.
+    """
+    dataset = await crud.ground_truth_dataset.get(id=dataset_id)
+    if not dataset:
+        raise IdNotFoundException(GroundTruthDataset, dataset_id)
+
+    if format is None:
+        content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+        format = CONTENT_TYPE_FORMATS.get(content_type)
+        if format is None:
+            raise HTTPException(status_code=400, detail=f"Cannot infer the dataset format from content type '{content_type}'.")
+
+    if not await crud.ground_truth_dataset.start_ingest(id=dataset_id, lease=settings.DATASET_INGEST_LEASE):
+        raise HTTPException(status_code=409, detail="Another upload to this dataset is in progress.")
+
+    try:
+        progress = await ingest_items(
+            dataset_id=dataset_id,
+            stream=request.stream(),
+            format=format,
+            label_columns=[c.strip() for c in label_columns.split(",") if c.strip()] if label_columns else [],
+            tenant_id=tenant_id,
+        )
+    except DatasetIngestError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # The upload committed through its own sessions
+    await crud.ground_truth_dataset.get_db_session().refresh(dataset)
+    return create_response(
+        data=dataset,
+        message=f"Inserted {progress['rows_inserted']} items, rejected {progress['rows_rejected']} rows.",
+    ) # type: ignore
+
+
+@router.post("/{dataset_id}/snapshot")
+async def export_dataset_snapshot(
+    dataset_id: UUID,
+    api_key: APIKey = Depends(get_current_api_key),
+) -> IPostResponseBase[IDatasetSnapshotRead]:
+    """
+    Export the columnar snapshot of the dataset's current items, if it does not exist yet.
+
+    Evaluation jobs export snapshots on demand; exporting ahead of time takes this off the first job's path.
+    """
+    dataset = await crud.ground_truth_dataset.get(id=dataset_id)
+    if not dataset:
+        raise IdNotFoundException(GroundTruthDataset, dataset_id)
+    try:
+        snapshot = await get_snapshot(dataset_id)
+    except SnapshotError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return create_response(data=IDatasetSnapshotRead.model_validate(snapshot.manifest)) # type: ignore
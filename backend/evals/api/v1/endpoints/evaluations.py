@@ -1,19 +1,136 @@
+from typing import List
+from uuid import UUID
+
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi_pagination import Params
 
 from backend.common.deps.service_deps import get_current_api_key
 from backend.common.models.m2m_client_model import APIKey
-
-from backend.evals.schema import EvaluationRequest
+from backend.common.schemas.response_schema import (
+    IGetResponseBase,
+    IGetResponsePaginated,
+    IPostResponseBase,
+    create_response,
+)
+from backend.common.utils.exceptions import IdNotFoundException
+from backend.evals import crud
+from backend.evals.models import EvaluationJob, EvaluationJobStatus
+from backend.evals.schema import (
+    IEvaluationComparisonRead,
+    IEvaluationJobCreate,
+    IEvaluationJobRead,
+    IEvaluationJobReadDetailed,
+)
+from backend.evals.tasks.evaluation_job import start_evaluation_job
 
 router = APIRouter()
 
 
 @router.post("/evaluate")
 async def evaluate_metric(
-    request: EvaluationRequest,
+    job_in: IEvaluationJobCreate,
     api_key: APIKey = Depends(get_current_api_key)
-):
-    try:
-        return {"result": None}
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
+) -> IPostResponseBase[IEvaluationJobRead]:
+    """
+    Create an evaluation job and start running it in the background.
+    """
+    if job_in.dataset_id is None:
+        raise HTTPException(status_code=400, detail="An evaluation job needs a dataset.")
+    if job_in.baseline_job_id is not None and not await crud.evaluation_job.get(id=job_in.baseline_job_id):
+        raise IdNotFoundException(EvaluationJob, job_in.baseline_job_id)
+    job = await crud.evaluation_job.create(obj_in=job_in)
+    start_evaluation_job(job.id)
+    return create_response(data=job, message="Evaluation job started.") # type: ignore
+
+
+@router.get("/jobs")
+async def get_jobs(
+    tenant_id: UUID | None = None,
+    task_id: UUID | None = None,
+    dataset_id: UUID | None = None,
+    status: EvaluationJobStatus | None = None,
+    params: Params = Depends(),
+    api_key: APIKey = Depends(get_current_api_key),
+) -> IGetResponsePaginated[IEvaluationJobRead]:
+    jobs = await crud.evaluation_job.get_filtered_jobs(
+        tenant_id=tenant_id,
+        task_id=task_id,
+        dataset_id=dataset_id,
+        status=status,
+        params=params,
+    )
+    return create_response(data=jobs) # type: ignore
+
+
+@router.get("/jobs/{job_id}")
+async def get_job(
+    job_id: UUID,
+    api_key: APIKey = Depends(get_current_api_key),
+) -> IGetResponseBase[IEvaluationJobReadDetailed]:
+    """
+    Job status and progress, with the aggregate results once completed.
+    """
+    job = await crud.evaluation_job.get(id=job_id)
+    if not job:
+        raise IdNotFoundException(EvaluationJob, job_id)
+    return create_response(data=job) # type: ignore
+
+
+@router.get("/jobs/{job_id}/comparisons")
+async def get_job_comparisons(
+    job_id: UUID,
+    metric_name: str | None = None,
+    api_key: APIKey = Depends(get_current_api_key),
+) -> IGetResponseBase[List[IEvaluationComparisonRead]]:
+    """
+    Paired comparisons of every two teams of a completed job, per metric.
+    """
+    job = await crud.evaluation_job.get(id=job_id)
+    if not job:
+        raise IdNotFoundException(EvaluationJob, job_id)
+    comparisons = await crud.evaluation_comparison.get_by_job(job_id=job_id, metric_name=metric_name)
+    return create_response(data=comparisons) # type: ignore
+
+
+@router.post("/jobs/{job_id}/rerun")
+async def rerun_job(
+    job_id: UUID,
+    api_key: APIKey = Depends(get_current_api_key),
+) -> IPostResponseBase[IEvaluationJobRead]:
+    """
+    Start a new job with the same teams, dataset and evaluators that reuses this job's item results.
+
+    Only items, teams and evaluators that changed since are run and scored again.
+    """
+    job = await crud.evaluation_job.get(id=job_id)
+    if not job:
+        raise IdNotFoundException(EvaluationJob, job_id)
+    rerun = await crud.evaluation_job.create(obj_in=IEvaluationJobCreate(
+        tenant_id=job.tenant_id,
+        task_id=job.task_id,
+        dataset_id=job.dataset_id,
+        team_ids=job.team_ids,
+        metrics=job.metrics,
+        evaluation_component=job.evaluation_component,
+        baseline_job_id=job.id,
+    ))
+    start_evaluation_job(rerun.id)
+    return create_response(data=rerun, message="Evaluation job started.") # type: ignore
+
+
+@router.post("/jobs/{job_id}/resume")
+async def resume_job(
+    job_id: UUID,
+    api_key: APIKey = Depends(get_current_api_key),
+) -> IPostResponseBase[IEvaluationJobRead]:
+    """
+    Restart a failed job from its last checkpoint.
+    """
+    job = await crud.evaluation_job.get(id=job_id)
+    if not job:
+        raise IdNotFoundException(EvaluationJob, job_id)
+    if job.status != EvaluationJobStatus.FAILED:
+        raise HTTPException(status_code=400, detail=f"Only failed jobs can be resumed, job is {job.status.value}.")
+    job = await crud.evaluation_job.update(obj_current=job, obj_new={"status": EvaluationJobStatus.PENDING})
+    start_evaluation_job(job.id)
+    return create_response(data=job, message="Evaluation job resumed.") # type: ignore
@@ -0,0 +1,67 @@
+from typing import List
+from uuid import UUID
+
+from fastapi import APIRouter, Body, Depends, HTTPException
+from fastapi_pagination import Params
+
+from backend.common.deps.service_deps import get_current_api_key
+from backend.common.models.m2m_client_model import APIKey
+from backend.common.schemas.response_schema import (
+    IGetResponseBase,
+    IGetResponsePaginated,
+    IPostResponseBase,
+    create_response,
+)
+from backend.evals import crud
+from backend.evals.core.config import settings
+from backend.evals.schema import IFeedbackSummary, IUserFeedbackCreate, IUserFeedbackRead
+from backend.evals.utils.feedback_stream import feedback_stream
+
+router = APIRouter()
+
+
+@router.post("", status_code=202)
+async def submit_feedback(
+    feedback: List[IUserFeedbackCreate] = Body(...),
+    api_key: APIKey = Depends(get_current_api_key),
+) -> IPostResponseBase[List[UUID]]:
+    """
+    Accept a batch of feedback. It is written to the database asynchronously and counted in the team and session
+    summaries immediately. Returns the ids the feedback will be stored with.
+    """
+    if len(feedback) > settings.EVAL_FEEDBACK_MAX_BATCH:
+        raise HTTPException(
+            status_code=400, detail=f"At most {settings.EVAL_FEEDBACK_MAX_BATCH} feedback entries per request."
+        )
+    ids = await feedback_stream.publish(feedback)
+    return create_response(data=ids, message="Feedback accepted.") # type: ignore
+
+
+@router.get("")
+async def get_feedback(
+    tenant_id: UUID | None = None,
+    team_id: UUID | None = None,
+    session_id: UUID | None = None,
+    params: Params = Depends(),
+    api_key: APIKey = Depends(get_current_api_key),
+) -> IGetResponsePaginated[IUserFeedbackRead]:
+    feedback = await crud.user_feedback.get_filtered_feedback(
+        tenant_id=tenant_id, team_id=team_id, session_id=session_id, params=params
+    )
+    return create_response(data=feedback) # type: ignore
+
+
+@router.get("/teams/{team_id}/summary")
+async def get_team_feedback_summary(
+    team_id: UUID,
+    api_key: APIKey = Depends(get_current_api_key),
+) -> IGetResponseBase[IFeedbackSummary]:
+    return create_response(data=await feedback_stream.summary(team_id=team_id)) # type: ignore
+
+
+@router.get("/sessions/{session_id}/summary")
+async def get_session_feedback_summary(
+    session_id: UUID,
+    api_key: APIKey = Depends(get_current_api_key),
+) -> IGetResponseBase[IFeedbackSummary]:
+    return create_response(data=await feedback_stream.summary(session_id=session_id)) # type: ignore
@@ -0,0 +1,170 @@
+"""
+Throughput benchmark of the evaluator operations used by evaluation jobs, on synthetic datasets.
+
+For each size, synthetic ground-truth labels and team responses are generated in the shape of dataset items and
+session messages. The benchmark times field extraction, `evaluate_batch` (batch_mean and bootstrap confidence
+intervals), `compare` and `estimate_sample_size` for a classification and a regression metric. Each operation is
+timed without tracing; with `--memory`, it is then run once more under `tracemalloc` to record its peak allocation.
+
+Results are appended as JSON lines to `--output`, one record per operation, tagged with the run's timestamp and git
+commit, so that runs can be compared over time.
+
+Usage: python -m backend.evals.benchmarks.evaluator_throughput [--sizes 1000 100000 1000000] [--output FILE]
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+import numpy as np
+
+from backend.evals.evaluators._base_evaluator import (
+    CIComputationMethod,
+    EvaluatorConfig,
+    FieldExtractionConfig,
+    MetricFunctionConfig,
+    compile_field_path,
+)
+from backend.evals.evaluators.sklearn import SklearnEvaluator
+
+Dataset = Tuple[List[Dict[str, Any]], List[List[Dict[str, Any]]], List[List[Dict[str, Any]]]]
+
+
+def _evaluator(name: str, ci_method: CIComputationMethod, bootstrap_iterations: int) -> SklearnEvaluator:
+    return SklearnEvaluator(EvaluatorConfig(
+        name=f"{name}_{ci_method.value}_benchmark",
+        description=f"{name} benchmark",
+        provider="sklearn",
+        extraction=FieldExtractionConfig(ground_truth_field="value", prediction_field="-1.content.value"),
+        metric=MetricFunctionConfig(
+            namespace="sklearn.metrics",
+            name=name,
+            ci_method=ci_method,
+            bootstrap_iterations=bootstrap_iterations,
+            random_seed=0,
+        ),
+    ))
+
+
+def synthetic_dataset(metric: str, n: int, rng: np.random.Generator) -> Dataset:
+    """
+    Ground-truth labels of `n` items and the responses of two teams, as stored for dataset items and sessions.
+    """
+    truth: np.ndarray
+    if metric == "accuracy_score":
+        truth = rng.integers(0, 5, n)
+        # Team a is right 70% of the time, team b 65%
+        first = np.where(rng.uniform(size=n) < 0.7, truth, rng.integers(0, 5, n))
+        second = np.where(rng.uniform(size=n) < 0.65, truth, rng.integers(0, 5, n))
+    else:
+        truth = rng.normal(size=n)
+        first = truth + rng.normal(scale=0.5, size=n)
+        second = truth + rng.normal(scale=0.55, size=n)
+    labels = [{"value": v} for v in truth.tolist()]
+    responses: List[List[List[Dict[str, Any]]]] = [
+        [[{"source": "user", "content": "..."}, {"source": "assistant", "content": {"value": v}}] for v in team.tolist()]
+        for team in (first, second)
+    ]
+    return labels, responses[0], responses[1]
+
+
+def _measure(fn: Callable[[], Any], repeat: int, memory: bool) -> Tuple[float, float | None]:
+    """
+    Best wall time of `repeat` runs and, with `memory`, the peak traced allocation of one more run in MiB.
+    """
+    seconds = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        seconds = min(seconds, time.perf_counter() - started)
+    if not memory:
+        return seconds, None
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return seconds, peak / 2**20
+
+
+def _operations(
+    metric: str, dataset: Dataset, bootstrap_iterations: int
+) -> Iterator[Tuple[str, str | None, Callable[[], Any]]]:
+    labels, first_responses, second_responses = dataset
+    truth_path = compile_field_path("value")
+    prediction_path = compile_field_path("-1.content.value")
+    yield "extract", None, lambda: (truth_path.extract_many(labels), prediction_path.extract_many(first_responses))
+
+    y_true = truth_path.extract_many(labels).tolist()
+    y_first = prediction_path.extract_many(first_responses).tolist()
+    y_second = prediction_path.extract_many(second_responses).tolist()
+    for ci_method in CIComputationMethod:
+        evaluator = _evaluator(metric, ci_method, bootstrap_iterations)
+        yield "evaluate_batch", ci_method.value, lambda: evaluator.evaluate_batch(y_true, y_first)
+        yield "compare", ci_method.value, lambda: evaluator.compare(y_true, y_first, y_second)
+        yield "estimate_sample_size", ci_method.value, lambda: evaluator.estimate_sample_size(
+            y_true, y_first, confidence=0.95, margin_of_error=0.01
+        )
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(sizes: List[int], output: str, repeat: int, memory: bool, bootstrap_iterations: int, seed: int) -> None:
+    run_info = {
+        "benchmark": "evaluator_throughput",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "bootstrap_iterations": bootstrap_iterations,
+    }
+    print(f"{'metric':<22}{'n':>9}  {'operation':<22}{'ci_method':<12}{'time (s)':>10}{'items/s':>13}{'peak (MiB)':>12}")
+    with open(output, "a") as results:
+        for n in sizes:
+            for metric in ("accuracy_score", "mean_absolute_error"):
+                dataset = synthetic_dataset(metric, n, np.random.default_rng(seed))
+                for operation, ci_method, fn in _operations(metric, dataset, bootstrap_iterations):
+                    seconds, peak_mb = _measure(fn, repeat, memory)
+                    record = {
+                        **run_info,
+                        "metric": metric,
+                        "n": n,
+                        "operation": operation,
+                        "ci_method": ci_method,
+                        "seconds": seconds,
+                        "items_per_second": n / seconds if seconds > 0 else None,
+                        "peak_memory_mb": peak_mb,
+                    }
+                    results.write(json.dumps(record) + "\n")
+                    results.flush()
+                    peak = f"{peak_mb:>12.1f}" if peak_mb is not None else f"{'-':>12}"
+                    print(f"{metric:<22}{n:>9}  {operation:<22}{ci_method or '-':<12}{seconds:>10.3f}{n / seconds:>13,.0f}{peak}")
+                del dataset
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000, 1_000_000])
+    parser.add_argument("--output", default="evals-benchmark-results.jsonl", help="JSON lines file results are appended to")
+    parser.add_argument("--repeat", type=int, default=1, help="Timed runs per operation, the fastest is kept")
+    parser.add_argument("--no-memory", dest="memory", action="store_false", help="Skip the traced run measuring peak memory")
+    parser.add_argument("--bootstrap-iterations", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    run(args.sizes, args.output, args.repeat, args.memory, args.bootstrap_iterations, args.seed)
@@ -0,0 +1,61 @@
+"""
+Benchmark of vectorized versus per-sample scoring in `SklearnEvaluator`.
+
+Usage: python -m backend.evals.benchmarks.sklearn_scoring [--sizes 1000 10000 100000]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from backend.evals.evaluators._base_evaluator import EvaluatorConfig, FieldExtractionConfig, MetricFunctionConfig
+from backend.evals.evaluators.sklearn import SklearnEvaluator
+
+
+def _evaluator(name: str, params: dict | None = None) -> SklearnEvaluator:
+    return SklearnEvaluator(EvaluatorConfig(
+        name=f"{name}_benchmark",
+        description=f"{name} benchmark",
+        provider="sklearn",
+        extraction=FieldExtractionConfig(ground_truth_field="value", prediction_field="-1.content"),
+        metric=MetricFunctionConfig(namespace="sklearn.metrics", name=name, params=params or {}),
+    ))
+
+
+def _cases(n: int, rng: np.random.Generator):
+    labels = rng.integers(0, 2, n)
+    yield "accuracy_score", {}, labels.tolist(), rng.integers(0, 2, n).tolist()
+    yield "mean_absolute_error", {}, rng.normal(size=n).tolist(), rng.normal(size=n).tolist()
+    yield "mean_squared_error", {}, rng.normal(size=n).tolist(), rng.normal(size=n).tolist()
+    yield "log_loss", {"labels": [0, 1]}, labels.tolist(), rng.uniform(size=n).tolist()
+
+
+def _time(fn) -> float:
+    started = time.perf_counter()
+    fn()
+    return time.perf_counter() - started
+
+
+def run(sizes: list[int], loop_limit: int) -> None:
+    rng = np.random.default_rng(0)
+    print(f"{'metric':<22}{'n':>9}{'loop (s)':>12}{'vectorized (s)':>16}{'speed-up':>10}")
+    for n in sizes:
+        for name, params, y_true, y_pred in _cases(n, rng):
+            evaluator = _evaluator(name, params)
+            vectorized = _time(lambda: evaluator.score_samples(y_true, y_pred))
+
+            # The per-sample loop is timed on at most `loop_limit` samples and extrapolated linearly
+            m = min(n, loop_limit)
+            fn, evaluator.vectorized_fn = evaluator.vectorized_fn, None
+            loop = _time(lambda: evaluator.score_samples(y_true[:m], y_pred[:m])) * n / m
+            evaluator.vectorized_fn = fn
+
+            print(f"{name:<22}{n:>9}{loop:>12.3f}{vectorized:>16.4f}{loop / vectorized:>9.0f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--loop-limit", type=int, default=2_000, help="Max samples timed with the per-sample loop")
+    args = parser.parse_args()
+    run(args.sizes, args.loop_limit)
@@ -1,3 +1,6 @@
+import os
+import tempfile
+
 from backend.common.core.config import Settings, SettingsConfigDict
 
 class ServiceSettings(Settings):
@@ -9,4 +12,67 @@ class ServiceSettings(Settings):
     )
     SERVICE_NAME: str = "evals"
 
+    # Evaluation result cache
+    EVAL_CACHE_LRU_SIZE: int = 100_000  # Results kept in process
+    EVAL_CACHE_TTL: int = 7 * 24 * 3600  # Seconds
+    EVAL_CACHE_WRITE_BATCH_SIZE: int = 500
+    EVAL_CACHE_FLUSH_INTERVAL: float = 1.0  # Seconds
+
+    # Evaluator registry
+    EVAL_REGISTRY_SIZE: int = 1024  # Warm evaluator instances kept per process
+    EVAL_PRELOAD_NAMESPACES: list[str] = ["sklearn.metrics"]  # Metric modules imported at startup
+
+    # Dataset uploads
+    DATASET_UPLOAD_BATCH_SIZE: int = 5000  # Rows per COPY and commit
+    DATASET_UPLOAD_SPOOL_SIZE: int = 64 * 1024 * 1024  # Bytes of an upload buffered in memory before spilling to disk
+    DATASET_UPLOAD_MAX_ERRORS: int = 100  # Rejected row messages kept in `ingest_progress`
+    DATASET_INGEST_LEASE: int = 300  # Seconds without progress before an upload counts as abandoned
+
+    # Dataset snapshots
+    EVAL_SNAPSHOTS: bool = True  # Evaluation jobs read items from columnar snapshots instead of the database
+    EVAL_SNAPSHOT_DIR: str = os.path.join(tempfile.gettempdir(), "aegis-eval-snapshots")
+    EVAL_SNAPSHOT_BUCKET: str | None = None  # MinIO bucket sharing snapshots between hosts, local disk only if unset
+    EVAL_SNAPSHOT_BATCH_SIZE: int = 10_000  # Items per exported record batch
+    EVAL_SNAPSHOT_RETENTION: int = 24 * 3600  # Seconds an outdated snapshot is kept after it was last opened
+
+    # Agents service, used to run teams on dataset items
+    AGENTS_API_URL: str = "http://localhost:8000/v1"
+    AGENTS_API_KEY: str = ""
+    AGENTS_API_TIMEOUT: float = 300.0  # Seconds per team run
+
+    # LLM judges, called through the proxy's OpenAI-compatible API
+    EVAL_JUDGE_API_URL: str = "http://localhost:8000/v1"
+    EVAL_JUDGE_API_KEY: str = ""
+    EVAL_JUDGE_TIMEOUT: float = 120.0  # Seconds per judge call
+    EVAL_JUDGE_MAX_CONCURRENCY: int = 8  # Judge calls in flight per batch
+    EVAL_JUDGE_MAX_RETRIES: int = 2  # Retries of rate limited, failed or unparsable judge calls
+    EVAL_JUDGE_BATCH_API_URL: str | None = None  # OpenAI Batch API base URL, the OpenAI default if unset
+    EVAL_JUDGE_BATCH_API_KEY: str = ""
+    EVAL_JUDGE_BATCH_POLL_INTERVAL: float = 60.0  # Seconds between batch status checks
+
+    # Embeddings of RAG metrics, computed through the judge proxy and cached on local disk and in Redis
+    EVAL_EMBEDDING_CACHE_DIR: str = os.path.join(tempfile.gettempdir(), "aegis-eval-embeddings")
+    EVAL_EMBEDDING_CACHE_TTL: int = 30 * 24 * 3600  # Seconds an embedding is kept in Redis
+    EVAL_EMBEDDING_BATCH_SIZE: int = 256  # Texts per embedding request
+
+    # Evaluation jobs
+    EVAL_JOB_CHUNK_SIZE: int = 100  # Dataset items per checkpoint
+    EVAL_JOB_MAX_CONCURRENT_RUNS: int = 8  # Team runs in flight per job
+    EVAL_JOB_SCORING_WORKERS: int | None = None  # Scoring processes, defaults to the CPU count
+    EVAL_JOB_LEASE: int = 600  # Seconds without a heartbeat before a running job counts as crashed
+    EVAL_SCORING_SHARD_MIN_WORK: int = 50_000_000  # Bootstrap iterations x samples above which resampling is sharded
+    EVAL_SCORING_SHARD_ITERATIONS: int = 50  # Bootstrap iterations per shard
+
+    # User feedback, buffered in a Redis stream and written to the database in bulk
+    EVAL_FEEDBACK_STREAM: str = "evals:feedback:stream"
+    EVAL_FEEDBACK_CONSUMER_GROUP: str = "feedback-writers"
+    EVAL_FEEDBACK_STREAM_MAX_LENGTH: int = 1_000_000  # Entries kept in the stream if the writers fall behind
+    EVAL_FEEDBACK_WRITE_BATCH_SIZE: int = 1000  # Rows per bulk insert
+    EVAL_FEEDBACK_BLOCK: float = 1.0  # Seconds a writer waits for new entries
+    EVAL_FEEDBACK_CLAIM_IDLE: int = 60  # Seconds before another writer takes over unacknowledged entries
+    EVAL_FEEDBACK_MAX_BATCH: int = 1000  # Feedback entries per request
+
+    # Analytics
+    EVAL_ANALYTICS_CACHE_TTL: int = 300  # Seconds an analytics response is cached in Redis
+
 settings = ServiceSettings()
@@ -0,0 +1,758 @@
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from fastapi_pagination import Params, Page
+from sqlalchemy import Integer, String, case, cast, exc, literal_column, or_
+from sqlalchemy.orm import lazyload, noload
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlmodel import col, delete, func, insert, select, update
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from backend.common.crud.base_crud import CRUDBase, handle_integrity_error
+from backend.common.utils.uuid6 import uuid7
+from backend.evals.evaluators.sketch import ScoreSketch
+from backend.evals.models import (
+    AnalyticsInterval,
+    DatasetIngestStatus,
+    EvaluationComparison,
+    EvaluationItemResult,
+    EvaluationJob,
+    EvaluationJobStatus,
+    EvaluationResult,
+    FeedbackType,
+    GroundTruthDataset,
+    GroundTruthItem,
+    UserFeedback,
+)
+from backend.evals.schema import (
+    IEvaluationComparisonCreate,
+    IEvaluationComparisonRead,
+    IEvaluationItemResultRead,
+    IEvaluationJobCreate,
+    IEvaluationJobRead,
+    IEvaluationJobUpdate,
+    IEvaluationResultCreate,
+    IEvaluationResultRead,
+    IFeedbackSummary,
+    IGroundTruthDatasetCreate,
+    IGroundTruthDatasetList,
+    IGroundTruthDatasetUpdate,
+    IGroundTruthItemCreate,
+    IGroundTruthItemUpdate,
+    IHistogramBin,
+    ILeaderboardEntry,
+    IMetricTrendPoint,
+    IScoreHistogram,
+    IScoreQuantiles,
+    IUserFeedbackCreate,
+    IUserFeedbackRead,
+    IUserFeedbackUpdate,
+)
+
+
+ITEM_COPY_COLUMNS = ["id", "created_at", "updated_at", "dataset_id", "tenant_id", "input_data", "ground_truth_label"]
+
+
+_SQLITE_BUCKET_FORMATS = {
+    AnalyticsInterval.HOUR: "%Y-%m-%d %H:00:00",
+    AnalyticsInterval.DAY: "%Y-%m-%d 00:00:00",
+    AnalyticsInterval.MONTH: "%Y-%m-01 00:00:00",
+}
+
+
+def _time_bucket(column: Any, interval: AnalyticsInterval, dialect: str) -> Any:
+    """
+    SQL expression for the start of the `interval` containing `column`; weeks start on Monday.
+    """
+    if dialect == "postgresql":
+        return func.date_trunc(interval.value, column)
+    if interval == AnalyticsInterval.WEEK:
+        return func.datetime(column, "weekday 0", "-6 days", "start of day")
+    return func.strftime(_SQLITE_BUCKET_FORMATS[interval], column)
+
+
+def _as_datetime(value: datetime | str) -> datetime:
+    # SQLite returns timestamps as naive strings
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+
+def _copy_record(row: Dict[str, Any]) -> Tuple[Any, ...]:
+    # COPY bypasses SQLAlchemy's type processing, so JSON columns are sent as text
+    return tuple(
+        json.dumps(row[column]) if column in ("input_data", "ground_truth_label") and row[column] is not None
+        else row[column]
+        for column in ITEM_COPY_COLUMNS
+    )
+
+
+class CRUDGroundTruthDataset(CRUDBase[GroundTruthDataset, IGroundTruthDatasetCreate, IGroundTruthDatasetUpdate, IGroundTruthDatasetList]):
+    async def get_filtered_datasets(
+        self,
+        *,
+        task_id: UUID | None = None,
+        params: Params = Params(),
+        db_session: AsyncSession | None = None,
+    ) -> Page[IGroundTruthDatasetList]:
+        query = select(GroundTruthDataset).order_by(GroundTruthDataset.created_at.desc()) # type: ignore
+        if task_id:
+            query = query.where(GroundTruthDataset.task_id == task_id)
+        return await self.get_multi_paginated(query=query, params=params, db_session=db_session) # type: ignore
+
+    async def start_ingest(
+        self, *, id: UUID, lease: int, db_session: AsyncSession | None = None
+    ) -> bool:
+        """
+        Atomically mark a dataset as ingesting; fails while another upload to it is in progress.
+
+        An upload that made no progress for `lease` seconds counts as abandoned.
+        """
+        db_session = db_session or self.get_db_session()
+        stale = datetime.now(timezone.utc) - timedelta(seconds=lease)
+        result = await db_session.execute(
+            update(GroundTruthDataset)
+            .where(col(GroundTruthDataset.id) == id)
+            .where(or_(
+                col(GroundTruthDataset.ingest_status).is_(None),
+                col(GroundTruthDataset.ingest_status) != DatasetIngestStatus.INGESTING,
+                col(GroundTruthDataset.updated_at) < stale,
+            ))
+            .values(
+                ingest_status=DatasetIngestStatus.INGESTING,
+                ingest_progress=None,
+                updated_at=datetime.now(timezone.utc),
+            )
+            .returning(col(GroundTruthDataset.id))
+        )
+        claimed = len(result.all()) == 1
+        await db_session.commit()
+        return claimed
+
+    async def renew_ingest(self, *, id: UUID, db_session: AsyncSession | None = None) -> None:
+        """
+        Keep the claim of an upload in progress from expiring, e.g. while its body is still arriving.
+        """
+        db_session = db_session or self.get_db_session()
+        await db_session.execute(
+            update(GroundTruthDataset)
+            .where(col(GroundTruthDataset.id) == id)
+            .where(col(GroundTruthDataset.ingest_status) == DatasetIngestStatus.INGESTING)
+            .values(updated_at=datetime.now(timezone.utc))
+        )
+        await db_session.commit()
+
+    async def set_ingest_progress(
+        self,
+        *,
+        id: UUID,
+        progress: Dict[str, Any],
+        added_items: int = 0,
+        status: DatasetIngestStatus | None = None,
+        db_session: AsyncSession | None = None,
+    ) -> None:
+        """
+        Record upload progress and count newly inserted items. Does not commit.
+        """
+        db_session = db_session or self.get_db_session()
+        values: Dict[str, Any] = {
+            "ingest_progress": progress,
+            "item_count": GroundTruthDataset.item_count + added_items,
+            "updated_at": datetime.now(timezone.utc),
+        }
+        if status is not None:
+            values["ingest_status"] = status
+        await db_session.execute(
+            update(GroundTruthDataset).where(GroundTruthDataset.id == id).values(**values) # type: ignore
+        )
+
+
+class CRUDGroundTruthItem(CRUDBase[GroundTruthItem, IGroundTruthItemCreate, IGroundTruthItemUpdate, GroundTruthItem]):
+    async def get_by_dataset_paginated(
+        self,
+        *,
+        dataset_id: UUID,
+        params: Params = Params(),
+        db_session: AsyncSession | None = None,
+    ) -> Page[GroundTruthItem]:
+        query = (
+            select(GroundTruthItem)
+            .options(lazyload(GroundTruthItem.dataset)) # type: ignore
+            .where(GroundTruthItem.dataset_id == dataset_id)
+            .order_by(GroundTruthItem.id) # type: ignore
+        )
+        return await self.get_multi_paginated(query=query, params=params, db_session=db_session) # type: ignore
+
+    async def bulk_insert(
+        self, *, records: List[Dict[str, Any]], db_session: AsyncSession | None = None
+    ) -> None:
+        """
+        Insert item records with COPY on PostgreSQL (asyncpg) and a multi-row INSERT elsewhere. Does not commit.
+        """
+        if not records:
+            return
+        db_session = db_session or self.get_db_session()
+        now = datetime.now(timezone.utc)
+        rows = [{"id": uuid7(), "created_at": now, "updated_at": now, **record} for record in records]
+        connection = await db_session.connection()
+        if connection.dialect.name == "postgresql" and connection.dialect.driver == "asyncpg":
+            raw_connection = await connection.get_raw_connection()
+            await raw_connection.driver_connection.copy_records_to_table( # type: ignore[union-attr]
+                GroundTruthItem.__tablename__,
+                columns=ITEM_COPY_COLUMNS,
+                records=[_copy_record(row) for row in rows],
+            )
+        else:
+            await db_session.execute(insert(GroundTruthItem), rows)
+
+    async def count_by_dataset(
+        self, *, dataset_id: UUID, db_session: AsyncSession | None = None
+    ) -> int:
+        db_session = db_session or self.get_db_session()
+        result = await db_session.execute(
+            select(func.count()).select_from(GroundTruthItem).where(GroundTruthItem.dataset_id == dataset_id)
+        )
+        return result.scalar_one()
+
+    async def get_ids(
+        self, *, dataset_id: UUID, db_session: AsyncSession | None = None
+    ) -> List[UUID]:
+        """
+        Ids of all items of a dataset in id order.
+        """
+        db_session = db_session or self.get_db_session()
+        result = await db_session.execute(
+            select(GroundTruthItem.id).where(GroundTruthItem.dataset_id == dataset_id).order_by(GroundTruthItem.id) # type: ignore
+        )
+        return list(result.scalars().all())
+
+    async def get_version_stamp(
+        self, *, dataset_id: UUID, db_session: AsyncSession | None = None
+    ) -> Tuple[int, Optional[datetime], Optional[str]]:
+        """
+        Item count, latest update and largest id of a dataset's items; changes whenever items are added, edited or
+        removed.
+        """
+        db_session = db_session or self.get_db_session()
+        result = await db_session.execute(
+            select(
+                func.count(),
+                func.max(GroundTruthItem.updated_at),
+                func.max(cast(GroundTruthItem.id, String)),  # PostgreSQL has no max() over uuid
+            ).where(GroundTruthItem.dataset_id == dataset_id)
+        )
+        count, updated_at, max_id = result.one()
+        return count, updated_at, max_id
+
+    async def get_chunk(
+        self,
+        *,
+        dataset_id: UUID,
+        after_id: UUID | None = None,
+        limit: int = 100,
+        db_session: AsyncSession | None = None,
+    ) -> Sequence[GroundTruthItem]:
+        """
+        Next `limit` items of a dataset in id order, starting after `after_id` (keyset pagination).
+        """
+        db_session = db_session or self.get_db_session()
+        query = (
+            select(GroundTruthItem)
+            .options(lazyload(GroundTruthItem.dataset)) # type: ignore
+            .where(GroundTruthItem.dataset_id == dataset_id)
+            .order_by(GroundTruthItem.id) # type: ignore
+            .limit(limit)
+        )
+        if after_id is not None:
+            query = query.where(GroundTruthItem.id > after_id) # type: ignore
+        result = await db_session.execute(query)
+        return result.scalars().all()
+
+
+class CRUDEvaluationJob(CRUDBase[EvaluationJob, IEvaluationJobCreate, IEvaluationJobUpdate, IEvaluationJobRead]):
+    async def create(
+        self,
+        *,
+        obj_in: IEvaluationJobCreate | EvaluationJob,
+        created_by_id: UUID | str | None = None,
+        db_session: AsyncSession | None = None,
+    ) -> EvaluationJob:
+        db_session = db_session or self.get_db_session()
+        db_obj = EvaluationJob.model_validate(obj_in)
+        # `team_ids` is a JSON column, which cannot hold UUID objects
+        db_obj.team_ids = [str(team_id) for team_id in db_obj.team_ids] # type: ignore[misc]
+        try:
+            db_session.add(db_obj)
+            await db_session.commit()
+        except exc.IntegrityError as e:
+            await db_session.rollback()
+            handle_integrity_error(e)
+        await db_session.refresh(db_obj)
+        return db_obj
+
+    async def get_filtered_jobs(
+        self,
+        *,
+        tenant_id: UUID | None = None,
+        task_id: UUID | None = None,
+        dataset_id: UUID | None = None,
+        status: EvaluationJobStatus | None = None,
+        params: Params = Params(),
+        db_session: AsyncSession | None = None,
+    ) -> Page[IEvaluationJobRead]:
+        # Listed jobs do not include their results, so skip loading them
+        query = select(EvaluationJob).options(noload(EvaluationJob.results)).order_by(EvaluationJob.created_at.desc()) # type: ignore
+        if tenant_id:
+            query = query.where(EvaluationJob.tenant_id == tenant_id)
+        if task_id:
+            query = query.where(EvaluationJob.task_id == task_id)
+        if dataset_id:
+            query = query.where(EvaluationJob.dataset_id == dataset_id)
+        if status:
+            query = query.where(EvaluationJob.status == status)
+        return await self.get_multi_paginated(query=query, params=params, db_session=db_session) # type: ignore
+
+    async def claim(
+        self, *, id: UUID, lease: int, db_session: AsyncSession | None = None
+    ) -> bool:
+        """
+        Atomically mark a job as running by this worker.
+
+        Succeeds for pending jobs and for running jobs whose last heartbeat is older than `lease` seconds (their
+        worker is assumed dead), so a job is never run twice at once.
+        """
+        db_session = db_session or self.get_db_session()
+        now = datetime.now(timezone.utc)
+        result = await db_session.execute(
+            update(EvaluationJob)
+            .where(col(EvaluationJob.id) == id)
+            .where(or_(
+                col(EvaluationJob.status) == EvaluationJobStatus.PENDING,
+                (col(EvaluationJob.status) == EvaluationJobStatus.RUNNING) & or_(
+                    col(EvaluationJob.heartbeat_at).is_(None),
+                    col(EvaluationJob.heartbeat_at) < now - timedelta(seconds=lease),
+                ),
+            ))
+            .values(status=EvaluationJobStatus.RUNNING, heartbeat_at=now, error_message=None)
+            .returning(col(EvaluationJob.id))
+        )
+        claimed = len(result.all()) == 1
+        await db_session.commit()
+        return claimed
+
+    async def get_resumable_ids(
+        self, *, lease: int, db_session: AsyncSession | None = None
+    ) -> List[UUID]:
+        """
+        Pending jobs and running jobs whose worker stopped sending heartbeats.
+        """
+        db_session = db_session or self.get_db_session()
+        stale = datetime.now(timezone.utc) - timedelta(seconds=lease)
+        result = await db_session.execute(
+            select(EvaluationJob.id).where(or_(
+                col(EvaluationJob.status) == EvaluationJobStatus.PENDING,
+                (col(EvaluationJob.status) == EvaluationJobStatus.RUNNING) & or_(
+                    col(EvaluationJob.heartbeat_at).is_(None),
+                    col(EvaluationJob.heartbeat_at) < stale,
+                ),
+            ))
+        )
+        return list(result.scalars().all())
+
+    async def renew(self, *, id: UUID, db_session: AsyncSession | None = None) -> None:
+        """
+        Refresh the heartbeat of a running job, keeping its lease while a long chunk is processed.
+        """
+        db_session = db_session or self.get_db_session()
+        await db_session.execute(
+            update(EvaluationJob)
+            .where(col(EvaluationJob.id) == id)
+            .where(col(EvaluationJob.status) == EvaluationJobStatus.RUNNING)
+            .values(heartbeat_at=datetime.now(timezone.utc))
+        )
+        await db_session.commit()
+
+    async def set_progress(
+        self, *, id: UUID, db_session: AsyncSession | None = None, **values: Any
+    ) -> None:
+        """
+        Update progress columns without loading the job, refreshing its heartbeat. Does not commit.
+        """
+        db_session = db_session or self.get_db_session()
+        values["heartbeat_at"] = datetime.now(timezone.utc)
+        await db_session.execute(
+            update(EvaluationJob).where(EvaluationJob.id == id).values(**values) # type: ignore
+        )
+
+
+class CRUDEvaluationItemResult(CRUDBase[EvaluationItemResult, EvaluationItemResult, EvaluationItemResult, IEvaluationItemResultRead]):
+    async def bulk_upsert(
+        self, *, records: List[Dict[str, Any]], db_session: AsyncSession | None = None
+    ) -> None:
+        """
+        Insert item results, replacing results of the same (job, item, team). Does not commit.
+        """
+        if not records:
+            return
+        db_session = db_session or self.get_db_session()
+        now = datetime.now(timezone.utc)
+        rows = [{"id": uuid7(), "created_at": now, "updated_at": now, **record} for record in records]
+        connection = await db_session.connection()
+        insert_fn = pg_insert if connection.dialect.name == "postgresql" else sqlite_insert
+        stmt = insert_fn(EvaluationItemResult).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["job_id", "item_id", "team_id"],
+            set_={
+                "session_id": stmt.excluded.session_id,
+                "run_id": stmt.excluded.run_id,
+                "prediction": stmt.excluded.prediction,
+                "scores": stmt.excluded.scores,
+                "error": stmt.excluded.error,
+                "content_hash": stmt.excluded.content_hash,
+                "score_hashes": stmt.excluded.score_hashes,
+                "updated_at": stmt.excluded.updated_at,
+            },
+        )
+        await db_session.execute(stmt)
+
+    async def get_for_items(
+        self, *, job_id: UUID, item_ids: Sequence[UUID], db_session: AsyncSession | None = None
+    ) -> List[EvaluationItemResult]:
+        """
+        Item results of a job for the given items, all teams.
+        """
+        db_session = db_session or self.get_db_session()
+        result = await db_session.execute(
+            select(EvaluationItemResult)
+            .where(EvaluationItemResult.job_id == job_id)
+            .where(EvaluationItemResult.item_id.in_(item_ids)) # type: ignore[attr-defined]
+        )
+        return list(result.scalars().all())
+
+    async def get_score_histogram(
+        self,
+        *,
+        job_id: UUID,
+        metric_name: str,
+        team_id: UUID | None = None,
+        bins: int = 20,
+        db_session: AsyncSession | None = None,
+    ) -> IScoreHistogram:
+        """
+        Histogram of a job's per-item scores on a metric, with `bins` equal-width bins between the lowest and the
+        highest score. Counted in SQL from the scores stored in the item results.
+        """
+        db_session = db_session or self.get_db_session()
+        score = col(EvaluationItemResult.scores)[metric_name].as_float()
+        query = select(score.label("score")).where(EvaluationItemResult.job_id == job_id).where(score.is_not(None))
+        if team_id:
+            query = query.where(EvaluationItemResult.team_id == team_id)
+        scores = query.subquery()
+
+        count, low, high = (await db_session.execute(
+            select(func.count(), func.min(scores.c.score), func.max(scores.c.score)).select_from(scores)
+        )).one()
+        if not count:
+            return IScoreHistogram(metric_name=metric_name, count=0, bins=[])
+        if high == low:
+            return IScoreHistogram(
+                metric_name=metric_name, count=count, min=low, max=high,
+                bins=[IHistogramBin(lower=low, upper=high, count=count)],
+            )
+
+        width = (high - low) / bins
+        connection = await db_session.connection()
+        offset = (scores.c.score - low) / width
+        # Scores are at least `low`, so truncating to an integer (SQLite) floors
+        index = func.floor(offset) if connection.dialect.name == "postgresql" else cast(offset, Integer)
+        rows = (await db_session.execute(
+            select(index.label("bin"), func.count()).select_from(scores).group_by(literal_column("bin"))
+        )).all()
+        counts = [0] * bins
+        for i, n in rows:
+            counts[min(int(i), bins - 1)] += n  # The highest score closes the last bin
+        return IScoreHistogram(
+            metric_name=metric_name, count=count, min=low, max=high,
+            bins=[
+                IHistogramBin(lower=low + i * width, upper=low + (i + 1) * width, count=n)
+                for i, n in enumerate(counts)
+            ],
+        )
+
+    async def stream_scores(
+        self, *, job_id: UUID, batch_size: int = 1000, db_session: AsyncSession | None = None
+    ) -> AsyncIterator[Tuple[UUID, UUID, Dict[str, Optional[float]]]]:
+        """
+        Stream (item_id, team_id, scores) of every item result of a job from a server-side cursor.
+        """
+        db_session = db_session or self.get_db_session()
+        query = (
+            select(EvaluationItemResult.item_id, EvaluationItemResult.team_id, EvaluationItemResult.scores)
+            .where(EvaluationItemResult.job_id == job_id)
+            .execution_options(yield_per=batch_size)
+        )
+        result = await db_session.stream(query)
+        async for item_id, team_id, scores in result:
+            yield item_id, team_id, scores
+
+
+class CRUDEvaluationResult(CRUDBase[EvaluationResult, IEvaluationResultCreate, IEvaluationResultCreate, IEvaluationResultRead]):
+    async def replace_for_job(
+        self, *, job_id: UUID, results: List[IEvaluationResultCreate], db_session: AsyncSession | None = None
+    ) -> None:
+        """
+        Replace the aggregate results of a job. Does not commit.
+        """
+        db_session = db_session or self.get_db_session()
+        await db_session.execute(delete(EvaluationResult).where(EvaluationResult.job_id == job_id)) # type: ignore
+        if results:
+            now = datetime.now(timezone.utc)
+            await db_session.execute(
+                insert(EvaluationResult),
+                [{"id": uuid7(), "created_at": now, "updated_at": now, **r.model_dump()} for r in results],
+            )
+
+    async def get_trend(
+        self,
+        *,
+        metric_name: str,
+        task_id: UUID | None = None,
+        team_ids: Sequence[UUID] = (),
+        start: datetime | None = None,
+        end: datetime | None = None,
+        interval: AnalyticsInterval = AnalyticsInterval.DAY,
+        db_session: AsyncSession | None = None,
+    ) -> List[IMetricTrendPoint]:
+        """
+        Job scores of a metric aggregated per team and time bucket, oldest bucket first.
+        """
+        db_session = db_session or self.get_db_session()
+        connection = await db_session.connection()
+        bucket = _time_bucket(EvaluationResult.created_at, interval, connection.dialect.name).label("bucket")
+        query = (
+            select( # type: ignore[call-overload]
+                bucket,
+                col(EvaluationResult.team_id),
+                func.avg(col(EvaluationResult.score)),
+                func.min(col(EvaluationResult.score)),
+                func.max(col(EvaluationResult.score)),
+                func.count(),
+            )
+            .where(EvaluationResult.metric_name == metric_name)
+            .group_by(bucket, EvaluationResult.team_id)
+            .order_by(bucket, EvaluationResult.team_id)
+        )
+        if task_id:
+            query = query.where(EvaluationResult.task_id == task_id)
+        if team_ids:
+            query = query.where(EvaluationResult.team_id.in_(team_ids)) # type: ignore[attr-defined]
+        if start:
+            query = query.where(EvaluationResult.created_at >= start) # type: ignore[operator]
+        if end:
+            query = query.where(EvaluationResult.created_at < end) # type: ignore[operator]
+        result = await db_session.execute(query)
+        return [
+            IMetricTrendPoint(
+                bucket=_as_datetime(b), team_id=team_id, mean=mean, min=low, max=high, job_count=count
+            )
+            for b, team_id, mean, low, high, count in result.all()
+        ]
+
+    async def get_quantiles(
+        self,
+        *,
+        metric_name: str,
+        quantiles: Sequence[float],
+        task_id: UUID | None = None,
+        team_ids: Sequence[UUID] = (),
+        job_ids: Sequence[UUID] = (),
+        start: datetime | None = None,
+        end: datetime | None = None,
+        db_session: AsyncSession | None = None,
+    ) -> List[IScoreQuantiles]:
+        """
+        Approximate quantiles of each team's per-sample scores on a metric, from the merged score sketches of the
+        matching results. Results stored without a sketch are left out.
+        """
+        db_session = db_session or self.get_db_session()
+        query = (
+            select(EvaluationResult.team_id, EvaluationResult.score_sketch)
+            .where(EvaluationResult.metric_name == metric_name)
+            .where(EvaluationResult.score_sketch.is_not(None)) # type: ignore[union-attr]
+        )
+        if task_id:
+            query = query.where(EvaluationResult.task_id == task_id)
+        if team_ids:
+            query = query.where(EvaluationResult.team_id.in_(team_ids)) # type: ignore[attr-defined]
+        if job_ids:
+            query = query.where(EvaluationResult.job_id.in_(job_ids)) # type: ignore[attr-defined]
+        if start:
+            query = query.where(EvaluationResult.created_at >= start) # type: ignore[operator]
+        if end:
+            query = query.where(EvaluationResult.created_at < end) # type: ignore[operator]
+
+        by_team: Dict[UUID, List[ScoreSketch]] = {}
+        for team_id, sketch in (await db_session.execute(query)).all():
+            if sketch:  # JSON null
+                by_team.setdefault(team_id, []).append(ScoreSketch.from_dict(sketch))
+        results = []
+        for team_id, sketches in sorted(by_team.items(), key=lambda item: str(item[0])):
+            merged = ScoreSketch.merge(sketches)
+            results.append(IScoreQuantiles(
+                team_id=team_id,
+                result_count=len(sketches),
+                count=merged.count,
+                min=merged.min if merged.count else None,
+                max=merged.max if merged.count else None,
+                quantiles={str(q): float(v) for q, v in zip(quantiles, merged.quantiles(quantiles))} if merged.count else {},
+            ))
+        return results
+
+    async def get_leaderboard(
+        self,
+        *,
+        task_id: UUID,
+        metric_name: str,
+        higher_is_better: bool = True,
+        limit: int = 100,
+        db_session: AsyncSession | None = None,
+    ) -> List[ILeaderboardEntry]:
+        """
+        Teams evaluated on a task's metric, ranked by their latest job score.
+        """
+        db_session = db_session or self.get_db_session()
+        recency = func.row_number().over(
+            partition_by=col(EvaluationResult.team_id),
+            order_by=EvaluationResult.created_at.desc(), # type: ignore[union-attr]
+        ).label("recency")
+        scores = (
+            select(EvaluationResult.team_id, EvaluationResult.score, EvaluationResult.created_at, recency)
+            .where(EvaluationResult.task_id == task_id)
+            .where(EvaluationResult.metric_name == metric_name)
+            .subquery()
+        )
+        latest = func.max(case((scores.c.recency == 1, scores.c.score))).label("latest_score")
+        query = (
+            select( # type: ignore[call-overload]
+                scores.c.team_id,
+                latest,
+                func.avg(scores.c.score),
+                func.max(scores.c.score) if higher_is_better else func.min(scores.c.score),
+                func.count(),
+                func.max(scores.c.created_at),
+            )
+            .group_by(scores.c.team_id)
+            .order_by(latest.desc() if higher_is_better else latest.asc(), scores.c.team_id)
+            .limit(limit)
+        )
+        result = await db_session.execute(query)
+        return [
+            ILeaderboardEntry(
+                rank=rank,
+                team_id=team_id,
+                latest_score=latest_score,
+                mean_score=mean,
+                best_score=best,
+                job_count=count,
+                last_evaluated_at=_as_datetime(last),
+            )
+            for rank, (team_id, latest_score, mean, best, count, last) in enumerate(result.all(), start=1)
+        ]
+
+
+class CRUDEvaluationComparison(CRUDBase[EvaluationComparison, IEvaluationComparisonCreate, IEvaluationComparisonCreate, IEvaluationComparisonRead]):
+    async def replace_for_job(
+        self, *, job_id: UUID, comparisons: List[IEvaluationComparisonCreate], db_session: AsyncSession | None = None
+    ) -> None:
+        """
+        Replace the team comparisons of a job. Does not commit.
+        """
+        db_session = db_session or self.get_db_session()
+        await db_session.execute(delete(EvaluationComparison).where(EvaluationComparison.job_id == job_id)) # type: ignore
+        if comparisons:
+            now = datetime.now(timezone.utc)
+            await db_session.execute(
+                insert(EvaluationComparison),
+                [{"id": uuid7(), "created_at": now, "updated_at": now, **c.model_dump()} for c in comparisons],
+            )
+
+    async def get_by_job(
+        self, *, job_id: UUID, metric_name: str | None = None, db_session: AsyncSession | None = None
+    ) -> List[EvaluationComparison]:
+        db_session = db_session or self.get_db_session()
+        query = select(EvaluationComparison).where(EvaluationComparison.job_id == job_id)
+        if metric_name is not None:
+            query = query.where(EvaluationComparison.metric_name == metric_name)
+        query = query.order_by(EvaluationComparison.metric_name, EvaluationComparison.id) # type: ignore[arg-type]
+        result = await db_session.execute(query)
+        return list(result.scalars().all())
+
+
+class CRUDUserFeedback(CRUDBase[UserFeedback, IUserFeedbackCreate, IUserFeedbackUpdate, IUserFeedbackRead]):
+    async def bulk_insert(self, *, rows: List[Dict[str, Any]], db_session: AsyncSession | None = None) -> None:
+        """
+        Insert feedback rows with their ids set, skipping ids already stored. Does not commit.
+        """
+        if not rows:
+            return
+        db_session = db_session or self.get_db_session()
+        connection = await db_session.connection()
+        insert = pg_insert if connection.dialect.name == "postgresql" else sqlite_insert
+        await db_session.execute(insert(UserFeedback).values(rows).on_conflict_do_nothing(index_elements=["id"]))
+
+    async def get_filtered_feedback(
+        self,
+        *,
+        tenant_id: UUID | None = None,
+        team_id: UUID | None = None,
+        session_id: UUID | None = None,
+        params: Params = Params(),
+        db_session: AsyncSession | None = None,
+    ) -> Page[IUserFeedbackRead]:
+        query = select(UserFeedback).order_by(UserFeedback.created_at.desc()) # type: ignore
+        if tenant_id:
+            query = query.where(UserFeedback.tenant_id == tenant_id)
+        if team_id:
+            query = query.where(UserFeedback.team_id == team_id)
+        if session_id:
+            query = query.where(UserFeedback.session_id == session_id)
+        return await self.get_multi_paginated(query=query, params=params, db_session=db_session) # type: ignore
+
+    async def get_summary(
+        self,
+        *,
+        team_id: UUID | None = None,
+        session_id: UUID | None = None,
+        db_session: AsyncSession | None = None,
+    ) -> IFeedbackSummary:
+        """
+        Feedback totals of a team or session, counted from the stored rows.
+        """
+        db_session = db_session or self.get_db_session()
+        query = select( # type: ignore[call-overload]
+            func.count(),
+            func.count(case((col(UserFeedback.feedback_type) == FeedbackType.POSITIVE, 1))),
+            func.count(case((col(UserFeedback.feedback_type) == FeedbackType.NEGATIVE, 1))),
+            func.count(col(UserFeedback.rating)),
+            func.avg(col(UserFeedback.rating)),
+        )
+        if team_id:
+            query = query.where(UserFeedback.team_id == team_id)
+        if session_id:
+            query = query.where(UserFeedback.session_id == session_id)
+        count, positive, negative, rating_count, mean_rating = (await db_session.execute(query)).one()
+        return IFeedbackSummary(
+            count=count, positive=positive, negative=negative, rating_count=rating_count, mean_rating=mean_rating
+        )
+
+
+ground_truth_dataset = CRUDGroundTruthDataset(GroundTruthDataset)
+ground_truth_item = CRUDGroundTruthItem(GroundTruthItem)
+evaluation_job = CRUDEvaluationJob(EvaluationJob)
+evaluation_item_result = CRUDEvaluationItemResult(EvaluationItemResult)
+evaluation_result = CRUDEvaluationResult(EvaluationResult)
+evaluation_comparison = CRUDEvaluationComparison(EvaluationComparison)
+user_feedback = CRUDUserFeedback(UserFeedback)
@@ -4,10 +4,16 @@ Base Evaluator Interface and Config Models.
 Defines standard evaluator API and configuration model used in evaluation service.
 """
 
+import hashlib
+import json
 from abc import ABC, abstractmethod
-from typing import Any, List, Dict, Tuple, Optional
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Callable, Iterable, List, Dict, Protocol, Sequence, Tuple, Optional
 from enum import Enum
+import numpy as np
 from pydantic import BaseModel
+from scipy.stats import norm
 
 
 class CIComputationMethod(str, Enum):
@@ -18,6 +24,14 @@ class CIComputationMethod(str, Enum):
     bootstrap = "bootstrap"    # Bootstrap estimation
 
 
+class BootstrapCIMethod(str, Enum):
+    """
+    How a confidence interval is read off the bootstrap distribution.
+    """
+    percentile = "percentile"  # Plain percentile interval
+    bca = "bca"                # Bias-corrected and accelerated interval
+
+
 class FieldExtractionConfig(BaseModel):
     """
     Configuration to extract ground truth and predicted values from input data.
@@ -42,6 +56,10 @@ class MetricFunctionConfig(BaseModel):
     params: Dict[str, Any] = {}
     ci_method: CIComputationMethod = CIComputationMethod.batch_mean
     bootstrap_iterations: int = 1000  # Used only if ci_method is bootstrap
+    bootstrap_ci_method: BootstrapCIMethod = BootstrapCIMethod.percentile
+    bootstrap_max_memory_mb: int = 256  # Cap on the resampling index matrix held at once
+    random_seed: Optional[int] = None  # Seed for reproducible bootstrap intervals
+    cache_version: int = 1  # Bump to invalidate cached results, e.g. after changing a judge prompt
 
 
 class EvaluatorConfig(BaseModel):
@@ -76,6 +94,7 @@ class BatchEvaluationResult(BaseModel):
     confidence_interval: Optional[Tuple[float, float]] = None
     sample_size: int
     additional_info: Optional[dict] = None
+    sketch: Optional[Dict[str, Any]] = None  # Serialized `ScoreSketch` of the per-sample scores, for quantiles
 
 
 class ComparisonResult(BaseModel):
@@ -99,6 +118,58 @@ class FieldExtractionError(Exception):
         super().__init__(f"Failed to extract field at path: '{field_path}'")
 
 
+ScoreKey = Tuple[str, str, str]
+
+
+class ResultCache(Protocol):
+    """
+    Synchronous view of a persistent evaluation result cache, e.g. `EvaluationCacheStore`.
+    """
+
+    def peek(self, config_hash: str, input_hash: str) -> Optional[Dict[str, Any]]: ...
+
+    def put(self, config_hash: str, input_hash: str, result: Dict[str, Any]) -> None: ...
+
+
+class ScoreCache:
+    """
+    In-process LRU of per-sample scores keyed by (evaluator config hash, dataset item id, sample hash), where the
+    sample hash covers the extracted ground truth and prediction.
+
+    Lets `evaluate_batch`, `compare` and `estimate_sample_size` on the same predictions share a single scoring pass,
+    and evaluation jobs skip samples a scoring worker has already scored.
+    """
+
+    def __init__(self, max_size: int = 1_000_000):
+        self.max_size = max_size
+        self._scores: OrderedDict[ScoreKey, float] = OrderedDict()
+
+    def get_many(self, keys: Sequence[ScoreKey]) -> List[Optional[float]]:
+        found = []
+        for key in keys:
+            score = self._scores.get(key)
+            if score is not None:
+                self._scores.move_to_end(key)
+            found.append(score)
+        return found
+
+    def put_many(self, items: Iterable[Tuple[ScoreKey, float]]) -> None:
+        for key, score in items:
+            self._scores[key] = score
+            self._scores.move_to_end(key)
+        while len(self._scores) > self.max_size:
+            self._scores.popitem(last=False)
+
+    def clear(self) -> None:
+        self._scores.clear()
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+
+score_cache = ScoreCache()
+
+
 class Evaluator(ABC):
     """
     Abstract Evaluator class.
@@ -106,8 +177,38 @@ class Evaluator(ABC):
     Each concrete Evaluator must implement this interface.
     """
 
-    def __init__(self, config: EvaluatorConfig):
+    # Evaluators whose scoring is cheaper than hashing predictions (e.g. vectorized metrics) turn this off
+    score_cache_enabled: bool = True
+    # Evaluators with expensive scores (e.g. paid model calls) persist them in the evaluation cache
+    cache_results: bool = False
+
+    def __init__(self, config: EvaluatorConfig, result_cache: Optional[ResultCache] = None):
         self.config = config
+        self.result_cache = result_cache
+
+    @property
+    def config_hash(self) -> str:
+        """
+        Hash of the parts of the config that determine per-sample scores.
+        """
+        metric = self.config.metric
+        return hash_value({
+            "provider": self.config.provider,
+            "extraction": self.config.extraction.model_dump(),
+            "namespace": metric.namespace,
+            "name": metric.name,
+            "params": metric.params,
+            "cache_version": metric.cache_version,
+        })
+
+    @property
+    def result_config_hash(self) -> str:
+        """
+        Hash under which results are kept in the result cache.
+
+        Defaults to `config_hash`; evaluators whose results serve several metrics hash only what determines the result.
+        """
+        return self.config_hash
 
     @abstractmethod
     def evaluate(self, y_true: Any, y_pred: Any) -> EvaluationResult:
@@ -116,45 +217,178 @@ class Evaluator(ABC):
         """
         pass
 
+    def score_samples(self, y_true_list: List[Any], y_pred_list: List[Any]) -> np.ndarray:
+        """
+        Per-sample scores of a batch.
+
+        Evaluators that can score a whole batch at once (e.g. vectorized metrics) override this.
+        """
+        return np.array([self.evaluate(yt, yp).score for yt, yp in zip(y_true_list, y_pred_list)], dtype=float)
+
+    async def aevaluate_samples(self, y_true_list: List[Any], y_pred_list: List[Any]) -> List[EvaluationResult]:
+        """
+        Per-sample results of a batch, for evaluators that wait on I/O (e.g. model calls) rather than compute.
+        """
+        metric_name = self.config.metric.name
+        return [
+            EvaluationResult(score=float(score), metric_name=metric_name)
+            for score in self.score_samples(y_true_list, y_pred_list)
+        ]
+
+    def cached_score(self, result: Dict[str, Any]) -> float:
+        """
+        This evaluator's score from a result in the result cache.
+        """
+        return float(result["score"])
+
+    def cached_scores(
+        self, y_true_list: List[Any], y_pred_list: List[Any], item_ids: Optional[List[Any]] = None
+    ) -> np.ndarray:
+        """
+        Per-sample scores, reusing scores already computed for the same (config, item, ground truth, prediction).
+
+        Without `item_ids` the scores are computed directly.
+        """
+        if item_ids is None or not self.score_cache_enabled:
+            return self.score_samples(y_true_list, y_pred_list)
+
+        config_hash = self.config_hash
+        keys = [
+            (config_hash, str(item_id), hash_value([y_true, y_pred]))
+            for item_id, y_true, y_pred in zip(item_ids, y_true_list, y_pred_list)
+        ]
+        cached = score_cache.get_many(keys)
+
+        scores = np.array([np.nan if score is None else score for score in cached], dtype=float)
+        missing = [i for i, score in enumerate(cached) if score is None]
+        if missing:
+            computed = self.score_samples([y_true_list[i] for i in missing], [y_pred_list[i] for i in missing])
+            scores[missing] = computed
+            score_cache.put_many((keys[i], float(score)) for i, score in zip(missing, computed))
+        return scores
+
     @abstractmethod
-    def evaluate_batch(self, y_true_list: List[Any], y_pred_list: List[Any]) -> BatchEvaluationResult:
+    def evaluate_batch(
+        self, y_true_list: List[Any], y_pred_list: List[Any], item_ids: Optional[List[Any]] = None
+    ) -> BatchEvaluationResult:
         """
         Compute batch metrics: mean, std dev, confidence interval.
         Implementation must respect self.config.metric.ci_method:
         - batch_mean: compute mean/std over per-sample scores
         - bootstrap: compute confidence intervals using bootstrap sampling
+
+        `item_ids` (dataset item ids) let per-sample scores be reused, see `cached_scores`.
         """
         pass
 
     @abstractmethod
-    def compare(self, y_true: List[Any], y_pred1: List[Any], y_pred2: List[Any]) -> ComparisonResult:
+    def compare(
+        self, y_true: List[Any], y_pred1: List[Any], y_pred2: List[Any], item_ids: Optional[List[Any]] = None
+    ) -> ComparisonResult:
         """
         Compare two prediction sets and return structured comparison result.
         """
         pass
 
     @abstractmethod
-    def estimate_sample_size(self, y_true_list: List[Any], y_pred_list: List[Any], confidence: float, margin_of_error: float) -> int:
+    def estimate_sample_size(
+        self,
+        y_true_list: List[Any],
+        y_pred_list: List[Any],
+        confidence: float,
+        margin_of_error: float,
+        item_ids: Optional[List[Any]] = None,
+    ) -> int:
         """
         Estimate required sample size empirically.
         """
         pass
 
+    def summarize_scores(
+        self, scores: np.ndarray, confidence: float = 0.95, bootstrap_means: Optional[np.ndarray] = None
+    ) -> BatchEvaluationResult:
+        """
+        Mean, std dev and confidence interval of per-sample scores, following `self.config.metric.ci_method`.
+
+        `bootstrap_means` are precomputed resample means of `scores`, e.g. shared with other metrics by a suite.
+        """
+        scores = np.asarray(scores, dtype=float)
+        mean_score = np.mean(scores)
+        std_dev = np.std(scores, ddof=1) if len(scores) > 1 else 0.0
+
+        ci_method = self.config.metric.ci_method
+        if ci_method == "batch_mean":
+            ci = norm.interval(confidence, loc=mean_score, scale=std_dev / np.sqrt(len(scores))) if len(scores) > 1 else (mean_score, mean_score)
+        elif ci_method == "bootstrap":
+            ci = self.bootstrap_ci(scores, confidence=confidence, means=bootstrap_means)
+        else:
+            raise ValueError(f"Unsupported ci_method: {ci_method}")
+
+        return BatchEvaluationResult(
+            metric_name=self.config.metric.name,
+            mean=mean_score,
+            std_dev=std_dev,
+            confidence_interval=ci,
+            sample_size=len(scores)
+        )
+
+    def bootstrap_ci(
+        self, scores: np.ndarray, confidence: float = 0.95, means: Optional[np.ndarray] = None
+    ) -> Tuple[float, float]:
+        """
+        Bootstrap confidence interval of the mean score, using the metric's bootstrap settings.
+        """
+        metric = self.config.metric
+        if means is None:
+            means = bootstrap_means(
+                scores,
+                iterations=metric.bootstrap_iterations,
+                rng=np.random.default_rng(metric.random_seed),
+                max_memory_mb=metric.bootstrap_max_memory_mb,
+            )
+        return bootstrap_interval(scores, means, method=metric.bootstrap_ci_method, confidence=confidence)
+
+    def paired_bootstrap(
+        self, differences: np.ndarray, confidence: float = 0.95
+    ) -> Tuple[Tuple[float, float], float]:
+        """
+        Bootstrap confidence interval and two-sided p-value of the mean paired difference.
+
+        Resampling the per-sample differences resamples whole pairs, which keeps the pairing.
+        """
+        metric = self.config.metric
+        means = bootstrap_means(
+            differences,
+            iterations=metric.bootstrap_iterations,
+            rng=np.random.default_rng(metric.random_seed),
+            max_memory_mb=metric.bootstrap_max_memory_mb,
+        )
+        ci = bootstrap_interval(differences, means, method=metric.bootstrap_ci_method, confidence=confidence)
+        p_value = min(1.0, 2 * min(float(np.mean(means <= 0)), float(np.mean(means >= 0))))
+        return ci, p_value
+
     def check_cache(self, y_true: Any, y_pred: Any) -> Optional[EvaluationResult]:
         """
         Optional cache lookup for expensive evaluations (e.g., LLM judges).
 
-        Concrete evaluators may override this to check DB or Redis cache.
+        Looks in the attached result cache for evaluators with `cache_results`. Batches should be prefetched into it
+        with `evaluation_cache.get_many` (see `ascore_samples`), as this hook only sees the in-process tier.
         """
-        return None
+        if not (self.cache_results and self.result_cache):
+            return None
+        cached = self.result_cache.peek(self.result_config_hash, hash_value({"y_true": y_true, "y_pred": y_pred}))
+        return EvaluationResult.model_validate(cached) if cached is not None else None
 
     def store_cache(self, y_true: Any, y_pred: Any, result: EvaluationResult) -> None:
         """
         Optional cache storage for expensive evaluations.
 
-        Concrete evaluators may override this to persist evaluation results.
+        Stores into the attached result cache, which persists results in the background.
         """
-        pass
+        if self.cache_results and self.result_cache:
+            self.result_cache.put(
+                self.result_config_hash, hash_value({"y_true": y_true, "y_pred": y_pred}), result.model_dump()
+            )
 
     def to_config(self) -> EvaluatorConfig:
         """
@@ -174,36 +408,172 @@ class Evaluator(ABC):
         """
         Extract y_true and y_pred from input objects using extraction config.
         """
-        y_true = extract_field(ground_truth_label, self.config.extraction.ground_truth_field)
+        y_true = compile_field_path(self.config.extraction.ground_truth_field)(ground_truth_label)
         if y_true is None:
             raise FieldExtractionError(self.config.extraction.ground_truth_field)
 
+        return y_true, self.extract_prediction(chat_response)
+
+    def extract_prediction(self, chat_response: List[Any]) -> Any:
+        """
+        Extract y_pred alone, for when y_true comes from elsewhere (e.g. a dataset snapshot).
+        """
         last_msg = chat_response[-1]
         content = getattr(last_msg, "content", None)
         if isinstance(content, str):
-            y_pred = content
-        else:
-            y_pred = extract_field(chat_response, self.config.extraction.prediction_field)
-            if y_pred is None:
-                raise FieldExtractionError(self.config.extraction.prediction_field)
+            return content
+        y_pred = compile_field_path(self.config.extraction.prediction_field)(chat_response)
+        if y_pred is None:
+            raise FieldExtractionError(self.config.extraction.prediction_field)
+        return y_pred
+
+
+def hash_value(value: Any) -> str:
+    """
+    Stable hash of a JSON-like value (dicts are hashed independent of key order).
+    """
+    if isinstance(value, BaseModel):
+        value = value.model_dump(mode="json")
+    canonical_json = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical_json.encode("utf-8")).hexdigest()
+
+
+def _field_accessor(part: str) -> Callable[[Any], Any]:
+    """
+    Accessor for one part of a dotted path; integer parts index lists, other parts read dict keys or attributes.
+    """
+    if part.isdigit() or (part.startswith("-") and part[1:].isdigit()):
+        index = int(part)
+
+        def get_index(obj: Any) -> Any:
+            if isinstance(obj, list):
+                return obj[index]
+            if isinstance(obj, dict):
+                return obj.get(part)
+            return getattr(obj, part, None)
+        return get_index
+
+    def get_key(obj: Any) -> Any:
+        if isinstance(obj, dict):
+            return obj.get(part)
+        return getattr(obj, part, None)
+    return get_key
+
+
+class FieldPath:
+    """
+    Dotted field path compiled into a chain of accessors, so the path is parsed once rather than on every call.
+    """
+    __slots__ = ("path", "_accessors")
+
+    def __init__(self, path: str):
+        self.path = path
+        self._accessors = tuple(_field_accessor(part) for part in path.split("."))
 
-        return y_true, y_pred
+    def __call__(self, obj: Any) -> Any:
+        for accessor in self._accessors:
+            obj = accessor(obj)
+            if obj is None:
+                break
+        return obj
+
+    def extract_many(self, records: Iterable[Any], dtype: Any = object) -> np.ndarray:
+        """
+        The field of every record as an array.
+
+        Missing fields, including list indexes out of range, are `None` in object arrays and NaN in numeric ones.
+        """
+        values = []
+        for record in records:
+            try:
+                values.append(self(record))
+            except IndexError:
+                values.append(None)
+        if np.dtype(dtype) == object:
+            array = np.empty(len(values), dtype=object)
+            array[:] = values  # Element-wise, so list values are not turned into extra dimensions
+            return array
+        return np.array([np.nan if value is None else value for value in values], dtype=dtype)
+
+
+@lru_cache(maxsize=1024)
+def compile_field_path(field_path: str) -> FieldPath:
+    return FieldPath(field_path)
 
 
 def extract_field(obj: Any, field_path: str) -> Any:
     """
     Dotted path extractor to retrieve nested fields from dict, Pydantic model or list.
     """
-    parts = field_path.split(".")
-    for part in parts:
-        if isinstance(obj, list) and (part.isdigit() or (part.startswith("-") and part[1:].isdigit())):
-            obj = obj[int(part)]
-        elif isinstance(obj, BaseModel):
-            obj = getattr(obj, part, None)
-        elif isinstance(obj, dict):
-            obj = obj.get(part)
-        else:
-            obj = getattr(obj, part, None)
-        if obj is None:
-            break
-    return obj
+    return compile_field_path(field_path)(obj)
+
+
+def bootstrap_means(
+    scores: np.ndarray, iterations: int, rng: np.random.Generator, max_memory_mb: int = 256
+) -> np.ndarray:
+    """
+    Means of `iterations` bootstrap resamples of `scores`.
+
+    Resamples are drawn as a (B x n) index matrix, in chunks of rows so that the indices and gathered scores stay
+    under `max_memory_mb`. The draws do not depend on the chunk size, so results are reproducible for a given seed.
+    A (k x n) matrix of scores of several metrics on the same samples is resampled with one shared index matrix and
+    gives (k x B) means; each row equals the means of that metric's scores alone.
+    """
+    scores = np.asarray(scores, dtype=float)
+    n = scores.shape[-1]
+    if n == 0:
+        return np.empty(scores.shape[:-1] + (0,))
+
+    metrics = scores.size // n
+    bytes_per_row = n * (np.dtype(np.int64).itemsize + metrics * scores.itemsize)
+    rows_per_chunk = max(1, (max_memory_mb * 1024 * 1024) // bytes_per_row)
+
+    means = np.empty(scores.shape[:-1] + (iterations,))
+    for start in range(0, iterations, rows_per_chunk):
+        stop = min(start + rows_per_chunk, iterations)
+        indices = rng.integers(0, n, size=(stop - start, n))
+        means[..., start:stop] = scores[..., indices].mean(axis=-1)
+    return means
+
+
+# (scores, iterations, seed, max_memory_mb) -> resample means, see `resample_means`
+Resampler = Callable[[np.ndarray, int, Optional[int], int], np.ndarray]
+
+
+def resample_means(scores: np.ndarray, iterations: int, seed: Optional[int], max_memory_mb: int = 256) -> np.ndarray:
+    """
+    `bootstrap_means` drawn in process from a generator seeded with `seed`. The default `Resampler`.
+    """
+    return bootstrap_means(scores, iterations=iterations, rng=np.random.default_rng(seed), max_memory_mb=max_memory_mb)
+
+
+def bootstrap_interval(
+    scores: np.ndarray,
+    means: np.ndarray,
+    method: BootstrapCIMethod = BootstrapCIMethod.percentile,
+    confidence: float = 0.95,
+) -> Tuple[float, float]:
+    """
+    Confidence interval of the mean from its bootstrap distribution.
+
+    BCa corrects the percentile interval for the bias of the bootstrap distribution (z0) and for the skew of the
+    statistic, estimated from jackknife means (acceleration).
+    """
+    scores = np.asarray(scores, dtype=float)
+    alpha = (1 - confidence) / 2
+    quantiles = np.array([alpha, 1 - alpha])
+
+    if method == BootstrapCIMethod.bca and len(scores) > 2:
+        theta = scores.mean()
+        proportion_below = np.mean(means < theta)
+        jackknife = (scores.sum() - scores) / (len(scores) - 1)
+        deviations = jackknife.mean() - jackknife
+        denominator = 6 * np.sum(deviations ** 2) ** 1.5
+        if 0 < proportion_below < 1 and denominator > 0:
+            z0 = norm.ppf(proportion_below)
+            acceleration = np.sum(deviations ** 3) / denominator
+            z = norm.ppf(quantiles)
+            quantiles = norm.cdf(z0 + (z0 + z) / (1 - acceleration * (z0 + z)))
+
+    lower, upper = np.quantile(means, quantiles)
+    return float(lower), float(upper)
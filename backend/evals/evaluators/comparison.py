@@ -0,0 +1,143 @@
+"""
+Pairwise comparison of several teams on the same items.
+
+`Evaluator.compare` compares two prediction sets. Comparing k teams that way takes k(k-1)/2 calls, each scoring both
+sides again. Here each team is scored once into an (items x teams) matrix, and the paired differences of all pairs
+are summarized together from the (items x pairs) difference matrix. Bootstrap comparisons of pairs scored on the
+same items resample one index matrix.
+
+With many pairs, some differences come out significant by chance alone, so p-values are adjusted for the number of
+pairs per metric before deciding significance. Confidence intervals are not adjusted.
+"""
+from collections import defaultdict
+from enum import Enum
+from typing import Dict, List, Tuple
+
+import numpy as np
+from scipy.stats import norm
+
+from backend.evals.evaluators._base_evaluator import (
+    CIComputationMethod,
+    ComparisonResult,
+    Evaluator,
+    Resampler,
+    bootstrap_interval,
+    resample_means,
+)
+
+
+class MultipleComparisonCorrection(str, Enum):
+    """
+    Adjustment of p-values for comparing many pairs at once.
+    """
+    none = "none"
+    bonferroni = "bonferroni"  # Controls the family-wise error rate
+    holm = "holm"              # Controls the family-wise error rate, uniformly more powerful than Bonferroni
+    fdr_bh = "fdr_bh"          # Benjamini-Hochberg, controls the false discovery rate
+
+
+def adjust_p_values(p_values: np.ndarray, method: MultipleComparisonCorrection) -> np.ndarray:
+    """
+    Adjusted p-values, in the order given.
+    """
+    p_values = np.asarray(p_values, dtype=float)
+    m = len(p_values)
+    if m == 0 or method == MultipleComparisonCorrection.none:
+        return p_values.copy()
+    if method == MultipleComparisonCorrection.bonferroni:
+        return np.minimum(p_values * m, 1.0)
+
+    order = np.argsort(p_values)
+    ranked = p_values[order]
+    if method == MultipleComparisonCorrection.holm:
+        adjusted = np.maximum.accumulate(ranked * (m - np.arange(m)))
+    elif method == MultipleComparisonCorrection.fdr_bh:
+        adjusted = np.minimum.accumulate((ranked * m / np.arange(1, m + 1))[::-1])[::-1]
+    else:
+        raise ValueError(f"Unsupported correction: {method}")
+    result = np.empty(m)
+    result[order] = np.minimum(adjusted, 1.0)
+    return result
+
+
+def team_pairs(team_count: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Column indices (a, b) of every pair of teams, a < b.
+    """
+    return np.triu_indices(team_count, k=1)
+
+
+def compare_teams(
+    evaluator: Evaluator,
+    scores: np.ndarray,
+    confidence: float = 0.95,
+    correction: MultipleComparisonCorrection = MultipleComparisonCorrection.holm,
+    resample: Resampler = resample_means,
+) -> List[Tuple[int, int, ComparisonResult]]:
+    """
+    Comparison of every pair of teams from an (items x teams) score matrix, NaN where not scored.
+
+    Each pair is compared on the items scored for both teams; the difference is team a minus team b. Pairs without
+    such items are left out. `p_value` is adjusted by `correction` across the pairs, and the unadjusted p-value is
+    kept in `additional_info`. Bootstrap resamples are drawn by `resample`.
+    """
+    scores = np.asarray(scores, dtype=float)
+    first, second = team_pairs(scores.shape[1])
+    differences = scores[:, first] - scores[:, second]
+    valid = ~np.isnan(differences)
+    counts = valid.sum(axis=0)
+    compared = np.flatnonzero(counts > 0)
+    if len(compared) == 0:
+        return []
+
+    filled = np.where(valid, differences, 0.0)
+    means = filled.sum(axis=0) / np.maximum(counts, 1)
+    squares = np.where(valid, (differences - means) ** 2, 0.0).sum(axis=0)
+    std_devs = np.sqrt(squares / np.maximum(counts - 1, 1))
+    std_devs[counts < 2] = 0.0
+
+    lower, upper = means.copy(), means.copy()
+    p_values: np.ndarray = np.ones(len(means))
+    metric = evaluator.config.metric
+    if metric.ci_method == CIComputationMethod.bootstrap:
+        # Pairs scored on the same items share one set of resamples
+        groups: Dict[bytes, List[int]] = defaultdict(list)
+        for pair in compared:
+            groups[np.packbits(valid[:, pair]).tobytes()].append(pair)
+        for pairs in groups.values():
+            rows = valid[:, pairs[0]]
+            pair_differences = differences[rows][:, pairs].T
+            resampled = resample(
+                pair_differences, metric.bootstrap_iterations, metric.random_seed, metric.bootstrap_max_memory_mb
+            )
+            for pair, values, pair_means in zip(pairs, pair_differences, resampled):
+                lower[pair], upper[pair] = bootstrap_interval(
+                    values, pair_means, method=metric.bootstrap_ci_method, confidence=confidence
+                )
+                p_values[pair] = min(1.0, 2 * min(np.mean(pair_means <= 0), np.mean(pair_means >= 0)))
+    else:
+        standard_errors = std_devs / np.sqrt(np.maximum(counts, 1))
+        z = norm.ppf(1 - (1 - confidence) / 2)
+        lower, upper = means - z * standard_errors, means + z * standard_errors
+        with np.errstate(divide="ignore", invalid="ignore"):
+            p_values = np.where(
+                standard_errors > 0,
+                2 * norm.sf(np.abs(means) / standard_errors),
+                np.where(means == 0, 1.0, 0.0),
+            )
+        p_values[counts < 2] = 1.0
+
+    adjusted = np.ones(len(means))
+    adjusted[compared] = adjust_p_values(p_values[compared], correction)
+    return [
+        (int(first[pair]), int(second[pair]), ComparisonResult(
+            metric_name=evaluator.config.name,
+            difference=float(means[pair]),
+            confidence_interval=(float(lower[pair]), float(upper[pair])),
+            p_value=float(adjusted[pair]),
+            significant=bool(adjusted[pair] < 1 - confidence),
+            sample_size=int(counts[pair]),
+            additional_info={"unadjusted_p_value": float(p_values[pair]), "std_dev": float(std_devs[pair])},
+        ))
+        for pair in compared
+    ]
@@ -0,0 +1,384 @@
+"""
+LLM Judge Evaluator Implementation.
+
+Scores answers with a judge model that grades them against a rubric and replies with a JSON object, e.g.
+`{"reasoning": ..., "satisfactory": false, "completeness": 0.2, "relevance": 0.5}`. Each evaluator reads one field of
+the judgement as its score, so several metrics can share the same judge configuration.
+
+Judge prompts go through the proxy's OpenAI-compatible chat completions API, at most `max_concurrency` at a time.
+Batches of at least `batch_min_samples` uncached answers are submitted to the OpenAI Batch API instead, which is
+cheaper but may take up to a day to complete. Replies are validated by a pydantic model compiled once per output
+schema.
+
+Judgements are cached under a hash of the judge configuration and the (reference, answer) pair, which leaves out
+the field being scored: a pair is judged once, whichever metrics read the judgement.
+"""
+
+import asyncio
+import json
+import logging
+import math
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Coroutine, Dict, List, Optional, Tuple, Type, TypeVar
+
+import httpx
+import numpy as np
+from pydantic import BaseModel, ValidationError, create_model
+from scipy.stats import norm
+
+from backend.evals.core.config import settings
+from backend.evals.evaluators._base_evaluator import (
+    BatchEvaluationResult,
+    ComparisonResult,
+    EvaluationResult,
+    Evaluator,
+    EvaluatorConfig,
+    ResultCache,
+    hash_value,
+)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+DEFAULT_PROMPT_TEMPLATE = "Reference answer:\n{reference}\n\nAnswer to evaluate:\n{answer}"
+BATCH_FINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+RETRY_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+_JSON_TYPES: Dict[str, Any] = {
+    "string": str,
+    "number": float,
+    "integer": int,
+    "boolean": bool,
+    "array": list,
+    "object": dict,
+}
+
+
+class JudgeParams(BaseModel):
+    """
+    Metric params of an LLM judge.
+    """
+    model: str
+    rubric: str  # System prompt the judge grades against
+    prompt_template: str = DEFAULT_PROMPT_TEMPLATE  # Formatted with `reference` and `answer`
+    score_field: str = "score"  # Judgement field read as the score; booleans score 1.0/0.0
+    output_schema: Optional[Dict[str, Any]] = None  # Flat JSON object schema, defaults to reasoning + score_field
+    temperature: float = 0.0
+    max_concurrency: Optional[int] = None  # Defaults to EVAL_JUDGE_MAX_CONCURRENCY
+    batch_min_samples: Optional[int] = None  # Use the Batch API for at least this many uncached answers
+
+    def resolved_schema(self) -> Dict[str, Any]:
+        if self.output_schema is not None:
+            return self.output_schema
+        return {
+            "type": "object",
+            "properties": {"reasoning": {"type": "string"}, self.score_field: {"type": "number"}},
+            "required": ["reasoning", self.score_field],
+        }
+
+
+@lru_cache(maxsize=128)
+def compile_judgement_schema(schema_json: str) -> Type[BaseModel]:
+    """
+    Pydantic model of a flat JSON object schema, so that replies are parsed and validated in one compiled pass.
+
+    Properties of other types (or without a type) accept any JSON value.
+    """
+    schema = json.loads(schema_json)
+    required = set(schema.get("required", ()))
+    fields: Dict[str, Any] = {}
+    for name, prop in schema.get("properties", {}).items():
+        annotation = _JSON_TYPES.get(prop.get("type"), Any)
+        fields[name] = (annotation, ...) if name in required else (Optional[annotation], None)
+    return create_model("Judgement", **fields)
+
+
+def _format_value(value: Any) -> str:
+    return value if isinstance(value, str) else json.dumps(value, default=str)
+
+
+def _run_sync(coro: Coroutine[Any, Any, T]) -> T:
+    """
+    Run a coroutine from synchronous code, in a separate thread if an event loop is already running in this one.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
+
+
+class LLMJudgeEvaluator(Evaluator):
+    """
+    Evaluator that scores answers with an LLM judge.
+    """
+
+    cache_results = True
+
+    def __init__(self, config: EvaluatorConfig, result_cache: Optional[ResultCache] = None):
+        super().__init__(config, result_cache)
+        self.params = JudgeParams.model_validate(config.metric.params)
+        self.output_schema = self.params.resolved_schema()
+        self.judgement_model = compile_judgement_schema(json.dumps(self.output_schema, sort_keys=True))
+
+    @property
+    def result_config_hash(self) -> str:
+        """
+        Hash of what determines a judgement, leaving out the field read as the score.
+        """
+        metric = self.config.metric
+        return hash_value({
+            "provider": self.config.provider,
+            "namespace": metric.namespace,
+            "params": self.params.model_dump(exclude={"score_field", "max_concurrency", "batch_min_samples"}),
+            "output_schema": self.output_schema,
+            "cache_version": metric.cache_version,
+        })
+
+    # --- Judgements ---
+
+    def prompt(self, y_true: Any, y_pred: Any) -> Tuple[str, str]:
+        """
+        System and user prompt judging one answer.
+        """
+        system = (
+            f"{self.params.rubric}\n\nRespond only with a JSON object matching this JSON schema:\n"
+            f"{json.dumps(self.output_schema)}"
+        )
+        user = self.params.prompt_template.format(reference=_format_value(y_true), answer=_format_value(y_pred))
+        return system, user
+
+    def parse_judgement(self, content: str) -> Dict[str, Any]:
+        """
+        Validated judgement from a reply, tolerating a Markdown code fence around the JSON.
+        """
+        content = content.strip()
+        if content.startswith("```"):
+            content = content.split("\n", 1)[-1].rsplit("```", 1)[0]
+        return self.judgement_model.model_validate_json(content).model_dump()
+
+    def score_judgement(self, judgement: Dict[str, Any]) -> float:
+        value = judgement.get(self.params.score_field)
+        if value is None:
+            return math.nan
+        return float(value)
+
+    def _result(self, judgement: Dict[str, Any]) -> EvaluationResult:
+        return EvaluationResult(
+            score=self.score_judgement(judgement),
+            metric_name=self.config.metric.name,
+            additional_info={"judgement": judgement},
+        )
+
+    def cached_score(self, result: Dict[str, Any]) -> float:
+        judgement = (result.get("additional_info") or {}).get("judgement")
+        return self.score_judgement(judgement) if judgement is not None else float(result["score"])
+
+    async def _judge_online(self, prompts: Dict[str, Tuple[str, str]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Judgements keyed like `prompts`, through the proxy with bounded concurrency; failed prompts are left out.
+        """
+        semaphore = asyncio.Semaphore(self.params.max_concurrency or settings.EVAL_JUDGE_MAX_CONCURRENCY)
+        schema = {"name": "Judgement", "schema": self.output_schema, "strict": False}
+
+        async def judge(client: httpx.AsyncClient, key: str, system: str, user: str) -> Optional[Dict[str, Any]]:
+            body = {
+                "model": self.params.model,
+                "messages": [{"role": "system", "content": system}, {"role": "user", "content": user}],
+                "temperature": self.params.temperature,
+                "response_format": {"type": "json_schema", "json_schema": schema},
+            }
+            async with semaphore:
+                for attempt in range(settings.EVAL_JUDGE_MAX_RETRIES + 1):
+                    try:
+                        response = await client.post("/chat/completions", json=body)
+                        if response.status_code not in RETRY_STATUS_CODES:
+                            response.raise_for_status()
+                            return self.parse_judgement(response.json()["choices"][0]["message"]["content"])
+                        error: Exception = httpx.HTTPStatusError(
+                            f"status {response.status_code}", request=response.request, response=response
+                        )
+                    except (httpx.TransportError, ValueError, KeyError, IndexError, TypeError) as e:  # incl. unparsable replies
+                        error = e
+                    except httpx.HTTPStatusError as e:
+                        logger.error(f"LLM judge {self.config.name}: request {key} rejected: {e}")
+                        return None
+                    if attempt < settings.EVAL_JUDGE_MAX_RETRIES:
+                        await asyncio.sleep(2 ** attempt)
+                logger.error(f"LLM judge {self.config.name}: no judgement for {key}: {error}")
+                return None
+
+        async with httpx.AsyncClient(
+            base_url=settings.EVAL_JUDGE_API_URL.rstrip("/"),
+            headers={"Authorization": f"Bearer {settings.EVAL_JUDGE_API_KEY}"},
+            timeout=settings.EVAL_JUDGE_TIMEOUT,
+        ) as client:
+            judgements = await asyncio.gather(*(
+                judge(client, key, system, user) for key, (system, user) in prompts.items()
+            ))
+        return {key: judgement for key, judgement in zip(prompts, judgements) if judgement is not None}
+
+    async def _judge_batch(self, prompts: Dict[str, Tuple[str, str]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Judgements keyed like `prompts`, through the OpenAI Batch API; waits until the batch is done.
+        """
+        from autogen_core.models import SystemMessage, UserMessage
+
+        from backend.agents.components import BatchOpenAIClient
+
+        client_args: Dict[str, Any] = {
+            "model": self.params.model,
+            "api_key": settings.EVAL_JUDGE_BATCH_API_KEY,
+            "temperature": self.params.temperature,
+        }
+        if settings.EVAL_JUDGE_BATCH_API_URL:
+            client_args["base_url"] = settings.EVAL_JUDGE_BATCH_API_URL
+        client = BatchOpenAIClient(**client_args)
+        try:
+            jsonl_path, batch_id = await client.create_batch(
+                [
+                    (key, [SystemMessage(content=system), UserMessage(content=user, source="user")])
+                    for key, (system, user) in prompts.items()
+                ],
+                json_output=self.judgement_model,
+            )
+            jsonl_path.unlink(missing_ok=True)
+            logger.info(f"LLM judge {self.config.name}: submitted batch {batch_id} of {len(prompts)} prompts.")
+
+            while (status := (await client.check_batch_status(batch_id))["status"]) not in BATCH_FINAL_STATUSES:
+                await asyncio.sleep(settings.EVAL_JUDGE_BATCH_POLL_INTERVAL)
+            if status != "completed":
+                logger.error(f"LLM judge {self.config.name}: batch {batch_id} ended with status {status}.")
+                return {}
+
+            judgements = {}
+            for key, result in await client.get_batch_results(batch_id):
+                try:
+                    judgements[key] = self.parse_judgement(str(result.content))
+                except ValidationError as e:
+                    logger.error(f"LLM judge {self.config.name}: unparsable judgement for {key}: {e}")
+            return judgements
+        finally:
+            await client.close()
+
+    async def aevaluate_samples(self, y_true_list: List[Any], y_pred_list: List[Any]) -> List[EvaluationResult]:
+        """
+        Judge a batch, once per distinct (reference, answer) pair that is not cached yet.
+
+        Pairs without a judgement (failed calls) score NaN and are not cached.
+        """
+        keys = [hash_value({"y_true": yt, "y_pred": yp}) for yt, yp in zip(y_true_list, y_pred_list)]
+        results: Dict[str, EvaluationResult] = {}
+        pending: Dict[str, Tuple[Any, Any]] = {}
+        for key, yt, yp in zip(keys, y_true_list, y_pred_list):
+            if key in results or key in pending:
+                continue
+            cached = self.check_cache(yt, yp)
+            if cached is not None:
+                results[key] = EvaluationResult(
+                    score=self.cached_score(cached.model_dump()),
+                    metric_name=self.config.metric.name,
+                    additional_info=cached.additional_info,
+                )
+            else:
+                pending[key] = (yt, yp)
+
+        if pending:
+            prompts = {key: self.prompt(yt, yp) for key, (yt, yp) in pending.items()}
+            batch_min_samples = self.params.batch_min_samples
+            if batch_min_samples is not None and len(prompts) >= batch_min_samples:
+                judgements = await self._judge_batch(prompts)
+            else:
+                judgements = await self._judge_online(prompts)
+
+            for key, (yt, yp) in pending.items():
+                judgement = judgements.get(key)
+                if judgement is None:
+                    results[key] = EvaluationResult(score=math.nan, metric_name=self.config.metric.name)
+                    continue
+                results[key] = self._result(judgement)
+                self.store_cache(yt, yp, results[key])
+        return [results[key] for key in keys]
+
+    # --- Evaluator interface ---
+
+    def score_samples(self, y_true_list: List[Any], y_pred_list: List[Any]) -> np.ndarray:
+        """
+        Per-sample scores, NaN where the judge failed.
+        """
+        results = _run_sync(self.aevaluate_samples(y_true_list, y_pred_list))
+        return np.array([result.score for result in results], dtype=float)
+
+    def evaluate(self, y_true: Any, y_pred: Any) -> EvaluationResult:
+        """
+        Judge a single sample.
+        """
+        return _run_sync(self.aevaluate_samples([y_true], [y_pred]))[0]
+
+    def evaluate_batch(
+        self, y_true_list: List[Any], y_pred_list: List[Any], item_ids: Optional[List[Any]] = None
+    ) -> BatchEvaluationResult:
+        """
+        Compute batch mean, std dev, and confidence interval over the judged samples.
+        """
+        scores = self.cached_scores(y_true_list, y_pred_list, item_ids)
+        return self.summarize_scores(scores[~np.isnan(scores)])
+
+    def compare(
+        self, y_true: List[Any], y_pred1: List[Any], y_pred2: List[Any], item_ids: Optional[List[Any]] = None
+    ) -> ComparisonResult:
+        """
+        Compare two prediction sets using the paired difference over samples judged in both.
+        """
+        differences = self.cached_scores(y_true, y_pred1, item_ids) - self.cached_scores(y_true, y_pred2, item_ids)
+        differences = differences[~np.isnan(differences)]
+
+        mean_diff = np.mean(differences)
+        std_dev = np.std(differences, ddof=1) if len(differences) > 1 else 0.0
+        confidence = 0.95
+        p_value = None
+        if self.config.metric.ci_method == "bootstrap":
+            ci, p_value = self.paired_bootstrap(differences, confidence=confidence)
+        else:
+            ci = norm.interval(confidence, loc=mean_diff, scale=std_dev / np.sqrt(len(differences))) if len(differences) > 1 else (mean_diff, mean_diff)
+
+        return ComparisonResult(
+            metric_name=self.config.metric.name,
+            difference=mean_diff,
+            confidence_interval=ci,
+            p_value=p_value,
+            significant=p_value < (1 - confidence) if p_value is not None else None,
+            sample_size=len(differences)
+        )
+
+    def estimate_sample_size(
+        self,
+        y_true_list: List[Any],
+        y_pred_list: List[Any],
+        confidence: float,
+        margin_of_error: float,
+        item_ids: Optional[List[Any]] = None,
+    ) -> int:
+        """
+        Empirically estimate sample size based on the observed variance of the judged samples.
+        """
+        scores = self.cached_scores(y_true_list, y_pred_list, item_ids)
+        scores = scores[~np.isnan(scores)]
+        observed_std = np.std(scores, ddof=1) if len(scores) > 1 else 0.0
+        z = norm.ppf(1 - (1 - confidence) / 2)
+        if observed_std == 0.0:
+            return len(scores)
+        return int(np.ceil((z * observed_std / margin_of_error) ** 2))
+
+    @classmethod
+    def from_config(cls, config: EvaluatorConfig) -> "LLMJudgeEvaluator":
+        """
+        Load evaluator from config, sharing judgements through the evaluation cache.
+        """
+        # Imported here so that the evaluators do not depend on the database at import time
+        from backend.evals.utils.evaluation_cache import evaluation_cache
+
+        return cls(config, result_cache=evaluation_cache)
@@ -0,0 +1,314 @@
+"""
+Ragas Evaluator Implementation.
+
+Scores RAG answers with a single-turn ragas metric, e.g. `ResponseRelevancy`, `LLMContextPrecisionWithReference`,
+`Faithfulness` or `SemanticSimilarity`. The metric config names the ragas metric class (namespace `ragas.metrics`),
+and `sample_fields` maps the extracted ground truth (`y_true`) and prediction (`y_pred`) onto the fields of a ragas
+`SingleTurnSample`.
+
+LLM calls of the metric go through the judge proxy's OpenAI-compatible API. Embeddings go through the same proxy and
+are cached by content (see `embedding_cache`). Texts known before scoring (questions, answers, references) are
+embedded in batches up front, so scoring itself mostly reads cached embeddings.
+
+Some ragas metrics embed synchronously from within their async scoring, which would block the event loop; batches
+are therefore scored on their own event loop in a worker thread. Scores are cached like LLM judgements.
+"""
+
+import asyncio
+import logging
+import math
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+import numpy as np
+from langchain_openai import ChatOpenAI
+from pydantic import BaseModel
+from ragas import SingleTurnSample
+from ragas.embeddings import BaseRagasEmbeddings
+from ragas.llms import LangchainLLMWrapper
+from ragas.metrics.base import MetricWithEmbeddings, MetricWithLLM, SingleTurnMetric
+from ragas.run_config import RunConfig
+from scipy.stats import norm
+
+from backend.evals.core.config import settings
+from backend.evals.evaluators._base_evaluator import (
+    BatchEvaluationResult,
+    ComparisonResult,
+    EvaluationResult,
+    Evaluator,
+    EvaluatorConfig,
+    FieldExtractionError,
+    ResultCache,
+    compile_field_path,
+    hash_value,
+)
+from backend.evals.evaluators.llm_judge import RETRY_STATUS_CODES, _run_sync
+from backend.evals.evaluators.registry import resolve_metric
+from backend.evals.utils.embedding_cache import EmbeddingCache, embedding_cache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SAMPLE_FIELDS = {
+    "user_input": "y_true.user_input",
+    "reference": "y_true.reference",
+    "response": "y_pred.response",
+    "retrieved_contexts": "y_pred.retrieved_contexts",
+}
+EMBEDDED_FIELDS = ("user_input", "response", "reference")  # Sample fields embedded ahead of scoring
+
+
+class RagasParams(BaseModel):
+    """
+    Metric params of a ragas metric.
+    """
+    llm_model: Optional[str] = None  # Judge model, required by LLM-based metrics
+    embedding_model: Optional[str] = None  # Required by embedding-based metrics
+    temperature: float = 0.0
+    metric_args: Dict[str, Any] = {}  # Keyword arguments of the ragas metric class
+    # SingleTurnSample field -> "y_true" or "y_pred", optionally followed by a field path into it
+    sample_fields: Dict[str, str] = DEFAULT_SAMPLE_FIELDS
+    max_concurrency: Optional[int] = None  # Samples scored at once, defaults to EVAL_JUDGE_MAX_CONCURRENCY
+
+
+class CachedEmbeddings(BaseRagasEmbeddings):
+    """
+    Ragas embeddings through the judge proxy, cached by content.
+    """
+
+    def __init__(self, model: str, cache: Optional[EmbeddingCache] = None):
+        super().__init__()
+        self.model = model
+        self.embedding_cache = cache or embedding_cache
+        self.set_run_config(RunConfig())
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embedding_cache.embed(self.model, list(texts), self._embed_remote).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await asyncio.get_running_loop().run_in_executor(None, self.embed_documents, texts)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return (await self.aembed_documents([text]))[0]
+
+    def _embed_remote(self, texts: List[str]) -> np.ndarray:
+        """
+        Embeddings of a batch of texts from the proxy's OpenAI-compatible embeddings API.
+        """
+        with httpx.Client(
+            base_url=settings.EVAL_JUDGE_API_URL.rstrip("/"),
+            headers={"Authorization": f"Bearer {settings.EVAL_JUDGE_API_KEY}"},
+            timeout=settings.EVAL_JUDGE_TIMEOUT,
+        ) as client:
+            for attempt in range(settings.EVAL_JUDGE_MAX_RETRIES + 1):
+                response = client.post("/embeddings", json={"model": self.model, "input": texts})
+                if response.status_code not in RETRY_STATUS_CODES:
+                    break
+                if attempt < settings.EVAL_JUDGE_MAX_RETRIES:
+                    time.sleep(2 ** attempt)
+            response.raise_for_status()
+            data = sorted(response.json()["data"], key=lambda d: d["index"])
+        return np.array([d["embedding"] for d in data], dtype=np.float32)
+
+
+class RagasEvaluator(Evaluator):
+    """
+    Evaluator that scores samples with a single-turn ragas metric.
+    """
+
+    cache_results = True
+
+    def __init__(
+        self,
+        config: EvaluatorConfig,
+        result_cache: Optional[ResultCache] = None,
+        embeddings_cache: Optional[EmbeddingCache] = None,
+    ):
+        super().__init__(config, result_cache)
+        self.params = RagasParams.model_validate(config.metric.params)
+        self.metric_class = resolve_metric(config.metric.namespace, config.metric.name)
+        if not (isinstance(self.metric_class, type) and issubclass(self.metric_class, SingleTurnMetric)):
+            raise ValueError(f"Ragas metric '{config.metric.name}' is not a single-turn metric.")
+        self.embeddings_cache = embeddings_cache
+        self.sample_paths = {}
+        for field, spec in self.params.sample_fields.items():
+            source, _, path = spec.partition(".")
+            if source not in ("y_true", "y_pred"):
+                raise ValueError(f"Sample field '{field}' must be read from y_true or y_pred, got '{spec}'.")
+            self.sample_paths[field] = (source, compile_field_path(path) if path else None)
+
+    # --- Ragas ---
+
+    def sample(self, y_true: Any, y_pred: Any) -> SingleTurnSample:
+        """
+        Ragas sample of a (ground truth, prediction) pair; fields missing from either are left unset.
+        """
+        values = {"y_true": y_true, "y_pred": y_pred}
+        fields: Dict[str, Any] = {}
+        for field, (source, path) in self.sample_paths.items():
+            try:
+                fields[field] = path(values[source]) if path is not None else values[source]
+            except FieldExtractionError:
+                continue
+        return SingleTurnSample(**fields)
+
+    def build_metric(self) -> SingleTurnMetric:
+        """
+        A ragas metric instance wired to the proxy. Built per batch, as its clients are bound to one event loop.
+        """
+        run_config = RunConfig(timeout=int(settings.EVAL_JUDGE_TIMEOUT), max_retries=settings.EVAL_JUDGE_MAX_RETRIES)
+        metric = self.metric_class(**self.params.metric_args)
+        if isinstance(metric, MetricWithLLM):
+            if not self.params.llm_model:
+                raise ValueError(f"Ragas metric '{self.config.metric.name}' needs an llm_model.")
+            metric.llm = LangchainLLMWrapper(ChatOpenAI(
+                model=self.params.llm_model,
+                base_url=settings.EVAL_JUDGE_API_URL,
+                api_key=settings.EVAL_JUDGE_API_KEY or "unused", # type: ignore[arg-type]
+                temperature=self.params.temperature,
+            ))
+        if isinstance(metric, MetricWithEmbeddings):
+            if not self.params.embedding_model:
+                raise ValueError(f"Ragas metric '{self.config.metric.name}' needs an embedding_model.")
+            metric.embeddings = CachedEmbeddings(self.params.embedding_model, self.embeddings_cache)
+        metric.init(run_config)
+        return metric
+
+    async def _ascore(self, samples: List[SingleTurnSample]) -> List[float]:
+        metric = self.build_metric()
+        if isinstance(metric, MetricWithEmbeddings):
+            texts = {getattr(sample, field) for sample in samples for field in EMBEDDED_FIELDS}
+            metric.embeddings.embed_documents([text for text in texts if isinstance(text, str)]) # type: ignore[union-attr]
+
+        semaphore = asyncio.Semaphore(self.params.max_concurrency or settings.EVAL_JUDGE_MAX_CONCURRENCY)
+
+        async def score(sample: SingleTurnSample) -> float:
+            async with semaphore:
+                try:
+                    return float(await metric.single_turn_ascore(sample))
+                except Exception as e:
+                    logger.error(f"Ragas evaluator {self.config.name}: cannot score sample: {type(e).__name__}: {e}")
+                    return math.nan
+
+        return list(await asyncio.gather(*(score(sample) for sample in samples)))
+
+    def _score_blocking(self, samples: List[SingleTurnSample]) -> List[float]:
+        return asyncio.run(self._ascore(samples))
+
+    async def aevaluate_samples(self, y_true_list: List[Any], y_pred_list: List[Any]) -> List[EvaluationResult]:
+        """
+        Score a batch, once per distinct (ground truth, prediction) pair that is not cached yet.
+
+        Pairs that cannot be scored score NaN and are not cached.
+        """
+        keys = [hash_value({"y_true": yt, "y_pred": yp}) for yt, yp in zip(y_true_list, y_pred_list)]
+        results: Dict[str, EvaluationResult] = {}
+        pending: Dict[str, Tuple[Any, Any]] = {}
+        for key, yt, yp in zip(keys, y_true_list, y_pred_list):
+            if key in results or key in pending:
+                continue
+            cached = self.check_cache(yt, yp)
+            if cached is not None:
+                results[key] = cached
+            else:
+                pending[key] = (yt, yp)
+
+        if pending:
+            samples: Dict[str, SingleTurnSample] = {}
+            for key, (yt, yp) in pending.items():
+                try:
+                    samples[key] = self.sample(yt, yp)
+                except ValueError as e:  # Values of the wrong type
+                    logger.error(f"Ragas evaluator {self.config.name}: invalid sample: {e}")
+            loop = asyncio.get_running_loop()
+            scores = await loop.run_in_executor(None, self._score_blocking, list(samples.values()))
+            by_key = dict(zip(samples, scores))
+            for key, (yt, yp) in pending.items():
+                score = by_key.get(key, math.nan)
+                results[key] = EvaluationResult(score=score, metric_name=self.config.metric.name)
+                if math.isfinite(score):
+                    self.store_cache(yt, yp, results[key])
+        return [results[key] for key in keys]
+
+    # --- Evaluator interface ---
+
+    def score_samples(self, y_true_list: List[Any], y_pred_list: List[Any]) -> np.ndarray:
+        """
+        Per-sample scores, NaN where a sample could not be scored.
+        """
+        results = _run_sync(self.aevaluate_samples(y_true_list, y_pred_list))
+        return np.array([result.score for result in results], dtype=float)
+
+    def evaluate(self, y_true: Any, y_pred: Any) -> EvaluationResult:
+        """
+        Score a single sample.
+        """
+        return _run_sync(self.aevaluate_samples([y_true], [y_pred]))[0]
+
+    def evaluate_batch(
+        self, y_true_list: List[Any], y_pred_list: List[Any], item_ids: Optional[List[Any]] = None
+    ) -> BatchEvaluationResult:
+        """
+        Compute batch mean, std dev, and confidence interval over the scored samples.
+        """
+        scores = self.cached_scores(y_true_list, y_pred_list, item_ids)
+        return self.summarize_scores(scores[~np.isnan(scores)])
+
+    def compare(
+        self, y_true: List[Any], y_pred1: List[Any], y_pred2: List[Any], item_ids: Optional[List[Any]] = None
+    ) -> ComparisonResult:
+        """
+        Compare two prediction sets using the paired difference over samples scored in both.
+        """
+        differences = self.cached_scores(y_true, y_pred1, item_ids) - self.cached_scores(y_true, y_pred2, item_ids)
+        differences = differences[~np.isnan(differences)]
+
+        mean_diff = np.mean(differences)
+        std_dev = np.std(differences, ddof=1) if len(differences) > 1 else 0.0
+        confidence = 0.95
+        p_value = None
+        if self.config.metric.ci_method == "bootstrap":
+            ci, p_value = self.paired_bootstrap(differences, confidence=confidence)
+        else:
+            ci = norm.interval(confidence, loc=mean_diff, scale=std_dev / np.sqrt(len(differences))) if len(differences) > 1 else (mean_diff, mean_diff)
+
+        return ComparisonResult(
+            metric_name=self.config.metric.name,
+            difference=mean_diff,
+            confidence_interval=ci,
+            p_value=p_value,
+            significant=p_value < (1 - confidence) if p_value is not None else None,
+            sample_size=len(differences)
+        )
+
+    def estimate_sample_size(
+        self,
+        y_true_list: List[Any],
+        y_pred_list: List[Any],
+        confidence: float,
+        margin_of_error: float,
+        item_ids: Optional[List[Any]] = None,
+    ) -> int:
+        """
+        Empirically estimate sample size based on the observed variance of the scored samples.
+        """
+        scores = self.cached_scores(y_true_list, y_pred_list, item_ids)
+        scores = scores[~np.isnan(scores)]
+        observed_std = np.std(scores, ddof=1) if len(scores) > 1 else 0.0
+        z = norm.ppf(1 - (1 - confidence) / 2)
+        if observed_std == 0.0:
+            return len(scores)
+        return int(np.ceil((z * observed_std / margin_of_error) ** 2))
+
+    @classmethod
+    def from_config(cls, config: EvaluatorConfig) -> "RagasEvaluator":
+        """
+        Load evaluator from config, sharing scores through the evaluation cache.
+        """
+        # Imported here so that the evaluators do not depend on the database at import time
+        from backend.evals.utils.evaluation_cache import evaluation_cache
+
+        return cls(config, result_cache=evaluation_cache)
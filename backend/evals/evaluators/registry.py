@@ -0,0 +1,114 @@
+"""
+Evaluator registry.
+
+Building an evaluator resolves its metric function, and the first import of a metric namespace (e.g. `sklearn.metrics`)
+takes hundreds of milliseconds. The registry keeps warm evaluator instances keyed by config hash, resolves each metric
+function once, and imports evaluator providers lazily. `preload` imports the configured metric namespaces ahead of
+time (at service startup and in scoring workers), so that no request waits on a cold import.
+
+Instances are shared: callers must not modify the config of an evaluator they got from the registry.
+"""
+import importlib
+import logging
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, Type
+
+from backend.evals.core.config import settings
+from backend.evals.evaluators._base_evaluator import Evaluator, EvaluatorConfig, hash_value
+
+logger = logging.getLogger(__name__)
+
+# provider -> "module:class", imported on first use
+EVALUATOR_PROVIDERS: Dict[str, str] = {
+    "sklearn": "backend.evals.evaluators.sklearn:SklearnEvaluator",
+    "llm_judge": "backend.evals.evaluators.llm_judge:LLMJudgeEvaluator",
+    "ragas": "backend.evals.evaluators.ragas:RagasEvaluator",
+}
+
+
+@lru_cache(maxsize=None)
+def resolve_metric(namespace: str, name: str) -> Callable[..., Any]:
+    """
+    Metric function `name` of module `namespace`, imported once per process.
+    """
+    return getattr(importlib.import_module(namespace), name)
+
+
+@lru_cache(maxsize=None)
+def _provider_class(path: str) -> Type[Evaluator]:
+    module, _, attr = path.partition(":")
+    return getattr(importlib.import_module(module), attr)
+
+
+class EvaluatorRegistry:
+    """
+    Process-wide LRU of warm evaluator instances, keyed by a hash of their full config.
+    """
+
+    def __init__(self, providers: Dict[str, str], max_size: int = 1024):
+        self.providers = dict(providers)
+        self.max_size = max_size
+        self._instances: OrderedDict[str, Evaluator] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def register(self, provider: str, path: str) -> None:
+        """
+        Add a provider, given as "module:class".
+        """
+        self.providers[provider] = path
+
+    def provider_class(self, provider: str) -> Type[Evaluator]:
+        path = self.providers.get(provider)
+        if path is None:
+            raise ValueError(f"Unknown evaluator provider: '{provider}'")
+        return _provider_class(path)
+
+    def get(self, config: EvaluatorConfig) -> Evaluator:
+        """
+        Warm evaluator for a config, built on first use.
+        """
+        key = hash_value(config)
+        with self._lock:
+            evaluator = self._instances.get(key)
+            if evaluator is not None:
+                self._instances.move_to_end(key)
+                return evaluator
+
+        evaluator = self.provider_class(config.provider).from_config(config.model_copy(deep=True))
+        with self._lock:
+            evaluator = self._instances.setdefault(key, evaluator)
+            self._instances.move_to_end(key)
+            while len(self._instances) > self.max_size:
+                self._instances.popitem(last=False)
+        return evaluator
+
+    def preload(self, namespaces: Iterable[str] = (), providers: Iterable[str] | None = None) -> None:
+        """
+        Import evaluator providers (all registered ones by default) and metric namespaces ahead of use.
+        """
+        for provider in self.providers if providers is None else providers:
+            try:
+                self.provider_class(provider)
+            except ImportError:
+                logger.warning(f"Evaluator registry: cannot preload evaluator provider '{provider}'.")
+        for namespace in namespaces:
+            try:
+                importlib.import_module(namespace)
+            except ImportError:
+                logger.warning(f"Evaluator registry: cannot preload metric namespace '{namespace}'.")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._instances.clear()
+
+    def __len__(self) -> int:
+        return len(self._instances)
+
+
+evaluator_registry = EvaluatorRegistry(EVALUATOR_PROVIDERS, max_size=settings.EVAL_REGISTRY_SIZE)
+
+
+def load_evaluator(config: EvaluatorConfig) -> Evaluator:
+    return evaluator_registry.get(config)
@@ -0,0 +1,138 @@
+"""
+Mergeable sketch of per-sample scores for approximate quantiles.
+
+A t-digest summarizes a score distribution by a few hundred weighted centroids: small clusters near the tails and
+larger ones near the median, so that extreme quantiles stay accurate. Digests of disjoint sets of scores merge into
+a digest of their union, so quantiles over several jobs, teams or time windows are answered from the stored digests
+alone, without the per-sample scores.
+
+Centroids are formed by the arcsine scale function k(q) = compression / (2 pi) * asin(2q - 1): each cluster covers
+at most one unit of k. Building from sorted scores and merging are both a sort followed by a vectorized assignment of
+points to clusters.
+"""
+import base64
+import math
+from typing import Any, Dict, Iterable, Sequence
+
+import numpy as np
+
+DEFAULT_COMPRESSION = 200
+
+
+def _scale(q: np.ndarray, compression: float) -> np.ndarray:
+    return compression / (2 * math.pi) * np.arcsin(2 * np.clip(q, 0.0, 1.0) - 1)
+
+
+class ScoreSketch:
+    """
+    t-digest of a set of scores, with their exact count, minimum and maximum.
+    """
+
+    def __init__(
+        self,
+        means: np.ndarray,
+        weights: np.ndarray,
+        minimum: float = math.nan,
+        maximum: float = math.nan,
+        compression: float = DEFAULT_COMPRESSION,
+    ):
+        self.means = np.asarray(means, dtype=float)
+        self.weights = np.asarray(weights, dtype=float)
+        self.min = float(minimum)
+        self.max = float(maximum)
+        self.compression = compression
+
+    @property
+    def count(self) -> int:
+        return int(round(self.weights.sum()))
+
+    @classmethod
+    def from_scores(cls, scores: Sequence[float] | np.ndarray, compression: float = DEFAULT_COMPRESSION) -> "ScoreSketch":
+        """
+        Digest of the finite scores given.
+        """
+        scores = np.asarray(scores, dtype=float)
+        scores = np.sort(scores[np.isfinite(scores)])
+        if len(scores) == 0:
+            return cls(np.empty(0), np.empty(0), compression=compression)
+        means, weights = cls._cluster(scores, np.ones(len(scores)), compression)
+        return cls(means, weights, scores[0], scores[-1], compression)
+
+    @staticmethod
+    def _cluster(means: np.ndarray, weights: np.ndarray, compression: float):
+        """
+        Centroids of points sorted by mean, grouped by the unit of the scale function they start in.
+        """
+        total = weights.sum()
+        before = np.cumsum(weights) - weights
+        k = _scale(before / total, compression)
+        clusters = np.floor(k - k[0]).astype(np.int64)
+        _, starts = np.unique(clusters, return_index=True)
+        cluster_weights = np.add.reduceat(weights, starts)
+        cluster_means = np.add.reduceat(means * weights, starts) / cluster_weights
+        return cluster_means, cluster_weights
+
+    @classmethod
+    def merge(cls, sketches: Iterable["ScoreSketch"]) -> "ScoreSketch":
+        """
+        Digest of the union of the scores of several digests.
+        """
+        sketches = [sketch for sketch in sketches if len(sketch.weights)]
+        if not sketches:
+            return cls(np.empty(0), np.empty(0))
+        compression = min(sketch.compression for sketch in sketches)
+        means = np.concatenate([sketch.means for sketch in sketches])
+        weights = np.concatenate([sketch.weights for sketch in sketches])
+        order = np.argsort(means, kind="stable")
+        merged_means, merged_weights = cls._cluster(means[order], weights[order], compression)
+        return cls(
+            merged_means,
+            merged_weights,
+            min(sketch.min for sketch in sketches),
+            max(sketch.max for sketch in sketches),
+            compression,
+        )
+
+    def quantiles(self, qs: Sequence[float] | np.ndarray) -> np.ndarray:
+        """
+        Approximate quantiles, NaN for an empty digest. Interpolates between centroid centers, and between the outer
+        centroids and the exact minimum and maximum.
+        """
+        qs = np.clip(np.asarray(qs, dtype=float), 0.0, 1.0)
+        if len(self.weights) == 0:
+            return np.full(qs.shape, np.nan)
+        total = self.weights.sum()
+        centers = np.cumsum(self.weights) - self.weights / 2
+        positions = np.concatenate([[0.0], centers, [total]])
+        values = np.concatenate([[self.min], self.means, [self.max]])
+        return np.interp(qs * total, positions, values)
+
+    def quantile(self, q: float) -> float:
+        return float(self.quantiles([q])[0])
+
+    # --- Storage ---
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        JSON-serializable form, with the centroids as base64 float64 (mean, weight) pairs.
+        """
+        centroids = np.column_stack([self.means, self.weights]).astype("<f8").tobytes()
+        return {
+            "type": "tdigest",
+            "compression": self.compression,
+            "count": self.count,
+            "min": None if math.isnan(self.min) else self.min,
+            "max": None if math.isnan(self.max) else self.max,
+            "centroids": base64.b64encode(centroids).decode(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ScoreSketch":
+        centroids = np.frombuffer(base64.b64decode(data["centroids"]), dtype="<f8").reshape(-1, 2)
+        return cls(
+            centroids[:, 0],
+            centroids[:, 1],
+            math.nan if data.get("min") is None else data["min"],
+            math.nan if data.get("max") is None else data["max"],
+            data.get("compression", DEFAULT_COMPRESSION),
+        )
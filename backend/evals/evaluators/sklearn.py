@@ -3,29 +3,124 @@ Sklearn Evaluator Implementation.
 
 Evaluates classification/regression metrics using scikit-learn. Supports batch CI computation and sample size
 estimation.
+
+Per-sample scores of decomposable metrics (accuracy, zero-one loss, absolute/squared error, log loss) are computed in
+one NumPy pass; other metrics fall back to calling the sklearn function once per sample.
 """
 
-import importlib
 import numpy as np
 from scipy.stats import norm
-from typing import Any, List
+from typing import Any, Callable, Dict, List, Optional
 from backend.evals.evaluators._base_evaluator import (
     Evaluator,
     EvaluatorConfig,
     EvaluationResult,
     BatchEvaluationResult,
-    ComparisonResult
+    ComparisonResult,
+    ResultCache
 )
+from backend.evals.evaluators.registry import resolve_metric
+
+def _as_2d(a: np.ndarray) -> np.ndarray:
+    return a.reshape(len(a), -1)
+
+def _absolute_error(y_true: np.ndarray, y_pred: np.ndarray, params: Dict[str, Any]) -> np.ndarray:
+    return np.abs(_as_2d(y_true.astype(float)) - _as_2d(y_pred.astype(float))).mean(axis=1)
+
+def _squared_error(y_true: np.ndarray, y_pred: np.ndarray, params: Dict[str, Any]) -> np.ndarray:
+    return ((_as_2d(y_true.astype(float)) - _as_2d(y_pred.astype(float))) ** 2).mean(axis=1)
+
+def _root_squared_error(y_true: np.ndarray, y_pred: np.ndarray, params: Dict[str, Any]) -> np.ndarray:
+    # sklearn takes the root per output before averaging the outputs, which for one sample is the absolute error
+    return _absolute_error(y_true, y_pred, params)
+
+def _check_label_types(y_true: np.ndarray, y_pred: np.ndarray) -> None:
+    """
+    NumPy compares e.g. int labels with str predictions as unequal, where sklearn rejects the mix of types. Raises
+    `TypeError` so that such inputs are left to sklearn.
+    """
+    numeric = "biuf"
+    kinds = (y_true.dtype.kind, y_pred.dtype.kind)
+    if "O" in kinds or (kinds[0] != kinds[1] and not (kinds[0] in numeric and kinds[1] in numeric)):
+        raise TypeError(f"Mixed label types: {y_true.dtype} and {y_pred.dtype}.")
+
+def _check_discrete(*arrays: np.ndarray) -> None:
+    """
+    sklearn rejects continuous targets in classification metrics; raises `ValueError` for them in the same way.
+    """
+    for a in arrays:
+        if a.dtype.kind == "f" and not np.all(np.mod(a, 1) == 0):
+            raise ValueError("Classification metrics can't handle continuous targets.")
+
+def _correct(y_true: np.ndarray, y_pred: np.ndarray, params: Dict[str, Any]) -> np.ndarray:
+    _check_label_types(y_true, y_pred)
+    _check_discrete(y_true, y_pred)
+    return (_as_2d(y_true) == _as_2d(y_pred)).all(axis=1).astype(float)
+
+def _incorrect(y_true: np.ndarray, y_pred: np.ndarray, params: Dict[str, Any]) -> np.ndarray:
+    return 1.0 - _correct(y_true, y_pred, params)
+
+def _log_loss(y_true: np.ndarray, y_pred: np.ndarray, params: Dict[str, Any]) -> np.ndarray:
+    """
+    Per-sample cross-entropy, as `log_loss([yt], [yp], labels=...)` computes it.
+    """
+    labels = np.unique(np.asarray(params["labels"]))  # Sorted, as sklearn orders the probability columns
+    probs = y_pred.astype(float)
+    if probs.ndim == 1:
+        probs = np.column_stack([1 - probs, probs])
+    if probs.ndim != 2 or probs.shape[1] != len(labels):
+        raise ValueError(f"y_pred has {probs.shape[-1]} probability columns for {len(labels)} labels.")
+    eps = np.finfo(probs.dtype).eps
+    probs = np.clip(probs, eps, 1 - eps)
+    probs = probs / probs.sum(axis=1, keepdims=True)
+
+    positions = np.searchsorted(labels, y_true)
+    if np.any(positions >= len(labels)) or np.any(labels[np.minimum(positions, len(labels) - 1)] != y_true):
+        raise ValueError("y_true contains labels not present in `labels`.")
+    return -np.log(probs[np.arange(len(probs)), positions])
+
+# name -> (per-sample score function, params it understands)
+VECTORIZED_METRICS: Dict[str, tuple[Callable[[np.ndarray, np.ndarray, Dict[str, Any]], np.ndarray], set[str]]] = {
+    "accuracy_score": (_correct, {"normalize"}),
+    "zero_one_loss": (_incorrect, {"normalize"}),
+    "mean_absolute_error": (_absolute_error, set()),
+    "mean_squared_error": (_squared_error, set()),
+    "root_mean_squared_error": (_root_squared_error, set()),
+    # Scoring a single sample needs the full label set, so only the `labels` form can be vectorized
+    "log_loss": (_log_loss, {"labels"}),
+}
 
 class SklearnEvaluator(Evaluator):
     """
     Evaluator for scikit-learn metrics.
     """
 
-    def __init__(self, config: EvaluatorConfig):
-        super().__init__(config)
-        module = importlib.import_module(config.metric.namespace)
-        self.metric_fn = getattr(module, config.metric.name)
+    def __init__(self, config: EvaluatorConfig, result_cache: Optional[ResultCache] = None):
+        super().__init__(config, result_cache)
+        self.metric_fn = resolve_metric(config.metric.namespace, config.metric.name)
+        self.vectorized_fn = None
+        if config.metric.namespace == "sklearn.metrics" and config.metric.name in VECTORIZED_METRICS:
+            fn, supported_params = VECTORIZED_METRICS[config.metric.name]
+            if set(config.metric.params) <= supported_params and (
+                config.metric.name != "log_loss" or "labels" in config.metric.params
+            ):
+                self.vectorized_fn = fn
+        # A vectorized pass is cheaper than hashing the predictions for the score cache
+        self.score_cache_enabled = self.vectorized_fn is None
+
+    def score_samples(self, y_true_list: List[Any], y_pred_list: List[Any]) -> np.ndarray:
+        """
+        Per-sample scores, vectorized for decomposable metrics.
+        """
+        if self.vectorized_fn is not None and len(y_true_list):
+            try:
+                return self.vectorized_fn(np.asarray(y_true_list), np.asarray(y_pred_list), self.config.metric.params)
+            except (TypeError, ValueError):
+                pass  # e.g. ragged or non-numeric inputs; sklearn decides per sample
+        return np.array([
+            self.metric_fn([yt], [yp], **self.config.metric.params)
+            for yt, yp in zip(y_true_list, y_pred_list)
+        ], dtype=float)
 
     def evaluate(self, y_true: Any, y_pred: Any) -> EvaluationResult:
         """
@@ -34,70 +129,53 @@ class SklearnEvaluator(Evaluator):
         score = self.metric_fn([y_true], [y_pred], **self.config.metric.params)
         return EvaluationResult(score=score, metric_name=self.config.metric.name)
 
-    def evaluate_batch(self, y_true_list: List[Any], y_pred_list: List[Any]) -> BatchEvaluationResult:
+    def evaluate_batch(
+        self, y_true_list: List[Any], y_pred_list: List[Any], item_ids: Optional[List[Any]] = None
+    ) -> BatchEvaluationResult:
         """
         Compute batch mean, std dev, and confidence interval.
         """
-        scores = [
-            self.metric_fn([yt], [yp], **self.config.metric.params)
-            for yt, yp in zip(y_true_list, y_pred_list)
-        ]
-        mean_score = np.mean(scores)
-        std_dev = np.std(scores, ddof=1) if len(scores) > 1 else 0.0
-
-        ci_method = self.config.metric.ci_method
-        confidence = 0.95
-
-        if ci_method == "batch_mean":
-            ci = norm.interval(confidence, loc=mean_score, scale=std_dev / np.sqrt(len(scores))) if len(scores) > 1 else (mean_score, mean_score)
-        elif ci_method == "bootstrap":
-            bootstrap_scores = []
-            for _ in range(self.config.metric.bootstrap_iterations):
-                indices = np.random.choice(len(scores), len(scores), replace=True)
-                sample_mean = np.mean(np.array(scores)[indices])
-                bootstrap_scores.append(sample_mean)
-            lower = np.percentile(bootstrap_scores, 2.5)
-            upper = np.percentile(bootstrap_scores, 97.5)
-            ci = (lower, upper)
-        else:
-            raise ValueError(f"Unsupported ci_method: {ci_method}")
-
-        return BatchEvaluationResult(
-            metric_name=self.config.metric.name,
-            mean=mean_score,
-            std_dev=std_dev,
-            confidence_interval=ci,
-            sample_size=len(scores)
-        )
+        scores = self.cached_scores(y_true_list, y_pred_list, item_ids)
+        return self.summarize_scores(scores)
 
-    def compare(self, y_true: List[Any], y_pred1: List[Any], y_pred2: List[Any]) -> ComparisonResult:
+    def compare(
+        self, y_true: List[Any], y_pred1: List[Any], y_pred2: List[Any], item_ids: Optional[List[Any]] = None
+    ) -> ComparisonResult:
         """
         Compare two prediction sets using paired difference.
         """
-        scores1 = [self.metric_fn([yt], [yp1], **self.config.metric.params) for yt, yp1 in zip(y_true, y_pred1)]
-        scores2 = [self.metric_fn([yt], [yp2], **self.config.metric.params) for yt, yp2 in zip(y_true, y_pred2)]
-        differences = np.array(scores1) - np.array(scores2)
+        differences = self.cached_scores(y_true, y_pred1, item_ids) - self.cached_scores(y_true, y_pred2, item_ids)
 
         mean_diff = np.mean(differences)
         std_dev = np.std(differences, ddof=1) if len(differences) > 1 else 0.0
         confidence = 0.95
-        ci = norm.interval(confidence, loc=mean_diff, scale=std_dev / np.sqrt(len(differences))) if len(differences) > 1 else (mean_diff, mean_diff)
+        p_value = None
+        if self.config.metric.ci_method == "bootstrap":
+            ci, p_value = self.paired_bootstrap(differences, confidence=confidence)
+        else:
+            ci = norm.interval(confidence, loc=mean_diff, scale=std_dev / np.sqrt(len(differences))) if len(differences) > 1 else (mean_diff, mean_diff)
 
         return ComparisonResult(
             metric_name=self.config.metric.name,
             difference=mean_diff,
             confidence_interval=ci,
+            p_value=p_value,
+            significant=p_value < (1 - confidence) if p_value is not None else None,
             sample_size=len(differences)
         )
 
-    def estimate_sample_size(self, y_true_list: List[Any], y_pred_list: List[Any], confidence: float, margin_of_error: float) -> int:
+    def estimate_sample_size(
+        self,
+        y_true_list: List[Any],
+        y_pred_list: List[Any],
+        confidence: float,
+        margin_of_error: float,
+        item_ids: Optional[List[Any]] = None,
+    ) -> int:
         """
         Empirically estimate sample size based on observed variance.
         """
-        scores = [
-            self.metric_fn([yt], [yp], **self.config.metric.params)
-            for yt, yp in zip(y_true_list, y_pred_list)
-        ]
+        scores = self.cached_scores(y_true_list, y_pred_list, item_ids)
         observed_std = np.std(scores, ddof=1) if len(scores) > 1 else 0.0
         z = norm.ppf(1 - (1 - confidence) / 2)
         if observed_std == 0.0:
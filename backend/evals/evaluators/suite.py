@@ -0,0 +1,166 @@
+"""
+Evaluator suite: several metrics over the same samples in one pass.
+
+Each evaluator holds one metric, so scoring N metrics evaluator by evaluator extracts every sample N times and draws N
+sets of bootstrap resamples. A suite groups its evaluators by extraction config and extracts each group once, then
+scores all of the group's metrics on the shared arrays. Summaries of bootstrap metrics scored on the same samples
+resample one stacked (metrics x samples) matrix with a single index matrix.
+
+Summaries carry a `ScoreSketch` of their scores, from which quantiles are read later without the scores.
+"""
+import math
+from collections import defaultdict
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from backend.evals.evaluators._base_evaluator import (
+    BatchEvaluationResult,
+    CIComputationMethod,
+    Evaluator,
+    FieldExtractionError,
+    Resampler,
+    compile_field_path,
+    resample_means,
+)
+from backend.evals.evaluators.sketch import ScoreSketch
+
+
+def finite_or_none(value: Any) -> Optional[float]:
+    value = float(value)
+    return value if math.isfinite(value) else None
+
+
+def extract_pairs(
+    evaluator: Evaluator,
+    labels: Optional[List[Any]],
+    responses: List[Optional[List[Any]]],
+    ground_truth: Optional[Sequence[Any] | np.ndarray] = None,
+) -> Tuple[List[int], List[Any], List[Any]]:
+    """
+    Indices, y_true and y_pred of the samples whose values could be extracted.
+
+    y_true is taken from `ground_truth` when given (values of the evaluator's ground truth field, e.g. read from a
+    snapshot) and extracted from `labels` in one pass otherwise. Samples without a response (failed runs) or with
+    missing fields are skipped.
+    """
+    if ground_truth is None:
+        ground_truth = compile_field_path(evaluator.config.extraction.ground_truth_field).extract_many(labels or [])
+    indices, y_true, y_pred = [], [], []
+    for i, response in enumerate(responses):
+        yt = ground_truth[i]
+        if not response or yt is None or (isinstance(yt, float) and math.isnan(yt)):
+            continue
+        try:
+            yp = evaluator.extract_prediction(response)
+        except (FieldExtractionError, IndexError, KeyError, TypeError):
+            continue
+        indices.append(i)
+        y_true.append(yt)
+        y_pred.append(yp)
+    return indices, y_true, y_pred
+
+
+class EvaluatorSuite:
+    """
+    Evaluators scored and summarized together; results are keyed by evaluator name.
+    """
+
+    def __init__(self, evaluators: Sequence[Evaluator]):
+        names = [evaluator.config.name for evaluator in evaluators]
+        duplicates = sorted({name for name in names if names.count(name) > 1})
+        if duplicates:
+            raise ValueError(f"Evaluator names must be unique within a suite: {duplicates}")
+        self.evaluators = list(evaluators)
+        self.groups: Dict[Tuple[str, str], List[Evaluator]] = defaultdict(list)
+        for evaluator in self.evaluators:
+            extraction = evaluator.config.extraction
+            self.groups[(extraction.ground_truth_field, extraction.prediction_field)].append(evaluator)
+
+    @property
+    def ground_truth_fields(self) -> List[str]:
+        return list(dict.fromkeys(field for field, _ in self.groups))
+
+    def score_samples(
+        self,
+        labels: Optional[List[Any]],
+        responses: List[Optional[List[Any]]],
+        ground_truth: Optional[Mapping[str, Sequence[Any]]] = None,
+        item_ids: Optional[Sequence[Any]] = None,
+    ) -> Dict[str, List[Optional[float]]]:
+        """
+        Per-sample scores of every evaluator, `None` where a sample is not scorable.
+
+        `ground_truth` optionally maps ground truth fields to their values, replacing extraction from `labels`.
+        `item_ids` (dataset item ids of the samples) let scores be reused, see `Evaluator.cached_scores`.
+        """
+        results: Dict[str, List[Optional[float]]] = {}
+        for (field, _), evaluators in self.groups.items():
+            indices, y_true, y_pred = extract_pairs(
+                evaluators[0], labels, responses, ground_truth[field] if ground_truth is not None else None
+            )
+            ids = [item_ids[i] for i in indices] if item_ids is not None else None
+            for evaluator in evaluators:
+                scores: List[Optional[float]] = [None] * len(responses)
+                if indices:
+                    for i, score in zip(indices, evaluator.cached_scores(y_true, y_pred, ids)):
+                        scores[i] = finite_or_none(score)
+                results[evaluator.config.name] = scores
+        return results
+
+    def summarize(
+        self,
+        scores: Mapping[str, Sequence[Optional[float]] | np.ndarray],
+        confidence: float = 0.95,
+        resample: Resampler = resample_means,
+    ) -> Dict[str, BatchEvaluationResult]:
+        """
+        Summaries of per-sample scores aligned by sample, with `None` or NaN where a sample is not scored.
+
+        Bootstrap metrics scored on the same samples with the same bootstrap settings share their resamples, drawn
+        by `resample`. Each summary holds a serialized `ScoreSketch` of its scores. Evaluators without any scores are
+        left out.
+        """
+        results: Dict[str, BatchEvaluationResult] = {}
+        sketches: Dict[str, ScoreSketch] = {}
+        shared: Dict[Tuple[bytes, int, Optional[int]], List[Tuple[Evaluator, np.ndarray]]] = defaultdict(list)
+        for evaluator in self.evaluators:
+            values = np.array(
+                [np.nan if score is None else score for score in scores.get(evaluator.config.name, [])], dtype=float
+            )
+            scored = ~np.isnan(values)
+            if not scored.any():
+                continue
+            sketches[evaluator.config.name] = ScoreSketch.from_scores(values[scored])
+            metric = evaluator.config.metric
+            if metric.ci_method == CIComputationMethod.bootstrap:
+                key = (np.packbits(scored).tobytes(), metric.bootstrap_iterations, metric.random_seed)
+                shared[key].append((evaluator, values[scored]))
+            else:
+                results[evaluator.config.name] = evaluator.summarize_scores(values[scored], confidence)
+
+        for (_, iterations, seed), members in shared.items():
+            means = resample(
+                np.vstack([values for _, values in members]),
+                iterations,
+                seed,
+                min(evaluator.config.metric.bootstrap_max_memory_mb for evaluator, _ in members),
+            )
+            for (evaluator, values), metric_means in zip(members, means):
+                results[evaluator.config.name] = evaluator.summarize_scores(
+                    values, confidence, bootstrap_means=metric_means
+                )
+        return {
+            evaluator.config.name: results[evaluator.config.name].model_copy(
+                update={"sketch": sketches[evaluator.config.name].to_dict()}
+            )
+            for evaluator in self.evaluators if evaluator.config.name in results
+        }
+
+    def evaluate(
+        self, labels: List[Any], responses: List[Optional[List[Any]]], confidence: float = 0.95
+    ) -> Dict[str, BatchEvaluationResult]:
+        """
+        Score and summarize every evaluator over the same samples.
+        """
+        return self.summarize(self.score_samples(labels, responses), confidence)
@@ -15,6 +15,11 @@ from backend.evals.api.v1.api import api_router as api_router_v1
 from backend.common.core.config import ModeEnum
 from backend.evals.core.config import settings
 from backend.common.utils.fastapi_globals import GlobalsMiddleware, g
+from backend.evals.evaluators.registry import evaluator_registry
+from backend.evals.tasks.evaluation_job import resume_evaluation_jobs, stop_evaluation_jobs
+from backend.evals.utils.evaluation_cache import evaluation_cache
+from backend.evals.utils.feedback_stream import feedback_stream
+from backend.evals.utils.scoring_pool import shutdown_scoring_pool
 
 
 @asynccontextmanager
@@ -22,8 +27,16 @@ async def lifespan(app: FastAPI):
     # Startup
     redis_client = await get_redis_client()
     FastAPICache.init(RedisBackend(redis_client), prefix="fastapi-cache")
+    evaluation_cache.start(redis_client)
+    feedback_stream.start(redis_client)
+    evaluator_registry.preload(settings.EVAL_PRELOAD_NAMESPACES)
+    await resume_evaluation_jobs()
     yield
     # shutdown
+    await stop_evaluation_jobs()
+    shutdown_scoring_pool()
+    await evaluation_cache.stop()
+    await feedback_stream.stop()
     await FastAPICache.clear()
     # models.clear()
     g.cleanup()
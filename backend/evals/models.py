@@ -2,7 +2,7 @@ from datetime import datetime
 from typing import Optional, List, Dict, Any, Tuple
 from uuid import UUID
 
-from sqlalchemy import Column, DateTime, ForeignKey
+from sqlalchemy import Column, DateTime, Index, UniqueConstraint
 from sqlmodel import Field, Relationship, JSON, SQLModel
 from enum import Enum
 
@@ -18,6 +18,25 @@ class EvaluationJobStatus(str, Enum):
     FAILED = "FAILED"
 
 
+class DatasetIngestStatus(str, Enum):
+    INGESTING = "INGESTING"
+    READY = "READY"
+    FAILED = "FAILED"
+
+
+class DatasetFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+    PARQUET = "parquet"
+
+
+class AnalyticsInterval(str, Enum):
+    HOUR = "hour"
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+
+
 class FeedbackType(str, Enum):
     POSITIVE = "positive"
     NEGATIVE = "negative"
@@ -39,8 +58,13 @@ class GroundTruthDatasetBase(SQLModel):
 
 
 class GroundTruthDataset(GroundTruthDatasetBase, BaseUUIDModel, table=True):
+    item_count: int = Field(default=0, nullable=False)
+    ingest_status: Optional[DatasetIngestStatus] = Field(default=None)
+    # Rows read, inserted and rejected by the current or last upload, and the first rejection messages
+    ingest_progress: Optional[Dict[str, Any]] = Field(default=None, sa_column=Column(JSON, nullable=True))
+    # Datasets can hold hundreds of thousands of items; page through them with `crud.ground_truth_item` instead
     items: List["GroundTruthItem"] = Relationship(
-        back_populates="dataset", sa_relationship_kwargs={"lazy": "selectin"}
+        back_populates="dataset", sa_relationship_kwargs={"lazy": "raise"}
     )
 
 
@@ -50,7 +74,7 @@ class GroundTruthItemBase(SQLModel):
 
     Contains composite input keys and expected evaluation label.
     """
-    dataset_id: UUID = Field(ForeignKey("groundtruthdataset.id", ondelete="CASCADE"), nullable=False, index=True)
+    dataset_id: UUID = Field(foreign_key="GroundTruthDataset.id", ondelete="CASCADE", nullable=False, index=True)
     tenant_id: Optional[UUID] = Field(nullable=True, index=True)
     input_data: Dict[str, Any] = Field(sa_column=Column(JSON, nullable=False))  # Key-value pairs for input data. Allows reconstruction of StructuredData from Autogen
     ground_truth_label: Optional[Dict[str, Any]] = Field(default=None, sa_column=Column(JSON, nullable=True))
@@ -58,7 +82,7 @@ class GroundTruthItemBase(SQLModel):
 
 class GroundTruthItem(GroundTruthItemBase, BaseUUIDModel, table=True):
     dataset: Optional[GroundTruthDataset] = Relationship(
-        back_populates="items", sa_relationship_kwargs={"lazy": "selectin"}
+        back_populates="items", sa_relationship_kwargs={"lazy": "joined"}
     )
 
 
@@ -70,20 +94,62 @@ class EvaluationJobBase(SQLModel):
     """
     tenant_id: Optional[UUID] = Field(nullable=True, index=True)
     task_id: UUID = Field(nullable=False, index=True)
-    dataset_id: Optional[UUID] = Field(ForeignKey("groundtruthdataset.id", ondelete="SET NULL"), nullable=True, index=True)
+    dataset_id: Optional[UUID] = Field(default=None, foreign_key="GroundTruthDataset.id", ondelete="SET NULL", nullable=True, index=True)
     team_ids: List[UUID] = Field(sa_column=Column(JSON, nullable=False))
     metrics: List[str] = Field(sa_column=Column(JSON, nullable=False))
     status: EvaluationJobStatus = Field(default=EvaluationJobStatus.PENDING, nullable=False)
     completed_at: Optional[datetime] = Field(default=None, sa_column=Column(DateTime(timezone=True)))
     evaluation_component: Dict[str, Any] = Field(sa_column=Column(JSON, nullable=False))
+    # Job whose item results are reused where items, team versions and evaluator configs are unchanged
+    baseline_job_id: Optional[UUID] = Field(default=None, foreign_key="EvaluationJob.id", ondelete="SET NULL", nullable=True)
 
 
 class EvaluationJob(EvaluationJobBase, BaseUUIDModel, table=True):
+    # Progress, counted in (dataset item, team) runs
+    total_runs: Optional[int] = Field(default=None)
+    processed_runs: int = Field(default=0, nullable=False)
+    failed_runs: int = Field(default=0, nullable=False)
+    # Resume point: the last dataset item of the last fully processed chunk
+    checkpoint_item_id: Optional[UUID] = Field(default=None)
+    # Agents session used for each team's runs, keyed by team id
+    team_sessions: Dict[str, str] = Field(default_factory=dict, sa_column=Column(JSON, nullable=False))
+    heartbeat_at: Optional[datetime] = Field(default=None, sa_column=Column(DateTime(timezone=True)))
+    error_message: Optional[str] = Field(default=None)
+    # Hash of each team's version and component, keyed by team id
+    team_versions: Dict[str, str] = Field(default_factory=dict, sa_column=Column(JSON, nullable=False))
+    # Item order, stopping checks and latest estimates of sequentially sampled jobs
+    sampling_state: Optional[Dict[str, Any]] = Field(default=None, sa_column=Column(JSON))
     results: List["EvaluationResult"] = Relationship(
         back_populates="job", sa_relationship_kwargs={"lazy": "selectin"}
     )
 
 
+# ---------- Evaluation Item Result ----------
+
+class EvaluationItemResultBase(SQLModel):
+    """
+    Outcome of one team run on one dataset item within an evaluation job.
+
+    Written chunk by chunk while a job runs; doubles as the job's checkpoint.
+    """
+    job_id: UUID = Field(foreign_key="EvaluationJob.id", ondelete="CASCADE", nullable=False, index=True)
+    item_id: UUID = Field(foreign_key="GroundTruthItem.id", ondelete="CASCADE", nullable=False)
+    team_id: UUID = Field(nullable=False)
+    session_id: Optional[UUID] = Field(default=None)
+    run_id: Optional[UUID] = Field(default=None)
+    prediction: Optional[Any] = Field(default=None, sa_column=Column(JSON, nullable=True))  # Messages returned by the team
+    scores: Dict[str, Optional[float]] = Field(default_factory=dict, sa_column=Column(JSON, nullable=False))  # Evaluator name -> score
+    error: Optional[str] = Field(default=None)
+    # Hash of the item's input data and the team version the prediction was made with
+    content_hash: Optional[str] = Field(default=None)
+    # Evaluator name -> hash of the content hash, ground truth label and evaluator config each score was computed from
+    score_hashes: Dict[str, str] = Field(default_factory=dict, sa_column=Column(JSON, nullable=False))
+
+
+class EvaluationItemResult(EvaluationItemResultBase, BaseUUIDModel, table=True):
+    __table_args__ = (UniqueConstraint("job_id", "item_id", "team_id", name="uq_EvaluationItemResult_job_item_team"),)
+
+
 # ---------- Evaluation Result ----------
 
 class EvaluationResultBase(SQLModel):
@@ -92,22 +158,54 @@ class EvaluationResultBase(SQLModel):
 
     Links to Evaluation Job and Dataset.
     """
-    job_id: UUID = Field(ForeignKey("evaluationjob.id", ondelete="CASCADE"), nullable=False, index=True)
+    job_id: UUID = Field(foreign_key="EvaluationJob.id", ondelete="CASCADE", nullable=False, index=True)
+    task_id: Optional[UUID] = Field(default=None, nullable=True)  # Copied from the job for analytics queries
     session_id: UUID = Field(nullable=False, index=True)
     team_id: UUID = Field(nullable=False, index=True)
     metric_name: str = Field(nullable=False, index=True)
     score: float = Field(nullable=False)
     std_dev: Optional[float] = Field(default=None)
     confidence_interval: Optional[Tuple[float, float]] = Field(default=None, sa_column=Column(JSON, nullable=True))
-    dataset_id: Optional[UUID] = Field(ForeignKey("groundtruthdataset.id", ondelete="SET NULL"), nullable=True, index=True)
+    dataset_id: Optional[UUID] = Field(default=None, foreign_key="GroundTruthDataset.id", ondelete="SET NULL", nullable=True, index=True)
+    # Mergeable t-digest of the per-sample scores (see `evaluators.sketch`), for quantiles across results
+    score_sketch: Optional[Dict[str, Any]] = Field(default=None, sa_column=Column(JSON, nullable=True))
 
 
 class EvaluationResult(EvaluationResultBase, BaseUUIDModel, table=True):
+    __table_args__ = (
+        Index("ix_EvaluationResult_task_metric_created", "task_id", "metric_name", "created_at"),
+        Index("ix_EvaluationResult_team_metric", "team_id", "metric_name"),
+    )
     job: Optional[EvaluationJob] = Relationship(
         back_populates="results", sa_relationship_kwargs={"lazy": "selectin"}
     )
 
 
+# ---------- Evaluation Comparison ----------
+
+class EvaluationComparisonBase(SQLModel):
+    """
+    Paired comparison of two teams of an evaluation job on one metric.
+
+    `difference` is team a minus team b over the items scored for both. `p_value` is adjusted for the number of team
+    pairs compared on the metric.
+    """
+    job_id: UUID = Field(foreign_key="EvaluationJob.id", ondelete="CASCADE", nullable=False, index=True)
+    metric_name: str = Field(nullable=False)
+    team_a_id: UUID = Field(nullable=False)
+    team_b_id: UUID = Field(nullable=False)
+    difference: float = Field(nullable=False)
+    confidence_interval: Optional[Tuple[float, float]] = Field(default=None, sa_column=Column(JSON, nullable=True))
+    p_value: Optional[float] = Field(default=None)
+    unadjusted_p_value: Optional[float] = Field(default=None)
+    significant: bool = Field(default=False, nullable=False)
+    sample_size: int = Field(nullable=False)
+
+
+class EvaluationComparison(EvaluationComparisonBase, BaseUUIDModel, table=True):
+    pass
+
+
 # ---------- Evaluation Cache ----------
 
 class EvaluationCacheBase(SQLModel):
@@ -120,7 +218,7 @@ class EvaluationCacheBase(SQLModel):
 
 
 class EvaluationCache(EvaluationCacheBase, BaseUUIDModel, table=True):
-    pass
+    __table_args__ = (UniqueConstraint("evaluator_config_hash", "input_hash", name="uq_EvaluationCache_config_input"),)
 
 
 # ---------- User Feedback ----------
@@ -1,15 +1,22 @@
-from typing import Optional, List
+from datetime import datetime
+from typing import Any, Dict, Optional, List
 from uuid import UUID
-from pydantic import types as pydantic_types
+from pydantic import BaseModel, Field, field_validator, model_validator, types as pydantic_types
 from backend.common.utils.partial import optional
+from backend.evals.evaluators._base_evaluator import EvaluatorConfig
+from backend.evals.evaluators.comparison import MultipleComparisonCorrection
 from .models import (
     GroundTruthDatasetBase,
     GroundTruthItemBase,
     EvaluationJobBase,
     EvaluationResultBase,
+    EvaluationItemResultBase,
+    EvaluationComparisonBase,
     EvaluationCacheBase,
     UserFeedbackBase,
-    EvaluationJobStatus
+    EvaluationJobStatus,
+    DatasetIngestStatus,
+    FeedbackType,
 )
 
 # ---- Dataset Schemas ----
@@ -26,9 +33,14 @@ class IGroundTruthDatasetUpdate(GroundTruthDatasetBase):
 
 class IGroundTruthDatasetRead(GroundTruthDatasetBase):
     id: UUID
+    item_count: int
+    ingest_status: Optional[DatasetIngestStatus]
+    ingest_progress: Optional[Dict[str, Any]]
 
 class IGroundTruthDatasetList(GroundTruthDatasetBase):
     id: UUID
+    item_count: int
+    ingest_status: Optional[DatasetIngestStatus]
 
 class IGroundTruthItemCreate(GroundTruthItemBase):
     pass
@@ -40,15 +52,77 @@ class IGroundTruthItemUpdate(GroundTruthItemBase):
 class IGroundTruthItemRead(GroundTruthItemBase):
     id: UUID
 
-class IGroundTruthDatasetReadDetailed(GroundTruthDatasetBase):
-    id: UUID
-    items: List[IGroundTruthItemRead]
+class GroundTruthItemRow(BaseModel):
+    """
+    One row of a dataset upload.
+    """
+    input_data: Dict[str, Any]
+    ground_truth_label: Optional[Dict[str, Any]] = None
+    tenant_id: Optional[UUID] = None
+
+
+class IDatasetSnapshotRead(BaseModel):
+    """
+    Manifest of an exported dataset snapshot.
+    """
+    dataset_id: UUID
+    version: str
+    item_count: int
+    created_at: datetime
+    label_fields: Dict[str, Dict[str, str]]  # Numeric label field -> file and dtype
 
 
 # ---- Evaluation Job Schemas ----
 
+class SequentialSamplingConfig(BaseModel):
+    """
+    Adaptive sampling for an evaluation job.
+
+    Items are run in a random order and the job stops as soon as either target is met: every team's confidence
+    interval is narrower than `margin_of_error` for every evaluator, or (`stop_on_significance`) every pair of teams
+    differs significantly on every evaluator. Remaining items are not run.
+    """
+    margin_of_error: Optional[float] = Field(default=None, gt=0)  # Target half-width of the confidence intervals
+    stop_on_significance: bool = False
+    confidence: float = Field(default=0.95, gt=0, lt=1)
+    min_samples: int = Field(default=30, gt=1)  # Items scored before the first stopping check
+    seed: Optional[int] = None  # Seed of the item order, random if unset
+
+    @model_validator(mode="after")
+    def check_target(self) -> "SequentialSamplingConfig":
+        if self.margin_of_error is None and not self.stop_on_significance:
+            raise ValueError("Sequential sampling needs a margin_of_error or stop_on_significance.")
+        return self
+
+
+class EvaluationComponentConfig(BaseModel):
+    """
+    Contents of `EvaluationJob.evaluation_component`.
+
+    `EvaluationJob.metrics` selects evaluators by name; an empty list runs all of them.
+    """
+    evaluators: List[EvaluatorConfig]
+    chunk_size: Optional[int] = Field(default=None, gt=0)  # Dataset items per checkpoint, defaults to EVAL_JOB_CHUNK_SIZE
+    max_concurrent_runs: Optional[int] = Field(default=None, gt=0)  # Defaults to EVAL_JOB_MAX_CONCURRENT_RUNS
+    sampling: Optional[SequentialSamplingConfig] = None  # Stop early once the estimates are precise enough
+    comparison_correction: MultipleComparisonCorrection = MultipleComparisonCorrection.holm  # Across team pairs
+
+    def selected_evaluators(self, metrics: List[str]) -> List[EvaluatorConfig]:
+        if not metrics:
+            return self.evaluators
+        by_name = {config.name: config for config in self.evaluators}
+        unknown = [name for name in metrics if name not in by_name]
+        if unknown:
+            raise ValueError(f"Metrics without an evaluator config: {unknown}")
+        return [by_name[name] for name in metrics]
+
+
 class IEvaluationJobCreate(EvaluationJobBase):
-    pass
+    @field_validator("evaluation_component")
+    @classmethod
+    def validate_evaluation_component(cls, v: Dict[str, Any]) -> Dict[str, Any]:
+        EvaluationComponentConfig.model_validate(v)
+        return v
 
 @optional()
 class IEvaluationJobUpdate(EvaluationJobBase):
@@ -56,17 +130,24 @@ class IEvaluationJobUpdate(EvaluationJobBase):
 
 class IEvaluationResultRead(EvaluationResultBase):
     id: UUID
+    score_sketch: Optional[Dict[str, Any]] = Field(default=None, exclude=True)  # Read through /analytics/quantiles
 
 class IEvaluationJobRead(EvaluationJobBase):
     id: UUID
     status: EvaluationJobStatus
     completed_at: Optional[pydantic_types.AwareDatetime]
+    total_runs: Optional[int]
+    processed_runs: int
+    failed_runs: int
+    error_message: Optional[str]
+    team_versions: Dict[str, str]
+    sampling_state: Optional[Dict[str, Any]]
+
+class IEvaluationJobReadDetailed(IEvaluationJobRead):
+    results: List[IEvaluationResultRead]
 
-class IEvaluationJobReadDetailed(EvaluationJobBase):
+class IEvaluationItemResultRead(EvaluationItemResultBase):
     id: UUID
-    status: EvaluationJobStatus
-    completed_at: Optional[pydantic_types.AwareDatetime]
-    results: List[IEvaluationResultRead]
 
 
 # ---- Evaluation Result Schemas ----
@@ -75,6 +156,67 @@ class IEvaluationResultCreate(EvaluationResultBase):
     pass
 
 
+# ---- Evaluation Analytics Schemas ----
+
+class IMetricTrendPoint(BaseModel):
+    """
+    Aggregate of a team's job scores on a metric within one time bucket.
+    """
+    bucket: datetime  # Start of the bucket
+    team_id: UUID
+    mean: float
+    min: float
+    max: float
+    job_count: int
+
+class ILeaderboardEntry(BaseModel):
+    """
+    A team's standing on a metric of a task, ranked by its latest job score.
+    """
+    rank: int
+    team_id: UUID
+    latest_score: float
+    mean_score: float
+    best_score: float
+    job_count: int
+    last_evaluated_at: datetime
+
+class IScoreQuantiles(BaseModel):
+    """
+    Approximate quantiles of a team's per-sample scores on a metric, merged across evaluation results.
+    """
+    team_id: UUID
+    result_count: int  # Evaluation results merged
+    count: int  # Scored samples
+    min: Optional[float] = None
+    max: Optional[float] = None
+    quantiles: Dict[str, float]  # Keyed by quantile, e.g. "0.9"
+
+class IHistogramBin(BaseModel):
+    lower: float
+    upper: float
+    count: int
+
+class IScoreHistogram(BaseModel):
+    """
+    Distribution of the per-item scores of a job on a metric.
+    """
+    metric_name: str
+    count: int
+    min: Optional[float] = None
+    max: Optional[float] = None
+    bins: List[IHistogramBin]
+
+
+# ---- Evaluation Comparison Schemas ----
+
+class IEvaluationComparisonCreate(EvaluationComparisonBase):
+    pass
+
+class IEvaluationComparisonRead(EvaluationComparisonBase):
+    id: UUID
+
+
 # ---- Evaluation Cache (read only) ----
 
 class IEvaluationCacheRead(EvaluationCacheBase):
@@ -85,7 +227,11 @@ class IEvaluationCacheRead(EvaluationCacheBase):
 # ---- User Feedback ----
 
 class IUserFeedbackCreate(UserFeedbackBase):
-    pass
+    @model_validator(mode="after")
+    def check_rating(self) -> "IUserFeedbackCreate":
+        if self.feedback_type == FeedbackType.RATING and self.rating is None:
+            raise ValueError("Rating feedback needs a rating.")
+        return self
 
 class IUserFeedbackRead(UserFeedbackBase):
     id: UUID
@@ -94,3 +240,13 @@ class IUserFeedbackRead(UserFeedbackBase):
 @optional()
 class IUserFeedbackUpdate(UserFeedbackBase):
     pass
+
+class IFeedbackSummary(BaseModel):
+    """
+    Running totals of the feedback on a team or session.
+    """
+    count: int = 0
+    positive: int = 0
+    negative: int = 0
+    rating_count: int = 0
+    mean_rating: Optional[float] = None
@@ -0,0 +1,500 @@
+"""
+Evaluation job runner.
+
+A job runs each of its teams on every item of its ground truth dataset through the agents API, then scores the
+responses with the job's evaluators. Items are streamed in id-ordered chunks; each chunk's item results are committed
+together with the job's cursor, so a job that crashed resumes after its last completed chunk instead of restarting.
+A running job holds a lease that a background heartbeat keeps renewing, however long a chunk takes.
+Jobs with `sampling` configured run items in a random order instead and stop once their estimates are precise enough
+(see `sequential_sampling`). Items are read from the dataset's columnar snapshot when one can be exported (see
+`dataset_snapshot`), and from the database otherwise. Scoring runs in a process pool because metric computation is
+CPU-bound; evaluators that cache their results (e.g. LLM judges) are scored in-process through the evaluation cache
+instead. A completed job stores a summary per (team, evaluator) and a comparison per (pair of teams, evaluator).
+"""
+import asyncio
+import logging
+import math
+import random
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Set, Tuple, Union
+from uuid import UUID
+
+import httpx
+import numpy as np
+
+from backend.common.db.session import SessionLocal
+from backend.evals import crud
+from backend.evals.core.config import settings
+from backend.evals.evaluators._base_evaluator import Evaluator, hash_value
+from backend.evals.evaluators.comparison import MultipleComparisonCorrection
+from backend.evals.evaluators.registry import load_evaluator
+from backend.evals.evaluators.suite import extract_pairs, finite_or_none
+from backend.evals.models import EvaluationItemResult, EvaluationJob, EvaluationJobStatus, GroundTruthItem
+from backend.evals.schema import (
+    EvaluationComponentConfig,
+    IEvaluationComparisonCreate,
+    IEvaluationResultCreate,
+    SequentialSamplingConfig,
+)
+from backend.evals.utils.agents_client import AgentRunError, AgentsClient, get_agents_client
+from backend.evals.utils.dataset_snapshot import DatasetSnapshot, SnapshotError, SnapshotItem, get_snapshot
+from backend.evals.utils.evaluation_cache import ascore_samples
+from backend.evals.utils.sequential_sampling import SequentialStopper
+from backend.evals.utils.scoring_pool import acompare_suite, asummarize_suite, get_scoring_pool, score_chunk
+
+logger = logging.getLogger(__name__)
+
+Item = Union[GroundTruthItem, SnapshotItem]
+ChunkProcessor = Callable[[Sequence[Item], Optional[Sequence[int]]], Awaitable[List[Dict[str, Any]]]]
+
+_running: Set[asyncio.Task] = set()
+
+
+def start_evaluation_job(job_id: UUID) -> asyncio.Task:
+    """
+    Run a job in the background of the current event loop.
+    """
+    task = asyncio.create_task(run_evaluation_job(job_id))
+    _running.add(task)
+    task.add_done_callback(_running.discard)
+    return task
+
+
+async def resume_evaluation_jobs() -> int:
+    """
+    Start pending jobs and jobs whose worker died. Returns the number of jobs started.
+    """
+    async with SessionLocal() as db_session:
+        job_ids = await crud.evaluation_job.get_resumable_ids(lease=settings.EVAL_JOB_LEASE, db_session=db_session)
+    for job_id in job_ids:
+        start_evaluation_job(job_id)
+    return len(job_ids)
+
+
+async def stop_evaluation_jobs() -> None:
+    """
+    Cancel running jobs; they are handed back as pending and resume from their last checkpoint.
+    """
+    for task in list(_running):
+        task.cancel()
+    await asyncio.gather(*_running, return_exceptions=True)
+
+
+async def run_evaluation_job(job_id: UUID) -> None:
+    async with SessionLocal() as db_session:
+        if not await crud.evaluation_job.claim(id=job_id, lease=settings.EVAL_JOB_LEASE, db_session=db_session):
+            logger.info(f"Evaluation job {job_id} is not runnable or is held by another worker.")
+            return
+        job = await crud.evaluation_job.get(id=job_id, db_session=db_session)
+
+    heartbeat = asyncio.create_task(_keep_lease(job_id))
+    try:
+        try:
+            async with get_agents_client() as client:
+                await _run(job, client) # type: ignore[arg-type]
+        finally:
+            heartbeat.cancel()
+            await asyncio.gather(heartbeat, return_exceptions=True)
+    except asyncio.CancelledError:
+        await _set_status(job_id, EvaluationJobStatus.PENDING)
+        raise
+    except Exception as e:
+        logger.exception(f"Evaluation job {job_id} failed.")
+        await _set_status(job_id, EvaluationJobStatus.FAILED, error_message=f"{type(e).__name__}: {e}")
+
+
+async def _keep_lease(job_id: UUID) -> None:
+    """
+    Refresh the job's heartbeat every third of the lease, so a chunk that runs longer than the lease is not taken for
+    a crashed job and claimed by another worker.
+    """
+    while True:
+        await asyncio.sleep(settings.EVAL_JOB_LEASE / 3)
+        try:
+            async with SessionLocal() as db_session:
+                await crud.evaluation_job.renew(id=job_id, db_session=db_session)
+        except Exception:
+            logger.exception(f"Failed to renew the lease of evaluation job {job_id}.")
+
+
+async def _set_status(job_id: UUID, status: EvaluationJobStatus, **values: Any) -> None:
+    async with SessionLocal() as db_session:
+        await crud.evaluation_job.set_progress(id=job_id, status=status, db_session=db_session, **values)
+        await db_session.commit()
+
+
+async def _run(job: EvaluationJob, client: AgentsClient) -> None:
+    if job.dataset_id is None:
+        raise ValueError("Evaluation job has no dataset.")
+    component = EvaluationComponentConfig.model_validate(job.evaluation_component)
+    evaluators = [load_evaluator(config) for config in component.selected_evaluators(job.metrics)]
+    chunk_size = component.chunk_size or settings.EVAL_JOB_CHUNK_SIZE
+    semaphore = asyncio.Semaphore(component.max_concurrent_runs or settings.EVAL_JOB_MAX_CONCURRENT_RUNS)
+    team_ids = [UUID(str(team_id)) for team_id in job.team_ids]  # Stored as JSON strings
+
+    # One agents session per team holds all of the team's runs for this job
+    team_sessions = dict(job.team_sessions or {})
+    for team_id in team_ids:
+        if str(team_id) not in team_sessions:
+            session_id = await client.create_session(task_id=job.task_id, team_id=team_id, tenant_id=job.tenant_id)
+            team_sessions[str(team_id)] = str(session_id)
+
+    # A team's version and component identify the predictions that can be reused from the baseline job
+    team_versions = {}
+    for team_id in team_ids:
+        team = await client.get_team(team_id)
+        team_versions[str(team_id)] = hash_value({"version": team.get("version"), "component": team.get("component")})
+
+    snapshot = await _open_snapshot(job.dataset_id)
+    async with SessionLocal() as db_session:
+        if snapshot is not None:
+            item_count = snapshot.item_count
+        else:
+            item_count = await crud.ground_truth_item.count_by_dataset(dataset_id=job.dataset_id, db_session=db_session)
+        await crud.evaluation_job.set_progress(
+            id=job.id,
+            team_sessions=team_sessions,
+            team_versions=team_versions,
+            total_runs=item_count * len(team_ids),
+            db_session=db_session,
+        )
+        await db_session.commit()
+
+    async def process(items: Sequence[Item], rows: Optional[Sequence[int]]) -> List[Dict[str, Any]]:
+        return await _process_chunk(
+            job, items, team_ids, team_sessions, team_versions, evaluators, client, semaphore, snapshot=snapshot, rows=rows
+        )
+
+    if component.sampling is not None:
+        await _run_sampled(job, component.sampling, team_ids, evaluators, snapshot, chunk_size, process)
+    else:
+        await _run_in_order(job, snapshot, chunk_size, process)
+
+    results, comparisons = await _aggregate(
+        job, team_ids, team_sessions, evaluators, component.comparison_correction
+    )
+    async with SessionLocal() as db_session:
+        await crud.evaluation_result.replace_for_job(job_id=job.id, results=results, db_session=db_session)
+        await crud.evaluation_comparison.replace_for_job(
+            job_id=job.id, comparisons=comparisons, db_session=db_session
+        )
+        await crud.evaluation_job.set_progress(
+            id=job.id,
+            status=EvaluationJobStatus.COMPLETED,
+            completed_at=datetime.now(timezone.utc),
+            db_session=db_session,
+        )
+        await db_session.commit()
+
+
+async def _run_in_order(
+    job: EvaluationJob, snapshot: Optional[DatasetSnapshot], chunk_size: int, process: ChunkProcessor
+) -> None:
+    """
+    Process all items in id order, resuming after the checkpointed item.
+    """
+    cursor, processed, failed = job.checkpoint_item_id, job.processed_runs, job.failed_runs
+    while True:
+        rows = None
+        if snapshot is not None:
+            start = snapshot.position_after(cursor)
+            items: Sequence[Item] = await asyncio.to_thread(snapshot.items, start, start + chunk_size)
+            rows = range(start, start + len(items))
+        else:
+            async with SessionLocal() as db_session:
+                items = await crud.ground_truth_item.get_chunk(
+                    dataset_id=job.dataset_id, after_id=cursor, limit=chunk_size, db_session=db_session # type: ignore[arg-type]
+                )
+        if not items:
+            break
+
+        records = await process(items, rows)
+        cursor = items[-1].id
+        processed += len(records)
+        failed += sum(1 for record in records if record["error"])
+        await _save_chunk(job.id, records, checkpoint_item_id=cursor, processed_runs=processed, failed_runs=failed)
+
+
+async def _run_sampled(
+    job: EvaluationJob,
+    sampling: SequentialSamplingConfig,
+    team_ids: List[UUID],
+    evaluators: List[Evaluator],
+    snapshot: Optional[DatasetSnapshot],
+    chunk_size: int,
+    process: ChunkProcessor,
+) -> None:
+    """
+    Process items in a seeded random order until the sampling targets are met or all items are processed.
+
+    The position in the order is the checkpoint, and the stopper is rebuilt from the stored item results on resume.
+    """
+    state = dict(job.sampling_state or {})
+    if "seed" not in state:
+        state["seed"] = sampling.seed if sampling.seed is not None else random.getrandbits(63)
+    if snapshot is not None:
+        ids = None
+        item_count = snapshot.item_count
+    else:
+        async with SessionLocal() as db_session:
+            ids = await crud.ground_truth_item.get_ids(dataset_id=job.dataset_id, db_session=db_session) # type: ignore[arg-type]
+        item_count = len(ids)
+    order = np.random.default_rng(state["seed"]).permutation(item_count)
+
+    stopper = SequentialStopper(sampling, evaluators, team_ids, state)
+    async with SessionLocal() as db_session:
+        async for item_id, team_id, scores in crud.evaluation_item_result.stream_scores(job_id=job.id, db_session=db_session):
+            stopper.add(item_id, team_id, scores)
+
+    position, processed, failed = state.get("position", 0), job.processed_runs, job.failed_runs
+    while position < item_count and not state.get("stopped"):
+        rows = order[position:position + chunk_size].tolist()
+        if snapshot is not None:
+            items: Sequence[Item] = await asyncio.to_thread(snapshot.items_at, rows)
+        else:
+            async with SessionLocal() as db_session:
+                items = await crud.ground_truth_item.get_by_ids(
+                    list_ids=[ids[row] for row in rows], db_session=db_session # type: ignore[index]
+                ) or []
+
+        records = await process(items, rows if snapshot is not None else None)
+        position += len(rows)
+        processed += len(records)
+        failed += sum(1 for record in records if record["error"])
+        for record in records:
+            stopper.add(record["item_id"], record["team_id"], record["scores"])
+
+        state["position"] = position
+        if stopper.look_due():
+            state["stopped"], look = await asyncio.to_thread(stopper.look)
+            state.update(look)
+        await _save_chunk(job.id, records, processed_runs=processed, failed_runs=failed, sampling_state=dict(state))
+    if state.get("stopped"):
+        logger.info(f"Evaluation job {job.id} met its {state['stopped']} target after {position} of {item_count} items.")
+
+
+async def _save_chunk(job_id: UUID, records: List[Dict[str, Any]], **progress: Any) -> None:
+    """
+    Commit a chunk's item results together with the job's progress and checkpoint.
+    """
+    async with SessionLocal() as db_session:
+        await crud.evaluation_item_result.bulk_upsert(records=records, db_session=db_session)
+        await crud.evaluation_job.set_progress(id=job_id, db_session=db_session, **progress)
+        await db_session.commit()
+
+
+async def _open_snapshot(dataset_id: UUID) -> Optional[DatasetSnapshot]:
+    if not settings.EVAL_SNAPSHOTS:
+        return None
+    try:
+        return await get_snapshot(dataset_id)
+    except SnapshotError as e:
+        logger.warning(f"Reading dataset {dataset_id} from the database: {e}")
+        return None
+
+
+async def _process_chunk(
+    job: EvaluationJob,
+    items: Sequence[Item],
+    team_ids: List[UUID],
+    team_sessions: Dict[str, str],
+    team_versions: Dict[str, str],
+    evaluators: List[Evaluator],
+    client: AgentsClient,
+    semaphore: asyncio.Semaphore,
+    snapshot: Optional[DatasetSnapshot] = None,
+    rows: Optional[Sequence[int]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Run every team on a chunk of items and score the responses.
+
+    Item results of the baseline job are reused where their hashes match: the prediction when the item's input data
+    and the team version are unchanged, and the scores when the ground truth label and every evaluator config are
+    unchanged too. Only the remaining runs are made and only the remaining cells are scored.
+
+    `rows` are the snapshot rows of the items, when they were read from `snapshot`.
+    """
+    baseline: Dict[Tuple[str, str], EvaluationItemResult] = {}
+    if job.baseline_job_id is not None:
+        async with SessionLocal() as db_session:
+            previous = await crud.evaluation_item_result.get_for_items(
+                job_id=job.baseline_job_id, item_ids=[item.id for item in items], db_session=db_session
+            )
+        baseline = {(str(result.item_id), str(result.team_id)): result for result in previous}
+    # Everything but the name and description can change an evaluator's scores, including which fields it reads
+    config_hashes = {
+        evaluator.config.name: hash_value(evaluator.config.model_dump(mode="json", exclude={"name", "description"}))
+        for evaluator in evaluators
+    }
+    reused = 0
+
+    async def run_one(item: Item, team_id: UUID) -> Dict[str, Any]:
+        nonlocal reused
+        session_id = UUID(team_sessions[str(team_id)])
+        content_hash = hash_value({"input_data": item.input_data, "team": team_versions[str(team_id)]})
+        record: Dict[str, Any] = {
+            "job_id": job.id,
+            "item_id": item.id,
+            "team_id": team_id,
+            "session_id": session_id,
+            "run_id": None,
+            "prediction": None,
+            "scores": {},
+            "error": None,
+            "content_hash": content_hash,
+            "score_hashes": {
+                name: hash_value({"content": content_hash, "label": item.ground_truth_label, "evaluator": config_hash})
+                for name, config_hash in config_hashes.items()
+            },
+        }
+        previous = baseline.get((str(item.id), str(team_id)))
+        if previous is not None and previous.content_hash == content_hash and previous.error is None:
+            record.update(session_id=previous.session_id, run_id=previous.run_id, prediction=previous.prediction)
+            reused += 1
+            if all(previous.score_hashes.get(name) == h for name, h in record["score_hashes"].items()):
+                record["scores"] = {name: previous.scores.get(name) for name in config_hashes}
+            return record
+
+        async with semaphore:
+            try:
+                record["run_id"], record["prediction"] = await client.run_team(
+                    session_id=session_id, task_id=job.task_id, input_data=item.input_data
+                )
+            except (AgentRunError, httpx.HTTPStatusError) as e:
+                # Failed runs are recorded and skipped; transport errors (agents service down) fail the job instead
+                record["error"] = f"{type(e).__name__}: {e}"
+        return record
+
+    cells = [(i, team_id) for i in range(len(items)) for team_id in team_ids]
+    records = await asyncio.gather(*(run_one(items[i], team_id) for i, team_id in cells))
+    unscored = [k for k, record in enumerate(records) if not record["scores"]]
+    if unscored and evaluators:
+        labels = [items[cells[k][0]].ground_truth_label for k in unscored]
+        snapshot_rows = [rows[cells[k][0]] for k in unscored] if snapshot is not None and rows is not None else None
+        scores = await score_responses(
+            evaluators,
+            labels,
+            [records[k]["prediction"] for k in unscored],
+            snapshot=snapshot,
+            rows=snapshot_rows,
+            item_ids=[str(items[cells[k][0]].id) for k in unscored],
+        )
+        for j, k in enumerate(unscored):
+            records[k]["scores"] = {name: values[j] for name, values in scores.items()}
+    if baseline:
+        logger.debug(f"Evaluation job {job.id}: reused {reused} of {len(records)} runs from job {job.baseline_job_id}.")
+    return list(records)
+
+
+async def score_responses(
+    evaluators: List[Evaluator],
+    labels: List[Any],
+    responses: List[Optional[List[Any]]],
+    snapshot: Optional[DatasetSnapshot] = None,
+    rows: Optional[List[int]] = None,
+    item_ids: Optional[List[str]] = None,
+) -> Dict[str, List[Optional[float]]]:
+    """
+    Per-sample scores for each evaluator, keyed by evaluator name; `None` where a sample is not scorable.
+
+    With a `snapshot`, pooled workers read the ground truth of `rows` from it instead of receiving `labels`. With
+    `item_ids`, pooled workers reuse the scores of samples they have already scored.
+    """
+    pooled = [evaluator for evaluator in evaluators if not evaluator.cache_results]
+    results: Dict[str, List[Optional[float]]] = {}
+    if pooled:
+        loop = asyncio.get_running_loop()
+        results.update(await loop.run_in_executor(
+            get_scoring_pool(),
+            score_chunk,
+            [evaluator.config.model_dump_json() for evaluator in pooled],
+            None if snapshot is not None else labels,
+            responses,
+            str(snapshot.directory) if snapshot is not None else None,
+            rows,
+            item_ids,
+        ))
+
+    for evaluator in evaluators:
+        if not evaluator.cache_results:
+            continue
+        indices, y_true, y_pred = extract_pairs(evaluator, labels, responses)
+        scores: List[Optional[float]] = [None] * len(labels)
+        if indices:
+            for i, score in zip(indices, await ascore_samples(evaluator, y_true, y_pred)):
+                scores[i] = finite_or_none(score)
+        results[evaluator.config.name] = scores
+    return results
+
+
+async def _aggregate(
+    job: EvaluationJob,
+    team_ids: List[UUID],
+    team_sessions: Dict[str, str],
+    evaluators: List[Evaluator],
+    correction: MultipleComparisonCorrection,
+) -> Tuple[List[IEvaluationResultCreate], List[IEvaluationComparisonCreate]]:
+    """
+    Summarize the item scores of every (team, evaluator) pair into `EvaluationResult`s, and compare every pair of
+    teams per evaluator into `EvaluationComparison`s.
+
+    Scores are gathered into one (evaluators x items x teams) tensor. All evaluators of a team are summarized in one
+    pass, and the teams of each evaluator are compared from one (items x teams) matrix.
+    """
+    names = [evaluator.config.name for evaluator in evaluators]
+    columns = {str(team_id): column for column, team_id in enumerate(team_ids)}
+    item_rows: Dict[UUID, int] = {}
+    cells: List[Tuple[int, int]] = []
+    values: List[List[float]] = []  # Per-item scores in `names` order, one list per cell
+    async with SessionLocal() as db_session:
+        async for item_id, team_id, item_scores in crud.evaluation_item_result.stream_scores(job_id=job.id, db_session=db_session):
+            column = columns.get(str(team_id))
+            if column is None:
+                continue
+            cells.append((item_rows.setdefault(item_id, len(item_rows)), column))
+            values.append([math.nan if (score := item_scores.get(name)) is None else score for name in names])
+
+    scores = np.full((len(names), len(item_rows), len(team_ids)), np.nan)
+    if cells:
+        rows, cols = np.array(cells).T
+        scores[:, rows, cols] = np.array(values, dtype=float).T
+    has_results = np.zeros(len(team_ids), dtype=bool)
+    has_results[[column for _, column in cells]] = True
+
+    results = []
+    for column, team_id in enumerate(team_ids):
+        if not has_results[column]:
+            continue
+        summaries = await asummarize_suite(evaluators, scores[:, :, column])
+        for name, summary in summaries.items():
+            results.append(IEvaluationResultCreate(
+                job_id=job.id,
+                task_id=job.task_id,
+                session_id=UUID(team_sessions[str(team_id)]),
+                team_id=team_id,
+                metric_name=name,
+                score=summary.mean,
+                std_dev=summary.std_dev,
+                confidence_interval=summary.confidence_interval,
+                dataset_id=job.dataset_id,
+                score_sketch=summary.sketch,
+            ))
+
+    comparisons = []
+    if len(team_ids) > 1:
+        by_metric = await acompare_suite(evaluators, scores, correction)
+        for name, pairs in by_metric.items():
+            for a, b, comparison in pairs:
+                comparisons.append(IEvaluationComparisonCreate(
+                    job_id=job.id,
+                    metric_name=name,
+                    team_a_id=team_ids[a],
+                    team_b_id=team_ids[b],
+                    difference=comparison.difference,
+                    confidence_interval=comparison.confidence_interval,
+                    p_value=comparison.p_value,
+                    unadjusted_p_value=(comparison.additional_info or {}).get("unadjusted_p_value"),
+                    significant=bool(comparison.significant),
+                    sample_size=comparison.sample_size or 0,
+                ))
+    return results, comparisons
@@ -0,0 +1,28 @@
+import json
+
+import numpy as np
+
+from backend.evals.benchmarks.evaluator_throughput import run, synthetic_dataset
+from backend.evals.evaluators._base_evaluator import CIComputationMethod
+
+
+def test_synthetic_dataset_shape():
+    labels, first, second = synthetic_dataset("accuracy_score", 20, np.random.default_rng(0))
+
+    assert len(labels) == len(first) == len(second) == 20
+    assert all(0 <= label["value"] < 5 for label in labels)
+    assert first[0][-1] == {"source": "assistant", "content": {"value": first[0][-1]["content"]["value"]}}
+
+
+def test_run_appends_one_record_per_operation(tmp_path):
+    output = tmp_path / "results.jsonl"
+    output.write_text(json.dumps({"benchmark": "previous"}) + "\n")
+
+    run([50], str(output), repeat=1, memory=True, bootstrap_iterations=20, seed=0)
+
+    records = [json.loads(line) for line in output.read_text().splitlines()][1:]
+    operations_per_metric = 1 + 3 * len(CIComputationMethod)
+    assert len(records) == 2 * operations_per_metric
+    assert {record["metric"] for record in records} == {"accuracy_score", "mean_absolute_error"}
+    assert all(record["n"] == 50 and record["seconds"] > 0 and record["peak_memory_mb"] > 0 for record in records)
+    assert [record["ci_method"] for record in records[:2]] == [None, list(CIComputationMethod)[0].value]
@@ -1,14 +1,21 @@
 import pytest
+import numpy as np
 from pydantic import BaseModel
 from backend.evals.evaluators._base_evaluator import (
     EvaluatorConfig,
     FieldExtractionConfig,
     MetricFunctionConfig,
     extract_field,
+    compile_field_path,
     FieldExtractionError,
     CIComputationMethod,
-    Evaluator
+    BootstrapCIMethod,
+    EvaluationResult,
+    Evaluator,
+    bootstrap_means,
+    bootstrap_interval
 )
+from backend.evals.tests.helpers import DictResultCache
 
 
 class DummyLabel(BaseModel):
@@ -95,6 +102,24 @@ def test_extract_field_invalid():
     assert extract_field(data, "a.c") is None
 
 
+def test_compiled_field_path():
+    path = compile_field_path("-1.content.value")
+    assert path is compile_field_path("-1.content.value")
+
+    messages = [{"content": {"value": 1}}, DummyStructuredMessage(content=DummyContentStructure(value=2), extra={})]
+    assert path(messages) == 2
+    assert path([{"content": None}]) is None
+    with pytest.raises(IndexError):
+        path([])
+
+    values = path.extract_many([messages, [{"content": {}}], [], [{"content": {"value": [1, 2]}}]])
+    assert values.dtype == object and values.shape == (4,)
+    assert values.tolist() == [2, None, None, [1, 2]]
+
+    scores = compile_field_path("score").extract_many([{"score": 1}, {}, {"score": 0.5}], dtype=float)
+    np.testing.assert_array_equal(scores, [1.0, np.nan, 0.5])
+
+
 def test_field_extraction_error(evaluator_config):
     evaluator = DummyEvaluator(evaluator_config)
 
@@ -158,3 +183,59 @@ def test_to_from_config(evaluator_config):
     evaluator = DummyEvaluator(evaluator_config)
     config = evaluator.to_config()
     assert config == evaluator_config
+
+
+def test_bootstrap_means_independent_of_memory_cap():
+    scores = np.random.default_rng(0).normal(size=500)
+    chunked = bootstrap_means(scores, 200, np.random.default_rng(7), max_memory_mb=0)
+    whole = bootstrap_means(scores, 200, np.random.default_rng(7))
+    assert np.array_equal(chunked, whole)
+
+
+@pytest.mark.parametrize("method", list(BootstrapCIMethod))
+def test_bootstrap_interval_contains_mean(method):
+    scores = np.random.default_rng(1).exponential(size=300)
+    means = bootstrap_means(scores, 2000, np.random.default_rng(0))
+    lower, upper = bootstrap_interval(scores, means, method=method)
+    assert lower < scores.mean() < upper
+
+
+def test_bootstrap_interval_constant_scores():
+    scores = np.ones(50)
+    means = bootstrap_means(scores, 100, np.random.default_rng(0))
+    assert bootstrap_interval(scores, means, method=BootstrapCIMethod.bca) == (1.0, 1.0)
+
+
+def test_bootstrap_ci_seeded(evaluator_config):
+    evaluator_config.metric.random_seed = 42
+    evaluator_config.metric.bootstrap_ci_method = BootstrapCIMethod.bca
+    evaluator = DummyEvaluator(evaluator_config)
+    scores = np.random.default_rng(2).integers(0, 2, 100).astype(float)
+    assert evaluator.bootstrap_ci(scores) == evaluator.bootstrap_ci(scores)
+
+
+def test_paired_bootstrap(evaluator_config):
+    evaluator_config.metric.random_seed = 0
+    evaluator = DummyEvaluator(evaluator_config)
+
+    (lower, upper), p_value = evaluator.paired_bootstrap(np.full(100, 0.5) + np.random.default_rng(3).normal(0, 0.1, 100))
+    assert lower > 0 and p_value < 0.05
+
+    _, p_value = evaluator.paired_bootstrap(np.random.default_rng(4).normal(0, 1, 100))
+    assert p_value > 0.05
+
+
+def test_result_cache_hooks(evaluator_config):
+    class CachedEvaluator(DummyEvaluator):
+        cache_results = True
+
+    cache = DictResultCache()
+    evaluator = CachedEvaluator(evaluator_config, result_cache=cache)
+    assert evaluator.check_cache({"a": 1}, "x") is None
+
+    evaluator.store_cache({"a": 1}, "x", EvaluationResult(score=0.5, metric_name="accuracy_score"))
+    assert evaluator.check_cache({"a": 1}, "x").score == 0.5
+
+    # A new cache version invalidates previously stored results
+    evaluator.config.metric.cache_version += 1
+    assert evaluator.check_cache({"a": 1}, "x") is None
@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from backend.evals.evaluators._base_evaluator import CIComputationMethod
+from backend.evals.evaluators.comparison import MultipleComparisonCorrection, adjust_p_values, compare_teams
+from backend.evals.evaluators.sklearn import SklearnEvaluator
+from backend.evals.tests.helpers import sklearn_config
+
+
+@pytest.mark.parametrize("config", [
+    sklearn_config("accuracy_score"),
+    sklearn_config("accuracy_score", ci_method=CIComputationMethod.bootstrap, bootstrap_iterations=100, random_seed=5),
+])
+def test_team_comparisons_match_pairwise_compare(config):
+    rng = np.random.default_rng(3)
+    y_true = rng.integers(0, 2, 80).tolist()
+    predictions = [rng.integers(0, 2, 80).tolist() for _ in range(3)]
+    evaluator = SklearnEvaluator(config)
+    matrix = np.column_stack([evaluator.score_samples(y_true, y_pred) for y_pred in predictions])
+
+    comparisons = compare_teams(evaluator, matrix, correction=MultipleComparisonCorrection.none)
+
+    assert [(a, b) for a, b, _ in comparisons] == [(0, 1), (0, 2), (1, 2)]
+    for a, b, comparison in comparisons:
+        expected = evaluator.compare(y_true, predictions[a], predictions[b])
+        assert comparison.difference == pytest.approx(expected.difference)
+        assert comparison.confidence_interval == pytest.approx(expected.confidence_interval)
+        if expected.p_value is not None:
+            assert comparison.p_value == pytest.approx(expected.p_value)
+
+
+@pytest.mark.parametrize("correction,expected", [
+    (MultipleComparisonCorrection.bonferroni, [0.04, 0.16, 0.12, 0.8]),
+    (MultipleComparisonCorrection.holm, [0.04, 0.09, 0.09, 0.2]),
+    (MultipleComparisonCorrection.fdr_bh, [0.04, 0.0533333, 0.0533333, 0.2]),
+])
+def test_adjust_p_values(correction, expected):
+    assert adjust_p_values(np.array([0.01, 0.04, 0.03, 0.2]), correction) == pytest.approx(expected)
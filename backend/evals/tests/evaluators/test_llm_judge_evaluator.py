@@ -0,0 +1,87 @@
+import json
+from functools import partial
+
+import httpx
+import numpy as np
+import pytest
+
+from backend.evals.evaluators import llm_judge
+from backend.evals.evaluators._base_evaluator import EvaluatorConfig, FieldExtractionConfig, MetricFunctionConfig
+from backend.evals.evaluators.llm_judge import LLMJudgeEvaluator
+from backend.evals.tests.helpers import DictResultCache
+
+JUDGEMENT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "reasoning": {"type": "string"},
+        "satisfactory": {"type": "boolean"},
+        "completeness": {"type": "number"},
+        "relevance": {"type": "number"},
+    },
+    "required": ["reasoning", "satisfactory", "completeness", "relevance"],
+}
+
+
+def judge_config(score_field):
+    return EvaluatorConfig(
+        name=score_field,
+        description="LLM judge",
+        provider="llm_judge",
+        extraction=FieldExtractionConfig(ground_truth_field="reference", prediction_field="-1.content"),
+        metric=MetricFunctionConfig(
+            namespace="llm_judge",
+            name=score_field,
+            params={
+                "model": "gpt-4o-mini",
+                "rubric": "Grade the student's answer against the reference answer.",
+                "score_field": score_field,
+                "output_schema": JUDGEMENT_SCHEMA,
+            },
+        ),
+    )
+
+
+@pytest.fixture
+def judge_calls(monkeypatch):
+    calls = []
+
+    def handler(request):
+        body = json.loads(request.content)
+        calls.append(body)
+        if len(calls) == 1:
+            return httpx.Response(429)  # Retried
+        answer = body["messages"][1]["content"].rsplit("\n", 1)[-1]
+        judgement = {
+            "reasoning": "...",
+            "satisfactory": answer == "good",
+            "completeness": 0.9 if answer == "good" else 0.2,
+            "relevance": 0.5,
+        }
+        content = f"```json\n{json.dumps(judgement)}\n```"
+        return httpx.Response(200, json={"choices": [{"message": {"content": content}}]})
+
+    monkeypatch.setattr(llm_judge.httpx, "AsyncClient", partial(httpx.AsyncClient, transport=httpx.MockTransport(handler)))
+    monkeypatch.setattr(llm_judge.asyncio, "sleep", _no_sleep)
+    return calls
+
+
+async def _no_sleep(seconds):
+    return None
+
+
+def test_judgements_shared_across_score_fields(judge_calls):
+    cache = DictResultCache()
+    completeness = LLMJudgeEvaluator(judge_config("completeness"), result_cache=cache)
+    satisfactory = LLMJudgeEvaluator(judge_config("satisfactory"), result_cache=cache)
+    assert completeness.result_config_hash == satisfactory.result_config_hash
+    assert completeness.config_hash != satisfactory.config_hash
+
+    y_true = ["ref a", "ref b", "ref a"]
+    y_pred = ["good", "bad", "good"]
+    np.testing.assert_allclose(completeness.score_samples(y_true, y_pred), [0.9, 0.2, 0.9])
+    # The duplicate pair is judged once; the first call was rate limited and retried
+    assert len(judge_calls) == 3
+
+    np.testing.assert_allclose(satisfactory.score_samples(y_true, y_pred), [1.0, 0.0, 1.0])
+    assert len(judge_calls) == 3
+    assert judge_calls[-1]["response_format"]["json_schema"]["schema"] == JUDGEMENT_SCHEMA
@@ -0,0 +1,59 @@
+import json
+from functools import partial
+
+import httpx
+import numpy as np
+import pytest
+
+from backend.evals.evaluators import ragas as ragas_evaluator
+from backend.evals.evaluators._base_evaluator import EvaluatorConfig, FieldExtractionConfig, MetricFunctionConfig
+from backend.evals.evaluators.ragas import RagasEvaluator
+from backend.evals.utils.embedding_cache import EmbeddingCache
+
+EMBEDDINGS = {"Paris": [1.0, 0.0], "Paris, France": [0.8, 0.6], "Lyon": [0.0, 1.0]}
+
+
+def similarity_config():
+    return EvaluatorConfig(
+        name="semantic_similarity",
+        description="Answer similarity to the reference",
+        provider="ragas",
+        extraction=FieldExtractionConfig(ground_truth_field="answer", prediction_field="-1.content"),
+        metric=MetricFunctionConfig(
+            namespace="ragas.metrics",
+            name="SemanticSimilarity",
+            params={
+                "embedding_model": "text-embedding-3-small",
+                "sample_fields": {"reference": "y_true", "response": "y_pred"},
+            },
+        ),
+    )
+
+
+@pytest.fixture
+def embedding_requests(monkeypatch):
+    requests = []
+
+    def handler(request):
+        texts = json.loads(request.content)["input"]
+        requests.append(texts)
+        data = [{"index": i, "embedding": EMBEDDINGS[text]} for i, text in enumerate(texts)]
+        return httpx.Response(200, json={"data": data})
+
+    monkeypatch.setattr(ragas_evaluator.httpx, "Client", partial(httpx.Client, transport=httpx.MockTransport(handler)))
+    return requests
+
+
+def test_embeddings_cached_across_evaluations(embedding_requests, tmp_path):
+    y_true = ["Paris", "Paris", "Paris"]
+    y_pred = ["Paris, France", "Lyon", "Paris"]
+
+    evaluator = RagasEvaluator(similarity_config(), embeddings_cache=EmbeddingCache(str(tmp_path), ttl=60, batch_size=2))
+    np.testing.assert_allclose(evaluator.score_samples(y_true, y_pred), [0.8, 0.0, 1.0], atol=1e-6)
+    # The three distinct texts are embedded up front, two per request
+    assert sorted(len(texts) for texts in embedding_requests) == [1, 2]
+
+    # A new process reads the embeddings back from the local store
+    evaluator = RagasEvaluator(similarity_config(), embeddings_cache=EmbeddingCache(str(tmp_path), ttl=60, batch_size=2))
+    np.testing.assert_allclose(evaluator.score_samples(["Lyon"], ["Paris"]), [0.0], atol=1e-6)
+    assert len(embedding_requests) == 2
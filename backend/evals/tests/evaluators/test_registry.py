@@ -0,0 +1,22 @@
+import pytest
+
+from backend.evals.evaluators.registry import EVALUATOR_PROVIDERS, EvaluatorRegistry
+from backend.evals.evaluators.sklearn import SklearnEvaluator
+from backend.evals.tests.helpers import sklearn_config
+
+
+def test_registry_reuses_warm_evaluators():
+    config = sklearn_config("accuracy_score")
+    registry = EvaluatorRegistry(EVALUATOR_PROVIDERS, max_size=2)
+    registry.preload(["sklearn.metrics"], providers=["sklearn"])
+    evaluator = registry.get(config)
+    assert isinstance(evaluator, SklearnEvaluator)
+    assert registry.get(config.model_copy(deep=True)) is evaluator
+
+    # Changing the caller's config afterwards does not leak into the shared instance
+    config.metric.name = "zero_one_loss"
+    other = registry.get(config)
+    assert other is not evaluator and evaluator.config.metric.name == "accuracy_score"
+
+    with pytest.raises(ValueError):
+        registry.get(config.model_copy(update={"provider": "unknown"}))
@@ -0,0 +1,18 @@
+import numpy as np
+
+from backend.evals.evaluators.sketch import ScoreSketch
+
+
+def test_score_sketch_quantiles_merge():
+    scores = np.random.default_rng(3).lognormal(size=20_000)
+    qs = [0.01, 0.5, 0.9, 0.999]
+    parts = [ScoreSketch.from_dict(ScoreSketch.from_scores(part).to_dict()) for part in np.array_split(scores, 7)]
+    merged = ScoreSketch.merge(parts)
+
+    assert merged.count == len(scores)
+    assert (merged.min, merged.max) == (scores.min(), scores.max())
+    for sketch in (ScoreSketch.from_scores(scores), merged):
+        # Rank error, not value error: the estimates fall between nearby exact quantiles
+        ranks = np.searchsorted(np.sort(scores), sketch.quantiles(qs)) / len(scores)
+        np.testing.assert_allclose(ranks, qs, atol=0.002)
+    assert np.isnan(ScoreSketch.merge([]).quantile(0.5))
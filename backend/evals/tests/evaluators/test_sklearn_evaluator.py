@@ -6,7 +6,9 @@ from backend.evals.evaluators._base_evaluator import (
     MetricFunctionConfig,
     CIComputationMethod
 )
+from backend.evals.evaluators._base_evaluator import score_cache
 from backend.evals.evaluators.sklearn import SklearnEvaluator
+from backend.evals.tests.helpers import sklearn_config
 
 
 @pytest.fixture
@@ -86,9 +88,126 @@ def test_compare(evaluator_config):
     assert result.confidence_interval is not None
 
 
+def test_compare_bootstrap(bootstrap_evaluator_config):
+    bootstrap_evaluator_config.metric.random_seed = 0
+    evaluator = SklearnEvaluator(bootstrap_evaluator_config)
+    y_true = [1, 0, 1, 1] * 25
+    y_pred1 = [1, 0, 1, 1] * 25
+    y_pred2 = [1, 1, 0, 1] * 25
+    result = evaluator.compare(y_true, y_pred1, y_pred2)
+    assert np.isclose(result.difference, 0.5)
+    assert result.confidence_interval[0] > 0
+    assert result.significant
+
+
 def test_sample_size_estimation(evaluator_config):
     evaluator = SklearnEvaluator(evaluator_config)
     y_true = [1, 0, 1, 1, 0, 0, 1, 1, 0, 0]
     y_pred = [1, 0, 1, 0, 0, 0, 1, 1, 1, 0]
     n = evaluator.estimate_sample_size(y_true, y_pred, confidence=0.95, margin_of_error=0.1)
     assert n > 0
+
+
+@pytest.mark.parametrize("name,params,y_true,y_pred", [
+    ("accuracy_score", {}, ["a", "b", "a", "c"], ["a", "a", "a", "c"]),
+    ("zero_one_loss", {}, [1, 0, 1, 1], [1, 0, 0, 1]),
+    ("mean_absolute_error", {}, [1.0, 2.5, -1.0], [0.5, 2.5, 1.0]),
+    ("mean_squared_error", {}, [[1.0, 2.0], [0.0, 1.0]], [[0.0, 2.0], [1.0, 3.0]]),
+    ("root_mean_squared_error", {}, [1.0, 2.5, -1.0], [0.5, 2.5, 1.0]),
+    ("root_mean_squared_error", {}, [[0.0, 0.0], [1.0, 1.0]], [[1.0, 3.0], [1.0, 2.0]]),
+    ("accuracy_score", {}, [1, 0, 2], [1.0, 1.0, 2.0]),
+    ("log_loss", {"labels": [0, 1]}, [1, 0, 1], [0.9, 0.2, 0.4]),
+    ("log_loss", {"labels": ["x", "y", "z"]}, ["y", "z"], [[0.2, 0.5, 0.3], [0.1, 0.1, 0.8]]),
+])
+def test_vectorized_scores_match_per_sample_metric(name, params, y_true, y_pred):
+    evaluator = SklearnEvaluator(sklearn_config(name, params))
+    assert evaluator.vectorized_fn is not None
+    expected = [evaluator.metric_fn([yt], [yp], **params) for yt, yp in zip(y_true, y_pred)]
+    assert np.allclose(evaluator.score_samples(y_true, y_pred), expected)
+
+
+@pytest.mark.parametrize("name", ["accuracy_score", "zero_one_loss"])
+def test_continuous_targets_are_rejected_like_sklearn(name):
+    evaluator = SklearnEvaluator(sklearn_config(name))
+    with pytest.raises(ValueError, match="continuous"):
+        evaluator.metric_fn([1], [0.5])
+    with pytest.raises(ValueError, match="continuous"):
+        evaluator.score_samples([1, 0], [1.0, 0.5])
+    with pytest.raises(ValueError, match="continuous"):
+        evaluator.score_samples([0.5, 0.0], [1, 0])
+
+
+def test_log_loss_with_too_few_probability_columns_is_rejected_like_sklearn():
+    evaluator = SklearnEvaluator(sklearn_config("log_loss", {"labels": [0, 1, 2]}))
+    with pytest.raises(ValueError):
+        evaluator.metric_fn([2], [0.3], labels=[0, 1, 2])
+    with pytest.raises(ValueError):
+        evaluator.score_samples([2, 0], [0.3, 0.6])
+
+
+@pytest.mark.parametrize("name", ["accuracy_score", "zero_one_loss"])
+def test_mixed_label_types_are_left_to_sklearn(name):
+    evaluator = SklearnEvaluator(sklearn_config(name))
+    calls = []
+    metric_fn = evaluator.metric_fn
+    evaluator.metric_fn = lambda *args, **kwargs: calls.append(args) or metric_fn(*args, **kwargs)
+
+    # Numeric kinds compare as sklearn compares them
+    assert np.allclose(evaluator.score_samples([1, 0], [1.0, 1.0]), [1.0, 0.0] if name == "accuracy_score" else [0.0, 1.0])
+    assert not calls
+    expected = [metric_fn([1], ["1"]), metric_fn([0], ["1"])]
+    assert np.allclose(evaluator.score_samples([1, 0], ["1", "1"]), expected)
+    assert len(calls) == 2
+
+
+def test_mean_squared_error_squared_param_is_not_vectorized():
+    evaluator = SklearnEvaluator(sklearn_config("mean_squared_error", {"squared": False}))
+    assert evaluator.vectorized_fn is None
+
+
+def test_non_decomposable_metric_falls_back_to_loop():
+    evaluator = SklearnEvaluator(sklearn_config("f1_score", {"zero_division": 0}))
+    assert evaluator.vectorized_fn is None
+    scores = evaluator.score_samples([1, 0, 1], [1, 0, 0])
+    assert np.allclose(scores, [1.0, 0.0, 0.0])
+
+
+def test_scores_reused_across_methods():
+    score_cache.clear()
+    evaluator = SklearnEvaluator(sklearn_config("f1_score", {"zero_division": 0}))
+    calls = []
+    metric_fn = evaluator.metric_fn
+    evaluator.metric_fn = lambda *args, **kwargs: calls.append(args) or metric_fn(*args, **kwargs)
+
+    item_ids = ["a", "b", "c", "d"]
+    y_true = [1, 0, 1, 1]
+    y_pred1 = [1, 0, 0, 1]
+    y_pred2 = [1, 1, 0, 1]
+    batch = evaluator.evaluate_batch(y_true, y_pred1, item_ids=item_ids)
+    evaluator.compare(y_true, y_pred1, y_pred2, item_ids=item_ids)
+    evaluator.estimate_sample_size(y_true, y_pred2, confidence=0.95, margin_of_error=0.1, item_ids=item_ids)
+
+    assert len(calls) == 5  # Each distinct (item, prediction) pair is scored once
+    assert np.isclose(batch.mean, evaluator.evaluate_batch(y_true, y_pred1).mean)
+
+
+def test_scores_are_not_shared_between_extraction_configs():
+    score_cache.clear()
+    config = sklearn_config("f1_score", {"zero_division": 0})
+    other_field = config.model_copy(update={
+        "extraction": config.extraction.model_copy(update={"ground_truth_field": "other"})
+    })
+    first, second = SklearnEvaluator(config), SklearnEvaluator(other_field)
+    assert first.config_hash != second.config_hash
+
+    item_ids = ["a", "b"]
+    assert first.cached_scores([1, 1], [1, 1], item_ids).tolist() == [1.0, 1.0]
+    assert second.cached_scores([0, 0], [1, 1], item_ids).tolist() == [0.0, 0.0]
+
+
+def test_scores_are_recomputed_when_the_ground_truth_changes():
+    score_cache.clear()
+    evaluator = SklearnEvaluator(sklearn_config("f1_score", {"zero_division": 0}))
+
+    assert evaluator.cached_scores([1], [1], ["a"]).tolist() == [1.0]
+    assert evaluator.cached_scores([0], [1], ["a"]).tolist() == [0.0]
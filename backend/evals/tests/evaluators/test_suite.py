@@ -0,0 +1,29 @@
+import numpy as np
+
+from backend.evals.evaluators._base_evaluator import CIComputationMethod
+from backend.evals.evaluators.sklearn import SklearnEvaluator
+from backend.evals.evaluators.suite import EvaluatorSuite
+from backend.evals.tests.helpers import sklearn_config
+
+
+def test_suite_matches_single_evaluators():
+    configs = [
+        sklearn_config("zero_one_loss", ci_method=CIComputationMethod.bootstrap, random_seed=7),
+        sklearn_config("mean_absolute_error", ci_method=CIComputationMethod.bootstrap, random_seed=7),
+        sklearn_config("accuracy_score"),
+    ]
+    evaluators = [SklearnEvaluator(config) for config in configs]
+    suite = EvaluatorSuite(evaluators)
+
+    labels = [{"value": v} for v in [1, 0, 1, 1, 0, 1]] + [{}]
+    responses = [[{"content": v}] for v in [1, 0, 0, 1, 1, 1, 1]]
+    results = suite.evaluate(labels, responses)
+
+    assert list(results) == ["zero_one_loss_eval", "mean_absolute_error_eval", "accuracy_score_eval"]
+    y_true, y_pred = [1, 0, 1, 1, 0, 1], [1, 0, 0, 1, 1, 1]
+    for evaluator in evaluators:
+        expected = evaluator.evaluate_batch(y_true, y_pred)
+        result = results[evaluator.config.name]
+        assert result.sample_size == 6
+        assert np.isclose(result.mean, expected.mean)
+        assert np.allclose(result.confidence_interval, expected.confidence_interval)
@@ -0,0 +1,43 @@
+from backend.evals.evaluators._base_evaluator import (
+    CIComputationMethod,
+    EvaluatorConfig,
+    FieldExtractionConfig,
+    MetricFunctionConfig,
+)
+
+
+def sklearn_config(name, params=None, ci_method=CIComputationMethod.batch_mean, **metric):
+    """
+    Config of a `sklearn.metrics` evaluator reading `value` from the label and the last message's content.
+    """
+    return EvaluatorConfig(
+        name=f"{name}_eval",
+        description=f"{name} evaluator",
+        provider="sklearn",
+        extraction=FieldExtractionConfig(
+            ground_truth_field="value",
+            prediction_field="-1.content"
+        ),
+        metric=MetricFunctionConfig(
+            namespace="sklearn.metrics",
+            name=name,
+            params=params or {},
+            ci_method=ci_method,
+            **metric
+        )
+    )
+
+
+class DictResultCache:
+    """
+    In-memory stand-in for the evaluation result cache.
+    """
+
+    def __init__(self):
+        self.results = {}
+
+    def peek(self, config_hash, input_hash):
+        return self.results.get((config_hash, input_hash))
+
+    def put(self, config_hash, input_hash, result):
+        self.results[(config_hash, input_hash)] = result
@@ -0,0 +1,147 @@
+import asyncio
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+from backend.evals import crud
+from backend.evals.evaluators.sklearn import SklearnEvaluator
+from backend.evals.models import EvaluationJob, EvaluationJobStatus
+from backend.evals.tasks import evaluation_job
+from backend.evals.tasks.evaluation_job import _process_chunk
+from backend.evals.tests.helpers import sklearn_config
+from backend.evals.utils.agents_client import AgentRunError
+from backend.evals.utils.dataset_snapshot import SnapshotItem
+
+
+class FakeAgentsClient:
+    def __init__(self):
+        self.runs = []
+
+    async def run_team(self, *, session_id, task_id, input_data):
+        self.runs.append(input_data)
+        if input_data.get("fail"):
+            raise AgentRunError(None, "team failed")
+        return uuid4(), [{"source": "assistant", "content": input_data["answer"]}]
+
+
+@pytest.fixture
+def scored(session, setup_database, monkeypatch):
+    """
+    Labels scored per `score_responses` call; item results are read from the test database.
+    """
+    monkeypatch.setattr(evaluation_job, "SessionLocal", setup_database)
+    monkeypatch.setattr(evaluation_job, "get_scoring_pool", lambda: None)
+    calls = []
+    score_responses = evaluation_job.score_responses
+    async def record_scoring(evaluators, labels, responses, **kwargs):
+        calls.append(labels)
+        return await score_responses(evaluators, labels, responses, **kwargs)
+    monkeypatch.setattr(evaluation_job, "score_responses", record_scoring)
+    return calls
+
+
+async def _run_chunk(session, items, team_versions, baseline_job_id=None, config=None):
+    job = SimpleNamespace(id=uuid4(), task_id=uuid4(), baseline_job_id=baseline_job_id)
+    team_ids = list(team_versions)
+    client = FakeAgentsClient()
+    records = await _process_chunk(
+        job,
+        items,
+        team_ids,
+        {str(team_id): str(uuid4()) for team_id in team_ids},
+        {str(team_id): version for team_id, version in team_versions.items()},
+        [SklearnEvaluator(config or sklearn_config("accuracy_score"))],
+        client,
+        asyncio.Semaphore(4),
+    )
+    await crud.evaluation_item_result.bulk_upsert(records=records, db_session=session)
+    await session.commit()
+    return job, records, client
+
+
+async def test_rerun_reuses_baseline_predictions_and_scores(session, scored):
+    team = uuid4()
+    items = [
+        SnapshotItem(uuid4(), {"answer": 1}, {"value": 1}),
+        SnapshotItem(uuid4(), {"answer": 0}, {"value": 1}),
+        SnapshotItem(uuid4(), {"answer": 1}, {"value": 1}),
+        SnapshotItem(uuid4(), {"answer": 1, "fail": True}, {"value": 1}),
+    ]
+    baseline, first, _ = await _run_chunk(session, items, {team: "v1"})
+    assert [record["scores"] for record in first] == [
+        {"accuracy_score_eval": 1.0}, {"accuracy_score_eval": 0.0}, {"accuracy_score_eval": 1.0}, {"accuracy_score_eval": None}
+    ]
+    scored.clear()
+
+    changed = [
+        items[0],  # Unchanged
+        items[1]._replace(ground_truth_label={"value": 0}),  # New label
+        items[2]._replace(input_data={"answer": 0}),  # New input
+        items[3],  # Failed in the baseline
+    ]
+    _, rerun, client = await _run_chunk(session, changed, {team: "v1"}, baseline_job_id=baseline.id)
+
+    assert client.runs == [{"answer": 0}, {"answer": 1, "fail": True}]
+    assert rerun[0]["prediction"] == first[0]["prediction"] and rerun[0]["run_id"] == first[0]["run_id"]
+    assert rerun[1]["run_id"] == first[1]["run_id"]
+    # Only the cells whose label or prediction changed are scored again
+    assert scored == [[{"value": 0}, {"value": 1}, {"value": 1}]]
+    assert [record["scores"]["accuracy_score_eval"] for record in rerun] == [1.0, 1.0, 0.0, None]
+
+
+async def test_new_team_version_reruns_every_item(session, scored):
+    team = uuid4()
+    items = [SnapshotItem(uuid4(), {"answer": n}, {"value": 1}) for n in range(3)]
+    baseline, _, _ = await _run_chunk(session, items, {team: "v1"})
+
+    _, rerun, client = await _run_chunk(session, items, {team: "v2"}, baseline_job_id=baseline.id)
+
+    assert len(client.runs) == 3
+    assert [record["scores"]["accuracy_score_eval"] for record in rerun] == [0.0, 1.0, 0.0]
+
+
+async def test_new_extraction_config_rescores_every_item(session, scored):
+    team = uuid4()
+    items = [SnapshotItem(uuid4(), {"answer": n}, {"value": 1, "other": 0}) for n in range(2)]
+    baseline, _, _ = await _run_chunk(session, items, {team: "v1"})
+    config = sklearn_config("accuracy_score")
+    other_field = config.model_copy(update={
+        "extraction": config.extraction.model_copy(update={"ground_truth_field": "other"})
+    })
+    scored.clear()
+
+    _, rerun, client = await _run_chunk(session, items, {team: "v1"}, baseline_job_id=baseline.id, config=other_field)
+
+    # The predictions are reused, the scores are not
+    assert client.runs == []
+    assert len(scored) == 1
+    assert [record["scores"]["accuracy_score_eval"] for record in rerun] == [1.0, 0.0]
+
+
+async def test_lease_is_kept_while_the_job_runs(session, setup_database, monkeypatch):
+    monkeypatch.setattr(evaluation_job, "SessionLocal", setup_database)
+    monkeypatch.setattr(evaluation_job.settings, "EVAL_JOB_LEASE", 0.3)
+    job = EvaluationJob(task_id=uuid4(), team_ids=[], metrics=[], evaluation_component={})
+    session.add(job)
+    await session.commit()
+
+    @asynccontextmanager
+    async def agents_client():
+        yield None
+    claims = []
+    async def slow_run(job, client):
+        # One chunk outlasting the lease
+        await asyncio.sleep(0.6)
+        async with setup_database() as db_session:
+            claims.append(await crud.evaluation_job.claim(id=job.id, lease=0.3, db_session=db_session))
+    monkeypatch.setattr(evaluation_job, "get_agents_client", agents_client)
+    monkeypatch.setattr(evaluation_job, "_run", slow_run)
+
+    await evaluation_job.run_evaluation_job(job.id)
+
+    assert claims == [False]
+    assert not any(task.get_coro().__name__ == "_keep_lease" for task in asyncio.all_tasks())
+    await session.refresh(job)
+    assert job.status == EvaluationJobStatus.RUNNING
@@ -0,0 +1,124 @@
+from datetime import datetime, timezone
+from uuid import uuid4
+
+import numpy as np
+import pytest
+
+from backend.evals import crud
+from backend.evals.evaluators.sketch import ScoreSketch
+from backend.evals.models import AnalyticsInterval, EvaluationResult
+
+TEAM_A = uuid4()
+TEAM_B = uuid4()
+
+
+async def _add_results(session, task_id, results):
+    for team_id, score, created_at, sketch in results:
+        session.add(EvaluationResult(
+            job_id=uuid4(),
+            task_id=task_id,
+            session_id=uuid4(),
+            team_id=team_id,
+            metric_name="accuracy",
+            score=score,
+            score_sketch=sketch,
+            created_at=created_at,
+        ))
+    await session.commit()
+
+
+def _at(day, hour=12):
+    return datetime(2025, 3, day, hour, tzinfo=timezone.utc)
+
+
+@pytest.mark.parametrize("interval,buckets", [
+    (AnalyticsInterval.DAY, [_at(3, 0), _at(3, 0), _at(4, 0), _at(10, 0)]),
+    (AnalyticsInterval.WEEK, [_at(3, 0), _at(3, 0), _at(10, 0)]),
+    (AnalyticsInterval.MONTH, [_at(1, 0), _at(1, 0)]),
+])
+async def test_get_trend(session, interval, buckets):
+    task_id = uuid4()
+    await _add_results(session, task_id, [
+        (TEAM_A, 0.5, _at(3, 9), None),
+        (TEAM_A, 0.7, _at(3, 18), None),
+        (TEAM_B, 0.4, _at(3, 10), None),
+        (TEAM_A, 0.9, _at(4), None),
+        (TEAM_B, 0.6, _at(10), None),
+    ])
+
+    trend = await crud.evaluation_result.get_trend(
+        metric_name="accuracy", task_id=task_id, interval=interval, db_session=session
+    )
+
+    assert [point.bucket for point in trend] == sorted(buckets)
+    assert sum(point.job_count for point in trend) == 5
+    first = next(point for point in trend if point.team_id == TEAM_A)
+    assert first.min == 0.5
+    if interval == AnalyticsInterval.DAY:
+        assert (first.mean, first.max, first.job_count) == (pytest.approx(0.6), 0.7, 2)
+
+
+async def test_get_trend_filters(session):
+    task_id = uuid4()
+    await _add_results(session, task_id, [(TEAM_A, 0.5, _at(3), None), (TEAM_B, 0.4, _at(5), None)])
+
+    trend = await crud.evaluation_result.get_trend(
+        metric_name="accuracy", task_id=task_id, start=_at(4, 0), db_session=session
+    )
+    assert [(point.team_id, point.mean) for point in trend] == [(TEAM_B, 0.4)]
+    assert await crud.evaluation_result.get_trend(
+        metric_name="accuracy", task_id=task_id, team_ids=[TEAM_A], end=_at(3, 0), db_session=session
+    ) == []
+
+
+async def test_get_quantiles_merges_sketches(session):
+    task_id = uuid4()
+    rng = np.random.default_rng(0)
+    first, second = rng.uniform(size=2000), rng.uniform(size=1000)
+    await _add_results(session, task_id, [
+        (TEAM_A, float(first.mean()), _at(3), ScoreSketch.from_scores(first).to_dict()),
+        (TEAM_A, float(second.mean()), _at(4), ScoreSketch.from_scores(second).to_dict()),
+        (TEAM_A, 0.5, _at(5), None),  # Stored before sketches existed
+        (TEAM_B, 1.0, _at(5), ScoreSketch.from_scores(np.ones(10)).to_dict()),
+    ])
+
+    quantiles = await crud.evaluation_result.get_quantiles(
+        metric_name="accuracy", quantiles=[0.1, 0.5, 0.9], task_id=task_id, db_session=session
+    )
+
+    by_team = {result.team_id: result for result in quantiles}
+    scores = np.concatenate([first, second])
+    merged = by_team[TEAM_A]
+    assert (merged.result_count, merged.count) == (2, 3000)
+    assert (merged.min, merged.max) == (scores.min(), scores.max())
+    assert list(merged.quantiles) == ["0.1", "0.5", "0.9"]
+    np.testing.assert_allclose(list(merged.quantiles.values()), np.quantile(scores, [0.1, 0.5, 0.9]), atol=0.02)
+    assert by_team[TEAM_B].quantiles == {"0.1": 1.0, "0.5": 1.0, "0.9": 1.0}
+
+    only_b = await crud.evaluation_result.get_quantiles(
+        metric_name="accuracy", quantiles=[0.5], task_id=task_id, team_ids=[TEAM_B], db_session=session
+    )
+    assert [result.team_id for result in only_b] == [TEAM_B]
+
+
+async def test_get_leaderboard_ranks_latest_scores(session):
+    task_id = uuid4()
+    await _add_results(session, task_id, [
+        (TEAM_A, 0.9, _at(3), None),
+        (TEAM_A, 0.6, _at(4), None),
+        (TEAM_B, 0.7, _at(3), None),
+    ])
+
+    leaderboard = await crud.evaluation_result.get_leaderboard(
+        task_id=task_id, metric_name="accuracy", db_session=session
+    )
+
+    assert [(entry.rank, entry.team_id, entry.latest_score) for entry in leaderboard] == [(1, TEAM_B, 0.7), (2, TEAM_A, 0.6)]
+    assert (leaderboard[1].mean_score, leaderboard[1].best_score, leaderboard[1].job_count) == (pytest.approx(0.75), 0.9, 2)
+    assert leaderboard[1].last_evaluated_at == _at(4)
+
+    lowest_first = await crud.evaluation_result.get_leaderboard(
+        task_id=task_id, metric_name="accuracy", higher_is_better=False, db_session=session
+    )
+    assert [entry.team_id for entry in lowest_first] == [TEAM_A, TEAM_B]
+    assert lowest_first[0].best_score == 0.6
@@ -0,0 +1,136 @@
+import io
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+from sqlmodel import col, update
+
+from backend.evals import crud
+from backend.evals.core.config import settings
+from backend.evals.models import DatasetFormat, DatasetIngestStatus, GroundTruthDataset
+from backend.evals.utils import dataset_ingest
+from backend.evals.utils.dataset_ingest import BatchReader, DatasetIngestError, ingest_items, read_csv, read_ndjson
+
+
+def test_read_ndjson_skips_blank_lines_and_yields_parse_errors():
+    rows = list(read_ndjson(io.BytesIO(b'{"q": "a"}\n\n  \n{bad json}\n[1, 2]\n')))
+
+    assert rows[0] == {"q": "a"}
+    assert isinstance(rows[1], ValueError) and "Invalid JSON" in str(rows[1])
+    assert rows[2] == [1, 2]
+    assert len(rows) == 3
+
+
+def test_read_csv_decodes_json_cells():
+    file = io.BytesIO(b'q,y,meta\nhello,1,"{""a"": 1}"\n"multi\nline",true,\nbad,1,2,3\n')
+
+    rows = list(read_csv(file))
+
+    assert rows[0] == {"q": "hello", "y": 1, "meta": {"a": 1}}
+    assert rows[1] == {"q": "multi\nline", "y": True, "meta": None}
+    assert isinstance(rows[2], ValueError)
+
+
+def test_batch_reader_batches_and_rejects_rows():
+    dataset_id, tenant_id = uuid4(), uuid4()
+    rows = iter([
+        {"input_data": {"q": "a"}, "ground_truth_label": {"y": 1}},
+        {"q": "flat", "y": 0},
+        ValueError("Invalid JSON"),
+        [1, 2],
+        {"input_data": 5},
+    ])
+    reader = BatchReader(rows, dataset_id=dataset_id, tenant_id=tenant_id, label_columns=["y"], batch_size=3)
+
+    records, errors, read = reader.next_batch()
+    assert read == 3
+    assert records == [
+        {"dataset_id": dataset_id, "tenant_id": tenant_id, "input_data": {"q": "a"}, "ground_truth_label": {"y": 1}},
+        {"dataset_id": dataset_id, "tenant_id": tenant_id, "input_data": {"q": "flat"}, "ground_truth_label": {"y": 0}},
+    ]
+    assert errors == ["Row 3: Invalid JSON"]
+
+    records, errors, read = reader.next_batch()
+    assert (records, read) == ([], 2)
+    assert errors[0] == "Row 4: Row is not an object"
+    assert errors[1].startswith("Row 5: input_data")
+
+    assert reader.next_batch() == ([], [], 0)
+
+
+async def _dataset(session) -> GroundTruthDataset:
+    dataset = GroundTruthDataset(task_id=uuid4(), name="ingest")
+    session.add(dataset)
+    await session.commit()
+    return dataset
+
+
+async def _go_quiet(session, dataset_id, seconds=120):
+    await session.execute(
+        update(GroundTruthDataset)
+        .where(col(GroundTruthDataset.id) == dataset_id)
+        .values(updated_at=datetime.now(timezone.utc) - timedelta(seconds=seconds))
+    )
+    await session.commit()
+
+
+async def test_renewed_ingest_is_not_taken_over(session):
+    dataset = await _dataset(session)
+    assert await crud.ground_truth_dataset.start_ingest(id=dataset.id, lease=60, db_session=session)
+    assert not await crud.ground_truth_dataset.start_ingest(id=dataset.id, lease=60, db_session=session)
+
+    await _go_quiet(session, dataset.id)
+    await crud.ground_truth_dataset.renew_ingest(id=dataset.id, db_session=session)
+    assert not await crud.ground_truth_dataset.start_ingest(id=dataset.id, lease=60, db_session=session)
+
+    # An upload that stopped making progress is abandoned
+    await _go_quiet(session, dataset.id)
+    assert await crud.ground_truth_dataset.start_ingest(id=dataset.id, lease=60, db_session=session)
+
+
+async def test_ingest_items(session, setup_database, monkeypatch):
+    monkeypatch.setattr(dataset_ingest, "SessionLocal", setup_database)
+    monkeypatch.setattr(settings, "DATASET_UPLOAD_BATCH_SIZE", 2)
+    monkeypatch.setattr(settings, "DATASET_INGEST_LEASE", 0)
+    renewals = []
+    renew_ingest = crud.ground_truth_dataset.renew_ingest
+    async def record_renewal(**kwargs):
+        renewals.append(kwargs["id"])
+        await renew_ingest(**kwargs)
+    monkeypatch.setattr(crud.ground_truth_dataset, "renew_ingest", record_renewal)
+
+    dataset = await _dataset(session)
+    assert await crud.ground_truth_dataset.start_ingest(id=dataset.id, lease=60, db_session=session)
+
+    async def upload():
+        yield b'q,y\na,1\nb,0\n'
+        yield b'c,1,extra\nd,0\ne,1\n'
+
+    progress = await ingest_items(
+        dataset_id=dataset.id, stream=upload(), format=DatasetFormat.CSV, label_columns=["y"]
+    )
+
+    assert progress == {"rows_read": 5, "rows_inserted": 4, "rows_rejected": 1, "errors": [
+        "Row 3: Row has more cells than the header"
+    ]}
+    # The claim is renewed while the body arrives, before any batch is committed
+    assert renewals == [dataset.id, dataset.id]
+    await session.refresh(dataset)
+    assert dataset.item_count == 4
+    assert dataset.ingest_status == DatasetIngestStatus.READY
+
+
+async def test_ingest_items_unreadable_upload(session, setup_database, monkeypatch):
+    monkeypatch.setattr(dataset_ingest, "SessionLocal", setup_database)
+    dataset = await _dataset(session)
+    assert await crud.ground_truth_dataset.start_ingest(id=dataset.id, lease=60, db_session=session)
+
+    async def upload():
+        yield b"garbage"
+
+    with pytest.raises(DatasetIngestError, match="Cannot read upload"):
+        await ingest_items(dataset_id=dataset.id, stream=upload(), format=DatasetFormat.PARQUET)
+
+    await session.refresh(dataset)
+    assert dataset.ingest_status == DatasetIngestStatus.FAILED
+    assert dataset.ingest_progress["error"].startswith("Cannot read upload")
@@ -0,0 +1,123 @@
+import json
+from uuid import UUID, uuid4
+
+import numpy as np
+import pytest
+
+from backend.common.utils.uuid6 import uuid7
+from backend.evals import crud
+from backend.evals.core.config import settings
+from backend.evals.models import GroundTruthDataset
+from backend.evals.utils import dataset_snapshot
+from backend.evals.utils.dataset_snapshot import (
+    MANIFEST,
+    DatasetSnapshot,
+    SnapshotError,
+    SnapshotWriter,
+    get_snapshot,
+)
+
+ITEMS = [
+    ({"q": "a"}, {"score": 1, "grade": 0.5, "meta": {"level": 3}, "tag": "x"}),
+    ({"q": "b"}, {"score": 0, "meta": {"level": 1}, "tag": 2}),
+    ({"q": "c"}, None),
+    ({"q": "d", "n": [1, 2]}, {"score": 1, "grade": 1, "big": 2**70}),
+]
+
+
+def _write(directory, items, batch_size=2):
+    ids = sorted(uuid7() for _ in items)
+    writer = SnapshotWriter(directory)
+    rows = [(item_id, data, label) for item_id, (data, label) in zip(ids, items)]
+    for start in range(0, len(rows), batch_size):
+        writer.write_batch(rows[start:start + batch_size])
+    manifest = writer.close(dataset_id=uuid4(), version="v1")
+    return ids, manifest
+
+
+def test_snapshot_round_trip(tmp_path):
+    ids, manifest = _write(tmp_path, ITEMS)
+    snapshot = DatasetSnapshot(tmp_path)
+
+    assert (snapshot.version, snapshot.item_count) == ("v1", 4)
+    assert manifest == json.loads((tmp_path / MANIFEST).read_text())
+    assert snapshot.items(0, 10) == [(item_id, data, label) for item_id, (data, label) in zip(ids, ITEMS)]
+    assert snapshot.items(1, 3) == [(ids[1], *ITEMS[1]), (ids[2], *ITEMS[2])]
+    assert snapshot.items(4, 10) == []
+    assert snapshot.items_at([3, 0]) == [(ids[3], *ITEMS[3]), (ids[0], *ITEMS[0])]
+    assert snapshot.items_at([]) == []
+
+
+def test_snapshot_position_after(tmp_path):
+    ids, _ = _write(tmp_path, ITEMS)
+    snapshot = DatasetSnapshot(tmp_path)
+
+    assert snapshot.position_after(None) == 0
+    assert [snapshot.position_after(item_id) for item_id in ids] == [1, 2, 3, 4]
+    assert snapshot.position_after(UUID(int=0)) == 0
+
+
+def test_snapshot_label_values(tmp_path):
+    _, manifest = _write(tmp_path, ITEMS)
+    snapshot = DatasetSnapshot(tmp_path)
+
+    # Numeric fields are stored as arrays; others are decoded from the label column
+    assert set(manifest["label_fields"]) == {"score", "grade", "meta.level"}
+    assert manifest["label_fields"]["meta.level"]["dtype"] == "float64"  # Missing on the third item
+    np.testing.assert_array_equal(snapshot.label_values("score"), [1, 0, np.nan, 1])
+    np.testing.assert_array_equal(snapshot.label_values("grade"), [0.5, np.nan, np.nan, 1.0])
+    assert isinstance(snapshot.label_values("score"), np.memmap)
+    assert list(snapshot.label_values("tag")) == ["x", 2, None, None]
+    assert list(snapshot.label_values("big")) == [None, None, None, 2**70]
+
+
+def test_integer_label_field_keeps_its_dtype(tmp_path):
+    _, manifest = _write(tmp_path, [({"q": n}, {"score": n}) for n in range(3)])
+
+    assert manifest["label_fields"]["score"]["dtype"] == "int64"
+    np.testing.assert_array_equal(DatasetSnapshot(tmp_path).label_values("score"), [0, 1, 2])
+
+
+def test_empty_snapshot(tmp_path):
+    _write(tmp_path, [])
+    snapshot = DatasetSnapshot(tmp_path)
+
+    assert snapshot.item_count == 0
+    assert snapshot.items(0, 10) == []
+    assert snapshot.position_after(uuid4()) == 0
+
+
+def test_missing_snapshot(tmp_path):
+    with pytest.raises(SnapshotError):
+        DatasetSnapshot(tmp_path)
+
+
+async def test_get_snapshot_exports_each_version_once(session, setup_database, tmp_path, monkeypatch):
+    monkeypatch.setattr(dataset_snapshot, "SessionLocal", setup_database)
+    monkeypatch.setattr(settings, "EVAL_SNAPSHOT_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "EVAL_SNAPSHOT_BATCH_SIZE", 2)
+    dataset = GroundTruthDataset(task_id=uuid4(), name="snapshot")
+    session.add(dataset)
+    await session.commit()
+
+    async def add_items(items):
+        await crud.ground_truth_item.bulk_insert(records=[
+            {"dataset_id": dataset.id, "input_data": data, "ground_truth_label": label} for data, label in items
+        ], db_session=session)
+        await session.commit()
+
+    await add_items(ITEMS[:3])
+    snapshot = await get_snapshot(dataset.id)
+    assert [item.input_data for item in snapshot.items(0, 10)] == [data for data, _ in ITEMS[:3]]
+    assert (await get_snapshot(dataset.id)).directory == snapshot.directory
+
+    # New items make a new version; the old one is kept until it expires
+    await add_items(ITEMS[3:])
+    updated = await get_snapshot(dataset.id)
+    assert updated.version != snapshot.version
+    assert updated.item_count == 4
+    assert snapshot.directory.exists()
+
+    monkeypatch.setattr(settings, "EVAL_SNAPSHOT_RETENTION", -1)
+    await get_snapshot(dataset.id)
+    assert not snapshot.directory.exists()
@@ -0,0 +1,146 @@
+from collections import defaultdict
+from uuid import uuid4
+
+import pytest
+from sqlmodel import col, func, select
+
+from backend.evals.models import FeedbackType, UserFeedback
+from backend.evals.schema import IUserFeedbackCreate
+from backend.evals.utils import feedback_stream
+from backend.evals.utils.feedback_stream import FeedbackStream
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.commands.append((name, args, kwargs))
+
+    async def execute(self):
+        if self.redis.fail:
+            raise ConnectionError("Redis is down")
+        return [getattr(self.redis, name)(*args, **kwargs) for name, args, kwargs in self.commands]
+
+
+class FakeRedis:
+    """
+    The stream and hash commands used by `FeedbackStream`, in memory.
+    """
+
+    def __init__(self):
+        self.fail = False
+        self.entries = {}
+        self.hashes = defaultdict(dict)
+        self.acked = []
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def xadd(self, stream, fields, maxlen=None, approximate=True):
+        entry_id = f"{len(self.entries) + 1}-0"
+        self.entries[entry_id] = fields
+        return entry_id
+
+    def hincrby(self, key, field, value):
+        self.hashes[key][field] = str(int(self.hashes[key].get(field, 0)) + value)
+
+    def hincrbyfloat(self, key, field, value):
+        self.hashes[key][field] = str(float(self.hashes[key].get(field, 0)) + value)
+
+    async def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    def xack(self, stream, group, *ids):
+        self.acked.extend(ids)
+
+    def xdel(self, stream, *ids):
+        for entry_id in ids:
+            self.entries.pop(entry_id, None)
+
+
+@pytest.fixture
+def stream(setup_database, monkeypatch):
+    monkeypatch.setattr(feedback_stream, "SessionLocal", setup_database)
+    stream = FeedbackStream(stream="feedback", group="writers", max_length=100, batch_size=2, block=0.01, claim_idle=60)
+    stream.redis = FakeRedis()
+    return stream
+
+
+def _feedback(team_id, session_id=None):
+    def create(feedback_type, **fields):
+        return IUserFeedbackCreate(
+            **{"tenant_id": None, "session_id": None, **fields}, team_id=team_id, feedback_type=feedback_type
+        )
+
+    return [
+        create(FeedbackType.POSITIVE, session_id=session_id),
+        create(FeedbackType.NEGATIVE, session_id=session_id),
+        create(FeedbackType.RATING, rating=4),
+        create(FeedbackType.RATING, rating=2, comments="slow"),
+    ]
+
+
+async def _stored(session, ids):
+    result = await session.execute(select(func.count()).where(col(UserFeedback.id).in_(ids)))
+    return result.scalar_one()
+
+
+async def test_publish_counts_running_totals(stream, session):
+    team_id, session_id = uuid4(), uuid4()
+    ids = await stream.publish(_feedback(team_id, session_id))
+
+    assert len(stream.redis.entries) == 4
+    assert await _stored(session, ids) == 0  # Written by the consumer
+    team = await stream.summary(team_id=team_id)
+    assert (team.count, team.positive, team.negative, team.rating_count, team.mean_rating) == (4, 1, 1, 2, 3.0)
+    by_session = await stream.summary(session_id=session_id)
+    assert (by_session.count, by_session.rating_count, by_session.mean_rating) == (2, 0, None)
+    with pytest.raises(ValueError):
+        await stream.summary()
+
+
+async def test_publish_writes_to_the_database_when_redis_fails(stream, session):
+    stream.redis.fail = True
+
+    ids = await stream.publish(_feedback(uuid4()))
+
+    assert await _stored(session, ids) == 4
+    assert not stream.redis.entries
+
+
+async def test_write_acknowledges_committed_entries(stream, session):
+    ids = await stream.publish(_feedback(uuid4()))
+    entries = list(stream.redis.entries.items()) + [("99-0", {"data": "{not json"}), ("100-0", {})]
+
+    await stream._write(entries)
+
+    assert await _stored(session, ids) == 4
+    # Malformed entries are dropped rather than redelivered forever
+    assert stream.redis.acked == [entry_id for entry_id, _ in entries]
+    assert not stream.redis.entries
+
+    # An entry delivered again, e.g. after a crash before the acknowledgement, is inserted once
+    await stream._write(entries[:2])
+    assert await _stored(session, ids) == 4
+
+
+async def test_write_leaves_entries_unacknowledged_when_the_insert_fails(stream, monkeypatch):
+    await stream.publish(_feedback(uuid4()))
+    entries = list(stream.redis.entries.items())
+
+    async def fail(rows):
+        raise ConnectionError("database is down")
+    monkeypatch.setattr(stream, "_write_db", fail)
+
+    with pytest.raises(ConnectionError):
+        await stream._write(entries)
+    assert stream.redis.acked == []
+    assert len(stream.redis.entries) == 4
@@ -0,0 +1,45 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from backend.evals.evaluators._base_evaluator import score_cache
+from backend.evals.tests.helpers import sklearn_config
+from backend.evals.utils.scoring_pool import ShardedResampler, score_chunk
+
+
+def test_score_chunk_skips_unscorable_samples():
+    labels = [{"value": 1}, {"value": 1}, {"value": 0}, {"value": 1}, {}]
+    responses = [[{"content": 1}], None, [], [{"content": 0}], [{"content": 1}]]
+
+    scores = score_chunk([sklearn_config("accuracy_score").model_dump_json()], labels, responses)
+
+    assert scores == {"accuracy_score_eval": [1.0, None, None, 0.0, None]}
+
+
+def test_score_chunk_reuses_scores_of_scored_items():
+    score_cache.clear()
+    config_json = sklearn_config("f1_score", {"zero_division": 0}).model_dump_json()
+    labels = [{"value": 1}, {"value": 0}]
+    responses = [[{"content": 1}], [{"content": 1}]]
+
+    first = score_chunk([config_json], labels, responses, item_ids=["a", "b"])
+    assert len(score_cache) == 2
+    # The same items with one new prediction only score the new prediction
+    second = score_chunk([config_json], labels, [[{"content": 1}], [{"content": 0}]], item_ids=["a", "b"])
+
+    assert first == {"f1_score_eval": [1.0, 0.0]}
+    assert second == {"f1_score_eval": [1.0, 0.0]}
+    assert len(score_cache) == 3
+
+
+def test_sharded_bootstrap_is_independent_of_workers():
+    scores = np.random.default_rng(1).uniform(size=(2, 500))
+    results = []
+    for workers in (1, 3):
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            resample = ShardedResampler(pool, min_work=0, block_iterations=30)
+            results.append(resample(scores, 200, 11, 256))
+
+    assert results[0].shape == (2, 200)
+    np.testing.assert_array_equal(results[0], results[1])
+    np.testing.assert_allclose(results[0].mean(axis=1), scores.mean(axis=1), atol=0.01)
@@ -0,0 +1,32 @@
+import numpy as np
+
+from backend.evals.evaluators.sklearn import SklearnEvaluator
+from backend.evals.schema import SequentialSamplingConfig
+from backend.evals.tests.helpers import sklearn_config
+from backend.evals.utils.sequential_sampling import SequentialStopper
+
+
+def test_sequential_stopper_targets():
+    evaluator = SklearnEvaluator(sklearn_config("accuracy_score"))
+    rng = np.random.default_rng(0)
+    stopper = SequentialStopper(
+        SequentialSamplingConfig(margin_of_error=0.05, stop_on_significance=True, min_samples=20),
+        [evaluator],
+        team_ids=["a", "b"],
+    )
+
+    def add(start, n):
+        for item in range(start, start + n):
+            stopper.add(item, "a", {"accuracy_score_eval": float(rng.random() < 0.9)})
+            stopper.add(item, "b", {"accuracy_score_eval": float(rng.random() < 0.5)})
+
+    add(0, 10)
+    assert not stopper.look_due()
+
+    add(10, 40)
+    assert stopper.look_due()
+    reason, state = stopper.look()
+    assert reason == "significance"
+    assert state["comparisons"][0]["significant"]
+    assert all(estimate["required_samples"] > 50 for estimate in state["estimates"])
+    assert not stopper.look_due()
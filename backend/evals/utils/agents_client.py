@@ -0,0 +1,86 @@
+"""
+Client for the agents service, used by evaluation jobs to run teams on dataset items.
+"""
+from typing import Any, Dict, List, Tuple
+from uuid import UUID
+
+import httpx
+
+from backend.evals.core.config import settings
+
+
+class AgentRunError(Exception):
+    """
+    Raised when a team run fails or returns no result.
+    """
+    def __init__(self, run_id: UUID | str | None, message: str):
+        self.run_id = run_id
+        super().__init__(f"Run {run_id} failed: {message}")
+
+
+class AgentsClient:
+    """
+    Thin async wrapper around the agents `/session` and `/run` endpoints.
+    """
+
+    def __init__(self, base_url: str, api_key: str, timeout: float):
+        self._client = httpx.AsyncClient(
+            base_url=base_url.rstrip("/"),
+            headers={"Authorization": f"Bearer {api_key}"},
+            timeout=timeout,
+        )
+
+    async def __aenter__(self) -> "AgentsClient":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    async def _request(self, method: str, url: str, **kwargs: Any) -> Dict[str, Any]:
+        response = await self._client.request(method, url, **kwargs)
+        response.raise_for_status()
+        return response.json()["data"]
+
+    async def get_team(self, team_id: UUID) -> Dict[str, Any]:
+        return await self._request("GET", f"/team/{team_id}")
+
+    async def create_session(self, *, task_id: UUID, team_id: UUID, tenant_id: UUID | None = None) -> UUID:
+        session = await self._request("POST", "/session", json={
+            "task_id": str(task_id),
+            "team_id": str(team_id),
+            "tenant_id": str(tenant_id) if tenant_id else None,
+        })
+        return UUID(session["id"])
+
+    async def run_team(
+        self, *, session_id: UUID, task_id: UUID, input_data: Dict[str, Any]
+    ) -> Tuple[UUID, List[Dict[str, Any]]]:
+        """
+        Run the session's team on one input and return the run id and the messages of its result.
+        """
+        run = await self._request("POST", "/run", json={
+            "session_id": str(session_id),
+            "task_id": str(task_id),
+            "run_task": {"source": "user", "content": input_data},
+        })
+        run_id = UUID(run["id"])
+        # Fetching a created run executes it
+        run = await self._request("GET", f"/run/{run_id}")
+        if run.get("status") != "complete":
+            raise AgentRunError(run_id, run.get("error_message") or f"status {run.get('status')}")
+        team_result = run.get("team_result") or {}
+        messages = (team_result.get("task_result") or {}).get("messages")
+        if not messages:
+            raise AgentRunError(run_id, "no messages in team result")
+        return run_id, messages
+
+
+def get_agents_client() -> AgentsClient:
+    return AgentsClient(
+        base_url=settings.AGENTS_API_URL,
+        api_key=settings.AGENTS_API_KEY,
+        timeout=settings.AGENTS_API_TIMEOUT,
+    )
@@ -0,0 +1,214 @@
+"""
+Streaming ingestion of ground truth items.
+
+An upload is spooled to a temporary file (in memory up to `DATASET_UPLOAD_SPOOL_SIZE` bytes, on disk beyond), which
+decouples the client's upload speed from the database and gives Parquet the random access it needs. The file is then
+read back in batches of `DATASET_UPLOAD_BATCH_SIZE` rows: rows are validated one by one, and each batch is inserted
+with a single COPY (PostgreSQL through asyncpg) or multi-row INSERT (other databases) and committed together with the
+dataset's progress. At most one batch of rows is held in memory. While the body is spooled, the dataset's claim is
+renewed every half `DATASET_INGEST_LEASE` so that a slow upload is not taken for an abandoned one.
+
+Rows are either `{"input_data": {...}, "ground_truth_label": {...}}` objects, or flat records whose `label_columns`
+form the ground truth label and whose remaining columns form the input data. CSV cells holding JSON literals (numbers,
+booleans, objects) are decoded.
+"""
+import asyncio
+import csv
+import io
+import json
+import tempfile
+import time
+from typing import Any, AsyncIterator, BinaryIO, Dict, Iterator, List, Sequence, Tuple
+from uuid import UUID
+
+from pydantic import ValidationError
+
+from backend.common.db.session import SessionLocal
+from backend.evals import crud
+from backend.evals.core.config import settings
+from backend.evals.models import DatasetFormat, DatasetIngestStatus
+from backend.evals.schema import GroundTruthItemRow
+
+
+class DatasetIngestError(Exception):
+    """
+    Raised when an upload cannot be read at all (as opposed to individual rejected rows).
+    """
+
+
+def read_ndjson(file: BinaryIO) -> Iterator[Any]:
+    for line in io.TextIOWrapper(file, encoding="utf-8"):
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as e:
+            yield ValueError(f"Invalid JSON: {e}")
+
+
+def _decode_cell(value: str | None) -> Any:
+    if value is None or value == "":
+        return None
+    try:
+        return json.loads(value)
+    except json.JSONDecodeError:
+        return value
+
+
+def read_csv(file: BinaryIO) -> Iterator[Any]:
+    for row in csv.DictReader(io.TextIOWrapper(file, encoding="utf-8", newline="")):
+        if None in row:
+            yield ValueError("Row has more cells than the header")
+            continue
+        yield {column: _decode_cell(value) for column, value in row.items()}
+
+
+def read_parquet(file: BinaryIO, batch_size: int) -> Iterator[Any]:
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise DatasetIngestError("Parquet uploads require the `pyarrow` package.") from e
+    for batch in pq.ParquetFile(file).iter_batches(batch_size=batch_size):
+        yield from batch.to_pylist()
+
+
+def read_rows(file: BinaryIO, format: DatasetFormat, batch_size: int) -> Iterator[Any]:
+    """
+    Raw rows of an upload; unparsable rows are yielded as exceptions so that reading can continue.
+    """
+    if format == DatasetFormat.NDJSON:
+        return read_ndjson(file)
+    if format == DatasetFormat.CSV:
+        return read_csv(file)
+    if format == DatasetFormat.PARQUET:
+        return read_parquet(file, batch_size)
+    raise DatasetIngestError(f"Unsupported dataset format: {format}")
+
+
+def to_item_row(raw: Any, label_columns: Sequence[str]) -> GroundTruthItemRow:
+    if isinstance(raw, Exception):
+        raise raw
+    if not isinstance(raw, dict):
+        raise ValueError("Row is not an object")
+    if "input_data" in raw:
+        return GroundTruthItemRow.model_validate(raw)
+    label = {column: raw[column] for column in label_columns if column in raw}
+    input_data = {column: value for column, value in raw.items() if column not in label_columns}
+    return GroundTruthItemRow(input_data=input_data, ground_truth_label=label or None)
+
+
+class BatchReader:
+    """
+    Reads validated item records from raw rows, one batch at a time.
+    """
+
+    def __init__(
+        self,
+        rows: Iterator[Any],
+        *,
+        dataset_id: UUID,
+        tenant_id: UUID | None,
+        label_columns: Sequence[str],
+        batch_size: int,
+    ):
+        self.rows = rows
+        self.dataset_id = dataset_id
+        self.tenant_id = tenant_id
+        self.label_columns = label_columns
+        self.batch_size = batch_size
+        self.row_number = 0
+
+    def next_batch(self) -> Tuple[List[Dict[str, Any]], List[str], int]:
+        """
+        Next batch of records, the rejection messages of the batch and the number of rows read.
+        """
+        records, errors, read = [], [], 0
+        for raw in self.rows:
+            self.row_number += 1
+            read += 1
+            try:
+                row = to_item_row(raw, self.label_columns)
+            except ValidationError as e:
+                details = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+                errors.append(f"Row {self.row_number}: {details}")
+            except (ValueError, TypeError) as e:
+                errors.append(f"Row {self.row_number}: {e}")
+            else:
+                records.append({
+                    "dataset_id": self.dataset_id,
+                    "tenant_id": row.tenant_id or self.tenant_id,
+                    "input_data": row.input_data,
+                    "ground_truth_label": row.ground_truth_label,
+                })
+            if read >= self.batch_size:
+                break
+        return records, errors, read
+
+
+async def ingest_items(
+    *,
+    dataset_id: UUID,
+    stream: AsyncIterator[bytes],
+    format: DatasetFormat,
+    label_columns: Sequence[str] = (),
+    tenant_id: UUID | None = None,
+) -> Dict[str, Any]:
+    """
+    Append the rows of an upload to a dataset, updating its `ingest_progress` after every batch.
+
+    The caller must have claimed the dataset with `crud.ground_truth_dataset.start_ingest`. Returns the final progress.
+    """
+    progress: Dict[str, Any] = {"rows_read": 0, "rows_inserted": 0, "rows_rejected": 0, "errors": []}
+    status = DatasetIngestStatus.FAILED
+    try:
+        with tempfile.SpooledTemporaryFile(max_size=settings.DATASET_UPLOAD_SPOOL_SIZE) as file:
+            renewed = time.monotonic()
+            async for chunk in stream:
+                file.write(chunk)
+                if time.monotonic() - renewed >= settings.DATASET_INGEST_LEASE / 2:
+                    async with SessionLocal() as db_session:
+                        await crud.ground_truth_dataset.renew_ingest(id=dataset_id, db_session=db_session)
+                    renewed = time.monotonic()
+            file.seek(0)
+
+            reader = BatchReader(
+                read_rows(file, format, settings.DATASET_UPLOAD_BATCH_SIZE), # type: ignore[arg-type]
+                dataset_id=dataset_id,
+                tenant_id=tenant_id,
+                label_columns=label_columns,
+                batch_size=settings.DATASET_UPLOAD_BATCH_SIZE,
+            )
+            while True:
+                try:
+                    records, errors, read = await asyncio.to_thread(reader.next_batch)
+                except (DatasetIngestError, UnicodeDecodeError, csv.Error) as e:
+                    raise DatasetIngestError(f"Cannot read upload after row {reader.row_number}: {e}") from e
+                except Exception as e:
+                    # e.g. a corrupt Parquet file
+                    raise DatasetIngestError(f"Cannot read upload: {e}") from e
+                if not read:
+                    break
+
+                progress["rows_read"] += read
+                progress["rows_inserted"] += len(records)
+                progress["rows_rejected"] += len(errors)
+                room = settings.DATASET_UPLOAD_MAX_ERRORS - len(progress["errors"])
+                progress["errors"].extend(errors[:max(room, 0)])
+
+                async with SessionLocal() as db_session:
+                    await crud.ground_truth_item.bulk_insert(records=records, db_session=db_session)
+                    await crud.ground_truth_dataset.set_ingest_progress(
+                        id=dataset_id, added_items=len(records), progress=progress, db_session=db_session
+                    )
+                    await db_session.commit()
+        status = DatasetIngestStatus.READY
+        return progress
+    except DatasetIngestError as e:
+        progress["error"] = str(e)
+        raise
+    finally:
+        async with SessionLocal() as db_session:
+            await crud.ground_truth_dataset.set_ingest_progress(
+                id=dataset_id, status=status, progress=progress, db_session=db_session
+            )
+            await db_session.commit()
@@ -0,0 +1,395 @@
+"""
+Columnar, memory-mapped snapshots of ground truth datasets.
+
+Evaluation jobs read the same dataset again and again. Instead of decoding its JSON rows from the database every time,
+each version of a dataset is exported once to a directory:
+
+    {EVAL_SNAPSHOT_DIR}/{dataset_id}/{version}/
+        manifest.json       item count, numeric label fields and the snapshot's files
+        ids.npy             item ids as 16-byte UUIDs, in id order
+        items.arrow         Arrow IPC file with the input data and ground truth label of every item as JSON text
+        labels/{n}.npy      one array per numeric label field (e.g. `score`, `meta.grade`), NaN where missing
+
+Opening a snapshot memory-maps its files, so reading y_true costs no copies and processes that open the same snapshot
+(the scoring workers) share a single copy through the page cache. The version is a fingerprint of the dataset's items,
+so editing a dataset produces a new snapshot. Outdated snapshots are removed once they have not been opened for
+`EVAL_SNAPSHOT_RETENTION` seconds, which lets running jobs finish on the version they started with. With
+`EVAL_SNAPSHOT_BUCKET` set, snapshots are also kept in MinIO, from where other hosts download them instead of
+exporting them again.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Sequence, Set, Tuple
+from uuid import UUID
+
+import numpy as np
+
+from backend.common.db.session import SessionLocal
+from backend.common.utils.minio_client import MinioClient
+from backend.evals import crud
+from backend.evals.core.config import settings
+from backend.evals.evaluators._base_evaluator import compile_field_path
+
+logger = logging.getLogger(__name__)
+
+MANIFEST = "manifest.json"
+IDS_FILE = "ids.npy"
+ITEMS_FILE = "items.arrow"
+
+_INT64_MIN, _INT64_MAX = -(2**63), 2**63 - 1
+
+_export_locks: Dict[str, asyncio.Lock] = {}
+
+
+class SnapshotError(Exception):
+    """
+    Raised when a dataset snapshot cannot be exported or opened.
+    """
+
+
+class SnapshotItem(NamedTuple):
+    id: UUID
+    input_data: Dict[str, Any]
+    ground_truth_label: Optional[Dict[str, Any]]
+
+
+def _pyarrow() -> Any:
+    try:
+        import pyarrow
+        import pyarrow.ipc  # noqa: F401
+    except ImportError as e:
+        raise SnapshotError("Dataset snapshots require the `pyarrow` package.") from e
+    return pyarrow
+
+
+def snapshot_version(item_count: int, updated_at: Optional[datetime], max_id: Optional[str]) -> str:
+    """
+    Version of a dataset's items, from `crud.ground_truth_item.get_version_stamp`.
+    """
+    stamp = f"{item_count}|{updated_at.isoformat() if updated_at else ''}|{max_id or ''}"
+    return hashlib.sha256(stamp.encode("utf-8")).hexdigest()[:16]
+
+
+def _label_leaves(label: Dict[str, Any], prefix: str = "") -> Iterator[Tuple[str, Any]]:
+    """
+    Dotted paths and values of the non-object leaves of a label.
+    """
+    for key, value in label.items():
+        if not isinstance(key, str) or "." in key:
+            continue  # Not addressable with a dotted path
+        if isinstance(value, dict):
+            yield from _label_leaves(value, f"{prefix}{key}.")
+        else:
+            yield f"{prefix}{key}", value
+
+
+class SnapshotWriter:
+    """
+    Writes a snapshot directory from batches of items given in id order.
+
+    Input data and labels are streamed to the Arrow file; only ids and numeric label values are held until `close`.
+    """
+
+    def __init__(self, directory: Path):
+        pa = _pyarrow()
+        self.directory = directory
+        self.schema = pa.schema([
+            ("input_data", pa.large_string()),
+            ("ground_truth_label", pa.large_string()),
+        ])
+        self.ids = bytearray()
+        self.count = 0
+        self._numeric: Dict[str, Tuple[List[int], List[Any]]] = {}  # Field -> (rows, values)
+        self._float_fields: Set[str] = set()
+        self._other_fields: Set[str] = set()
+        self._sink = pa.OSFile(str(directory / ITEMS_FILE), "wb")
+        self._writer = pa.ipc.new_file(self._sink, self.schema)
+
+    def write_batch(self, items: Sequence[Tuple[UUID, Any, Any]]) -> None:
+        pa = _pyarrow()
+        input_data, labels = [], []
+        for item_id, data, label in items:
+            self.ids += item_id.bytes
+            input_data.append(json.dumps(data))
+            labels.append(None if label is None else json.dumps(label))
+            if isinstance(label, dict):
+                for field, value in _label_leaves(label):
+                    self._add_label_value(field, value)
+            self.count += 1
+        self._writer.write_batch(pa.record_batch(
+            [pa.array(input_data, pa.large_string()), pa.array(labels, pa.large_string())], schema=self.schema
+        ))
+
+    def _add_label_value(self, field: str, value: Any) -> None:
+        if value is None or field in self._other_fields:
+            return
+        if not isinstance(value, (int, float)) or (isinstance(value, int) and not _INT64_MIN <= value <= _INT64_MAX):
+            # Strings, lists and huge integers make the field non-numeric
+            self._other_fields.add(field)
+            self._numeric.pop(field, None)
+            return
+        if isinstance(value, float):
+            self._float_fields.add(field)
+        rows, values = self._numeric.setdefault(field, ([], []))
+        rows.append(self.count)
+        values.append(value)
+
+    def close(self, *, dataset_id: UUID, version: str) -> Dict[str, Any]:
+        """
+        Finish the Arrow file, write the id and label arrays and the manifest. Returns the manifest.
+        """
+        self._writer.close()
+        self._sink.close()
+        np.save(self.directory / IDS_FILE, np.frombuffer(bytes(self.ids), dtype="S16"))
+        files = [IDS_FILE, ITEMS_FILE]
+
+        label_fields: Dict[str, Dict[str, str]] = {}
+        if self._numeric:
+            (self.directory / "labels").mkdir()
+        for n, (field, (rows, values)) in enumerate(sorted(self._numeric.items())):
+            if field in self._float_fields or len(rows) < self.count:
+                array = np.full(self.count, np.nan)
+            else:
+                array = np.zeros(self.count, dtype=np.int64)
+            array[rows] = values
+            file = f"labels/{n}.npy"
+            np.save(self.directory / file, array)
+            files.append(file)
+            label_fields[field] = {"file": file, "dtype": str(array.dtype)}
+
+        manifest = {
+            "dataset_id": str(dataset_id),
+            "version": version,
+            "item_count": self.count,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "label_fields": label_fields,
+            "files": files,
+        }
+        (self.directory / MANIFEST).write_text(json.dumps(manifest))
+        return manifest
+
+
+class DatasetSnapshot:
+    """
+    Read access to an exported snapshot; all files are memory-mapped and loaded lazily.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        try:
+            self.manifest: Dict[str, Any] = json.loads((directory / MANIFEST).read_text())
+        except (OSError, ValueError) as e:
+            raise SnapshotError(f"No snapshot at {directory}: {e}") from e
+        self.ids = self._load(IDS_FILE)
+        self._items: Any = None
+        self._label_values: Dict[str, np.ndarray] = {}
+
+    @property
+    def version(self) -> str:
+        return self.manifest["version"]
+
+    @property
+    def item_count(self) -> int:
+        return self.manifest["item_count"]
+
+    def _load(self, file: str) -> np.ndarray:
+        # Empty files cannot be memory-mapped
+        return np.load(self.directory / file, mmap_mode="r" if self.item_count else None)
+
+    @property
+    def items_table(self) -> Any:
+        """
+        The memory-mapped Arrow table of input data and labels.
+        """
+        if self._items is None:
+            pa = _pyarrow()
+            self._items = pa.ipc.open_file(pa.memory_map(str(self.directory / ITEMS_FILE))).read_all()
+        return self._items
+
+    def position_after(self, item_id: UUID | None) -> int:
+        """
+        Row of the first item with an id greater than `item_id`, i.e. where a job with that cursor continues.
+        """
+        if item_id is None:
+            return 0
+        return int(np.searchsorted(self.ids, np.bytes_(item_id.bytes), side="right"))
+
+    def items(self, start: int, stop: int) -> List[SnapshotItem]:
+        """
+        Decoded items of rows `start` to `stop`.
+        """
+        stop = min(stop, self.item_count)
+        if start >= stop:
+            return []
+        return self._decode(self.ids[start:stop], self.items_table.slice(start, stop - start))
+
+    def items_at(self, rows: Sequence[int]) -> List[SnapshotItem]:
+        """
+        Decoded items of the given rows, in that order.
+        """
+        if not len(rows):
+            return []
+        return self._decode(self.ids[np.asarray(rows)], self.items_table.take(rows))
+
+    @staticmethod
+    def _decode(ids: np.ndarray, table: Any) -> List[SnapshotItem]:
+        raw_ids = ids.tobytes()
+        return [
+            SnapshotItem(
+                id=UUID(bytes=raw_ids[16 * n:16 * (n + 1)]),
+                input_data=json.loads(data),
+                ground_truth_label=None if label is None else json.loads(label),
+            )
+            for n, (data, label) in enumerate(zip(
+                table.column("input_data").to_pylist(), table.column("ground_truth_label").to_pylist()
+            ))
+        ]
+
+    def label_values(self, field_path: str) -> np.ndarray:
+        """
+        Values of a label field for every item, `None` or NaN where missing.
+
+        Numeric fields are memory-mapped; other fields are decoded from the label column once per snapshot.
+        """
+        values = self._label_values.get(field_path)
+        if values is None:
+            field = self.manifest["label_fields"].get(field_path)
+            if field is not None:
+                values = self._load(field["file"])
+            else:
+                values = compile_field_path(field_path).extract_many(
+                    None if label is None else json.loads(label)
+                    for label in self.items_table.column("ground_truth_label").to_pylist()
+                )
+            self._label_values[field_path] = values
+        return values
+
+
+async def get_snapshot(dataset_id: UUID) -> DatasetSnapshot:
+    """
+    Open the snapshot of a dataset's current version, downloading or exporting it first if needed.
+    """
+    async with SessionLocal() as db_session:
+        stamp = await crud.ground_truth_item.get_version_stamp(dataset_id=dataset_id, db_session=db_session)
+    version = snapshot_version(*stamp)
+    directory = Path(settings.EVAL_SNAPSHOT_DIR) / str(dataset_id) / version
+
+    async with _export_locks.setdefault(str(directory), asyncio.Lock()):
+        if not (directory / MANIFEST).exists():
+            downloaded = bool(settings.EVAL_SNAPSHOT_BUCKET) and await asyncio.to_thread(_download, directory)
+            if not downloaded:
+                await export_snapshot(dataset_id, version, directory)
+                if settings.EVAL_SNAPSHOT_BUCKET:
+                    await asyncio.to_thread(_upload, directory)
+        os.utime(directory)  # Marks the snapshot as in use
+        _remove_other_versions(directory)
+    return await asyncio.to_thread(DatasetSnapshot, directory)
+
+
+async def export_snapshot(dataset_id: UUID, version: str, directory: Path) -> None:
+    """
+    Export a dataset to `directory`, streaming its items in id-ordered batches.
+
+    The snapshot is written to a staging directory and renamed into place, so readers never see a partial snapshot.
+    Fails if the dataset changes during the export.
+    """
+    directory.parent.mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(prefix=f".{version}-", dir=directory.parent))
+    try:
+        writer = await asyncio.to_thread(SnapshotWriter, staging)
+        cursor = None
+        while True:
+            async with SessionLocal() as db_session:
+                items = await crud.ground_truth_item.get_chunk(
+                    dataset_id=dataset_id,
+                    after_id=cursor,
+                    limit=settings.EVAL_SNAPSHOT_BATCH_SIZE,
+                    db_session=db_session,
+                )
+            if not items:
+                break
+            await asyncio.to_thread(
+                writer.write_batch, [(item.id, item.input_data, item.ground_truth_label) for item in items]
+            )
+            cursor = items[-1].id
+        await asyncio.to_thread(writer.close, dataset_id=dataset_id, version=version)
+
+        async with SessionLocal() as db_session:
+            stamp = await crud.ground_truth_item.get_version_stamp(dataset_id=dataset_id, db_session=db_session)
+        if snapshot_version(*stamp) != version:
+            raise SnapshotError(f"Dataset {dataset_id} changed while it was exported.")
+        _publish(staging, directory)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+
+def _publish(staging: Path, directory: Path) -> None:
+    try:
+        os.rename(staging, directory)
+    except OSError:
+        # Another process published the same version first
+        if not (directory / MANIFEST).exists():
+            raise
+
+
+def _remove_other_versions(directory: Path) -> None:
+    expired = datetime.now().timestamp() - settings.EVAL_SNAPSHOT_RETENTION
+    for other in directory.parent.iterdir():
+        # Dot-prefixed directories are exports in progress
+        if other != directory and not other.name.startswith(".") and other.stat().st_mtime < expired:
+            shutil.rmtree(other, ignore_errors=True)
+
+
+def _minio_client() -> MinioClient:
+    return MinioClient(
+        minio_url=settings.MINIO_URL,
+        access_key=settings.MINIO_ROOT_USER,
+        secret_key=settings.MINIO_ROOT_PASSWORD,
+        bucket_name=settings.EVAL_SNAPSHOT_BUCKET, # type: ignore[arg-type]
+    )
+
+
+def _object_prefix(directory: Path) -> str:
+    return f"{directory.parent.name}/{directory.name}/"
+
+
+def _upload(directory: Path) -> None:
+    try:
+        client = _minio_client()
+        prefix = _object_prefix(directory)
+        manifest = json.loads((directory / MANIFEST).read_text())
+        # The manifest goes last, so its presence marks a complete upload
+        for file in [*manifest["files"], MANIFEST]:
+            client.client.fput_object(client.bucket_name, prefix + file, str(directory / file))
+    except Exception:
+        logger.warning(f"Failed to upload the dataset snapshot {directory} to MinIO.", exc_info=True)
+
+
+def _download(directory: Path) -> bool:
+    """
+    Fetch a snapshot from MinIO; False if it is not there (or MinIO is unreachable).
+    """
+    directory.parent.mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(prefix=f".{directory.name}-", dir=directory.parent))
+    try:
+        client = _minio_client()
+        prefix = _object_prefix(directory)
+        if not client.check_file_name_exists(client.bucket_name, prefix + MANIFEST):
+            return False
+        client.client.fget_object(client.bucket_name, prefix + MANIFEST, str(staging / MANIFEST))
+        for file in json.loads((staging / MANIFEST).read_text())["files"]:
+            client.client.fget_object(client.bucket_name, prefix + file, str(staging / file))
+        _publish(staging, directory)
+        return True
+    except Exception:
+        logger.warning(f"Failed to download the dataset snapshot {directory} from MinIO.", exc_info=True)
+        return False
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
@@ -0,0 +1,211 @@
+"""
+Content-addressed cache of text embeddings.
+
+RAG metrics embed the same questions, answers and references again in every evaluation over a corpus. Embeddings
+are cached under a digest of (model, text) in two tiers: an append-only store on local disk, read through memory
+maps, and Redis, which shares embeddings between hosts. Texts found in neither are embedded in batches, then written
+to both tiers.
+
+The local store of a model is a directory holding `keys.bin` (16-byte digests) and `vectors.f32` (float32 rows in
+the same order). Rows are only ever appended, vectors before their keys and under a file lock, so several processes
+can share a store and readers never see a key without its vector. Calls are synchronous and thread-safe, as embedding
+APIs of metric libraries (e.g. ragas) are called from synchronous code.
+"""
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, cast
+
+import numpy as np
+import redis
+
+from backend.evals.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+REDIS_PREFIX = "evals:embedding"
+DIGEST_SIZE = 16
+REDIS_RETRY_INTERVAL = 60.0  # Seconds the Redis tier is skipped after a failure
+
+EmbedFn = Callable[[List[str]], np.ndarray]
+
+
+def text_digest(text: str) -> bytes:
+    return hashlib.blake2b(text.encode(), digest_size=DIGEST_SIZE).digest()
+
+
+class EmbeddingStore:
+    """
+    Append-only local store of one model's embeddings, keyed by text digest and read through memory maps.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._keys_path = directory / "keys.bin"
+        self._vectors_path = directory / "vectors.f32"
+        self._meta_path = directory / "meta.json"
+        self._keys_path.touch(exist_ok=True)
+        self._vectors_path.touch(exist_ok=True)
+        self.dim: Optional[int] = json.loads(self._meta_path.read_text())["dim"] if self._meta_path.exists() else None
+        self._index: Dict[bytes, int] = {}
+        self._vectors: Optional[np.memmap] = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def _refresh(self) -> None:
+        """
+        Index rows appended since the last refresh, by this or another process.
+        """
+        if self.dim is None:
+            if not self._meta_path.exists():
+                return
+            self.dim = json.loads(self._meta_path.read_text())["dim"]
+        rows = min(
+            os.path.getsize(self._keys_path) // DIGEST_SIZE,
+            os.path.getsize(self._vectors_path) // (4 * self.dim),
+        )
+        if rows <= len(self._index):
+            return
+        keys = np.fromfile(self._keys_path, dtype=np.uint8, count=rows * DIGEST_SIZE).reshape(rows, DIGEST_SIZE)
+        for row in range(len(self._index), rows):
+            self._index.setdefault(keys[row].tobytes(), row)
+        self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode="r", shape=(rows, self.dim))
+
+    def get_many(self, digests: Sequence[bytes]) -> Dict[bytes, np.ndarray]:
+        with self._lock:
+            self._refresh()
+            rows = {digest: self._index[digest] for digest in digests if digest in self._index}
+            if not rows:
+                return {}
+            vectors = np.asarray(self._vectors[list(rows.values())]) # type: ignore[index]
+        return dict(zip(rows, vectors))
+
+    def put_many(self, vectors: Dict[bytes, np.ndarray]) -> None:
+        if not vectors:
+            return
+        with self._lock, open(self._keys_path, "ab") as keys_file:
+            fcntl.flock(keys_file, fcntl.LOCK_EX)
+            try:
+                if self.dim is None and not self._meta_path.exists():
+                    self.dim = len(next(iter(vectors.values())))
+                    self._meta_path.write_text(json.dumps({"dim": self.dim}))
+                self._refresh()
+                # Rows past the last key were left by an interrupted append; overwrite them
+                rows = os.path.getsize(self._keys_path) // DIGEST_SIZE
+                new = {digest: vector for digest, vector in vectors.items() if digest not in self._index}
+                if not new:
+                    return
+                with open(self._vectors_path, "r+b") as vectors_file:
+                    vectors_file.seek(rows * 4 * self.dim) # type: ignore[operator]
+                    vectors_file.write(np.asarray(list(new.values()), dtype=np.float32).tobytes())
+                keys_file.seek(0, os.SEEK_END)
+                keys_file.write(b"".join(new))
+                keys_file.flush()
+                self._refresh()
+            finally:
+                fcntl.flock(keys_file, fcntl.LOCK_UN)
+
+
+class EmbeddingCache:
+    """
+    Local store + Redis cache of embeddings, embedding misses in batches.
+    """
+
+    def __init__(self, directory: str, ttl: int, batch_size: int, redis_client: Optional[redis.Redis] = None):
+        self.directory = Path(directory)
+        self.ttl = ttl
+        self.batch_size = batch_size
+        self.redis = redis_client
+        self._stores: Dict[str, EmbeddingStore] = {}
+        self._stores_lock = threading.Lock()
+        self._redis_retry_at = 0.0
+
+    def store(self, model: str) -> EmbeddingStore:
+        key = hashlib.blake2b(model.encode(), digest_size=8).hexdigest()
+        with self._stores_lock:
+            if key not in self._stores:
+                self._stores[key] = EmbeddingStore(self.directory / key)
+            return self._stores[key]
+
+    def embed(self, model: str, texts: Sequence[str], embed_fn: EmbedFn) -> np.ndarray:
+        """
+        (texts x dim) embeddings of `texts` by `model`, computing only those not cached with `embed_fn`.
+        """
+        digests = [text_digest(text) for text in texts]
+        unique = dict(zip(digests, texts))
+        store = self.store(model)
+        found = store.get_many(list(unique))
+
+        missing = [digest for digest in unique if digest not in found]
+        if missing:
+            from_redis = self._get_redis(model, missing)
+            store.put_many(from_redis)
+            found.update(from_redis)
+            missing = [digest for digest in missing if digest not in from_redis]
+
+        if missing:
+            computed: Dict[bytes, np.ndarray] = {}
+            for start in range(0, len(missing), self.batch_size):
+                batch = missing[start:start + self.batch_size]
+                vectors = np.asarray(embed_fn([unique[digest] for digest in batch]), dtype=np.float32)
+                computed.update(zip(batch, vectors))
+            store.put_many(computed)
+            self._put_redis(model, computed)
+            found.update(computed)
+
+        if not digests:
+            return np.empty((0, store.dim or 0), dtype=np.float32)
+        return np.stack([found[digest] for digest in digests])
+
+    def _redis_key(self, model: str, digest: bytes) -> str:
+        return f"{REDIS_PREFIX}:{model}:{digest.hex()}"
+
+    def _redis_available(self) -> bool:
+        return self.redis is not None and time.monotonic() >= self._redis_retry_at
+
+    def _get_redis(self, model: str, digests: List[bytes]) -> Dict[bytes, np.ndarray]:
+        if not self._redis_available():
+            return {}
+        try:
+            values = cast(
+                List[Optional[bytes]],
+                self.redis.mget([self._redis_key(model, digest) for digest in digests]), # type: ignore[union-attr]
+            )
+        except redis.RedisError:
+            logger.exception("Embedding cache: Redis lookup failed, skipping Redis for a while.")
+            self._redis_retry_at = time.monotonic() + REDIS_RETRY_INTERVAL
+            return {}
+        return {
+            digest: np.frombuffer(value, dtype=np.float32)
+            for digest, value in zip(digests, values) if value is not None
+        }
+
+    def _put_redis(self, model: str, vectors: Dict[bytes, np.ndarray]) -> None:
+        if not vectors or not self._redis_available():
+            return
+        try:
+            with self.redis.pipeline(transaction=False) as pipe: # type: ignore[union-attr]
+                for digest, vector in vectors.items():
+                    pipe.set(self._redis_key(model, digest), np.asarray(vector, dtype=np.float32).tobytes(), ex=self.ttl)
+                pipe.execute()
+        except redis.RedisError:
+            logger.exception("Embedding cache: Redis write failed, skipping Redis for a while.")
+            self._redis_retry_at = time.monotonic() + REDIS_RETRY_INTERVAL
+
+
+embedding_cache = EmbeddingCache(
+    directory=settings.EVAL_EMBEDDING_CACHE_DIR,
+    ttl=settings.EVAL_EMBEDDING_CACHE_TTL,
+    batch_size=settings.EVAL_EMBEDDING_BATCH_SIZE,
+    redis_client=redis.Redis(
+        host=settings.REDIS_HOST, port=settings.REDIS_PORT, socket_connect_timeout=1, socket_timeout=5
+    ),
+)
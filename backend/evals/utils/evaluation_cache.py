@@ -0,0 +1,297 @@
+"""
+Two-tier cache of evaluation results.
+
+Lookups go through an in-process LRU, then Redis, then the `EvaluationCache` table; hits from a lower tier are copied
+into the tiers above. Writes land in the LRU immediately and reach Redis and the table through a write-behind
+buffer flushed in batches.
+
+Entries are keyed by (evaluator config hash, input hash). Changing the metric config, or bumping its
+`cache_version`, changes the config hash, so stale results are simply never read again. Entries also expire after
+`ttl` seconds in every tier.
+"""
+import asyncio
+import json
+import logging
+import math
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from redis.asyncio import Redis
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlmodel import delete, select
+
+from backend.common.db.session import SessionLocal
+from backend.common.utils.uuid6 import uuid7
+from backend.evals.core.config import settings
+from backend.evals.evaluators._base_evaluator import Evaluator, hash_value
+from backend.evals.models import EvaluationCache
+
+logger = logging.getLogger(__name__)
+
+CacheKey = Tuple[str, str]
+
+REDIS_PREFIX = "evals:cache"
+DB_LOOKUP_CHUNK = 1000
+
+
+def input_hash(y_true: Any, y_pred: Any) -> str:
+    # Must match the hash used by `Evaluator.check_cache`/`store_cache`
+    return hash_value({"y_true": y_true, "y_pred": y_pred})
+
+
+class EvaluationCacheStore:
+    """
+    LRU + Redis + `EvaluationCache` table, with batched multi-get lookups and write-behind inserts.
+    """
+
+    def __init__(self, lru_size: int, ttl: int, batch_size: int, flush_interval: float):
+        self.lru_size = lru_size
+        self.ttl = ttl
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.redis: Redis | None = None
+        self._lru: OrderedDict[CacheKey, Tuple[float, Dict[str, Any]]] = OrderedDict()
+        self._pending: Dict[CacheKey, Dict[str, Any]] = {}
+        self._task: asyncio.Task | None = None
+
+    def start(self, redis: Redis | None = None) -> None:
+        self.redis = redis
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Stop the writer and flush everything still buffered.
+        """
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        await self.flush()
+
+    # --- In-process tier (also the evaluators' synchronous check_cache/store_cache hooks) ---
+
+    def peek(self, config_hash: str, input_hash: str) -> Dict[str, Any] | None:
+        key = (config_hash, input_hash)
+        cached = self._lru.get(key)
+        if cached is None:
+            # Evicted from the LRU but not written through yet
+            return self._pending.get(key)
+        stored_at, result = cached
+        if time.monotonic() - stored_at > self.ttl:
+            del self._lru[key]
+            return None
+        self._lru.move_to_end(key)
+        return result
+
+    def put(self, config_hash: str, input_hash: str, result: Dict[str, Any]) -> None:
+        """
+        Cache a result locally and queue it for Redis and the database.
+        """
+        self._remember((config_hash, input_hash), result)
+        self._pending[(config_hash, input_hash)] = result
+
+    def _remember(self, key: CacheKey, result: Dict[str, Any]) -> None:
+        self._lru[key] = (time.monotonic(), result)
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.lru_size:
+            self._lru.popitem(last=False)
+
+    # --- Batched lookups ---
+
+    async def get_many(self, config_hash: str, input_hashes: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Results for the given inputs that are cached in any tier, keyed by input hash.
+        """
+        found: Dict[str, Dict[str, Any]] = {}
+        missing = []
+        for h in dict.fromkeys(input_hashes):
+            result = self.peek(config_hash, h)
+            if result is not None:
+                found[h] = result
+            else:
+                missing.append(h)
+
+        if missing and self.redis is not None:
+            try:
+                values = await self.redis.mget([self._redis_key(config_hash, h) for h in missing])
+            except Exception:
+                logger.exception("Evaluation cache: Redis lookup failed, falling back to the database.")
+                values = [None] * len(missing)
+            still_missing = []
+            for h, value in zip(missing, values):
+                if value is None:
+                    still_missing.append(h)
+                else:
+                    found[h] = json.loads(value)
+                    self._remember((config_hash, h), found[h])
+            missing = still_missing
+
+        if missing:
+            from_db = await self._get_from_db(config_hash, missing)
+            for h, result in from_db.items():
+                found[h] = result
+                self._remember((config_hash, h), result)
+            if from_db and self.redis is not None:
+                await self._write_redis({(config_hash, h): result for h, result in from_db.items()})
+        return found
+
+    async def _get_from_db(self, config_hash: str, input_hashes: List[str]) -> Dict[str, Dict[str, Any]]:
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=self.ttl)
+        found: Dict[str, Dict[str, Any]] = {}
+        async with SessionLocal() as db_session:
+            for start in range(0, len(input_hashes), DB_LOOKUP_CHUNK):
+                result = await db_session.execute(
+                    select(EvaluationCache.input_hash, EvaluationCache.result)
+                    .where(EvaluationCache.evaluator_config_hash == config_hash)
+                    .where(EvaluationCache.input_hash.in_(input_hashes[start:start + DB_LOOKUP_CHUNK])) # type: ignore
+                    .where(EvaluationCache.created_at >= cutoff) # type: ignore
+                )
+                found.update(result.tuples().all())
+        return found
+
+    # --- Write-behind ---
+
+    async def flush(self) -> int:
+        """
+        Write buffered results to Redis and the database. Returns the number of results written.
+        """
+        if not self._pending:
+            return 0
+        pending, self._pending = self._pending, {}
+        items = list(pending.items())
+
+        if self.redis is not None:
+            await self._write_redis(pending)
+
+        written = 0
+        for start in range(0, len(items), self.batch_size):
+            batch = items[start:start + self.batch_size]
+            try:
+                await self._write_db(batch)
+                written += len(batch)
+            except Exception:
+                logger.exception(f"Evaluation cache: failed to write {len(batch)} results.")
+        return written
+
+    async def _write_redis(self, items: Dict[CacheKey, Dict[str, Any]]) -> None:
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe: # type: ignore[union-attr]
+                for (config_hash, h), result in items.items():
+                    pipe.set(self._redis_key(config_hash, h), json.dumps(result), ex=self.ttl)
+                await pipe.execute()
+        except Exception:
+            logger.exception("Evaluation cache: Redis write failed.")
+
+    async def _write_db(self, items: List[Tuple[CacheKey, Dict[str, Any]]]) -> None:
+        now = datetime.now(timezone.utc)
+        rows = [
+            {
+                "id": uuid7(),
+                "created_at": now,
+                "updated_at": now,
+                "evaluator_config_hash": config_hash,
+                "input_hash": h,
+                "result": result,
+            }
+            for (config_hash, h), result in items
+        ]
+        async with SessionLocal() as db_session:
+            connection = await db_session.connection()
+            insert = pg_insert if connection.dialect.name == "postgresql" else sqlite_insert
+            stmt = insert(EvaluationCache).values(rows)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["evaluator_config_hash", "input_hash"],
+                set_={"result": stmt.excluded.result, "created_at": stmt.excluded.created_at},
+            )
+            await db_session.execute(stmt)
+            await db_session.commit()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    # --- Invalidation ---
+
+    async def invalidate(self, config_hash: str) -> None:
+        """
+        Drop every cached result of an evaluator config from all tiers.
+        """
+        for key in [key for key in self._lru if key[0] == config_hash]:
+            del self._lru[key]
+        self._pending = {key: r for key, r in self._pending.items() if key[0] != config_hash}
+
+        if self.redis is not None:
+            keys = [key async for key in self.redis.scan_iter(match=f"{REDIS_PREFIX}:{config_hash}:*", count=1000)]
+            if keys:
+                await self.redis.unlink(*keys)
+
+        async with SessionLocal() as db_session:
+            await db_session.execute(
+                delete(EvaluationCache).where(EvaluationCache.evaluator_config_hash == config_hash) # type: ignore
+            )
+            await db_session.commit()
+
+    async def purge_expired(self) -> int:
+        """
+        Delete database entries older than the TTL. Returns the number of rows deleted.
+        """
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=self.ttl)
+        async with SessionLocal() as db_session:
+            result = await db_session.execute(
+                delete(EvaluationCache).where(EvaluationCache.created_at < cutoff) # type: ignore
+            )
+            await db_session.commit()
+        return result.rowcount
+
+    @staticmethod
+    def _redis_key(config_hash: str, input_hash: str) -> str:
+        return f"{REDIS_PREFIX}:{config_hash}:{input_hash}"
+
+
+async def ascore_samples(
+    evaluator: Evaluator,
+    y_true_list: List[Any],
+    y_pred_list: List[Any],
+    cache: Optional[EvaluationCacheStore] = None,
+) -> np.ndarray:
+    """
+    Per-sample scores, served from the evaluation cache where possible.
+
+    Only evaluators that opt in with `cache_results` (e.g. LLM judges) are cached; the rest are scored directly.
+    """
+    cache = cache or evaluation_cache
+    if not evaluator.cache_results:
+        return evaluator.score_samples(y_true_list, y_pred_list)
+
+    config_hash = evaluator.result_config_hash
+    hashes = [input_hash(yt, yp) for yt, yp in zip(y_true_list, y_pred_list)]
+    found = await cache.get_many(config_hash, hashes)
+
+    scores = np.array([evaluator.cached_score(found[h]) if h in found else np.nan for h in hashes], dtype=float)
+    missing = [i for i, h in enumerate(hashes) if h not in found]
+    if missing:
+        computed = await evaluator.aevaluate_samples(
+            [y_true_list[i] for i in missing], [y_pred_list[i] for i in missing]
+        )
+        for i, result in zip(missing, computed):
+            scores[i] = result.score
+            if math.isfinite(result.score):  # Failures (e.g. judge errors) are retried next time
+                cache.put(config_hash, hashes[i], result.model_dump())
+    return scores
+
+evaluation_cache = EvaluationCacheStore(
+    lru_size=settings.EVAL_CACHE_LRU_SIZE,
+    ttl=settings.EVAL_CACHE_TTL,
+    batch_size=settings.EVAL_CACHE_WRITE_BATCH_SIZE,
+    flush_interval=settings.EVAL_CACHE_FLUSH_INTERVAL,
+)
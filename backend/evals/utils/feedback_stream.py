@@ -0,0 +1,250 @@
+"""
+User feedback ingestion through a Redis stream.
+
+Feedback arrives in bursts of small writes. Accepted feedback is appended to a Redis stream. In the same transaction,
+the running totals of its team and session (counts, rating sum) are updated in Redis hashes, so summaries are read
+without touching the database. A consumer in each service process reads the stream as part of one consumer group and
+writes the feedback to the `UserFeedback` table in bulk inserts, acknowledging entries only once they are committed.
+
+Feedback ids and timestamps are assigned on acceptance, so an entry delivered twice (e.g. after a consumer crashed
+between the insert and the acknowledgement) is inserted once. Entries left unacknowledged by a dead consumer are
+claimed by another one after `claim_idle` seconds.
+"""
+import asyncio
+import json
+import logging
+import os
+import socket
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Sequence, Tuple
+from uuid import UUID
+
+from redis.asyncio import Redis
+from redis.exceptions import ResponseError
+
+from backend.common.db.session import SessionLocal
+from backend.common.utils.uuid6 import uuid7
+from backend.evals import crud
+from backend.evals.core.config import settings
+from backend.evals.models import FeedbackType
+from backend.evals.schema import IFeedbackSummary, IUserFeedbackCreate
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_PREFIX = "evals:feedback:summary"
+
+StreamEntry = Tuple[str, Dict[str, str]]
+
+
+class FeedbackStream:
+    """
+    Redis stream buffering feedback writes, with running per-team and per-session totals.
+    """
+
+    def __init__(
+        self,
+        stream: str,
+        group: str,
+        max_length: int,
+        batch_size: int,
+        block: float,
+        claim_idle: int,
+    ):
+        self.stream = stream
+        self.group = group
+        self.consumer = f"{socket.gethostname()}-{os.getpid()}"
+        self.max_length = max_length
+        self.batch_size = batch_size
+        self.block = block
+        self.claim_idle = claim_idle
+        self.redis: Redis | None = None
+        self._task: asyncio.Task | None = None
+
+    def start(self, redis: Redis | None = None) -> None:
+        self.redis = redis
+        if redis is not None and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Stop the consumer. Unwritten entries stay in the stream for the next consumer.
+        """
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    # --- Producer ---
+
+    async def publish(self, feedback: Sequence[IUserFeedbackCreate]) -> List[UUID]:
+        """
+        Accept feedback for writing and count it in the running totals. Returns the ids the rows will be stored with.
+
+        Without Redis, the feedback is written to the database directly.
+        """
+        now = datetime.now(timezone.utc)
+        rows = [{"id": uuid7(), "created_at": now, "updated_at": now, **f.model_dump()} for f in feedback]
+        if self.redis is None:
+            await self._write_db(rows)
+            return [row["id"] for row in rows]
+
+        totals: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        for f in feedback:
+            keys = [self._summary_key(kind, id) for kind, id in (("team", f.team_id), ("session", f.session_id)) if id]
+            for key in keys:
+                counts = totals[key]
+                counts["count"] += 1
+                if f.feedback_type == FeedbackType.POSITIVE:
+                    counts["positive"] += 1
+                elif f.feedback_type == FeedbackType.NEGATIVE:
+                    counts["negative"] += 1
+                if f.rating is not None:
+                    counts["rating_count"] += 1
+                    counts["rating_sum"] += f.rating
+
+        try:
+            async with self.redis.pipeline(transaction=True) as pipe:
+                for row in rows:
+                    # Trimming is approximate and only drops entries once the stream is far past `max_length`
+                    pipe.xadd(
+                        self.stream, {"data": json.dumps(row, default=str)}, maxlen=self.max_length, approximate=True
+                    )
+                for key, counts in totals.items():
+                    for field, value in counts.items():
+                        if field == "rating_sum":
+                            pipe.hincrbyfloat(key, field, value)
+                        else:
+                            pipe.hincrby(key, field, int(value))
+                await pipe.execute()
+        except Exception:
+            logger.exception("Feedback stream: Redis write failed, writing feedback to the database directly.")
+            await self._write_db(rows)
+        return [row["id"] for row in rows]
+
+    async def summary(self, *, team_id: UUID | None = None, session_id: UUID | None = None) -> IFeedbackSummary:
+        """
+        Running feedback totals of a team or session, counted from the database if Redis has none.
+        """
+        kind, id = ("team", team_id) if team_id else ("session", session_id)
+        if id is None:
+            raise ValueError("A feedback summary needs a team_id or session_id.")
+        counts: Dict[str, str] = {}
+        if self.redis is not None:
+            try:
+                # redis-py types its async commands as sync-or-async
+                counts = await self.redis.hgetall(self._summary_key(kind, id)) # type: ignore[misc]
+            except Exception:
+                logger.exception("Feedback stream: Redis summary lookup failed, falling back to the database.")
+        if not counts:
+            return await crud.user_feedback.get_summary(team_id=team_id, session_id=session_id)
+
+        rating_count = int(counts.get("rating_count", 0))
+        return IFeedbackSummary(
+            count=int(counts.get("count", 0)),
+            positive=int(counts.get("positive", 0)),
+            negative=int(counts.get("negative", 0)),
+            rating_count=rating_count,
+            mean_rating=float(counts["rating_sum"]) / rating_count if rating_count else None,
+        )
+
+    # --- Consumer ---
+
+    async def _run(self) -> None:
+        await self._ensure_group()
+        pending = True  # Start with the entries delivered to this consumer but not acknowledged
+        last_claim = 0.0
+        while True:
+            try:
+                if time.monotonic() - last_claim > self.claim_idle:
+                    last_claim = time.monotonic()
+                    if await self._claim_abandoned():
+                        pending = True
+                response = await self.redis.xreadgroup( # type: ignore[union-attr]
+                    self.group,
+                    self.consumer,
+                    {self.stream: "0" if pending else ">"},
+                    count=self.batch_size,
+                    block=None if pending else int(self.block * 1000),
+                )
+                entries: List[StreamEntry] = response[0][1] if response else []
+                if pending and not entries:
+                    pending = False
+                if entries:
+                    await self._write(entries)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Feedback stream: failed to write feedback, retrying.")
+                pending = True
+                await asyncio.sleep(self.block)
+
+    async def _ensure_group(self) -> None:
+        try:
+            await self.redis.xgroup_create(self.stream, self.group, id="0", mkstream=True) # type: ignore[union-attr]
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    async def _claim_abandoned(self) -> bool:
+        """
+        Take over the entries other consumers left unacknowledged for `claim_idle` seconds.
+        """
+        claimed = False
+        start = "0-0"
+        while True:
+            response = await self.redis.xautoclaim( # type: ignore[union-attr]
+                self.stream, self.group, self.consumer,
+                min_idle_time=self.claim_idle * 1000, start_id=start, count=self.batch_size, justid=True,
+            )
+            start, ids = response[0], response[1]
+            claimed = claimed or bool(ids)
+            if start in ("0-0", b"0-0"):
+                return claimed
+
+    async def _write(self, entries: List[StreamEntry]) -> None:
+        rows = []
+        for entry_id, fields in entries:
+            try:
+                row = json.loads(fields["data"])
+                row["id"] = UUID(row["id"])
+                row["feedback_type"] = FeedbackType(row["feedback_type"])
+                for key in ("tenant_id", "session_id", "team_id"):
+                    row[key] = UUID(row[key]) if row[key] else None
+                for key in ("created_at", "updated_at"):
+                    row[key] = datetime.fromisoformat(row[key])
+                rows.append(row)
+            except (KeyError, TypeError, ValueError):
+                logger.error(f"Feedback stream: dropping malformed entry {entry_id}.")
+        await self._write_db(rows)
+
+        ids = [entry_id for entry_id, _ in entries]
+        async with self.redis.pipeline(transaction=False) as pipe: # type: ignore[union-attr]
+            pipe.xack(self.stream, self.group, *ids)
+            pipe.xdel(self.stream, *ids)
+            await pipe.execute()
+
+    async def _write_db(self, rows: List[Dict[str, Any]]) -> None:
+        async with SessionLocal() as db_session:
+            for start in range(0, len(rows), self.batch_size):
+                await crud.user_feedback.bulk_insert(rows=rows[start:start + self.batch_size], db_session=db_session)
+            await db_session.commit()
+
+    @staticmethod
+    def _summary_key(kind: str, id: UUID) -> str:
+        return f"{SUMMARY_PREFIX}:{kind}:{id}"
+
+
+feedback_stream = FeedbackStream(
+    stream=settings.EVAL_FEEDBACK_STREAM,
+    group=settings.EVAL_FEEDBACK_CONSUMER_GROUP,
+    max_length=settings.EVAL_FEEDBACK_STREAM_MAX_LENGTH,
+    batch_size=settings.EVAL_FEEDBACK_WRITE_BATCH_SIZE,
+    block=settings.EVAL_FEEDBACK_BLOCK,
+    claim_idle=settings.EVAL_FEEDBACK_CLAIM_IDLE,
+)
@@ -0,0 +1,234 @@
+"""
+Process pool for CPU-bound scoring.
+
+Metric computation (sklearn, NumPy, bootstrap resampling) holds the GIL, so evaluation jobs score in worker processes.
+Work is submitted as evaluator configs serialized to JSON plus plain data; each worker builds an evaluator once per
+config and reuses it. Ground truth can instead be referenced by dataset snapshot and rows, which workers memory-map
+rather than receive with every chunk.
+
+Summaries and team comparisons of large score matrices are sharded: bootstrap resampling, the costly part, is split
+into blocks of iterations run across the pool, with the scores passed through shared memory instead of pickled. The
+blocks' resample means are then reduced into intervals in a thread, off the event loop. Each block draws from its
+own child of the metric's seed, so sharded results are reproducible and do not depend on the number of workers.
+"""
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor
+from functools import lru_cache, partial
+from multiprocessing.shared_memory import SharedMemory
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, cast
+
+import numpy as np
+
+from backend.evals.core.config import settings
+from backend.evals.evaluators._base_evaluator import (
+    BatchEvaluationResult,
+    CIComputationMethod,
+    ComparisonResult,
+    Evaluator,
+    EvaluatorConfig,
+    bootstrap_means,
+    resample_means,
+)
+from backend.evals.evaluators.comparison import MultipleComparisonCorrection, compare_teams
+from backend.evals.evaluators.registry import evaluator_registry, load_evaluator
+from backend.evals.evaluators.suite import EvaluatorSuite
+from backend.evals.utils.dataset_snapshot import DatasetSnapshot
+
+# (shared memory name, shape, dtype)
+SharedArraySpec = Tuple[str, Tuple[int, ...], str]
+
+_pool: ProcessPoolExecutor | None = None
+
+
+def _preload_worker() -> None:
+    evaluator_registry.preload(settings.EVAL_PRELOAD_NAMESPACES)
+
+
+@lru_cache(maxsize=128)
+def _worker_evaluator(config_json: str) -> Evaluator:
+    return load_evaluator(EvaluatorConfig.model_validate_json(config_json))
+
+
+@lru_cache(maxsize=8)
+def _worker_snapshot(path: str) -> DatasetSnapshot:
+    return DatasetSnapshot(Path(path))
+
+
+@lru_cache(maxsize=32)
+def _worker_suite(config_jsons: Tuple[str, ...]) -> EvaluatorSuite:
+    return EvaluatorSuite([_worker_evaluator(config_json) for config_json in config_jsons])
+
+
+def score_chunk(
+    config_jsons: List[str],
+    labels: Optional[List[Any]],
+    responses: List[Optional[List[Any]]],
+    snapshot_path: Optional[str] = None,
+    rows: Optional[Sequence[int]] = None,
+    item_ids: Optional[Sequence[str]] = None,
+) -> Dict[str, List[Optional[float]]]:
+    """
+    Per-sample scores of a chunk for each evaluator, keyed by evaluator name; `None` where a sample is not scorable.
+
+    Ground truth comes from `labels`, or from the snapshot at `snapshot_path` for the given rows. With `item_ids`,
+    samples this worker has already scored are not scored again.
+    """
+    suite = _worker_suite(tuple(config_jsons))
+    ground_truth = None
+    if snapshot_path:
+        snapshot = _worker_snapshot(snapshot_path)
+        positions = np.asarray(rows, dtype=np.int64)
+        ground_truth = {field: snapshot.label_values(field)[positions].tolist() for field in suite.ground_truth_fields}
+    return suite.score_samples(labels, responses, ground_truth, item_ids)
+
+
+def summarize_suite(config_jsons: List[str], scores: np.ndarray) -> Dict[str, BatchEvaluationResult]:
+    """
+    Summaries of an (evaluators x samples) score matrix, NaN where not scored; see `EvaluatorSuite.summarize`.
+    """
+    suite = _worker_suite(tuple(config_jsons))
+    return suite.summarize({evaluator.config.name: row for evaluator, row in zip(suite.evaluators, scores)})
+
+
+def compare_suite(
+    config_jsons: List[str], scores: np.ndarray, correction: MultipleComparisonCorrection
+) -> Dict[str, List[Tuple[int, int, ComparisonResult]]]:
+    """
+    Pairwise team comparisons of an (evaluators x items x teams) score tensor, NaN where not scored; see
+    `compare_teams`. Teams are given by their index along the last axis.
+    """
+    suite = _worker_suite(tuple(config_jsons))
+    return {
+        evaluator.config.name: compare_teams(evaluator, matrix, correction=correction)
+        for evaluator, matrix in zip(suite.evaluators, scores)
+    }
+
+
+class SharedArray:
+    """
+    Copy of an array in shared memory, which workers attach to by name. Unlinked on exit.
+    """
+
+    def __init__(self, array: np.ndarray):
+        array = np.ascontiguousarray(array)
+        self._memory = SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, dtype=array.dtype, buffer=self._memory.buf)[...] = array
+        self.spec: SharedArraySpec = (self._memory.name, array.shape, array.dtype.str)
+
+    def __enter__(self) -> "SharedArray":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._memory.close()
+        self._memory.unlink()
+
+
+def bootstrap_block(spec: SharedArraySpec, block: int, iterations: int, entropy: int, max_memory_mb: int) -> np.ndarray:
+    """
+    Resample means of block `block` of a sharded bootstrap of the shared scores, drawn from its child seed.
+    """
+    name, shape, dtype = spec
+    memory = SharedMemory(name=name)
+    try:
+        scores: np.ndarray = np.ndarray(shape, dtype=dtype, buffer=memory.buf)
+        rng = np.random.default_rng(np.random.SeedSequence(entropy, spawn_key=(block,)))
+        means = bootstrap_means(scores, iterations=iterations, rng=rng, max_memory_mb=max_memory_mb)
+        del scores
+    finally:
+        memory.close()
+    return means
+
+
+class ShardedResampler:
+    """
+    `Resampler` running bootstrap resampling across a process pool in blocks of `block_iterations`.
+
+    Resampling smaller than `min_work` (iterations x samples) is drawn in process by `resample_means`. Blocks run
+    blocking on the pool, so call it from a thread rather than the event loop.
+    """
+
+    def __init__(self, executor: Executor, min_work: int, block_iterations: int):
+        self.executor = executor
+        self.min_work = min_work
+        self.block_iterations = block_iterations
+
+    def __call__(self, scores: np.ndarray, iterations: int, seed: Optional[int], max_memory_mb: int = 256) -> np.ndarray:
+        scores = np.asarray(scores, dtype=float)
+        if scores.shape[-1] * iterations < self.min_work:
+            return resample_means(scores, iterations, seed, max_memory_mb)
+        entropy = cast(int, np.random.SeedSequence(seed).entropy)  # An int when seeded with an int or None
+        with SharedArray(scores) as shared:
+            futures = [
+                self.executor.submit(
+                    bootstrap_block, shared.spec, block, min(self.block_iterations, iterations - start), entropy,
+                    max_memory_mb,
+                )
+                for block, start in enumerate(range(0, iterations, self.block_iterations))
+            ]
+            return np.concatenate([future.result() for future in futures], axis=-1)
+
+
+def _is_sharded(evaluators: Sequence[Evaluator], samples: int) -> bool:
+    iterations = [
+        evaluator.config.metric.bootstrap_iterations
+        for evaluator in evaluators if evaluator.config.metric.ci_method == CIComputationMethod.bootstrap
+    ]
+    return bool(iterations) and samples * max(iterations) >= settings.EVAL_SCORING_SHARD_MIN_WORK
+
+
+def _sharded_resampler() -> ShardedResampler:
+    return ShardedResampler(
+        get_scoring_pool(),
+        min_work=settings.EVAL_SCORING_SHARD_MIN_WORK,
+        block_iterations=settings.EVAL_SCORING_SHARD_ITERATIONS,
+    )
+
+
+async def asummarize_suite(evaluators: List[Evaluator], scores: np.ndarray) -> Dict[str, BatchEvaluationResult]:
+    """
+    `summarize_suite` off the event loop: in one worker, or sharded across the pool for large bootstrap work.
+    """
+    loop = asyncio.get_running_loop()
+    if not _is_sharded(evaluators, scores.shape[-1]):
+        config_jsons = [evaluator.config.model_dump_json() for evaluator in evaluators]
+        return await loop.run_in_executor(get_scoring_pool(), summarize_suite, config_jsons, scores)
+    suite = EvaluatorSuite(evaluators)
+    by_name = {evaluator.config.name: row for evaluator, row in zip(evaluators, scores)}
+    return await loop.run_in_executor(None, partial(suite.summarize, by_name, resample=_sharded_resampler()))
+
+
+async def acompare_suite(
+    evaluators: List[Evaluator], scores: np.ndarray, correction: MultipleComparisonCorrection
+) -> Dict[str, List[Tuple[int, int, ComparisonResult]]]:
+    """
+    `compare_suite` off the event loop: in one worker, or sharded across the pool for large bootstrap work.
+    """
+    loop = asyncio.get_running_loop()
+    if not _is_sharded(evaluators, scores.shape[1]):
+        config_jsons = [evaluator.config.model_dump_json() for evaluator in evaluators]
+        return await loop.run_in_executor(get_scoring_pool(), compare_suite, config_jsons, scores, correction)
+
+    resample = _sharded_resampler()
+
+    def compare() -> Dict[str, List[Tuple[int, int, ComparisonResult]]]:
+        return {
+            evaluator.config.name: compare_teams(evaluator, matrix, correction=correction, resample=resample)
+            for evaluator, matrix in zip(evaluators, scores)
+        }
+
+    return await loop.run_in_executor(None, compare)
+
+
+def get_scoring_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=settings.EVAL_JOB_SCORING_WORKERS, initializer=_preload_worker)
+    return _pool
+
+
+def shutdown_scoring_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=True, cancel_futures=True)
+        _pool = None
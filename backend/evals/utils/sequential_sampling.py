@@ -0,0 +1,131 @@
+"""
+Sequential sampling for evaluation jobs.
+
+A sequentially sampled job runs its items in a seeded random order, so that the items run so far are always a random
+sample of the dataset, and a `SequentialStopper` decides after each chunk whether the estimates are good enough to
+stop. This saves most of the team runs and judge calls when a dataset is much larger than the precision needed.
+
+Stopping is checked at looks spaced geometrically (each with at least `LOOK_GROWTH` times the items of the previous
+one), which keeps the number of looks logarithmic in the dataset size. The margin of error target bounds precision
+and is checked at the nominal confidence. The significance target is a test, and testing at every look would inflate
+false positives, so the j-th look spends alpha * 6 / (pi^2 j^2) of the error budget; these sum to alpha over all looks.
+"""
+import math
+from collections import defaultdict
+from itertools import combinations
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+
+import numpy as np
+
+from backend.evals.evaluators._base_evaluator import Evaluator
+from backend.evals.schema import SequentialSamplingConfig
+
+LOOK_GROWTH = 1.5
+
+
+class SequentialStopper:
+    """
+    Collects the per-item scores of a sequentially sampled job and checks its stopping targets.
+
+    `state` is the job's `sampling_state`, from which the look schedule continues when a job resumes.
+    """
+
+    def __init__(
+        self,
+        config: SequentialSamplingConfig,
+        evaluators: List[Evaluator],
+        team_ids: List[UUID],
+        state: Optional[Dict[str, Any]] = None,
+    ):
+        self.config = config
+        self.evaluators = evaluators
+        self.team_ids = [str(team_id) for team_id in team_ids]
+        self.looks: int = (state or {}).get("looks", 0)
+        self.last_look_items: int = (state or {}).get("last_look_items", 0)
+        self._items: set = set()
+        self._scores: Dict[Tuple[str, str], Dict[str, float]] = defaultdict(dict)  # (team, evaluator) -> item -> score
+
+    def add(self, item_id: Any, team_id: Any, scores: Dict[str, Optional[float]]) -> None:
+        self._items.add(str(item_id))
+        for name, score in scores.items():
+            if score is not None:
+                self._scores[(str(team_id), name)][str(item_id)] = score
+
+    @property
+    def item_count(self) -> int:
+        return len(self._items)
+
+    def look_due(self) -> bool:
+        return self.item_count >= self.config.min_samples and self.item_count >= self.last_look_items * LOOK_GROWTH
+
+    def look(self) -> Tuple[Optional[str], Dict[str, Any]]:
+        """
+        Check the targets. Returns the target that was met (`None` to continue) and the state to persist.
+        """
+        self.looks += 1
+        self.last_look_items = self.item_count
+        estimates, precise = self._estimates()
+        comparisons, significant = self._comparisons()
+
+        reason = None
+        if self.config.margin_of_error is not None and precise:
+            reason = "margin_of_error"
+        elif self.config.stop_on_significance and significant:
+            reason = "significance"
+        return reason, {
+            "looks": self.looks,
+            "last_look_items": self.last_look_items,
+            "estimates": estimates,
+            "comparisons": comparisons,
+        }
+
+    def _estimates(self) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        Each team's estimate per evaluator, and whether all of them meet the margin of error.
+        """
+        target = self.config.margin_of_error
+        estimates, precise = [], True
+        for evaluator in self.evaluators:
+            name = evaluator.config.name
+            for team_id in self.team_ids:
+                values = np.fromiter(self._scores[(team_id, name)].values(), dtype=float)
+                estimate: Dict[str, Any] = {"team_id": team_id, "metric_name": name, "sample_size": len(values)}
+                if len(values) < self.config.min_samples:
+                    precise = False
+                if len(values) > 1:
+                    summary = evaluator.summarize_scores(values, confidence=self.config.confidence)
+                    lower, upper = summary.confidence_interval # type: ignore[misc]
+                    margin = (upper - lower) / 2
+                    estimate.update(mean=float(summary.mean), confidence_interval=[float(lower), float(upper)])
+                    if target is not None:
+                        precise = precise and margin <= target
+                        # Interval widths shrink with the square root of the sample size
+                        estimate["required_samples"] = max(len(values), math.ceil(len(values) * (margin / target) ** 2))
+                estimates.append(estimate)
+        return estimates, precise
+
+    def _comparisons(self) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        Paired differences between every two teams per evaluator, and whether all of them are significant.
+        """
+        alpha = (1 - self.config.confidence) * 6 / (math.pi ** 2 * self.looks ** 2)
+        comparisons, significant = [], len(self.team_ids) > 1
+        for evaluator in self.evaluators:
+            name = evaluator.config.name
+            for team_a, team_b in combinations(self.team_ids, 2):
+                scores_a, scores_b = self._scores[(team_a, name)], self._scores[(team_b, name)]
+                differences = np.array([scores_a[item] - scores_b[item] for item in scores_a.keys() & scores_b.keys()])
+                comparison: Dict[str, Any] = {
+                    "metric_name": name, "team_ids": [team_a, team_b], "sample_size": len(differences)
+                }
+                is_significant = False
+                if len(differences) >= self.config.min_samples:
+                    summary = evaluator.summarize_scores(differences, confidence=1 - alpha)
+                    lower, upper = summary.confidence_interval # type: ignore[misc]
+                    is_significant = bool(lower > 0 or upper < 0)
+                    comparison.update(difference=float(summary.mean), confidence_interval=[float(lower), float(upper)])
+                comparison["significant"] = is_significant
+                significant = significant and is_significant
+                comparisons.append(comparison)
+        return comparisons, significant
@@ -1,9 +1,11 @@
 from fastapi import APIRouter
 from backend.proxy.api.v1.endpoints import (
     auth,
-    chat
+    chat,
+    errors
 )
 
 api_router = APIRouter()
 api_router.include_router(chat.router, prefix="/chat", tags=["chat"])
 api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
+api_router.include_router(errors.router, prefix="/errors", tags=["errors"])
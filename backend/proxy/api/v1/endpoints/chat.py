@@ -1,19 +1,29 @@
-from fastapi import APIRouter, Depends
-from fastapi.responses import JSONResponse
+import asyncio
+import time
+from typing import Any, List
+from fastapi import APIRouter, Depends, Header, HTTPException, Request
+from fastapi.responses import JSONResponse, StreamingResponse
 from openai.types.chat import completion_create_params
 from litellm.types.utils import ModelResponse
 from fastapi_pagination import Params
 from uuid import UUID
 import litellm
 
-from backend.common.deps.service_deps import get_current_api_key
+from backend.common.db.session import SessionLocal
+from backend.common.deps.service_deps import get_current_api_key, get_request_context
 from backend.common.models.m2m_client_model import APIKey
-from backend.proxy.crud import stub_response, stub_replay
+from backend.proxy.core.config import settings
+from backend.proxy.models import LatencyDistribution
+from backend.proxy.crud import stub_response, stub_replay, stub_fault_profile, _compute_request_hash, _normalize
 from backend.proxy.schema import (
     ILLMStubRequestResponseCreate,
     ILLMStubRequestResponseRead,
     ILLMStubReplaySequenceCreate,
-    ILLMStubReplaySequenceRead
+    ILLMStubReplaySequenceRead,
+    ILLMStubFaultProfileCreate,
+    ILLMStubFaultProfileRead,
+    ILLMStubFaultProfileUpdate,
+    validate_latency_params,
 )
 from backend.common.utils.exceptions import (
     IdNotFoundException,
@@ -22,8 +32,16 @@ from backend.common.schemas.response_schema import (
     IGetResponseBase,
     IGetResponsePaginated,
     IPostResponseBase,
+    IPutResponseBase,
     create_response,
 )
+from backend.proxy.utils.error_recorder import error_recorder
+from backend.proxy.utils.fault_profile import fault_profiles, is_injected_fault
+from backend.proxy.utils.recorder import ProxyMode, resolve_proxy_mode, stub_recorder
+from backend.proxy.utils.stub_fixtures import aprepare_stub_batches, dump_stub_record
+from backend.proxy.utils.stub_index import stub_index
+from backend.proxy.utils.stub_matching import INDEXED_STRATEGIES
+from backend.proxy.utils.streaming import relay_provider_stream, stream_stub_response
 from openai import OpenAIError
 
 router = APIRouter()
@@ -59,66 +77,191 @@ stock_response = ModelResponse.model_validate(
 
 STUB_API_PREFIX = "stub_"
 
-@router.post("/completions")
+async def get_caller_tenant_id(context: dict = Depends(get_request_context)) -> UUID | None:
+    """
+    Tenant of the caller, from the `X-Tenant-ID` header set by the gateway.
+    """
+    if not context["tenant_id"]:
+        return None
+    try:
+        return UUID(context["tenant_id"])
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid X-Tenant-ID header.")
+
+@router.post("/completions", response_model=ModelResponse)
 async def create_completions(
-    params: completion_create_params.CompletionCreateParamsNonStreaming,
-    api_key: APIKey = Depends(get_current_api_key)
-) -> ModelResponse:
+    params: completion_create_params.CompletionCreateParams,
+    api_key: APIKey = Depends(get_current_api_key),
+    x_proxy_mode: ProxyMode | None = Header(None, alias="X-Proxy-Mode"),
+    x_replay_latency: bool | None = Header(None, alias="X-Proxy-Replay-Latency"),
+    tenant_id: UUID | None = Depends(get_caller_tenant_id),
+) -> ModelResponse | StreamingResponse | JSONResponse:
     model_name = params["model"]
+    # Materialise validated iterables (e.g. `messages`) once so they can be hashed and forwarded
+    request_params: dict = _normalize(params)
+    proxy_mode = resolve_proxy_mode(api_key, x_proxy_mode)
+    stream = bool(request_params.get("stream"))
 
     try:
+        if proxy_mode == ProxyMode.replay:
+            replay_latency = settings.PROXY_REPLAY_LATENCY if x_replay_latency is None else x_replay_latency
+            return _completion_response(
+                await _replay_completion(request_params, replay_latency=replay_latency, tenant_id=tenant_id), stream
+            )
+
+        if proxy_mode == ProxyMode.record:
+            started = time.perf_counter()
+            completion = await litellm.acompletion(
+                **request_params
+            )
+            provider = (
+                getattr(completion, "_hidden_params", {}).get("custom_llm_provider")
+                or getattr(completion, "custom_llm_provider", None)
+            )
+            if stream:
+                # Recorded once the provider has finished, and replayed as a stream of the assembled response
+                def record_stream(chunks: List[Any]) -> None:
+                    stub_recorder.record_stream(
+                        request_params=request_params,
+                        chunks=chunks,
+                        latency_ms=(time.perf_counter() - started) * 1000,
+                        provider=provider,
+                        tenant_id=tenant_id,
+                    )
+                return StreamingResponse(
+                    relay_provider_stream(completion, on_complete=record_stream), media_type="text/event-stream"
+                )
+            stub_recorder.record(
+                request_params=request_params,
+                response=completion,
+                latency_ms=(time.perf_counter() - started) * 1000,
+                provider=provider,
+                tenant_id=tenant_id,
+            )
+            return completion
+
         stub_resp = None
+        chunk_delay_ms = 0.0
         if model_name.startswith(STUB_API_PREFIX):
+            # Latency and errors from the model's fault profile, if any
+            injector = await fault_profiles.get(model_name)
+            if injector:
+                await injector.apply()
+                chunk_delay_ms = injector.chunk_delay_ms
+
             # Priority 1: Sequence replay
             stub_resp = await stub_replay.get_next_response_by_model(model=model_name)
 
-            if not stub_resp:
-                # Priority 2: Stubbed request/response
-                stub_resp = await stub_response.get_response_by_request(
-                    model=model_name,
-                    request_body=params,
+            # The caller's own stubs come before stubs shared by all tenants
+            request_hash = _compute_request_hash(request_params)
+            for owner in dict.fromkeys([tenant_id, None]):
+                if stub_resp:
+                    break
+                # Priority 2: In-memory stub index (fixture packs, regex and nearest-neighbour stubs)
+                entry = stub_index.match(
+                    model=model_name, request_params=request_params, request_hash=request_hash, tenant_id=owner
                 )
+                stub_resp = entry["response"] if entry else None
+
+                if not stub_resp:
+                    # Priority 3: Stubbed request/response
+                    stub_resp = await stub_response.get_response_by_request(
+                        model=model_name,
+                        request_body=request_params,
+                        tenant_id=owner,
+                    )
 
         if stub_resp:
-            return ModelResponse.model_validate(stub_resp)
+            return _completion_response(ModelResponse.model_validate(stub_resp), stream, chunk_delay_ms)
 
         if USE_STOCK_RESPONSE:
-            # Priority 3: Stock response
-            return stock_response
+            # Priority 4: Stock response
+            return _completion_response(stock_response, stream, chunk_delay_ms)
 
         completion = await litellm.acompletion(
-            **params
+            **request_params
         )
+        if stream:
+            return StreamingResponse(relay_provider_stream(completion), media_type="text/event-stream")
         return completion
 
     except OpenAIError as e:
-        return JSONResponse(
-            status_code=getattr(e, "status_code", 500),
-            content={
-                "error": {
-                    "message": getattr(e, "message", str(e)),
-                    "type": type(e).__name__,
-                    "param": getattr(e, "param", None),
-                    "code": getattr(e, "code", None),
-                    "body": getattr(e, "body", None),
-                }
-            },
-        )
+        status_code = getattr(e, "status_code", 500)
+        error = {
+            "message": getattr(e, "message", str(e)),
+            "type": type(e).__name__,
+            "param": getattr(e, "param", None),
+            "code": getattr(e, "code", None),
+            "body": getattr(e, "body", None),
+        }
+        # Faults injected by stub fault profiles are synthetic and would drown the provider errors
+        if not is_injected_fault(e):
+            error_recorder.record(
+                provider=getattr(e, "llm_provider", None),
+                model=model_name,
+                error_type=type(e).__name__,
+                error_message=getattr(e, "message", str(e)),
+                status_code=status_code,
+                payload=error,
+            )
+        return JSONResponse(status_code=status_code, content={"error": error})
+
+def _completion_response(
+    response: ModelResponse, stream: bool, chunk_delay_ms: float = 0.0
+) -> ModelResponse | StreamingResponse:
+    if stream:
+        return StreamingResponse(stream_stub_response(response, chunk_delay_ms), media_type="text/event-stream")
+    return response
+
+async def _replay_completion(params: dict, replay_latency: bool, tenant_id: UUID | None = None) -> ModelResponse:
+    """
+    Serve a recorded response from the stub index, falling back to the stub table.
+
+    Recordings of the caller's tenant come first, then recordings shared by all tenants.
+    """
+    model_name = params["model"]
+    request_hash = _compute_request_hash(params)
+    owners = list(dict.fromkeys([tenant_id, None]))
+    entry = None
+    for owner in owners:
+        entry = stub_index.get(model=model_name, request_hash=request_hash, tenant_id=owner)
+        if entry is not None:
+            break
+
+    if entry is None:
+        for owner in owners:
+            stub = await stub_response.get_by_request(model=model_name, request_body=params, tenant_id=owner)
+            if stub is not None:
+                break
+        if stub is None:
+            raise HTTPException(status_code=404, detail=f"No recorded response for this '{model_name}' request.")
+        entry = {"response": stub.response, "latency_ms": stub.latency_ms}
+        stub_index.add({"tenant_id": stub.tenant_id, "model": model_name, "request_hash": request_hash, **entry})
+
+    if replay_latency and entry["latency_ms"]:
+        await asyncio.sleep(entry["latency_ms"] / 1000)
+    return ModelResponse.model_validate(entry["response"])
 
 @router.post("/completions/stub")
 async def create_stub_completion_response(
     data: ILLMStubRequestResponseCreate,
     api_key: APIKey = Depends(get_current_api_key),
+    tenant_id: UUID | None = Depends(get_caller_tenant_id),
 ) -> IPostResponseBase[ILLMStubRequestResponseCreate]:
     """
-    Create a stubbed LLM completion entry for a specific model/provider/request.
+    Create a stubbed LLM completion entry for a specific model/provider/request, owned by the caller's tenant.
 
     This is used for replay/testing purposes.
     """
     if not data.model or not data.model.startswith(STUB_API_PREFIX):
         raise ValueError("Stub replay sequence models must start with 'stub'.")
+    if data.tenant_id not in (None, tenant_id):
+        raise HTTPException(status_code=403, detail="Stubs can only be created for your own tenant.")
+    data.tenant_id = tenant_id
 
     stub = await stub_response.create(obj_in=data)
+    if stub.match_strategy in INDEXED_STRATEGIES:
+        stub_index.add(stub.model_dump())
     return create_response(data=stub, message="Stub created.") # type: ignore
 
 @router.get("/completions/stubs", response_model=IGetResponsePaginated[ILLMStubRequestResponseRead])
@@ -129,6 +272,54 @@ async def get_stubs(
     stubs = await stub_response.get_multi_paginated(params=params)
     return create_response(data=stubs) # type: ignore
 
+@router.post("/completions/stubs/import")
+async def import_stubs(
+    request: Request,
+    api_key: APIKey = Depends(get_current_api_key),
+    tenant_id: UUID | None = Depends(get_caller_tenant_id),
+) -> IPostResponseBase[dict]:
+    """
+    Bulk create or update stubs of the caller's tenant from an NDJSON body, one `ILLMStubRequestResponseCreate` per
+    line.
+
+    Lines are hashed in a worker pool and upserted on their stub key (tenant, model and request) with multi-row
+    inserts in one transaction. Lines naming another tenant are rejected.
+    """
+    db_session = stub_response.get_db_session()
+    imported = 0
+    indexed: List[dict] = []
+    try:
+        async for records in aprepare_stub_batches(request.stream(), settings.STUB_IMPORT_BATCH_SIZE, tenant_id):
+            imported += await stub_response.bulk_upsert(records=records, db_session=db_session)
+            indexed.extend(r for r in records if r["match_strategy"] in INDEXED_STRATEGIES)
+        await db_session.commit()
+    except ValueError as e:
+        await db_session.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+
+    for record in indexed:
+        stub_index.add(record)
+
+    return create_response(data={"imported": imported}, message="Stubs imported.") # type: ignore
+
+@router.get("/completions/stubs/export")
+async def export_stubs(
+    model: str | None = None,
+    api_key: APIKey = Depends(get_current_api_key),
+) -> StreamingResponse:
+    """
+    Stream all stubs (optionally for one model) as NDJSON, in the format accepted by the import endpoint.
+    """
+    async def generate():
+        # The request-scoped session is closed before the body is streamed, so use a dedicated one
+        async with SessionLocal() as db_session:
+            async for stub in stub_response.stream_all(
+                model=model, batch_size=settings.STUB_IMPORT_BATCH_SIZE, db_session=db_session
+            ):
+                yield dump_stub_record(stub)
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
 @router.get("/completions/stubs/{stub_id}", response_model=IGetResponseBase[ILLMStubRequestResponseRead])
 async def get_stub_by_id(
     stub_id: str,
@@ -155,6 +346,7 @@ async def delete_stub(
         raise IdNotFoundException(ILLMStubRequestResponseRead, stub_id)
 
     stub = await stub_response.remove(id=stub_id)
+    stub_index.remove(stub.model_dump())
     return create_response(data=stub, message="Stub deleted.") # type: ignore
 
 @router.post("/completions/stub_sequences", response_model=IPostResponseBase[ILLMStubReplaySequenceRead])
@@ -206,3 +398,84 @@ async def reset_stub_replay_sequence(
     if not sequence:
         raise IdNotFoundException(ILLMStubReplaySequenceRead, sequence_id)
     return create_response(data=sequence, message="Stub replay sequence reset.") # type: ignore
+
+@router.post("/completions/fault_profiles", response_model=IPostResponseBase[ILLMStubFaultProfileRead])
+async def create_stub_fault_profile(
+    data: ILLMStubFaultProfileCreate,
+    api_key: APIKey = Depends(get_current_api_key),
+):
+    """
+    Attach a latency/error profile to a stub model.
+    """
+    if not data.model.startswith(STUB_API_PREFIX):
+        raise HTTPException(status_code=400, detail="Fault profiles can only be attached to 'stub_' models.")
+
+    profile = await stub_fault_profile.create(obj_in=data)
+    fault_profiles.invalidate(profile.model)
+    return create_response(data=profile, message="Stub fault profile created.")
+
+@router.get("/completions/fault_profiles")
+async def get_stub_fault_profiles(
+    params: Params = Depends(),
+    api_key: APIKey = Depends(get_current_api_key),
+) -> IGetResponsePaginated[ILLMStubFaultProfileRead]:
+    profiles = await stub_fault_profile.get_multi_paginated(params=params)
+    return create_response(data=profiles) # type: ignore
+
+@router.put("/completions/fault_profiles/{profile_id}")
+async def update_stub_fault_profile(
+    profile_id: UUID,
+    data: ILLMStubFaultProfileUpdate,
+    api_key: APIKey = Depends(get_current_api_key),
+) -> IPutResponseBase[ILLMStubFaultProfileRead]:
+    profile = await stub_fault_profile.get(id=profile_id)
+    if not profile:
+        raise IdNotFoundException(ILLMStubFaultProfileRead, profile_id)
+    try:
+        validate_latency_params(
+            data.latency_distribution or profile.latency_distribution,
+            data.latency_params if data.latency_params is not None else profile.latency_params,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    profile = await stub_fault_profile.update(obj_current=profile, obj_new=data)
+    fault_profiles.invalidate(profile.model)
+    return create_response(data=profile, message="Stub fault profile updated.") # type: ignore
+
+@router.post("/completions/fault_profiles/{profile_id}/calibrate")
+async def calibrate_stub_fault_profile(
+    profile_id: UUID,
+    source_model: str,
+    api_key: APIKey = Depends(get_current_api_key),
+) -> IPutResponseBase[ILLMStubFaultProfileRead]:
+    """
+    Replay the latency percentiles recorded for `source_model` (see record mode) on this stub model.
+    """
+    profile = await stub_fault_profile.get(id=profile_id)
+    if not profile:
+        raise IdNotFoundException(ILLMStubFaultProfileRead, profile_id)
+
+    percentiles = await stub_fault_profile.get_recorded_latency_percentiles(model=source_model)
+    if not percentiles:
+        raise HTTPException(status_code=400, detail=f"Not enough recorded latencies for model '{source_model}'.")
+
+    profile = await stub_fault_profile.update(
+        obj_current=profile,
+        obj_new={"latency_distribution": LatencyDistribution.recorded, "latency_params": percentiles},
+    )
+    fault_profiles.invalidate(profile.model)
+    return create_response(data=profile, message="Stub fault profile calibrated.") # type: ignore
+
+@router.delete("/completions/fault_profiles/{profile_id}")
+async def delete_stub_fault_profile(
+    profile_id: UUID,
+    api_key: APIKey = Depends(get_current_api_key),
+) -> IGetResponseBase[ILLMStubFaultProfileRead]:
+    profile = await stub_fault_profile.get(id=profile_id)
+    if not profile:
+        raise IdNotFoundException(ILLMStubFaultProfileRead, profile_id)
+
+    profile = await stub_fault_profile.remove(id=profile_id)
+    fault_profiles.invalidate(profile.model)
+    return create_response(data=profile, message="Stub fault profile deleted.") # type: ignore
@@ -0,0 +1,60 @@
+from datetime import datetime
+from typing import List
+from uuid import UUID
+
+from fastapi import APIRouter, Depends
+from fastapi_pagination import Params
+
+from backend.common.deps.service_deps import get_current_api_key
+from backend.common.models.m2m_client_model import APIKey
+from backend.common.schemas.response_schema import (
+    IGetResponseBase,
+    IGetResponsePaginated,
+    create_response,
+)
+from backend.proxy.crud import llm_error_log
+from backend.proxy.schema import ILLMErrorLogList, ILLMErrorSummary
+
+router = APIRouter()
+
+@router.get("")
+async def get_errors(
+    tenant_id: UUID | None = None,
+    provider: str | None = None,
+    model: str | None = None,
+    error_type: str | None = None,
+    start_date: datetime | None = None,
+    end_date: datetime | None = None,
+    params: Params = Depends(),
+    api_key: APIKey = Depends(get_current_api_key),
+) -> IGetResponsePaginated[ILLMErrorLogList]:
+    """
+    List aggregated LLM errors, most recent window first.
+    """
+    errors = await llm_error_log.get_filtered_errors(
+        tenant_id=tenant_id,
+        provider=provider,
+        model=model,
+        error_type=error_type,
+        start_date=start_date,
+        end_date=end_date,
+        params=params,
+    )
+    return create_response(data=errors) # type: ignore
+
+@router.get("/summary")
+async def get_error_summary(
+    tenant_id: UUID | None = None,
+    provider: str | None = None,
+    model: str | None = None,
+    start_date: datetime | None = None,
+    end_date: datetime | None = None,
+    api_key: APIKey = Depends(get_current_api_key),
+) -> IGetResponseBase[List[ILLMErrorSummary]]:
+    """
+    Error totals per provider, model, error type and status code.
+    """
+    summary = await llm_error_log.get_error_summary(
+        tenant_id=tenant_id, provider=provider, model=model, start_date=start_date, end_date=end_date
+    )
+    return create_response(data=summary) # type: ignore
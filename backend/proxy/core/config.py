@@ -9,4 +9,26 @@ class ServiceSettings(Settings):
     )
     SERVICE_NAME: str = "proxy"
 
+    # Bulk stub import/export
+    STUB_IMPORT_BATCH_SIZE: int = 1000
+    STUB_IMPORT_WORKERS: int = 4
+    STUB_FIXTURE_PATH: str | None = None  # NDJSON file or directory loaded into the stub index at startup
+    STUB_NN_MIN_SIMILARITY: float = 0.8  # Minimum cosine similarity for `nearest_neighbour` stubs
+
+    # Record-and-replay
+    PROXY_MODE_BY_API_KEY: dict[str, str] = {}  # API key name -> "passthrough" | "record" | "replay"
+    PROXY_REPLAY_LATENCY: bool = False  # Reproduce recorded latencies in replay mode
+    RECORDER_BATCH_SIZE: int = 200
+    RECORDER_FLUSH_INTERVAL: float = 1.0  # Seconds
+    RECORDER_MAX_PENDING: int = 10000
+
+    # Stub fault profiles
+    FAULT_PROFILE_CACHE_TTL: float = 30.0  # Seconds before a changed profile is picked up by other workers
+
+    # Aggregated LLM error log
+    ERROR_LOG_WINDOW: float = 60.0  # Seconds identical errors are aggregated into one row
+    ERROR_LOG_FLUSH_INTERVAL: float = 5.0  # Seconds
+    ERROR_LOG_MAX_SAMPLES: int = 5  # Sample payloads kept per aggregated row
+    ERROR_LOG_MAX_GROUPS: int = 10000  # Distinct open aggregates before new kinds of errors are dropped
+
 settings = ServiceSettings()
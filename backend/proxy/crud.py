@@ -1,25 +1,33 @@
 from uuid import UUID
 import json
-from sqlmodel import select, func
+from fastapi import HTTPException
+from sqlalchemy import exc
+from sqlmodel import col, select, func
 from sqlmodel.ext.asyncio.session import AsyncSession
 from fastapi_pagination import Params, Page
 from backend.common.crud.base_crud import CRUDBase
-from backend.proxy.models import LLMAPIKey, LLMUsage, LLMErrorLog, LLMStubReplaySequence, LLMStubRequestResponse
+from backend.proxy.models import (
+    LLMAPIKey, LLMUsage, LLMErrorLog, LLMStubReplaySequence, LLMStubRequestResponse, LLMStubFaultProfile, MatchStrategy
+)
 from backend.proxy.schema import (
     ILLMAPIKeyCreate, ILLMAPIKeyUpdate, ILLMAPIKeyRead,
     ILLMUsageCreate, ILLMUsageUpdate, ILLMUsageList,
     ILLMErrorLogCreate, ILLMErrorUpdate, ILLMErrorLogList,
     ILLMStubReplaySequenceCreate, ILLMStubReplaySequenceUpdate, ILLMStubReplaySequenceRead,
-    ILLMStubRequestResponseCreate, ILLMStubRequestResponseUpdate, ILLMStubRequestResponseRead
+    ILLMStubRequestResponseCreate, ILLMStubRequestResponseUpdate, ILLMStubRequestResponseRead,
+    ILLMStubFaultProfileCreate, ILLMStubFaultProfileUpdate, ILLMStubFaultProfileRead
 )
 from datetime import datetime
 from backend.common.schemas.common_schema import IOrderEnum
 from litellm.types.utils import ModelResponse
 import hashlib
-from openai.types.chat import completion_create_params
-from typing import Any
+import statistics
+from typing import Any, AsyncIterator, Dict, List
 from collections.abc import Mapping
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from backend.proxy.utils.exceptions import SerializedException, raise_from_serialized_exception
+from backend.proxy.utils.stub_matching import request_match_keys, stub_match_key
 from pydantic import ValidationError
 
 
@@ -173,31 +181,89 @@ class CRUDLLMErrorLog(CRUDBase[LLMErrorLog, ILLMErrorLogCreate, ILLMErrorUpdate,
         tenant_id: UUID | None = None,
         api_key_id: UUID | None = None,
         provider: str | None = None,
+        model: str | None = None,
+        error_type: str | None = None,
         start_date: datetime | None = None,
         end_date: datetime | None = None,
         params: Params | None = Params(),
         db_session: AsyncSession | None = None
     ) -> Page[ILLMErrorLogList]:
         """
-        Returns paginated LLM error logs filtered by tenant_id, api_key_id, provider, and date range.
+        Returns paginated LLM error logs filtered by tenant_id, api_key_id, provider, model, error type and date range.
+
+        Each row aggregates the identical errors of one time window, see `occurrence_count`.
         """
         db_session = db_session or self.get_db_session()
-        query = select(LLMErrorLog)
+        query = self._filter_errors(
+            select(LLMErrorLog), tenant_id=tenant_id, api_key_id=api_key_id, provider=provider, model=model,
+            error_type=error_type, start_date=start_date, end_date=end_date,
+        ).order_by(LLMErrorLog.timestamp.desc()) # type: ignore
+
+        return await self.get_multi_paginated_ordered(
+            params=params, order_by="timestamp", order=IOrderEnum.descendent, query=query, db_session=db_session # type: ignore
+        )
 
+    async def get_error_summary(
+        self,
+        *,
+        tenant_id: UUID | None = None,
+        provider: str | None = None,
+        model: str | None = None,
+        start_date: datetime | None = None,
+        end_date: datetime | None = None,
+        db_session: AsyncSession | None = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Returns error totals per (provider, model, error_type, status_code), most frequent first.
+        """
+        db_session = db_session or self.get_db_session()
+        total = func.sum(col(LLMErrorLog.occurrence_count)).label("occurrence_count")
+        query = select( # type: ignore
+            LLMErrorLog.provider,
+            LLMErrorLog.model,
+            LLMErrorLog.error_type,
+            LLMErrorLog.status_code,
+            total,
+            func.min(LLMErrorLog.timestamp).label("first_seen"),
+            func.max(func.coalesce(LLMErrorLog.last_seen, LLMErrorLog.timestamp)).label("last_seen"),
+        )
+        query = self._filter_errors(
+            query, tenant_id=tenant_id, provider=provider, model=model, start_date=start_date, end_date=end_date
+        )
+        query = query.group_by(
+            LLMErrorLog.provider, LLMErrorLog.model, LLMErrorLog.error_type, LLMErrorLog.status_code
+        ).order_by(total.desc())
+
+        result = await db_session.execute(query)
+        return [dict(row._mapping) for row in result]
+
+    @staticmethod
+    def _filter_errors(
+        query,
+        *,
+        tenant_id: UUID | None = None,
+        api_key_id: UUID | None = None,
+        provider: str | None = None,
+        model: str | None = None,
+        error_type: str | None = None,
+        start_date: datetime | None = None,
+        end_date: datetime | None = None,
+    ):
         if tenant_id:
             query = query.where(LLMErrorLog.tenant_id == tenant_id)
         if api_key_id:
             query = query.where(LLMErrorLog.api_key_id == api_key_id)
         if provider:
             query = query.where(LLMErrorLog.provider == provider)
+        if model:
+            query = query.where(LLMErrorLog.model == model)
+        if error_type:
+            query = query.where(LLMErrorLog.error_type == error_type)
         if start_date:
             query = query.where(LLMErrorLog.timestamp >= start_date)
         if end_date:
             query = query.where(LLMErrorLog.timestamp <= end_date)
-
-        return await self.get_multi_paginated_ordered(
-            params=params, order_by="timestamp", order=IOrderEnum.descendent, query=query, db_session=db_session # type: ignore
-        )
+        return query
 
 class CRUDLLMStubReplaySequence(CRUDBase[LLMStubReplaySequence, ILLMStubReplaySequenceCreate, ILLMStubReplaySequenceUpdate, ILLMStubReplaySequenceRead]):
     async def get_next_response(
@@ -324,18 +390,34 @@ def _compute_request_hash(request: dict) -> str:
     canonical_json = json.dumps(request, sort_keys=True, separators=(",", ":"), default=str)
     return hashlib.sha256(canonical_json.encode("utf-8")).hexdigest()
 
+def _compute_stub_key(
+    *,
+    tenant_id: UUID | str | None,
+    model: str | None,
+    request_hash: str | None,
+    match_strategy: MatchStrategy = MatchStrategy.canonical_hash,
+    match_pattern: str | None = None,
+) -> str:
+    """
+    Identity of a stub: at most one stub per tenant, model, match strategy, match pattern and request.
+    """
+    identity = json.dumps([
+        str(tenant_id) if tenant_id else None, model, MatchStrategy(match_strategy).value, match_pattern, request_hash
+    ])
+    return hashlib.sha256(identity.encode("utf-8")).hexdigest()
+
 
 class CRUDLLMStubRequestResponse(CRUDBase[LLMStubRequestResponse, ILLMStubRequestResponseCreate, ILLMStubRequestResponseUpdate, ILLMStubRequestResponseRead]):
-    async def get_response_by_request(
+    async def get_by_request(
         self,
         *,
         model: str,
-        request_body: completion_create_params.CompletionCreateParamsNonStreaming,
+        request_body: Dict[str, Any],
         tenant_id: UUID | None = None,
         db_session: AsyncSession | None = None
-    ) -> ModelResponse | None:
+    ) -> LLMStubRequestResponse | None:
         db_session = db_session or self.get_db_session()
-        request_hash = _compute_request_hash(request_body)
+        request_hash = _compute_request_hash(_normalize(request_body))
 
         result = await db_session.execute(
             select(LLMStubRequestResponse)
@@ -343,8 +425,36 @@ class CRUDLLMStubRequestResponse(CRUDBase[LLMStubRequestResponse, ILLMStubReques
             .where(LLMStubRequestResponse.model == model)
             .where(LLMStubRequestResponse.request_hash == request_hash)
         )
-        stub = result.scalar_one_or_none()
-        return stub.response if stub else None
+        return result.scalar_one_or_none()
+
+    async def get_response_by_request(
+        self,
+        *,
+        model: str,
+        request_body: Dict[str, Any],
+        tenant_id: UUID | None = None,
+        db_session: AsyncSession | None = None
+    ) -> ModelResponse | None:
+        """
+        Response of the stub matching a request under any hash-based match strategy.
+
+        All candidate keys are looked up in one indexed query; the most specific strategy wins.
+        """
+        db_session = db_session or self.get_db_session()
+        request_body = _normalize(request_body)
+        match_keys = list(request_match_keys(request_body, _compute_request_hash(request_body)).values())
+
+        result = await db_session.execute(
+            select(col(LLMStubRequestResponse.match_key), col(LLMStubRequestResponse.response))
+            .where(LLMStubRequestResponse.tenant_id == tenant_id)
+            .where(LLMStubRequestResponse.model == model)
+            .where(LLMStubRequestResponse.match_key.in_(match_keys)) # type: ignore
+        )
+        responses = dict(result.tuples().all())
+        for match_key in match_keys:
+            if match_key in responses:
+                return responses[match_key]
+        return None
 
     async def create(
         self,
@@ -357,16 +467,125 @@ class CRUDLLMStubRequestResponse(CRUDBase[LLMStubRequestResponse, ILLMStubReques
         db_obj = LLMStubRequestResponse.model_validate(obj_in)
 
         db_obj.response = db_obj.response.model_dump() if isinstance(db_obj.response, ModelResponse) else db_obj.response
-        db_obj.request_params = _normalize(db_obj.request_params)
-        db_obj.request_hash = _compute_request_hash(db_obj.request_params)
-        db_session.add(db_obj)
-        await db_session.commit()
+        request_params: Dict[str, Any] = _normalize(db_obj.request_params)
+        db_obj.request_params = request_params
+        db_obj.request_hash = _compute_request_hash(request_params)
+        db_obj.match_key = stub_match_key(db_obj.match_strategy, request_params, db_obj.request_hash)
+        db_obj.stub_key = _compute_stub_key(
+            tenant_id=db_obj.tenant_id,
+            model=db_obj.model,
+            request_hash=db_obj.request_hash,
+            match_strategy=db_obj.match_strategy,
+            match_pattern=db_obj.match_pattern,
+        )
+        try:
+            db_session.add(db_obj)
+            await db_session.commit()
+        except exc.IntegrityError:
+            await db_session.rollback()
+            raise HTTPException(
+                status_code=409,
+                detail="A stub for this request already exists. Delete it or re-import it to replace it.",
+            )
         await db_session.refresh(db_obj)
         return db_obj
 
+    async def bulk_upsert(
+        self,
+        *,
+        records: List[Dict[str, Any]],
+        db_session: AsyncSession | None = None,
+    ) -> int:
+        """
+        Multi-row insert of prepared stub records, updating rows that already exist for a `stub_key` (same tenant,
+        model, match strategy, match pattern and request).
+
+        Does not commit so that a whole import runs in a single transaction.
+        """
+        if not records:
+            return 0
+
+        db_session = db_session or self.get_db_session()
+        connection = await db_session.connection()
+        insert = pg_insert if connection.dialect.name == "postgresql" else sqlite_insert
+
+        # A single statement may not upsert the same row twice, so the last record per key wins
+        records = list({record["stub_key"]: record for record in records}.values())
+        stmt = insert(LLMStubRequestResponse).values(records)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["stub_key"],
+            set_={
+                column: stmt.excluded[column]
+                for column in (
+                    "provider", "request_params", "response", "notes", "latency_ms", "match_key", "updated_at",
+                )
+            },
+        )
+        await db_session.execute(stmt)
+        return len(records)
+
+    async def stream_all(
+        self,
+        *,
+        model: str | None = None,
+        match_strategies: List[MatchStrategy] | None = None,
+        batch_size: int = 1000,
+        db_session: AsyncSession | None = None,
+    ) -> AsyncIterator[LLMStubRequestResponse]:
+        """
+        Stream stubs from a server-side cursor, optionally filtered by model and match strategy.
+        """
+        db_session = db_session or self.get_db_session()
+        query = select(LLMStubRequestResponse).order_by(LLMStubRequestResponse.id) # type: ignore
+        if model:
+            query = query.where(LLMStubRequestResponse.model == model)
+        if match_strategies:
+            query = query.where(LLMStubRequestResponse.match_strategy.in_(match_strategies)) # type: ignore
+
+        result = await db_session.stream_scalars(query.execution_options(yield_per=batch_size))
+        async for stub in result:
+            yield stub
+
+class CRUDLLMStubFaultProfile(CRUDBase[LLMStubFaultProfile, ILLMStubFaultProfileCreate, ILLMStubFaultProfileUpdate, ILLMStubFaultProfileRead]):
+    async def get_by_model(
+        self,
+        *,
+        model: str,
+        db_session: AsyncSession | None = None
+    ) -> LLMStubFaultProfile | None:
+        db_session = db_session or self.get_db_session()
+        result = await db_session.execute(
+            select(LLMStubFaultProfile).where(LLMStubFaultProfile.model == model)
+        )
+        return result.scalar_one_or_none()
+
+    async def get_recorded_latency_percentiles(
+        self,
+        *,
+        model: str,
+        db_session: AsyncSession | None = None
+    ) -> Dict[str, float]:
+        """
+        Latency percentiles (p1 to p99) of the responses recorded for a model.
+        """
+        db_session = db_session or self.get_db_session()
+        result = await db_session.execute(
+            select(LLMStubRequestResponse.latency_ms)
+            .where(LLMStubRequestResponse.model == model)
+            .where(LLMStubRequestResponse.latency_ms.is_not(None)) # type: ignore
+        )
+        latencies = result.scalars().all()
+        if len(latencies) < 2:
+            return {}
+
+        cut_points = statistics.quantiles(latencies, n=100, method="inclusive")
+        return {f"p{q}": cut_points[q - 1] for q in (1, 10, 25, 50, 75, 90, 95, 99)}
+
+
 # ✅ Initialize CRUD classes
 api_key = CRUDAPIKey(LLMAPIKey)
 llm_usage = CRUDLLMUsage(LLMUsage)
 llm_error_log = CRUDLLMErrorLog(LLMErrorLog)
 stub_replay = CRUDLLMStubReplaySequence(LLMStubReplaySequence)
 stub_response = CRUDLLMStubRequestResponse(LLMStubRequestResponse)
+stub_fault_profile = CRUDLLMStubFaultProfile(LLMStubFaultProfile)
@@ -10,11 +10,18 @@ from fastapi_cache.backends.redis import RedisBackend
 from sqlalchemy.pool import NullPool, AsyncAdaptedQueuePool
 #from transformers import pipeline
 
+from backend.common.db.session import SessionLocal
 from backend.common.deps.service_deps import get_redis_client
 from backend.proxy.api.v1.api import api_router as api_router_v1
 from backend.common.core.config import ModeEnum
 from backend.proxy.core.config import settings
+from backend.proxy.crud import stub_response
 from backend.common.utils.fastapi_globals import GlobalsMiddleware, g
+from backend.proxy.utils.error_recorder import error_recorder
+from backend.proxy.utils.recorder import stub_recorder
+from backend.proxy.utils.stub_fixtures import load_fixture_pack, shutdown_stub_executor
+from backend.proxy.utils.stub_index import stub_index
+from backend.proxy.utils.stub_matching import INDEXED_STRATEGIES
 
 
 @asynccontextmanager
@@ -22,9 +29,21 @@ async def lifespan(app: FastAPI):
     # Startup
     redis_client = await get_redis_client()
     FastAPICache.init(RedisBackend(redis_client), prefix="fastapi-cache")
+    if settings.STUB_FIXTURE_PATH:
+        load_fixture_pack(settings.STUB_FIXTURE_PATH, stub_index)
+    # Regex and nearest-neighbour stubs are only matched in memory
+    async with SessionLocal() as db_session:
+        async for stub in stub_response.stream_all(match_strategies=list(INDEXED_STRATEGIES), db_session=db_session):
+            stub_index.add(stub.model_dump())
+    stub_recorder.start()
+    error_recorder.start()
     yield
     # shutdown
+    await stub_recorder.stop()
+    await error_recorder.stop()
     await FastAPICache.clear()
+    shutdown_stub_executor()
+    stub_index.clear()
     # models.clear()
     g.cleanup()
     gc.collect()
@@ -80,10 +80,13 @@ class LLMUsage(BaseUUIDModel, LLMUsageBase, table=True):
 class LLMErrorLogBase(SQLModel):
     """
     Logs errors that occur when calling the LLM API.
+
+    Errors recorded by the proxy are aggregated: one row per (provider, model, error_type, status_code) and time
+    window, with `timestamp` the first and `last_seen` the last occurrence in the window.
     """
-    tenant_id: UUID = Field(nullable=False)  # Required for multi-tenancy
-    user_id: UUID = Field(default=None, nullable=True)  # Optional, per user
-    group_id: UUID = Field(default=None, nullable=True)  # Optional, per group
+    tenant_id: Optional[UUID] = Field(default=None, nullable=True)  # Unknown for errors recorded by the proxy
+    user_id: Optional[UUID] = Field(default=None, nullable=True)  # Optional, per user
+    group_id: Optional[UUID] = Field(default=None, nullable=True)  # Optional, per group
     api_key_id: Optional[UUID] = Field(
         default=None,
         sa_column=Column(ForeignKey("LLMAPIKey.id", ondelete="CASCADE"), index=True)
@@ -93,19 +96,24 @@ class LLMErrorLogBase(SQLModel):
     provider: str = Field(nullable=False)  # Which LLM provider (e.g., OpenAI, Anthropic)
     model: str = Field(nullable=False)  # Which model was used (e.g., GPT-4, Claude-2)
     request_id: UUID = Field(nullable=False, index=True)  # Unique request identifier
-    vendor_request_id: str = Field(sa_column=Column(String, index=True, nullable=True))  # LLM API request ID
-    batch_job_id: str = Field(sa_column=Column(String, index=True, nullable=True))  # If part of batch processing
+    vendor_request_id: Optional[str] = Field(default=None, sa_column=Column(String, index=True, nullable=True))  # LLM API request ID
+    batch_job_id: Optional[str] = Field(default=None, sa_column=Column(String, index=True, nullable=True))  # If part of batch processing
 
     # Error Details
     error_type: str = Field(nullable=False)  # Type of error (e.g., Timeout, InvalidResponse)
     error_message: str = Field(nullable=False)  # Detailed error message
-    status_code: int = Field(default=None, nullable=True)  # HTTP status code (if applicable)
-    response_data: str = Field(default=None, sa_column=Column(String, nullable=True))  # Raw response (if relevant)
+    status_code: Optional[int] = Field(default=None, nullable=True)  # HTTP status code (if applicable)
+    response_data: Optional[str] = Field(default=None, sa_column=Column(String, nullable=True))  # Raw response (if relevant)
     timestamp: datetime = Field(
         default_factory=lambda: datetime.now(timezone.utc),
         sa_column=Column(DateTime(timezone=True), nullable=False, index=True),
     )
 
+    # Aggregation
+    occurrence_count: int = Field(default=1, nullable=False)
+    last_seen: Optional[datetime] = Field(default=None, sa_column=Column(DateTime(timezone=True), nullable=True))
+    sample_payloads: List[str] = Field(default_factory=list, sa_column=Column(JSON, nullable=True))
+
 class LLMErrorLog(BaseUUIDModel, LLMErrorLogBase, table=True):
     api_key_id: UUID = Field(
         sa_column=Column(ForeignKey("LLMAPIKey.id", ondelete="CASCADE"), index=True)
@@ -133,6 +141,10 @@ class LLMStubReplaySequence(LLMStubReplaySequenceBase, BaseUUIDModel, table=True
 class MatchStrategy(str, Enum):
     exact = "exact"
     canonical_hash = "canonical_hash"
+    messages_only = "messages_only"          # Same messages, any sampling params
+    last_user_message = "last_user_message"  # Same last user message
+    regex = "regex"                          # `match_pattern` found in the last user message
+    nearest_neighbour = "nearest_neighbour"  # Most similar user message text
 
 class LLMStubRequestResponseBase(SQLModel):
     """
@@ -149,6 +161,33 @@ class LLMStubRequestResponseBase(SQLModel):
     )
     notes: Optional[str] = Field(default=None)
     request_hash: Optional[str] = Field(default=None, index=True, nullable=True)
+    latency_ms: Optional[float] = Field(default=None, nullable=True)  # Provider latency when recorded from real traffic
+    match_strategy: MatchStrategy = Field(default=MatchStrategy.canonical_hash, nullable=False)
+    match_pattern: Optional[str] = Field(default=None, nullable=True)  # Regex for the `regex` strategy
+    match_key: Optional[str] = Field(default=None, index=True, nullable=True)  # Lookup key for hash-based strategies
 
 class LLMStubRequestResponse(LLMStubRequestResponseBase, BaseUUIDModel, table=True):
+    stub_key: Optional[str] = Field(default=None, index=True, unique=True, nullable=True)  # One stub per tenant, model and request
+
+
+class LatencyDistribution(str, Enum):
+    none = "none"            # Answer instantly
+    fixed = "fixed"          # {"ms": 250}
+    normal = "normal"        # {"mean_ms": 250, "std_ms": 50}
+    lognormal = "lognormal"  # {"median_ms": 250, "sigma": 0.5}
+    recorded = "recorded"    # {"p50": 220, "p90": 480, "p99": 900}; computed from recorded stubs when empty
+
+class LLMStubFaultProfileBase(SQLModel):
+    """
+    Latency and error behaviour injected into responses of a stub model.
+    """
+    tenant_id: Optional[UUID] = Field(default=None, nullable=True)
+    model: str = Field(nullable=False, index=True, unique=True)
+    latency_distribution: LatencyDistribution = Field(default=LatencyDistribution.none, nullable=False)
+    latency_params: Dict[str, float] = Field(default_factory=dict, sa_column=Column(JSON, nullable=False))
+    error_rates: Dict[str, float] = Field(default_factory=dict, sa_column=Column(JSON, nullable=False))  # Exception type -> probability
+    chunk_delay_ms: float = Field(default=0.0, nullable=False)  # Pause between streamed chunks
+    is_active: bool = Field(default=True, nullable=False)
+
+class LLMStubFaultProfile(LLMStubFaultProfileBase, BaseUUIDModel, table=True):
     pass
@@ -1,6 +1,16 @@
+import math
+import re
+from datetime import datetime
 from uuid import UUID
+from typing import Dict, Optional
+from pydantic import field_validator, model_validator
+from sqlmodel import SQLModel
 from backend.common.utils.partial import optional
+from backend.proxy.utils.exceptions import EXCEPTION_CLASS_MAP
 from backend.proxy.models import (
+    LatencyDistribution,
+    MatchStrategy,
+    LLMStubFaultProfileBase,
     LLMStubReplaySequenceBase,
     LLMStubRequestResponseBase,
     LLMAPIKeyBase,
@@ -89,6 +99,18 @@ class ILLMErrorLogList(LLMErrorLogBase):
     """
     id: UUID
 
+class ILLMErrorSummary(SQLModel):
+    """
+    Error totals for one (provider, model, error_type, status_code).
+    """
+    provider: str
+    model: str
+    error_type: str
+    status_code: Optional[int] = None
+    occurrence_count: int
+    first_seen: datetime
+    last_seen: datetime
+
 # --- 🔹 LLM Stub Replay Sequence Schemas ---
 class ILLMStubReplaySequenceCreate(LLMStubReplaySequenceBase):
     pass
@@ -105,9 +127,100 @@ class ILLMStubRequestResponseCreate(LLMStubRequestResponseBase):
     class Config:
         request_hash = None
 
+    @model_validator(mode="after")
+    def validate_match_pattern(self) -> "ILLMStubRequestResponseCreate":
+        if self.match_strategy == MatchStrategy.regex:
+            if not self.match_pattern:
+                raise ValueError("`match_pattern` is required for the regex match strategy.")
+            try:
+                re.compile(self.match_pattern)
+            except re.error as e:
+                raise ValueError(f"Invalid `match_pattern`: {e}")
+        return self
+
 @optional()
 class ILLMStubRequestResponseUpdate(LLMStubRequestResponseBase):
     pass
 
 class ILLMStubRequestResponseRead(LLMStubRequestResponseBase):
     id: UUID
+
+# --- 🔹 LLM Stub Fault Profile Schemas ---
+def _validate_error_rates(v: Dict[str, float] | None) -> Dict[str, float] | None:
+    if v is None:
+        return v
+    unknown = set(v) - set(EXCEPTION_CLASS_MAP)
+    if unknown:
+        raise ValueError(f"Unknown exception types: {sorted(unknown)}. Must be among: {list(EXCEPTION_CLASS_MAP.keys())}")
+    if any(rate < 0 for rate in v.values()) or sum(v.values()) > 1:
+        raise ValueError("Error rates must be non-negative and sum to at most 1.")
+    return v
+
+# Accepted `latency_params` keys per distribution: (required, optional); `recorded` takes percentile keys instead
+LATENCY_PARAMS: Dict[LatencyDistribution, tuple[set[str], set[str]]] = {
+    LatencyDistribution.none: (set(), set()),
+    LatencyDistribution.fixed: ({"ms"}, set()),
+    LatencyDistribution.normal: ({"mean_ms"}, {"std_ms"}),
+    LatencyDistribution.lognormal: ({"median_ms"}, {"sigma"}),
+}
+
+def latency_quantile(key: str) -> float | None:
+    """
+    Quantile of a recorded percentile key, e.g. "p99.9" -> 0.999; `None` for any other key.
+    """
+    if not key.startswith("p"):
+        return None
+    try:
+        percentile = float(key[1:])
+    except ValueError:
+        return None
+    return percentile / 100 if 0 <= percentile <= 100 else None
+
+def validate_latency_params(distribution: LatencyDistribution, params: Dict[str, float]) -> None:
+    """
+    Raise `ValueError` unless `params` are the parameters of `distribution`.
+    """
+    if any(not math.isfinite(v) or v < 0 for v in params.values()):
+        raise ValueError("Latency params must be finite and non-negative.")
+    distribution = LatencyDistribution(distribution)
+    if distribution == LatencyDistribution.recorded:
+        invalid = [k for k in params if latency_quantile(k) is None]
+        if invalid:
+            raise ValueError(f"Recorded latency params must be percentiles 'p0' to 'p100', got {sorted(invalid)}.")
+        return
+    required, optional = LATENCY_PARAMS[distribution]
+    if not required <= set(params) <= required | optional:
+        raise ValueError(
+            f"The '{distribution.value}' latency distribution takes {sorted(required)} "
+            f"and optionally {sorted(optional)}, got {sorted(params)}."
+        )
+
+class ILLMStubFaultProfileCreate(LLMStubFaultProfileBase):
+    _check_error_rates = field_validator("error_rates")(_validate_error_rates)
+
+    @model_validator(mode="after")
+    def check_latency_params(self) -> "ILLMStubFaultProfileCreate":
+        validate_latency_params(self.latency_distribution, self.latency_params)
+        return self
+
+class ILLMStubFaultProfileUpdate(SQLModel):
+    """
+    Partial update; the model name of a profile is fixed.
+    """
+    latency_distribution: Optional[LatencyDistribution] = None
+    latency_params: Optional[Dict[str, float]] = None
+    error_rates: Optional[Dict[str, float]] = None
+    chunk_delay_ms: Optional[float] = None
+    is_active: Optional[bool] = None
+
+    _check_error_rates = field_validator("error_rates")(_validate_error_rates)
+
+    @model_validator(mode="after")
+    def check_latency_params(self) -> "ILLMStubFaultProfileUpdate":
+        # Either one updated alone is checked against the profile's current value by the endpoint
+        if self.latency_distribution is not None and self.latency_params is not None:
+            validate_latency_params(self.latency_distribution, self.latency_params)
+        return self
+
+class ILLMStubFaultProfileRead(LLMStubFaultProfileBase):
+    id: UUID
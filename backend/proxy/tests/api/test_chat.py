@@ -0,0 +1,218 @@
+import json
+from uuid import uuid4
+
+import pytest
+from litellm.exceptions import RateLimitError
+from litellm.types.utils import ModelResponse, ModelResponseStream
+
+from backend.proxy.api.v1.endpoints import chat
+from backend.proxy.crud import stub_response
+from backend.proxy.models import LLMStubFaultProfile, MatchStrategy
+from backend.proxy.tests.helpers import completion, stub_data, stub_line
+from backend.proxy.utils import recorder
+from backend.proxy.utils.fault_profile import FaultInjector
+from backend.proxy.utils.recorder import StubRecorder
+from backend.proxy.utils.stub_fixtures import prepare_stub_records
+from backend.proxy.utils.stub_index import StubIndex
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    """
+    Stands in for the upstream provider, counting the completions it serves.
+    """
+    calls = []
+    async def acompletion(**params):
+        calls.append(params)
+        response = completion(f"provider answer {len(calls)}", params["model"])
+        if params.get("stream"):
+            return _chunks(response)
+        return ModelResponse.model_validate(response)
+    monkeypatch.setattr(chat.litellm, "acompletion", acompletion)
+    return calls
+
+
+@pytest.fixture
+def stub_recorder(monkeypatch):
+    index = StubIndex()
+    monkeypatch.setattr(chat, "stub_index", index)
+    monkeypatch.setattr(recorder, "stub_index", index)
+    stub_recorder = StubRecorder(batch_size=10, flush_interval=60, max_pending=10)
+    monkeypatch.setattr(chat, "stub_recorder", stub_recorder)
+    return stub_recorder
+
+
+async def _chunks(response):
+    base = {key: response[key] for key in ("id", "created", "model")}
+    for word in response["choices"][0]["message"]["content"].split(" "):
+        yield ModelResponseStream(**base, choices=[{"index": 0, "delta": {"role": "assistant", "content": f"{word} "}}])
+    yield ModelResponseStream(**base, choices=[{"index": 0, "delta": {}, "finish_reason": "stop"}])
+
+
+def _streamed_content(response):
+    events = [line.removeprefix("data: ") for line in response.text.splitlines() if line.startswith("data: ")]
+    assert events[-1] == "[DONE]"
+    return "".join(json.loads(event)["choices"][0]["delta"].get("content") or "" for event in events[:-1]).strip()
+
+
+def _request(prompt, model="gpt-4o-mini"):
+    return {"model": model, "messages": [{"role": "user", "content": prompt}]}
+
+
+def _content(response):
+    return response.json()["choices"][0]["message"]["content"]
+
+
+async def test_replay_serves_the_recorded_response(api_key_client, provider, stub_recorder):
+    recorded = await api_key_client.post(
+        "/chat/completions", json=_request("hello"), headers={"X-Proxy-Mode": "record"}
+    )
+    assert recorded.status_code == 200
+    assert _content(recorded) == "provider answer 1"
+    assert stub_recorder._queue.qsize() == 1
+
+    replayed = await api_key_client.post(
+        "/chat/completions", json=_request("hello"), headers={"X-Proxy-Mode": "replay"}
+    )
+    assert replayed.status_code == 200
+    assert _content(replayed) == "provider answer 1"
+    assert len(provider) == 1
+
+    missing = await api_key_client.post(
+        "/chat/completions", json=_request("goodbye"), headers={"X-Proxy-Mode": "replay"}
+    )
+    assert missing.status_code == 404
+    assert len(provider) == 1
+
+
+async def test_streamed_completions_are_recorded(api_key_client, provider, stub_recorder):
+    request = {**_request("hello"), "stream": True}
+    recorded = await api_key_client.post("/chat/completions", json=request, headers={"X-Proxy-Mode": "record"})
+    assert recorded.status_code == 200
+    assert _streamed_content(recorded) == "provider answer 1"
+    assert stub_recorder._queue.qsize() == 1
+
+    replayed = await api_key_client.post("/chat/completions", json=request, headers={"X-Proxy-Mode": "replay"})
+
+    assert replayed.status_code == 200
+    assert replayed.headers["content-type"].startswith("text/event-stream")
+    assert _streamed_content(replayed) == "provider answer 1"
+    assert len(provider) == 1
+
+
+async def test_replay_falls_back_to_the_stub_table(session, api_key_client, provider, stub_recorder):
+    model = f"stub_{uuid4().hex}"
+    await stub_response.bulk_upsert(records=prepare_stub_records([stub_line("hello", "stored", model)]), db_session=session)
+    await session.commit()
+
+    replayed = await api_key_client.post(
+        "/chat/completions", json=_request("hello", model), headers={"X-Proxy-Mode": "replay"}
+    )
+
+    assert replayed.status_code == 200
+    assert _content(replayed) == "stored"
+    assert provider == []
+
+
+async def test_mode_is_configured_per_api_key(monkeypatch, api_key_client, provider, stub_recorder):
+    monkeypatch.setattr(recorder.settings, "PROXY_MODE_BY_API_KEY", {"test_key": "replay"})
+
+    response = await api_key_client.post("/chat/completions", json=_request("unrecorded"))
+
+    assert response.status_code == 404
+    assert provider == []
+
+
+@pytest.fixture
+def error_records(monkeypatch):
+    records = []
+    monkeypatch.setattr(chat.error_recorder, "record", lambda **error: records.append(error))
+    return records
+
+
+async def test_injected_faults_are_not_logged(monkeypatch, api_key_client, error_records):
+    injector = FaultInjector(LLMStubFaultProfile(model="stub_faulty", error_rates={"RateLimitError": 1.0}))
+    async def get(model):
+        return injector
+    monkeypatch.setattr(chat.fault_profiles, "get", get)
+
+    response = await api_key_client.post("/chat/completions", json=_request("hello", "stub_faulty"))
+
+    assert response.status_code == 429
+    assert response.json()["error"]["type"] == "RateLimitError"
+    assert error_records == []
+
+
+async def test_provider_errors_are_logged(monkeypatch, api_key_client, error_records):
+    async def acompletion(**params):
+        raise RateLimitError(message="slow down", llm_provider="openai", model=params["model"])
+    monkeypatch.setattr(chat.litellm, "acompletion", acompletion)
+    monkeypatch.setattr(chat, "USE_STOCK_RESPONSE", False)
+
+    response = await api_key_client.post("/chat/completions", json=_request("hello"))
+
+    assert response.status_code == 429
+    assert [(error["provider"], error["error_type"], error["status_code"]) for error in error_records] == [
+        ("openai", "RateLimitError", 429)
+    ]
+
+
+async def test_stubs_are_served_to_their_tenant(api_key_client, stub_recorder):
+    tenant, other_tenant = str(uuid4()), str(uuid4())
+    model = f"stub_{uuid4().hex}"
+    created = await api_key_client.post(
+        "/chat/completions/stub", json=stub_data("hello", "tenant stub", model), headers={"X-Tenant-ID": tenant}
+    )
+    assert created.status_code == 200
+    assert created.json()["data"]["tenant_id"] == tenant
+    await api_key_client.post(
+        "/chat/completions/stub",
+        json=stub_data("hello", "tenant regex", model, match_strategy=MatchStrategy.regex, match_pattern="^bye"),
+        headers={"X-Tenant-ID": tenant},
+    )
+
+    async def answer(prompt, tenant_id=None):
+        headers = {"X-Tenant-ID": tenant_id} if tenant_id else {}
+        response = await api_key_client.post("/chat/completions", json=_request(prompt, model), headers=headers)
+        assert response.status_code == 200
+        return _content(response)
+
+    assert await answer("hello", tenant) == "tenant stub"
+    assert await answer("bye now", tenant) == "tenant regex"
+    # Other callers get the stock response
+    stock = chat.stock_response.choices[0].message.content
+    assert await answer("hello") == stock
+    assert await answer("hello", other_tenant) == stock
+    assert await answer("bye now", other_tenant) == stock
+
+
+async def test_shared_stubs_are_served_to_every_tenant(api_key_client, stub_recorder):
+    tenant = str(uuid4())
+    model = f"stub_{uuid4().hex}"
+    await api_key_client.post("/chat/completions/stub", json=stub_data("hello", "shared", model))
+    await api_key_client.post(
+        "/chat/completions/stub", json=stub_data("hello", "own", model, match_strategy=MatchStrategy.messages_only),
+        headers={"X-Tenant-ID": tenant},
+    )
+
+    shared = await api_key_client.post("/chat/completions", json=_request("hello", model), headers={"X-Tenant-ID": str(uuid4())})
+    own = await api_key_client.post("/chat/completions", json=_request("hello", model), headers={"X-Tenant-ID": tenant})
+
+    assert _content(shared) == "shared"
+    # The caller's own stub wins over a more specific shared one
+    assert _content(own) == "own"
+
+
+async def test_recordings_are_replayed_to_their_tenant(api_key_client, provider, stub_recorder):
+    tenant = str(uuid4())
+    headers = {"X-Tenant-ID": tenant}
+    await api_key_client.post("/chat/completions", json=_request("hello"), headers={**headers, "X-Proxy-Mode": "record"})
+
+    own = await api_key_client.post("/chat/completions", json=_request("hello"), headers={**headers, "X-Proxy-Mode": "replay"})
+    other = await api_key_client.post(
+        "/chat/completions", json=_request("hello"), headers={"X-Tenant-ID": str(uuid4()), "X-Proxy-Mode": "replay"}
+    )
+
+    assert _content(own) == "provider answer 1"
+    assert other.status_code == 404
+    assert len(provider) == 1
@@ -0,0 +1,33 @@
+import json
+from typing import Any, Dict
+
+
+def completion(content: str, model: str = "stub_chat") -> Dict[str, Any]:
+    """
+    A serialized `ModelResponse` answering `content`.
+    """
+    return {
+        "id": "chatcmpl-stub",
+        "created": 1742511004,
+        "model": model,
+        "object": "chat.completion",
+        "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}],
+    }
+
+
+def stub_data(prompt: str = "hello", answer: str = "hi", model: str = "stub_chat", **fields: Any) -> Dict[str, Any]:
+    """
+    An `ILLMStubRequestResponseCreate` payload answering one user message.
+    """
+    return {
+        "tenant_id": None,
+        "provider": "openai",
+        "model": model,
+        "request_params": {"model": model, "messages": [{"role": "user", "content": prompt}]},
+        "response": completion(answer, model),
+        **fields,
+    }
+
+
+def stub_line(*args: Any, **fields: Any) -> str:
+    return json.dumps(stub_data(*args, **fields), default=str)
@@ -0,0 +1,95 @@
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+from sqlmodel import col, select
+
+from backend.proxy.crud import stub_fault_profile, stub_response
+from backend.proxy.models import LLMStubRequestResponse, MatchStrategy
+from backend.proxy.schema import ILLMStubRequestResponseCreate
+from backend.proxy.tests.helpers import stub_data, stub_line
+from backend.proxy.utils.stub_fixtures import prepare_stub_records
+
+
+async def _stubs(session, model):
+    result = await session.execute(
+        select(LLMStubRequestResponse)
+        .where(LLMStubRequestResponse.model == model)
+        .order_by(col(LLMStubRequestResponse.created_at))
+    )
+    return list(result.scalars().all())
+
+
+async def _import(session, lines, tenant_id=None):
+    count = await stub_response.bulk_upsert(records=prepare_stub_records(lines, tenant_id=tenant_id), db_session=session)
+    await session.commit()
+    return count
+
+
+async def test_bulk_upsert_replaces_stubs_of_the_same_request(session):
+    model = f"stub_{uuid4().hex}"
+    # Within one batch the last stub of a request wins
+    assert await _import(session, [stub_line("a", "first", model), stub_line("a", "second", model)]) == 1
+    [stub] = await _stubs(session, model)
+    assert stub.response["choices"][0]["message"]["content"] == "second"
+
+    await _import(session, [stub_line("a", "third", model, notes="re-imported"), stub_line("b", "other", model)])
+
+    stubs = await _stubs(session, model)
+    assert len(stubs) == 2
+    await session.refresh(stubs[0])
+    assert stubs[0].id == stub.id
+    assert (stubs[0].response["choices"][0]["message"]["content"], stubs[0].notes) == ("third", "re-imported")
+
+
+async def test_bulk_upsert_keeps_stubs_of_other_tenants(session):
+    model = f"stub_{uuid4().hex}"
+    first, second = uuid4(), uuid4()
+    await _import(session, [stub_line("a", "first tenant", model)], tenant_id=first)
+
+    await _import(session, [stub_line("a", "second tenant", model)], tenant_id=second)
+
+    stubs = await _stubs(session, model)
+    assert [(stub.tenant_id, stub.response["choices"][0]["message"]["content"]) for stub in stubs] == [
+        (first, "first tenant"), (second, "second tenant")
+    ]
+
+
+async def test_bulk_upsert_keeps_stubs_of_other_match_strategies(session):
+    model = f"stub_{uuid4().hex}"
+    await _import(session, [
+        stub_line("a", "hash", model),
+        stub_line("a", "last message", model, match_strategy=MatchStrategy.last_user_message),
+        stub_line("a", "regex a", model, match_strategy=MatchStrategy.regex, match_pattern="a"),
+        stub_line("a", "regex b", model, match_strategy=MatchStrategy.regex, match_pattern="b"),
+    ])
+
+    assert len(await _stubs(session, model)) == 4
+
+
+async def test_create_rejects_duplicate_stubs(session):
+    model = f"stub_{uuid4().hex}"
+    def data(**fields):
+        # Validated `messages` are consumed once, like the body of a request
+        return ILLMStubRequestResponseCreate.model_validate(stub_data("a", "first", model, **fields))
+    await stub_response.create(obj_in=data(), db_session=session)
+
+    with pytest.raises(HTTPException) as e:
+        await stub_response.create(obj_in=data(), db_session=session)
+    assert e.value.status_code == 409
+
+    # Another tenant can stub the same request
+    await stub_response.create(obj_in=data(tenant_id=uuid4()), db_session=session)
+    assert len(await _stubs(session, model)) == 2
+
+
+async def test_recorded_latency_percentiles(session):
+    model = f"stub_{uuid4().hex}"
+    await _import(session, [stub_line(f"prompt {ms}", "answer", model, latency_ms=ms) for ms in range(1, 102)])
+    # Stubs without a latency, e.g. from fixture packs, are ignored
+    await _import(session, [stub_line("unrecorded", "answer", model)])
+
+    percentiles = await stub_fault_profile.get_recorded_latency_percentiles(model=model, db_session=session)
+
+    assert percentiles == {f"p{q}": q + 1.0 for q in (1, 10, 25, 50, 75, 90, 95, 99)}
+    assert await stub_fault_profile.get_recorded_latency_percentiles(model=f"stub_{uuid4().hex}", db_session=session) == {}
@@ -0,0 +1,153 @@
+import json
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from sqlmodel import col, select
+
+from backend.proxy.models import LLMErrorLog
+from backend.proxy.utils import error_recorder
+from backend.proxy.utils.error_recorder import MAX_PAYLOAD_CHARS, ErrorRecorder
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(error_recorder, "time", SimpleNamespace(monotonic=clock.monotonic))
+    return clock
+
+
+@pytest.fixture(autouse=True)
+def session_local(monkeypatch, setup_database):
+    monkeypatch.setattr(error_recorder, "SessionLocal", setup_database)
+
+
+def _recorder(**settings):
+    return ErrorRecorder(**{"window": 60, "flush_interval": 60, "max_samples": 3, "max_groups": 10, **settings})
+
+
+def _record(recorder, model, error_type="RateLimitError", status_code=429, payload=None):
+    recorder.record(
+        provider="openai", model=model, error_type=error_type, error_message=f"{error_type} from {model}",
+        status_code=status_code, payload=payload,
+    )
+
+
+async def _logs(session, model):
+    result = await session.execute(
+        select(LLMErrorLog).where(LLMErrorLog.model == model).order_by(col(LLMErrorLog.error_type))
+    )
+    return list(result.scalars().all())
+
+
+async def test_errors_are_aggregated_per_window(session, clock):
+    model = f"gpt-{uuid4().hex}"
+    recorder = _recorder()
+    for _ in range(5):
+        _record(recorder, model)
+    _record(recorder, model, "Timeout", 408)
+
+    # The windows are still open
+    clock.now += 59
+    assert await recorder.flush() == 0
+    _record(recorder, model)
+
+    clock.now += 1
+    assert await recorder.flush() == 2
+
+    logs = await _logs(session, model)
+    assert [(log.provider, log.error_type, log.status_code, log.occurrence_count) for log in logs] == [
+        ("openai", "RateLimitError", 429, 6), ("openai", "Timeout", 408, 1)
+    ]
+    assert logs[0].error_message == f"RateLimitError from {model}"
+    assert logs[0].last_seen >= logs[0].timestamp
+
+    # A new window starts with the next error
+    _record(recorder, model)
+    clock.now += 60
+    assert await recorder.flush() == 1
+    assert [log.occurrence_count for log in await _logs(session, model)] == [6, 1, 1]
+
+
+async def test_windows_close_independently(clock):
+    recorder = _recorder()
+    _record(recorder, "gpt-a")
+    clock.now += 30
+    _record(recorder, "gpt-b")
+
+    clock.now += 30
+    assert [row["model"] for row in recorder._drain(force=False)] == ["gpt-a"]
+    clock.now += 30
+    assert [row["model"] for row in recorder._drain(force=False)] == ["gpt-b"]
+
+
+async def test_stop_flushes_open_windows(session, clock):
+    model = f"gpt-{uuid4().hex}"
+    recorder = _recorder()
+    recorder.start()
+    _record(recorder, model)
+
+    await recorder.stop()
+
+    assert [log.occurrence_count for log in await _logs(session, model)] == [1]
+    assert recorder._task is None
+
+
+async def test_samples_are_capped_and_truncated(clock):
+    recorder = _recorder(max_samples=2)
+    for i in range(10):
+        _record(recorder, "gpt-a", payload={"i": i})
+    _record(recorder, "gpt-b", payload="x" * (MAX_PAYLOAD_CHARS + 10))
+
+    rows = {row["model"]: row for row in recorder._drain(force=True)}
+
+    assert len(rows["gpt-a"]["sample_payloads"]) == 2
+    assert all(json.loads(sample)["i"] in range(10) for sample in rows["gpt-a"]["sample_payloads"])
+    assert rows["gpt-b"]["sample_payloads"] == ["x" * MAX_PAYLOAD_CHARS]
+
+
+async def test_samples_are_uniform_over_the_window(clock):
+    counts = [0] * 10
+    for seed in range(2000):
+        recorder = _recorder(max_samples=2)
+        recorder._rng.seed(seed)
+        for i in range(10):
+            _record(recorder, "gpt-a", payload=i)
+        [row] = recorder._drain(force=True)
+        for sample in row["sample_payloads"]:
+            counts[json.loads(sample)] += 1
+
+    # Each error is sampled with probability 2/10
+    assert all(count / 2000 == pytest.approx(0.2, abs=0.04) for count in counts)
+
+
+async def test_new_kinds_of_errors_are_dropped_when_full(clock, caplog):
+    recorder = _recorder(max_groups=1)
+    _record(recorder, "gpt-a")
+    _record(recorder, "gpt-b")
+    _record(recorder, "gpt-a")
+
+    rows = recorder._drain(force=True)
+    assert [(row["model"], row["occurrence_count"]) for row in rows] == [("gpt-a", 2)]
+
+    assert await recorder.flush() == 0
+    assert "dropped 1 errors" in caplog.text
+
+
+async def test_failed_writes_are_logged(monkeypatch, clock, caplog):
+    def broken_session():
+        raise RuntimeError("database is down")
+    monkeypatch.setattr(error_recorder, "SessionLocal", broken_session)
+    recorder = _recorder()
+    _record(recorder, "gpt-a")
+
+    assert await recorder.flush(force=True) == 0
+    assert "Failed to write 1 aggregated LLM errors" in caplog.text
@@ -0,0 +1,209 @@
+import math
+import random
+
+import pytest
+from litellm.exceptions import RateLimitError
+
+from backend.proxy.models import LatencyDistribution, LLMStubFaultProfile
+from backend.proxy.schema import ILLMStubFaultProfileCreate, latency_quantile, validate_latency_params
+from backend.proxy.utils import fault_profile
+from backend.proxy.utils.fault_profile import FaultInjector, FaultProfileRegistry, is_injected_fault
+
+
+class FixedRandom(random.Random):
+    """
+    Returns the given uniform draws in turn.
+    """
+
+    def __init__(self, *draws):
+        super().__init__(0)
+        self.draws = list(draws)
+
+    def random(self):
+        return self.draws.pop(0)
+
+
+def _profile(distribution=LatencyDistribution.none, latency_params=None, error_rates=None, **fields):
+    return LLMStubFaultProfile(
+        model="stub_faulty",
+        latency_distribution=distribution,
+        latency_params=latency_params or {},
+        error_rates=error_rates or {},
+        **fields,
+    )
+
+
+@pytest.mark.parametrize("key,expected", [
+    ("p0", 0.0), ("p50", 0.5), ("p99.9", 0.999), ("p100", 1.0), ("p101", None), ("p", None), ("mean_ms", None),
+])
+def test_latency_quantile(key, expected):
+    assert latency_quantile(key) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("distribution,params", [
+    (LatencyDistribution.none, {}),
+    (LatencyDistribution.fixed, {"ms": 250}),
+    (LatencyDistribution.normal, {"mean_ms": 250}),
+    (LatencyDistribution.lognormal, {"median_ms": 250, "sigma": 0.5}),
+    (LatencyDistribution.recorded, {}),
+    (LatencyDistribution.recorded, {"p50": 220, "p99.9": 900}),
+])
+def test_validate_latency_params(distribution, params):
+    validate_latency_params(distribution, params)
+
+
+@pytest.mark.parametrize("distribution,params,message", [
+    (LatencyDistribution.fixed, {}, "takes"),
+    (LatencyDistribution.normal, {"mean_ms": 250, "median_ms": 200}, "takes"),
+    (LatencyDistribution.none, {"ms": 250}, "takes"),
+    (LatencyDistribution.fixed, {"ms": -1}, "non-negative"),
+    (LatencyDistribution.fixed, {"ms": math.nan}, "finite"),
+    (LatencyDistribution.recorded, {"p50": 220, "median_ms": 200}, "percentiles"),
+])
+def test_validate_latency_params_rejects(distribution, params, message):
+    with pytest.raises(ValueError, match=message):
+        validate_latency_params(distribution, params)
+
+
+def test_profile_schema_checks_latency_params_and_error_rates():
+    with pytest.raises(ValueError, match="takes"):
+        ILLMStubFaultProfileCreate(model="stub_faulty", latency_distribution=LatencyDistribution.fixed)
+    with pytest.raises(ValueError, match="sum to at most 1"):
+        ILLMStubFaultProfileCreate(model="stub_faulty", error_rates={"RateLimitError": 0.6, "Timeout": 0.6})
+
+
+@pytest.mark.parametrize("u,expected", [
+    (0.0, 100.0), (0.25, 150.0), (0.5, 200.0), (0.7, 300.0), (0.95, 700.0), (1.0, 1000.0),
+])
+def test_recorded_latency_interpolates_between_percentiles(u, expected):
+    injector = FaultInjector(
+        _profile(LatencyDistribution.recorded, {"p0": 100, "p50": 200, "p90": 400, "p100": 1000}),
+        rng=FixedRandom(u),
+    )
+    assert injector.sample_latency_ms() == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("u,expected", [(0.1, 200.0), (0.99, 400.0)])
+def test_recorded_latency_is_clamped_outside_the_percentiles(u, expected):
+    injector = FaultInjector(_profile(LatencyDistribution.recorded, {"p50": 200, "p90": 400}), rng=FixedRandom(u))
+    assert injector.sample_latency_ms() == expected
+
+
+def test_recorded_latency_follows_the_percentiles():
+    params = {"p10": 100, "p50": 200, "p90": 500, "p99": 900}
+    injector = FaultInjector(_profile(LatencyDistribution.recorded, params), rng=random.Random(7))
+
+    samples = sorted(injector.sample_latency_ms() for _ in range(20_000))
+
+    for key, value in params.items():
+        assert samples[int(latency_quantile(key) * len(samples))] == pytest.approx(value, rel=0.05)
+
+
+def test_latency_params_override_the_profile():
+    injector = FaultInjector(
+        _profile(LatencyDistribution.recorded), latency_params={"p0": 50, "p100": 50}, rng=random.Random(0)
+    )
+    assert injector.sample_latency_ms() == 50
+
+
+@pytest.mark.parametrize("distribution,params", [
+    (LatencyDistribution.none, {}),
+    (LatencyDistribution.normal, {"mean_ms": 0, "std_ms": 100}),
+    (LatencyDistribution.lognormal, {"median_ms": 0}),
+    (LatencyDistribution.recorded, {}),
+])
+def test_latency_is_never_negative(distribution, params):
+    injector = FaultInjector(_profile(distribution, params), rng=random.Random(0))
+    assert min(injector.sample_latency_ms() for _ in range(1000)) >= 0
+
+
+@pytest.mark.parametrize("u,expected", [(0.0, "RateLimitError"), (0.19, "RateLimitError"), (0.25, "Timeout"), (0.5, None)])
+def test_pick_error_by_cumulative_rate(u, expected):
+    injector = FaultInjector(_profile(error_rates={"RateLimitError": 0.2, "Timeout": 0.1}), rng=FixedRandom(u))
+    assert injector.pick_error() == expected
+
+
+def test_error_rates_are_sampled():
+    injector = FaultInjector(_profile(error_rates={"RateLimitError": 0.2, "Timeout": 0.1}), rng=random.Random(3))
+
+    errors = [injector.pick_error() for _ in range(20_000)]
+
+    assert errors.count("RateLimitError") / len(errors) == pytest.approx(0.2, abs=0.01)
+    assert errors.count("Timeout") / len(errors) == pytest.approx(0.1, abs=0.01)
+
+
+async def test_apply_waits_then_raises_an_injected_fault(monkeypatch):
+    sleeps = []
+    async def sleep(seconds):
+        sleeps.append(seconds)
+    monkeypatch.setattr(fault_profile.asyncio, "sleep", sleep)
+    injector = FaultInjector(_profile(LatencyDistribution.fixed, {"ms": 250}, {"RateLimitError": 1.0}))
+
+    with pytest.raises(RateLimitError) as e:
+        await injector.apply()
+
+    assert sleeps == [0.25]
+    assert is_injected_fault(e.value)
+    assert not is_injected_fault(RateLimitError(message="upstream", llm_provider="openai", model="gpt-4o"))
+
+
+async def test_apply_without_faults(monkeypatch):
+    sleeps = []
+    async def sleep(seconds):
+        sleeps.append(seconds)
+    monkeypatch.setattr(fault_profile.asyncio, "sleep", sleep)
+
+    await FaultInjector(_profile()).apply()
+
+    assert sleeps == []
+
+
+@pytest.fixture
+def profiles(monkeypatch):
+    """
+    Profiles served by the stubbed `stub_fault_profile` CRUD, with the lookups made.
+    """
+    profiles = {}
+    lookups = []
+    async def get_by_model(*, model):
+        lookups.append(model)
+        return profiles.get(model)
+    async def get_recorded_latency_percentiles(*, model):
+        return {"p0": 300, "p100": 300}
+    monkeypatch.setattr(fault_profile.stub_fault_profile, "get_by_model", get_by_model)
+    monkeypatch.setattr(
+        fault_profile.stub_fault_profile, "get_recorded_latency_percentiles", get_recorded_latency_percentiles
+    )
+    return profiles, lookups
+
+
+async def test_registry_caches_injectors(profiles):
+    profiles, lookups = profiles
+    profiles["stub_faulty"] = _profile(LatencyDistribution.fixed, {"ms": 10})
+    registry = FaultProfileRegistry(ttl=60)
+
+    injector = await registry.get("stub_faulty")
+    assert await registry.get("stub_faulty") is injector
+    assert await registry.get("stub_other") is None
+    assert await registry.get("stub_other") is None
+    assert lookups == ["stub_faulty", "stub_other"]
+
+    registry.invalidate("stub_faulty")
+    assert await registry.get("stub_faulty") is not injector
+    assert lookups == ["stub_faulty", "stub_other", "stub_faulty"]
+
+
+async def test_registry_skips_inactive_profiles(profiles):
+    profiles, _ = profiles
+    profiles["stub_faulty"] = _profile(LatencyDistribution.fixed, {"ms": 10}, is_active=False)
+
+    assert await FaultProfileRegistry().get("stub_faulty") is None
+
+
+async def test_registry_uses_recorded_percentiles_by_default(profiles):
+    profiles, _ = profiles
+    profiles["stub_faulty"] = _profile(LatencyDistribution.recorded)
+
+    injector = await FaultProfileRegistry().get("stub_faulty")
+
+    assert injector.sample_latency_ms() == 300
@@ -0,0 +1,95 @@
+from uuid import uuid4
+
+import pytest
+from litellm.types.utils import ModelResponse
+from sqlmodel import select
+
+from backend.common.models.m2m_client_model import APIKey
+from backend.proxy.core.config import settings
+from backend.proxy.crud import _compute_request_hash
+from backend.proxy.models import LLMStubRequestResponse
+from backend.proxy.tests.helpers import completion
+from backend.proxy.utils import recorder
+from backend.proxy.utils.recorder import ProxyMode, StubRecorder, resolve_proxy_mode
+from backend.proxy.utils.stub_index import StubIndex
+
+
+@pytest.mark.parametrize("key_name,header,expected", [
+    (None, None, ProxyMode.passthrough),
+    ("ci", None, ProxyMode.replay),
+    ("other", None, ProxyMode.passthrough),
+    ("ci", ProxyMode.record, ProxyMode.record),
+    (None, ProxyMode.replay, ProxyMode.replay),
+])
+def test_resolve_proxy_mode(monkeypatch, key_name, header, expected):
+    monkeypatch.setattr(settings, "PROXY_MODE_BY_API_KEY", {"ci": "replay"})
+    api_key = APIKey(name=key_name) if key_name else None
+
+    assert resolve_proxy_mode(api_key, header) == expected
+
+
+@pytest.fixture
+def index(monkeypatch):
+    index = StubIndex()
+    monkeypatch.setattr(recorder, "stub_index", index)
+    return index
+
+
+def _request(model, prompt):
+    return {"model": model, "messages": [{"role": "user", "content": prompt}]}
+
+
+async def test_recordings_are_written_in_batches(session, setup_database, index, monkeypatch):
+    monkeypatch.setattr(recorder, "SessionLocal", setup_database)
+    stub_recorder = StubRecorder(batch_size=2, flush_interval=60, max_pending=10)
+    batches = []
+    flush = stub_recorder._flush
+    async def record_flush(batch):
+        batches.append(len(batch))
+        await flush(batch)
+    monkeypatch.setattr(stub_recorder, "_flush", record_flush)
+
+    model = f"stub_{uuid4().hex}"
+    requests = [_request(model, prompt) for prompt in ("a", "b", "c")]
+    for n, request in enumerate(requests):
+        stub_recorder.record(
+            request_params=request, response=ModelResponse.model_validate(completion(f"answer {n}", model)),
+            latency_ms=100.0 + n, provider="openai",
+        )
+    # Replayable straight away, before anything is written
+    assert index.get(model=model, request_hash=_compute_request_hash(requests[2]))["latency_ms"] == 102.0
+
+    stub_recorder.start()
+    await stub_recorder.stop()
+
+    assert batches == [2, 1]
+    result = await session.execute(select(LLMStubRequestResponse).where(LLMStubRequestResponse.model == model))
+    stubs = sorted(result.scalars().all(), key=lambda stub: stub.latency_ms)
+    assert [(stub.provider, stub.notes, stub.latency_ms) for stub in stubs] == [
+        ("openai", "recorded", 100.0), ("openai", "recorded", 101.0), ("openai", "recorded", 102.0)
+    ]
+
+
+async def test_recordings_are_dropped_when_the_buffer_is_full(index, caplog):
+    stub_recorder = StubRecorder(batch_size=2, flush_interval=60, max_pending=1)
+    for prompt in ("a", "b"):
+        stub_recorder.record(
+            request_params=_request("gpt-4o", prompt), response=ModelResponse.model_validate(completion(prompt)),
+            latency_ms=1.0,
+        )
+
+    assert stub_recorder._queue.qsize() == 1
+    assert "buffer is full" in caplog.text
+    # Still served by replay in this process
+    assert index.get(model="gpt-4o", request_hash=_compute_request_hash(_request("gpt-4o", "b"))) is not None
+
+
+async def test_unassembled_streams_are_not_recorded(index, caplog):
+    stub_recorder = StubRecorder(batch_size=2, flush_interval=60, max_pending=10)
+
+    stub_recorder.record_stream(request_params=_request("gpt-4o", "a"), chunks=[], latency_ms=1.0)
+    stub_recorder.record_stream(request_params=_request("gpt-4o", "b"), chunks=[object()], latency_ms=1.0)
+
+    assert stub_recorder._queue.qsize() == 0
+    assert len(index) == 0
+    assert "Could not assemble" in caplog.text
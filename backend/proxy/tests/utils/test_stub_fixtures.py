@@ -0,0 +1,81 @@
+from uuid import uuid4
+
+import pytest
+
+from backend.proxy.crud import _compute_request_hash
+from backend.proxy.models import MatchStrategy
+from backend.proxy.tests.helpers import stub_line
+from backend.proxy.utils.stub_fixtures import aiter_ndjson_batches, load_fixture_pack, prepare_stub_records
+from backend.proxy.utils.stub_index import StubIndex
+
+
+async def _chunks(*chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+async def _batches(chunks, batch_size):
+    return [batch async for batch in aiter_ndjson_batches(_chunks(*chunks), batch_size)]
+
+
+async def test_ndjson_batches_join_lines_split_across_chunks():
+    batches = await _batches([b'{"a": 1}\n{"b"', b': 2}\n{"c": 3}\n', b'{"d": 4}'], batch_size=2)
+
+    assert batches == [['{"a": 1}', '{"b": 2}'], ['{"c": 3}', '{"d": 4}']]
+
+
+async def test_ndjson_batches_keep_multibyte_characters_split_across_chunks():
+    line = '{"text": "héllo ✓"}'.encode("utf-8")
+
+    batches = await _batches([line[:10], line[10:15], line[15:] + b"\n"], batch_size=10)
+
+    assert batches == [['{"text": "héllo ✓"}']]
+
+
+@pytest.mark.parametrize("chunks,expected", [
+    ([], []),
+    ([b"", b"\n"], [[""]]),
+    ([b'{"a": 1}\n', b"  "], [['{"a": 1}']]),
+])
+async def test_ndjson_batches_edge_cases(chunks, expected):
+    assert await _batches(chunks, batch_size=2) == expected
+
+
+def test_prepare_stub_records_skips_blank_lines_and_hashes_stubs():
+    tenant_id = uuid4()
+
+    records = prepare_stub_records(
+        [stub_line("a"), "", stub_line("b", match_strategy=MatchStrategy.regex, match_pattern="b+")], tenant_id=tenant_id
+    )
+
+    assert [record["request_params"]["messages"][0]["content"] for record in records] == ["a", "b"]
+    assert all(record["tenant_id"] == tenant_id for record in records)
+    assert records[0]["match_key"] == records[0]["request_hash"]
+    assert records[1]["match_key"] is None
+    assert len({record["stub_key"] for record in records}) == 2
+
+
+@pytest.mark.parametrize("line,error", [
+    ("{not json", "line 3"),
+    (stub_line(model="gpt-4o"), "must start with 'stub_'"),
+    (stub_line(tenant_id=str(uuid4())), "your own tenant"),
+    (stub_line(match_strategy=MatchStrategy.regex), "match_pattern"),
+])
+def test_prepare_stub_records_rejects_invalid_lines(line, error):
+    with pytest.raises(ValueError, match=error):
+        prepare_stub_records([stub_line("a"), line], first_line_no=2)
+
+
+def test_fixture_packs_keep_their_tenants(tmp_path):
+    tenant_id = uuid4()
+    (tmp_path / "a.ndjson").write_text(stub_line("a") + "\n" + stub_line("b", tenant_id=str(tenant_id)) + "\n")
+    (tmp_path / "b.jsonl").write_text(stub_line("c") + "\n")
+    (tmp_path / "notes.txt").write_text("not a fixture")
+    index = StubIndex()
+
+    assert load_fixture_pack(tmp_path, index) == 3
+
+    params = {"model": "stub_chat", "messages": [{"role": "user", "content": "b"}]}
+    request_hash = _compute_request_hash(params)
+    assert index.match(model="stub_chat", request_params=params, request_hash=request_hash, tenant_id=tenant_id)
+    assert index.match(model="stub_chat", request_params=params, request_hash=request_hash) is None
@@ -0,0 +1,211 @@
+from uuid import uuid4
+
+import pytest
+
+from backend.proxy.crud import _compute_request_hash
+from backend.proxy.models import MatchStrategy
+from backend.proxy.tests.helpers import stub_line
+from backend.proxy.utils.stub_fixtures import prepare_stub_records
+from backend.proxy.utils.stub_index import StubIndex
+from backend.proxy.utils.stub_matching import RegexMatcher, TokenIndex, request_match_keys, stub_match_key
+
+
+def _matcher(*patterns):
+    matcher = RegexMatcher()
+    for pattern in patterns:
+        matcher.add(pattern, pattern, pattern)
+    return matcher
+
+
+def test_regex_matcher_finds_the_matching_pattern():
+    matcher = _matcher(r"^weather in \w+", r"\d{4}-\d{2}-\d{2}", "refund")
+
+    assert matcher.search("weather in Paris") == r"^weather in \w+"
+    assert matcher.search("due on 2025-01-31") == r"\d{4}-\d{2}-\d{2}"
+    assert matcher.search("I want a refund") == "refund"
+    assert matcher.search("hello") is None
+
+
+def test_regex_matcher_tracks_added_and_removed_patterns():
+    matcher = _matcher("hello")
+    assert matcher.search("hello there") == "hello"
+
+    matcher.add("greeting", "there", "replaced")
+    matcher.remove("hello")
+    matcher.remove("missing")
+
+    assert matcher.search("hello there") == "replaced"
+    assert len(matcher) == 1
+
+
+def test_regex_matcher_keeps_inline_flags_to_their_pattern():
+    matcher = _matcher("(?i)hello", "World")
+
+    assert matcher.search("HELLO") == "(?i)hello"
+    # The flag does not leak into the other patterns
+    assert matcher.search("world") is None
+    assert matcher.search("World") == "World"
+
+
+def test_regex_matcher_allows_the_same_group_name_in_several_patterns():
+    matcher = _matcher(r"order (?P<id>\d+)", r"invoice (?P<id>\d+)", r"ticket (?P=id)?\d+")
+
+    assert matcher.search("order 12") == r"order (?P<id>\d+)"
+    assert matcher.search("invoice 7") == r"invoice (?P<id>\d+)"
+
+
+def test_regex_matcher_supports_backreferences():
+    matcher = _matcher(r"(\w+) \1", "plain")
+
+    assert matcher.search("bye bye") == r"(\w+) \1"
+    assert matcher.search("bye now") is None
+
+
+def test_regex_matcher_skips_invalid_patterns():
+    matcher = _matcher("hello", "(unclosed", "[a-")
+
+    assert matcher.search("hello") == "hello"
+    assert matcher.search("(unclosed") is None
+    assert len(matcher) == 3
+
+
+def test_regex_matcher_falls_back_when_patterns_cannot_be_combined():
+    # Each compiles alone, but a global flag in the middle of the alternation does not
+    matcher = _matcher("hello", "(?x) w o r l d")
+
+    assert matcher.search("world") == "(?x) w o r l d"
+    assert matcher.search("hello") == "hello"
+
+
+def test_token_index_returns_the_most_similar_document():
+    index = TokenIndex(min_similarity=0.5)
+    index.add("weather", "what is the weather in Paris", "weather")
+    index.add("capital", "what is the capital of France", "capital")
+
+    assert index.search("What's the weather in Paris today?") == "weather"
+    assert index.search("capital of France?") == "capital"
+    assert index.search("tell me a joke") is None
+    assert index.search("") is None
+
+
+def test_token_index_applies_the_similarity_threshold():
+    index = TokenIndex(min_similarity=0.8)
+    index.add("doc", "a b c d", "doc")
+
+    assert index.search("a b") is None  # 2 / sqrt(2 * 4) ≈ 0.71
+    assert index.search("a b c") == "doc"  # 3 / sqrt(3 * 4) ≈ 0.87
+    assert index.search("a b c d e f g") is None  # 4 / sqrt(7 * 4) ≈ 0.76
+    index.min_similarity = 0.7
+    assert index.search("a b") == "doc"
+
+
+def test_token_index_replaces_and_removes_documents():
+    index = TokenIndex(min_similarity=0.9)
+    index.add("doc", "hello world", "first")
+    index.add("doc", "goodbye world", "second")
+
+    assert index.search("hello world") is None
+    assert index.search("goodbye world") == "second"
+    assert len(index) == 1
+
+    index.remove("doc")
+    index.remove("doc")
+    assert index.search("goodbye world") is None
+    assert len(index) == 0
+
+
+def test_match_keys_ignore_what_the_strategy_ignores():
+    params = {"model": "stub_chat", "messages": [{"role": "user", "content": "hello"}]}
+    warmer = {**params, "temperature": 0.9}
+    followup = {**params, "messages": [{"role": "assistant", "content": "hi"}, *params["messages"]]}
+
+    keys = request_match_keys(params, _compute_request_hash(params))
+    assert keys[MatchStrategy.canonical_hash] != request_match_keys(warmer, _compute_request_hash(warmer))[
+        MatchStrategy.canonical_hash
+    ]
+    assert keys[MatchStrategy.messages_only] == stub_match_key(
+        MatchStrategy.messages_only, warmer, _compute_request_hash(warmer)
+    )
+    assert keys[MatchStrategy.last_user_message] == stub_match_key(
+        MatchStrategy.last_user_message, followup, _compute_request_hash(followup)
+    )
+    assert stub_match_key(MatchStrategy.regex, params, _compute_request_hash(params)) is None
+
+
+def _index(*lines):
+    index = StubIndex(min_similarity=0.5)
+    records = prepare_stub_records(list(lines), trust_tenant=True)
+    for record in records:
+        index.add(record)
+    return index, records
+
+
+def _match(index, prompt, model="stub_chat", tenant_id=None, **params):
+    request = {"model": model, "messages": [{"role": "user", "content": prompt}], **params}
+    entry = index.match(model=model, request_params=request, request_hash=_compute_request_hash(request), tenant_id=tenant_id)
+    return entry["response"]["choices"][0]["message"]["content"] if entry else None
+
+
+def test_stub_index_tries_strategies_from_the_most_specific():
+    index, _ = _index(
+        stub_line("hello", "exact"),
+        stub_line("hello", "any temperature", match_strategy=MatchStrategy.messages_only),
+        stub_line("hello", "regex", match_strategy=MatchStrategy.regex, match_pattern="^hel"),
+        stub_line("how is the weather in Paris", "neighbour", match_strategy=MatchStrategy.nearest_neighbour),
+    )
+
+    assert _match(index, "hello") == "exact"
+    assert _match(index, "hello", temperature=0.5) == "any temperature"
+    assert _match(index, "help") == "regex"
+    assert _match(index, "weather in Paris") == "neighbour"
+    assert _match(index, "unrelated") is None
+    assert _match(index, "hello", model="stub_other") is None
+
+
+def test_stub_index_keeps_regex_stubs_with_the_same_request_apart():
+    index, records = _index(
+        stub_line("hello", "first", match_strategy=MatchStrategy.regex, match_pattern="^first"),
+        stub_line("hello", "second", match_strategy=MatchStrategy.regex, match_pattern="^second"),
+    )
+
+    assert _match(index, "first try") == "first"
+    assert _match(index, "second try") == "second"
+
+    index.remove(records[0])
+    assert _match(index, "first try") is None
+    assert _match(index, "second try") == "second"
+    assert len(index) == 1
+
+
+def test_stub_index_keeps_tenants_apart():
+    tenant_id = uuid4()
+    index, records = _index(
+        stub_line("hello", "shared"),
+        stub_line("hello", "tenant", tenant_id=tenant_id),
+        stub_line("hello", "tenant regex", tenant_id=tenant_id, match_strategy=MatchStrategy.regex, match_pattern="x"),
+    )
+
+    assert _match(index, "hello") == "shared"
+    assert _match(index, "hello", tenant_id=tenant_id) == "tenant"
+    assert _match(index, "xylophone") is None
+    assert _match(index, "xylophone", tenant_id=str(tenant_id)) == "tenant regex"
+
+    request = records[0]["request_params"]
+    assert index.get(model="stub_chat", request_hash=_compute_request_hash(request), tenant_id=tenant_id) is not None
+    index.remove(records[1])
+    assert index.get(model="stub_chat", request_hash=_compute_request_hash(request), tenant_id=tenant_id) is None
+    assert index.get(model="stub_chat", request_hash=_compute_request_hash(request)) is not None
+
+
+@pytest.mark.parametrize("pattern,matches", [("(?i)HELLO", True), ("(unclosed", False)])
+def test_stub_index_survives_bad_regex_stubs(pattern, matches):
+    index, [bad] = _index(stub_line("hello", "bad", match_strategy=MatchStrategy.regex, match_pattern="hello"))
+    # Rows stored before patterns were validated on create
+    index.remove(bad)
+    index.add({**bad, "match_pattern": pattern})
+    index.add(prepare_stub_records([
+        stub_line("hello", "good", match_strategy=MatchStrategy.regex, match_pattern="^good")
+    ])[0])
+
+    assert _match(index, "good morning") == "good"
+    assert _match(index, "hello") == ("bad" if matches else None)
@@ -0,0 +1,164 @@
+"""
+Aggregating writer for `LLMErrorLog`.
+
+Provider outages produce bursts of identical errors, so errors are not written one row each. They are grouped by
+(provider, model, error_type, status_code) for `window` seconds, counted, and a few sample payloads are kept per group.
+Closed windows are bulk inserted by a background task.
+"""
+import asyncio
+import json
+import logging
+import random
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Tuple
+
+from sqlmodel import insert
+
+from backend.common.db.session import SessionLocal
+from backend.common.utils.uuid6 import uuid7
+from backend.proxy.core.config import settings
+from backend.proxy.models import LLMErrorLog
+
+logger = logging.getLogger(__name__)
+
+ErrorKey = Tuple[str, str, str, int | None]
+
+MAX_PAYLOAD_CHARS = 2000
+
+
+class ErrorRecorder:
+    """
+    Buffers errors in per-key aggregates and flushes closed windows to `LLMErrorLog`.
+
+    Recording is synchronous and never touches the database. Samples are a uniform reservoir over the window.
+    """
+
+    def __init__(self, window: float, flush_interval: float, max_samples: int, max_groups: int):
+        self.window = window
+        self.flush_interval = flush_interval
+        self.max_samples = max_samples
+        self.max_groups = max_groups
+        self._groups: Dict[ErrorKey, Dict[str, Any]] = {}
+        self._dropped = 0
+        self._task: asyncio.Task | None = None
+        self._rng = random.Random()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Stop the writer and flush every open window.
+        """
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        await self.flush(force=True)
+
+    def record(
+        self,
+        *,
+        provider: str | None,
+        model: str,
+        error_type: str,
+        error_message: str,
+        status_code: int | None = None,
+        payload: Any = None,
+    ) -> None:
+        key: ErrorKey = (provider or "unknown", model, error_type, status_code)
+        now = time.monotonic()
+        group = self._groups.get(key)
+
+        if group is None:
+            if len(self._groups) >= self.max_groups:
+                self._dropped += 1
+                return
+            group = self._groups[key] = {
+                "opened": now,
+                "request_id": uuid7(),
+                "error_message": error_message,
+                "timestamp": datetime.now(timezone.utc),
+                "occurrence_count": 0,
+                "sample_payloads": [],
+            }
+
+        group["occurrence_count"] += 1
+        group["last_seen"] = datetime.now(timezone.utc)
+
+        if payload is not None:
+            samples = group["sample_payloads"]
+            if len(samples) < self.max_samples:
+                samples.append(_serialize_payload(payload))
+            else:
+                # Reservoir sampling keeps each occurrence equally likely to be sampled
+                i = self._rng.randrange(group["occurrence_count"])
+                if i < self.max_samples:
+                    samples[i] = _serialize_payload(payload)
+
+    def _drain(self, force: bool) -> List[Dict[str, Any]]:
+        now = time.monotonic()
+        closed = [key for key, group in self._groups.items() if force or now - group["opened"] >= self.window]
+        rows = []
+        for key in closed:
+            group = self._groups.pop(key)
+            provider, model, error_type, status_code = key
+            rows.append({
+                "id": uuid7(),
+                "created_at": group["timestamp"],
+                "updated_at": group["last_seen"],
+                "provider": provider,
+                "model": model,
+                "error_type": error_type,
+                "status_code": status_code,
+                "request_id": group["request_id"],
+                "error_message": group["error_message"],
+                "timestamp": group["timestamp"],
+                "last_seen": group["last_seen"],
+                "occurrence_count": group["occurrence_count"],
+                "sample_payloads": group["sample_payloads"],
+            })
+        return rows
+
+    async def flush(self, force: bool = False) -> int:
+        """
+        Write the closed windows (all windows when `force` is set). Returns the number of rows written.
+        """
+        rows = self._drain(force)
+        if self._dropped:
+            logger.warning(f"Error recorder is full, dropped {self._dropped} errors of new kinds.")
+            self._dropped = 0
+        if not rows:
+            return 0
+        try:
+            async with SessionLocal() as db_session:
+                await db_session.execute(insert(LLMErrorLog), rows)
+                await db_session.commit()
+        except Exception:
+            logger.exception(f"Failed to write {len(rows)} aggregated LLM errors.")
+            return 0
+        return len(rows)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+
+def _serialize_payload(payload: Any) -> str:
+    text = payload if isinstance(payload, str) else json.dumps(payload, default=str)
+    return text[:MAX_PAYLOAD_CHARS]
+
+
+error_recorder = ErrorRecorder(
+    window=settings.ERROR_LOG_WINDOW,
+    flush_interval=settings.ERROR_LOG_FLUSH_INTERVAL,
+    max_samples=settings.ERROR_LOG_MAX_SAMPLES,
+    max_groups=settings.ERROR_LOG_MAX_GROUPS,
+)
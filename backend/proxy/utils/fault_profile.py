@@ -0,0 +1,147 @@
+"""
+Latency and fault injection for stub models.
+
+A `LLMStubFaultProfile` attached to a stub model makes its responses behave like a real provider: answers are delayed
+according to a latency distribution, a configurable share of requests fails with litellm exceptions, and streamed
+responses are paced chunk by chunk.
+"""
+import asyncio
+import bisect
+import math
+import random
+import time
+from itertools import accumulate
+from typing import Dict, List, Tuple
+
+from backend.proxy.core.config import settings
+from backend.proxy.crud import stub_fault_profile
+from backend.proxy.models import LatencyDistribution, LLMStubFaultProfile
+from backend.proxy.schema import latency_quantile
+from backend.proxy.utils.exceptions import SerializedException, raise_from_serialized_exception
+
+
+class FaultInjector:
+    """
+    Samples latencies and errors for one fault profile.
+    """
+
+    def __init__(
+        self,
+        profile: LLMStubFaultProfile,
+        latency_params: Dict[str, float] | None = None,
+        rng: random.Random | None = None,
+    ):
+        self.model = profile.model
+        self.distribution = LatencyDistribution(profile.latency_distribution)
+        self.params = latency_params if latency_params is not None else (profile.latency_params or {})
+        self.chunk_delay_ms = profile.chunk_delay_ms
+        self._rng = rng or random.Random()
+
+        error_types = list(profile.error_rates or {})
+        self._error_types = error_types
+        self._error_thresholds = list(accumulate(profile.error_rates[t] for t in error_types))
+
+        # Inverse CDF points for the recorded distribution, e.g. {"p50": 220} -> (0.5, 220)
+        quantiles = ((latency_quantile(k), v) for k, v in self.params.items())
+        self._quantiles: List[Tuple[float, float]] = sorted((q, v) for q, v in quantiles if q is not None)
+
+    def sample_latency_ms(self) -> float:
+        if self.distribution == LatencyDistribution.fixed:
+            return self.params.get("ms", 0.0)
+        if self.distribution == LatencyDistribution.normal:
+            return max(0.0, self._rng.gauss(self.params.get("mean_ms", 0.0), self.params.get("std_ms", 0.0)))
+        if self.distribution == LatencyDistribution.lognormal:
+            median = self.params.get("median_ms", 0.0)
+            if median <= 0:
+                return 0.0
+            return self._rng.lognormvariate(math.log(median), self.params.get("sigma", 0.0))
+        if self.distribution == LatencyDistribution.recorded:
+            return self._sample_recorded()
+        return 0.0
+
+    def _sample_recorded(self) -> float:
+        """
+        Piecewise linear interpolation between the recorded percentiles.
+        """
+        if not self._quantiles:
+            return 0.0
+        u = self._rng.random()
+        i = bisect.bisect_left(self._quantiles, (u, -math.inf))
+        if i == 0:
+            return self._quantiles[0][1]
+        if i == len(self._quantiles):
+            return self._quantiles[-1][1]
+        (q0, v0), (q1, v1) = self._quantiles[i - 1], self._quantiles[i]
+        return v0 + (v1 - v0) * (u - q0) / (q1 - q0)
+
+    def pick_error(self) -> str | None:
+        """
+        Exception type to raise for this request, if any.
+        """
+        if not self._error_types:
+            return None
+        i = bisect.bisect_right(self._error_thresholds, self._rng.random())
+        return self._error_types[i] if i < len(self._error_types) else None
+
+    async def apply(self) -> None:
+        """
+        Wait for a sampled latency, then raise an injected error if one is drawn.
+        """
+        latency_ms = self.sample_latency_ms()
+        if latency_ms > 0:
+            await asyncio.sleep(latency_ms / 1000)
+
+        error_type = self.pick_error()
+        if error_type:
+            try:
+                raise_from_serialized_exception(SerializedException(
+                    type=error_type,
+                    message=f"Injected {error_type} for stub model '{self.model}'",
+                    body=None,
+                    model=self.model,
+                    llm_provider="stub-provider",
+                ))
+            except Exception as e:
+                e.injected_fault = True  # type: ignore[attr-defined]
+                raise
+
+
+def is_injected_fault(e: BaseException) -> bool:
+    """
+    Whether an error was raised by a fault profile rather than by a provider.
+    """
+    return getattr(e, "injected_fault", False)
+
+
+class FaultProfileRegistry:
+    """
+    Process-wide cache of fault injectors per model, refreshed from the database every `ttl` seconds.
+    """
+
+    def __init__(self, ttl: float = 30.0):
+        self.ttl = ttl
+        self._cache: Dict[str, Tuple[float, FaultInjector | None]] = {}
+
+    async def get(self, model: str) -> FaultInjector | None:
+        cached = self._cache.get(model)
+        if cached and time.monotonic() - cached[0] < self.ttl:
+            return cached[1]
+
+        profile = await stub_fault_profile.get_by_model(model=model)
+        injector = None
+        if profile and profile.is_active:
+            latency_params = profile.latency_params
+            if profile.latency_distribution == LatencyDistribution.recorded and not latency_params:
+                latency_params = await stub_fault_profile.get_recorded_latency_percentiles(model=model)
+            injector = FaultInjector(profile, latency_params=latency_params)
+        self._cache[model] = (time.monotonic(), injector)
+        return injector
+
+    def invalidate(self, model: str | None = None) -> None:
+        if model is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(model, None)
+
+
+fault_profiles = FaultProfileRegistry(ttl=settings.FAULT_PROFILE_CACHE_TTL)
@@ -0,0 +1,161 @@
+"""
+Record-and-replay support for the proxy.
+
+In `record` mode completions are forwarded to the real provider and the `(request, response, latency)` triples are
+written to the stub tables by a background batched writer; streamed completions are recorded as the response
+assembled from their chunks. In `replay` mode the recorded responses are served back from the stub index, optionally
+reproducing the recorded latency.
+"""
+import asyncio
+import logging
+from enum import Enum
+from typing import Any, Dict, List
+from uuid import UUID
+
+import litellm
+from litellm.types.utils import ModelResponse
+
+from backend.common.db.session import SessionLocal
+from backend.common.models.m2m_client_model import APIKey
+from backend.proxy.core.config import settings
+from backend.proxy.crud import stub_response
+from backend.proxy.utils.stub_fixtures import build_stub_record
+from backend.proxy.utils.stub_index import stub_index
+
+logger = logging.getLogger(__name__)
+
+
+class ProxyMode(str, Enum):
+    passthrough = "passthrough"  # Default behaviour: stubs, stock response or provider
+    record = "record"            # Forward to the provider and record the exchange
+    replay = "replay"            # Serve recorded exchanges only
+
+
+def resolve_proxy_mode(api_key: APIKey | None, header_mode: ProxyMode | None) -> ProxyMode:
+    """
+    The `X-Proxy-Mode` header wins, then the per API key setting, then passthrough.
+    """
+    if header_mode is not None:
+        return header_mode
+    if api_key is not None and api_key.name in settings.PROXY_MODE_BY_API_KEY:
+        return ProxyMode(settings.PROXY_MODE_BY_API_KEY[api_key.name])
+    return ProxyMode.passthrough
+
+
+class StubRecorder:
+    """
+    Buffers recorded exchanges and upserts them into `LLMStubRequestResponse` in batches.
+
+    Recording never blocks the request: when the buffer is full the exchange is dropped and logged.
+    """
+
+    def __init__(self, batch_size: int, flush_interval: float, max_pending: int):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: asyncio.Queue[Dict[str, Any] | None] = asyncio.Queue(maxsize=max_pending)
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Flush everything still buffered and stop the writer.
+        """
+        if self._task is None:
+            return
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+
+    def record(
+        self,
+        *,
+        request_params: Dict[str, Any],
+        response: ModelResponse,
+        latency_ms: float,
+        provider: str | None = None,
+        tenant_id: UUID | None = None,
+    ) -> None:
+        record = build_stub_record(
+            request_params=request_params,
+            response=response,
+            model=request_params.get("model"),
+            provider=provider,
+            tenant_id=tenant_id,
+            latency_ms=latency_ms,
+            notes="recorded",
+        )
+        # Visible to replay in this process straight away, before the batch reaches the database
+        stub_index.add(record)
+        try:
+            self._queue.put_nowait(record)
+        except asyncio.QueueFull:
+            logger.warning(f"Stub recorder buffer is full, dropping recording for model '{record['model']}'.")
+
+    def record_stream(
+        self,
+        *,
+        request_params: Dict[str, Any],
+        chunks: List[Any],
+        latency_ms: float,
+        provider: str | None = None,
+        tenant_id: UUID | None = None,
+    ) -> None:
+        """
+        Record a streamed exchange as the complete response assembled from its chunks.
+        """
+        try:
+            response = litellm.stream_chunk_builder(chunks, messages=request_params.get("messages"))
+        except Exception:
+            logger.exception(f"Could not assemble the streamed response for model '{request_params.get('model')}'.")
+            return
+        if isinstance(response, ModelResponse):
+            self.record(
+                request_params=request_params,
+                response=response,
+                latency_ms=latency_ms,
+                provider=provider,
+                tenant_id=tenant_id,
+            )
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is None:
+                break
+
+            batch: List[Dict[str, Any]] = [item]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            await self._flush(batch)
+
+    async def _flush(self, batch: List[Dict[str, Any]]) -> None:
+        try:
+            async with SessionLocal() as db_session:
+                await stub_response.bulk_upsert(records=batch, db_session=db_session)
+                await db_session.commit()
+        except Exception:
+            logger.exception(f"Failed to write {len(batch)} recorded stubs.")
+
+
+stub_recorder = StubRecorder(
+    batch_size=settings.RECORDER_BATCH_SIZE,
+    flush_interval=settings.RECORDER_FLUSH_INTERVAL,
+    max_pending=settings.RECORDER_MAX_PENDING,
+)
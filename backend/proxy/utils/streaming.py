@@ -0,0 +1,59 @@
+"""
+Server-sent event helpers for streamed chat completions.
+"""
+import asyncio
+import json
+import re
+from typing import Any, AsyncIterator, Callable, Dict, List
+
+from litellm.types.utils import ModelResponse
+
+SSE_DONE = "data: [DONE]\n\n"
+_TOKEN_PATTERN = re.compile(r"\s*\S+\s*")
+
+
+def _sse(data: Dict[str, Any]) -> str:
+    return f"data: {json.dumps(data)}\n\n"
+
+
+async def stream_stub_response(response: ModelResponse, chunk_delay_ms: float = 0.0) -> AsyncIterator[str]:
+    """
+    Replay a complete response as `chat.completion.chunk` events, one word per chunk.
+
+    `chunk_delay_ms` is slept between chunks to mimic provider token pacing.
+    """
+    choice = response.choices[0]
+    content = choice.message.content or ""  # type: ignore
+    base = {"id": response.id, "object": "chat.completion.chunk", "created": response.created, "model": response.model}
+
+    pieces = _TOKEN_PATTERN.findall(content) or [""]
+    for i, piece in enumerate(pieces):
+        if i and chunk_delay_ms > 0:
+            await asyncio.sleep(chunk_delay_ms / 1000)
+        delta = {"role": "assistant", "content": piece} if i == 0 else {"content": piece}
+        yield _sse({**base, "choices": [{"index": 0, "delta": delta, "finish_reason": None}]})
+
+    final = {**base, "choices": [{"index": 0, "delta": {}, "finish_reason": choice.finish_reason}]}
+    usage = getattr(response, "usage", None)
+    if usage:
+        final["usage"] = usage.model_dump()
+    yield _sse(final)
+    yield SSE_DONE
+
+
+async def relay_provider_stream(
+    stream: AsyncIterator[Any], on_complete: Callable[[List[Any]], None] | None = None
+) -> AsyncIterator[str]:
+    """
+    Relay a litellm streaming response as server-sent events.
+
+    `on_complete` is called with all chunks once the provider has finished the stream, e.g. to record it.
+    """
+    chunks: List[Any] = []
+    async for chunk in stream:
+        if on_complete is not None:
+            chunks.append(chunk)
+        yield f"data: {chunk.model_dump_json()}\n\n"
+    if on_complete is not None:
+        on_complete(chunks)
+    yield SSE_DONE
@@ -0,0 +1,215 @@
+"""
+NDJSON stub fixture format.
+
+Each line is one `ILLMStubRequestResponseCreate` object. The same format is used by the bulk import/export endpoints
+and by offline fixture packs that are loaded straight into the in-memory stub index. Imported stubs belong to the
+importing tenant; only fixture packs, which are trusted files, keep the `tenant_id` of their lines.
+"""
+import asyncio
+import json
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List
+from uuid import UUID
+
+from litellm.types.utils import ModelResponse
+from pydantic import ValidationError
+
+from backend.common.utils.uuid6 import uuid7
+from backend.proxy.core.config import settings
+from backend.proxy.crud import _normalize, _compute_request_hash, _compute_stub_key
+from backend.proxy.models import LLMStubRequestResponse, MatchStrategy
+from backend.proxy.schema import ILLMStubRequestResponseCreate
+from backend.proxy.utils.stub_index import StubIndex
+from backend.proxy.utils.stub_matching import stub_match_key
+
+logger = logging.getLogger(__name__)
+
+STUB_PREFIX = "stub_"
+FIXTURE_SUFFIXES = (".ndjson", ".jsonl")
+
+_executor: ProcessPoolExecutor | None = None
+
+
+def build_stub_record(
+    *,
+    request_params: Any,
+    response: ModelResponse | Dict[str, Any],
+    model: str | None,
+    provider: str | None = None,
+    tenant_id: UUID | None = None,
+    notes: str | None = None,
+    latency_ms: float | None = None,
+    match_strategy: MatchStrategy = MatchStrategy.canonical_hash,
+    match_pattern: str | None = None,
+) -> Dict[str, Any]:
+    """
+    Build a row for `CRUDLLMStubRequestResponse.bulk_upsert` from a request/response pair.
+    """
+    now = datetime.now(timezone.utc)
+    request_params = _normalize(request_params)
+    request_hash = _compute_request_hash(request_params)
+    return {
+        "id": uuid7(),
+        "created_at": now,
+        "updated_at": now,
+        "tenant_id": tenant_id,
+        "provider": provider,
+        "model": model,
+        "request_params": request_params,
+        "response": response.model_dump() if isinstance(response, ModelResponse) else response,
+        "notes": notes,
+        "request_hash": request_hash,
+        "latency_ms": latency_ms,
+        "match_strategy": match_strategy,
+        "match_pattern": match_pattern,
+        "match_key": stub_match_key(match_strategy, request_params, request_hash),
+        "stub_key": _compute_stub_key(
+            tenant_id=tenant_id,
+            model=model,
+            request_hash=request_hash,
+            match_strategy=match_strategy,
+            match_pattern=match_pattern,
+        ),
+    }
+
+
+def prepare_stub_records(
+    lines: List[str],
+    first_line_no: int = 1,
+    tenant_id: UUID | None = None,
+    trust_tenant: bool = False,
+) -> List[Dict[str, Any]]:
+    """
+    Parse, validate, normalize and hash a batch of NDJSON stub lines.
+
+    The stubs belong to `tenant_id`, and lines naming another tenant are rejected, unless `trust_tenant` is set, in
+    which case each line keeps its own `tenant_id`. Runs inside a worker process, so it only takes and returns plain
+    data.
+    """
+    records = []
+    for line_no, line in enumerate(lines, start=first_line_no):
+        if not line.strip():
+            continue
+        try:
+            stub = ILLMStubRequestResponseCreate.model_validate(json.loads(line))
+        except (json.JSONDecodeError, ValidationError) as e:
+            raise ValueError(f"Invalid stub on line {line_no}: {e}") from e
+        if not stub.model or not stub.model.startswith(STUB_PREFIX):
+            raise ValueError(f"Invalid stub on line {line_no}: stub models must start with '{STUB_PREFIX}'.")
+        if not trust_tenant and stub.tenant_id not in (None, tenant_id):
+            raise ValueError(f"Invalid stub on line {line_no}: stubs can only be imported for your own tenant.")
+
+        records.append(build_stub_record(
+            request_params=stub.request_params,
+            response=stub.response,
+            model=stub.model,
+            provider=stub.provider,
+            tenant_id=stub.tenant_id if trust_tenant else tenant_id,
+            notes=stub.notes,
+            latency_ms=stub.latency_ms,
+            match_strategy=stub.match_strategy,
+            match_pattern=stub.match_pattern,
+        ))
+    return records
+
+
+def dump_stub_record(stub: LLMStubRequestResponse) -> str:
+    """
+    Serialize a stored stub as one NDJSON line.
+    """
+    return json.dumps({
+        "tenant_id": str(stub.tenant_id) if stub.tenant_id else None,
+        "provider": stub.provider,
+        "model": stub.model,
+        "request_params": stub.request_params,
+        "response": stub.response,
+        "notes": stub.notes,
+        "request_hash": stub.request_hash,
+        "latency_ms": stub.latency_ms,
+        "match_strategy": stub.match_strategy,
+        "match_pattern": stub.match_pattern,
+    }, default=str) + "\n"
+
+
+def get_stub_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=settings.STUB_IMPORT_WORKERS)
+    return _executor
+
+
+def shutdown_stub_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(cancel_futures=True)
+        _executor = None
+
+
+async def aiter_ndjson_batches(chunks: AsyncIterator[bytes], batch_size: int) -> AsyncIterator[List[str]]:
+    """
+    Split a streamed request body into batches of NDJSON lines without buffering the whole body.
+    """
+    pending = b""
+    batch: List[str] = []
+    async for chunk in chunks:
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            batch.append(line.decode("utf-8"))
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+    if pending.strip():
+        batch.append(pending.decode("utf-8"))
+    if batch:
+        yield batch
+
+
+async def aprepare_stub_batches(
+    chunks: AsyncIterator[bytes], batch_size: int, tenant_id: UUID | None = None
+) -> AsyncIterator[List[Dict[str, Any]]]:
+    """
+    Hash NDJSON batches of stubs of `tenant_id` in the worker pool.
+
+    The next batch is hashed while the caller is still writing the previous one.
+    """
+    loop = asyncio.get_running_loop()
+    executor = get_stub_executor()
+    in_flight: List[asyncio.Future] = []
+    line_no = 1
+    try:
+        async for lines in aiter_ndjson_batches(chunks, batch_size):
+            in_flight.append(loop.run_in_executor(executor, prepare_stub_records, lines, line_no, tenant_id))
+            line_no += len(lines)
+            if len(in_flight) > 1:
+                yield await in_flight.pop(0)
+        while in_flight:
+            yield await in_flight.pop(0)
+    finally:
+        # Drop batches still queued when the caller stops early, e.g. on a validation error
+        for future in in_flight:
+            if not future.cancel():
+                future.exception()
+
+
+def load_fixture_pack(path: str | Path, index: StubIndex) -> int:
+    """
+    Load an NDJSON fixture file, or every fixture file in a directory, into the stub index.
+
+    Returns the number of stubs loaded.
+    """
+    path = Path(path)
+    files = sorted(p for p in path.iterdir() if p.suffix in FIXTURE_SUFFIXES) if path.is_dir() else [path]
+
+    loaded = 0
+    for file in files:
+        with file.open("r", encoding="utf-8") as f:
+            lines = f.readlines()
+        for record in prepare_stub_records(lines, trust_tenant=True):
+            index.add(record)
+            loaded += 1
+        logger.info(f"Loaded stub fixture pack '{file}'.")
+    return loaded
@@ -0,0 +1,135 @@
+"""
+In-memory index of stubbed request/response pairs.
+
+Lets the proxy answer stub lookups without a database round trip. The index is filled from offline fixture packs,
+recorded traffic, replay lookups that fell through to the database and, for regex and nearest-neighbour stubs which
+cannot be looked up in the database, from the stub table at startup.
+"""
+from collections import defaultdict
+from typing import Any, Dict, Optional, Tuple, cast
+from uuid import UUID
+
+from backend.proxy.core.config import settings
+from backend.proxy.models import MatchStrategy
+from backend.proxy.utils.stub_matching import (
+    RegexMatcher,
+    TokenIndex,
+    last_user_message,
+    request_match_keys,
+    stub_match_key,
+    user_text,
+)
+
+StubKey = Tuple[Optional[str], Optional[str], str]
+ModelKey = Tuple[Optional[str], Optional[str]]
+
+
+class StubIndex:
+    """
+    Maps `(tenant_id, model, match_key)` to a stub entry holding the serialized `ModelResponse` and the recorded
+    provider latency, with a regex matcher and a nearest-neighbour index per `(tenant_id, model)`. Entries of the
+    matcher and the nearest-neighbour index are keyed by `stub_key`, so stubs sharing request params stay apart and
+    re-adding a stub replaces its entry.
+    """
+
+    def __init__(self, min_similarity: float = 0.8) -> None:
+        self.min_similarity = min_similarity
+        self._entries: Dict[StubKey, Dict[str, Any]] = {}
+        self._regex: Dict[ModelKey, RegexMatcher[Dict[str, Any]]] = defaultdict(RegexMatcher)
+        self._neighbours: Dict[ModelKey, TokenIndex[Dict[str, Any]]] = defaultdict(
+            lambda: TokenIndex(self.min_similarity)
+        )
+
+    @staticmethod
+    def _model_key(tenant_id: UUID | str | None, model: str | None) -> ModelKey:
+        return (str(tenant_id) if tenant_id else None, model)
+
+    @classmethod
+    def _key(cls, tenant_id: UUID | str | None, model: str | None, match_key: str) -> StubKey:
+        return (*cls._model_key(tenant_id, model), match_key)
+
+    def add(self, record: Dict[str, Any]) -> None:
+        """
+        Add a stub record (as produced by `build_stub_record`, or a dumped stub row) to the index.
+        """
+        entry = {"response": record["response"], "latency_ms": record.get("latency_ms")}
+        strategy = MatchStrategy(record.get("match_strategy") or MatchStrategy.canonical_hash)
+        model_key = self._model_key(record.get("tenant_id"), record.get("model"))
+        messages = (record.get("request_params") or {}).get("messages") or []
+
+        if strategy == MatchStrategy.regex:
+            self._regex[model_key].add(record["stub_key"], record["match_pattern"], entry)
+        elif strategy == MatchStrategy.nearest_neighbour:
+            self._neighbours[model_key].add(record["stub_key"], user_text(messages), entry)
+        else:
+            match_key: str = record.get("match_key") or cast(
+                str, stub_match_key(strategy, record.get("request_params") or {}, record["request_hash"])
+            )
+            self._entries[(*model_key, match_key)] = entry
+
+    def remove(self, record: Dict[str, Any]) -> None:
+        model_key = self._model_key(record.get("tenant_id"), record.get("model"))
+        strategy = MatchStrategy(record.get("match_strategy") or MatchStrategy.canonical_hash)
+        if strategy == MatchStrategy.regex:
+            if model_key in self._regex:
+                self._regex[model_key].remove(record["stub_key"])
+        elif strategy == MatchStrategy.nearest_neighbour:
+            if model_key in self._neighbours:
+                self._neighbours[model_key].remove(record["stub_key"])
+        else:
+            match_key = record.get("match_key") or stub_match_key(
+                strategy, record.get("request_params") or {}, record["request_hash"]
+            )
+            self._entries.pop((*model_key, match_key), None)  # type: ignore[arg-type]
+
+    def get(
+        self, *, model: str | None, request_hash: str, tenant_id: UUID | str | None = None
+    ) -> Dict[str, Any] | None:
+        """
+        Exact lookup by canonical request hash, as used by replay.
+        """
+        return self._entries.get(self._key(tenant_id, model, request_hash))
+
+    def match(
+        self,
+        *,
+        model: str | None,
+        request_params: Dict[str, Any],
+        request_hash: str,
+        tenant_id: UUID | str | None = None,
+    ) -> Dict[str, Any] | None:
+        """
+        Find the stub for a normalized request, trying strategies from the most to the least specific.
+        """
+        for match_key in request_match_keys(request_params, request_hash).values():
+            entry = self._entries.get(self._key(tenant_id, model, match_key))
+            if entry is not None:
+                return entry
+
+        model_key = self._model_key(tenant_id, model)
+        messages = request_params.get("messages") or []
+        regex = self._regex.get(model_key)
+        if regex:
+            entry = regex.search(last_user_message(messages) or "")
+            if entry is not None:
+                return entry
+
+        neighbours = self._neighbours.get(model_key)
+        if neighbours:
+            return neighbours.search(user_text(messages))
+        return None
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._regex.clear()
+        self._neighbours.clear()
+
+    def __len__(self) -> int:
+        return (
+            len(self._entries)
+            + sum(len(m) for m in self._regex.values())
+            + sum(len(i) for i in self._neighbours.values())
+        )
+
+
+stub_index = StubIndex(min_similarity=settings.STUB_NN_MIN_SIMILARITY)
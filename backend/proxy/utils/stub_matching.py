@@ -0,0 +1,220 @@
+"""
+Request matching for stubs.
+
+Each `MatchStrategy` decides which part of a request a stub must match:
+
+- `exact` / `canonical_hash`: the whole canonicalized request (`request_hash`).
+- `messages_only`: the messages, ignoring sampling and other parameters.
+- `last_user_message`: the content of the last user message.
+- `regex`: `match_pattern` searched in the last user message.
+- `nearest_neighbour`: the stub whose user message text is most similar to the request's.
+
+Hash-based strategies reduce a request to a `match_key` that is stored (and indexed) on the stub, so every lookup is a
+dictionary or B-tree probe. Regex and nearest-neighbour stubs are served from the in-memory indexes below.
+"""
+import hashlib
+import json
+import logging
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Any, Dict, Generic, List, Optional, Set, Tuple, TypeVar
+
+from backend.proxy.models import MatchStrategy
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+HASH_STRATEGIES = (
+    MatchStrategy.exact,
+    MatchStrategy.canonical_hash,
+    MatchStrategy.messages_only,
+    MatchStrategy.last_user_message,
+)
+INDEXED_STRATEGIES = (MatchStrategy.regex, MatchStrategy.nearest_neighbour)
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+# Constructs that break when a pattern is wrapped in a group and joined with others: backreferences (group numbers
+# shift), named groups (names may clash between stubs) and inline global flags (only allowed at the very start)
+_UNCOMBINABLE_PATTERN = re.compile(r"\\[1-9]|\(\?P[<=]|\(\?[aiLmsux]+\)")
+
+
+def message_text(message: Dict[str, Any]) -> str:
+    """
+    Text of a chat message, joining the text parts of multi-part content.
+    """
+    content = message.get("content")
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "\n".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return ""
+
+
+def last_user_message(messages: List[Dict[str, Any]]) -> str | None:
+    for message in reversed(messages):
+        if message.get("role") == "user":
+            return message_text(message)
+    return None
+
+
+def user_text(messages: List[Dict[str, Any]]) -> str:
+    return "\n".join(message_text(m) for m in messages if m.get("role") == "user")
+
+
+def _hash_key(strategy: MatchStrategy, value: Any) -> str:
+    # The strategy prefix keeps keys of different strategies from colliding in a shared index
+    canonical_json = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(f"{strategy.value}:{canonical_json}".encode("utf-8")).hexdigest()
+
+
+def request_match_keys(request_params: Dict[str, Any], request_hash: str) -> Dict[MatchStrategy, str]:
+    """
+    Keys of a (normalized) request under each hash-based strategy, in match priority order.
+    """
+    messages = request_params.get("messages") or []
+    keys = {
+        MatchStrategy.canonical_hash: request_hash,
+        MatchStrategy.messages_only: _hash_key(MatchStrategy.messages_only, messages),
+    }
+    last = last_user_message(messages)
+    if last is not None:
+        keys[MatchStrategy.last_user_message] = _hash_key(MatchStrategy.last_user_message, last)
+    return keys
+
+
+def stub_match_key(strategy: MatchStrategy, request_params: Dict[str, Any], request_hash: str) -> str | None:
+    """
+    The key a stub is stored under for its strategy; `None` for strategies served from in-memory indexes.
+    """
+    strategy = MatchStrategy(strategy)
+    if strategy in INDEXED_STRATEGIES:
+        return None
+    if strategy == MatchStrategy.exact:
+        strategy = MatchStrategy.canonical_hash
+    return request_match_keys(request_params, request_hash).get(strategy)
+
+
+class RegexMatcher(Generic[T]):
+    """
+    Matches text against many patterns with a single compiled alternation.
+
+    The alternation is rebuilt lazily on the first search after a change. Patterns that cannot be combined
+    (backreferences, named groups, inline global flags) are compiled and tried one by one. A pattern that does not
+    compile is logged and skipped, so one bad stub cannot break matching for the others.
+    """
+
+    def __init__(self) -> None:
+        self._patterns: Dict[Any, Tuple[str, T]] = {}
+        self._combined: Optional[re.Pattern] = None
+        self._group_ids: Dict[str, Any] = {}
+        self._separate: List[Tuple[re.Pattern, T]] = []
+        self._dirty = False
+
+    def add(self, key: Any, pattern: str, value: T) -> None:
+        self._patterns[key] = (pattern, value)
+        self._dirty = True
+
+    def remove(self, key: Any) -> None:
+        if self._patterns.pop(key, None) is not None:
+            self._dirty = True
+
+    def _compile(self) -> None:
+        alternatives, self._group_ids, self._separate = [], {}, []
+        combinable = []
+        for i, (key, (pattern, value)) in enumerate(self._patterns.items()):
+            try:
+                compiled = re.compile(pattern)
+            except re.error as e:
+                logger.error(f"Skipping stub {key}: invalid match pattern {pattern!r}: {e}")
+                continue
+            if _UNCOMBINABLE_PATTERN.search(pattern):
+                self._separate.append((compiled, value))
+                continue
+            group = f"_stub{i}"
+            self._group_ids[group] = key
+            alternatives.append(f"(?P<{group}>{pattern})")
+            combinable.append((compiled, value))
+        try:
+            self._combined = re.compile("|".join(alternatives)) if alternatives else None
+        except re.error:
+            # Patterns that compile alone but not together; match them one by one
+            logger.exception("Could not combine stub match patterns, matching them one by one.")
+            self._combined, self._group_ids = None, {}
+            self._separate = combinable + self._separate
+        self._dirty = False
+
+    def search(self, text: str) -> T | None:
+        if self._dirty:
+            self._compile()
+        if self._combined is not None:
+            match = self._combined.search(text)
+            if match:
+                return self._patterns[self._group_ids[match.lastgroup]][1]  # type: ignore[index]
+        for pattern, value in self._separate:
+            if pattern.search(text):
+                return value
+        return None
+
+    def __len__(self) -> int:
+        return len(self._patterns)
+
+
+class TokenIndex(Generic[T]):
+    """
+    Nearest-neighbour search by cosine similarity of token sets, using an inverted index with prefix filtering.
+
+    A document can only reach `min_similarity` if it shares at least `ceil(min_similarity² · |query|)` tokens with
+    the query, so candidates are drawn from the postings of the rarest query tokens only and then verified.
+    """
+
+    def __init__(self, min_similarity: float) -> None:
+        self.min_similarity = min_similarity
+        self._postings: Dict[str, Set[Any]] = defaultdict(set)
+        self._docs: Dict[Any, Tuple[frozenset, T]] = {}
+
+    @staticmethod
+    def tokenize(text: str) -> frozenset:
+        return frozenset(_TOKEN_PATTERN.findall(text.lower()))
+
+    def add(self, key: Any, text: str, value: T) -> None:
+        self.remove(key)
+        tokens = self.tokenize(text)
+        if not tokens:
+            return
+        self._docs[key] = (tokens, value)
+        for token in tokens:
+            self._postings[token].add(key)
+
+    def remove(self, key: Any) -> None:
+        doc = self._docs.pop(key, None)
+        if doc is None:
+            return
+        for token in doc[0]:
+            postings = self._postings[token]
+            postings.discard(key)
+            if not postings:
+                del self._postings[token]
+
+    def search(self, text: str) -> T | None:
+        query = self.tokenize(text)
+        if not query:
+            return None
+
+        min_overlap = max(1, math.ceil(self.min_similarity ** 2 * len(query)))
+        by_rarity = sorted(query, key=lambda t: len(self._postings.get(t, ())))
+        candidates: Counter = Counter()
+        for token in by_rarity[: len(query) - min_overlap + 1]:
+            candidates.update(self._postings.get(token, ()))
+
+        best, best_score = None, self.min_similarity
+        for key in candidates:
+            tokens, value = self._docs[key]
+            score = len(query & tokens) / math.sqrt(len(query) * len(tokens))
+            if score >= best_score:
+                best, best_score = value, score
+        return best
+
+    def __len__(self) -> int:
+        return len(self._docs)